@@ -32,6 +32,7 @@ class Settings(BaseSettings):
     
     # Database Configuration
     database_url: Optional[str] = None
+    query_page_size: int = 1000  # rows per page of full-history selects; keep at or below PostgREST's max_rows
     
     # API Configuration
     api_host: str = "0.0.0.0"
@@ -48,7 +49,76 @@ class Settings(BaseSettings):
     google_oauth_client_id: Optional[str] = None
     google_oauth_client_secret: Optional[str] = None
     google_oauth_redirect_uris: str = "http://localhost:8084/auth/google/callback,exp://localhost:8084/auth/google/callback"
-    
+
+    # Idempotency Configuration (Idempotency-Key replay for mutating endpoints)
+    idempotency_backend: str = "memory"  # "memory" or "supabase"
+    idempotency_ttl_seconds: int = 86400
+    idempotency_max_entries: int = 10000
+
+    # Analytics Cache Configuration (entries keyed on the user's write version)
+    analytics_cache_ttl_seconds: int = 300
+    analytics_cache_max_entries: int = 1024
+
+    # Weight Unit Cache (per-process cache of each user's weightUnit preference)
+    weight_unit_cache_ttl_seconds: int = 300
+    weight_unit_cache_max_entries: int = 10000
+
+    # Set Write Coalescing (merge updates to one set arriving within the window; 0 disables)
+    set_write_coalesce_window_ms: int = 0
+
+    # Active-Session Write-Behind Buffer (set writes for the active workout acknowledged
+    # after a local journal append and flushed in batches; single worker per journal)
+    session_buffer_enabled: bool = False
+    session_buffer_journal_path: str = "data/session_journal.jsonl"
+    session_buffer_flush_interval_seconds: float = 2.0
+    session_buffer_idle_close_seconds: int = 600
+
+    # Live Workout Channel (GET /workouts/{id}/live fan-out of set and exercise changes)
+    live_hub_backend: str = "local"  # "local" (this worker only) or "postgres" (LISTEN/NOTIFY via DATABASE_URL)
+    live_hub_queue_size: int = 256
+
+    # Background Task Queue (worker pool for post-write side effects such as personal records)
+    task_queue_workers: int = 4
+    task_queue_max_size: int = 1000
+    task_queue_max_attempts: int = 3
+    task_queue_backoff_seconds: float = 0.5
+    task_queue_drain_timeout_seconds: float = 10.0
+
+    # Stale Workout Closer (periodic job closing forgotten active workouts)
+    stale_workout_closer_enabled: bool = True
+    stale_workout_idle_hours: int = 12
+    stale_workout_batch_size: int = 500
+    stale_workout_max_batches: int = 20
+    stale_workout_interval_seconds: int = 900
+
+    # Sets Partition Maintenance (periodic job creating monthly partitions ahead)
+    set_partition_maintenance_enabled: bool = True
+    set_partition_months_ahead: int = 3
+    set_partition_interval_seconds: int = 86400
+
+    # Cold Workout Archive (periodic job moving old workouts' sets to compressed archive rows)
+    # Analytics only read archive summaries for windows older than the cutoff, so raising
+    # archive_after_days hides workouts archived under the old cutoff until they are opened
+    workout_archive_enabled: bool = True
+    workout_archive_after_days: int = 365
+    workout_archive_batch_size: int = 200
+    workout_archive_max_batches: int = 10
+    workout_archive_interval_seconds: int = 86400
+
+    # Workout Event Relay (periodic job moving trigger-written outbox events into the
+    # append-only event log, then running registered event log consumers)
+    workout_event_relay_enabled: bool = True
+    workout_event_relay_batch_size: int = 500
+    workout_event_relay_max_batches: int = 20
+    workout_event_relay_interval_seconds: float = 5.0
+
+    # Workout Event Log Retention (periodic job deleting log events every registered
+    # consumer has committed; a consumer that never commits keeps the whole log)
+    workout_event_log_prune_enabled: bool = True
+    workout_event_log_prune_batch_size: int = 5000
+    workout_event_log_prune_max_batches: int = 20
+    workout_event_log_prune_interval_seconds: int = 3600
+
     @field_validator('supabase_url')
     @classmethod
     def validate_supabase_url(cls, v):
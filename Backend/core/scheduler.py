@@ -0,0 +1,169 @@
+"""
+In-process periodic job scheduler.
+
+Runs registered maintenance jobs on fixed intervals inside the API process.
+Jobs are synchronous callables (the Supabase client is synchronous) and run
+in a worker thread so they never block the event loop. Each job records its
+last result or error so runs can be inspected and logged.
+
+The scheduler is started and stopped from the FastAPI lifespan in main.py.
+With several worker processes every process runs its own scheduler, so jobs
+must be safe to run concurrently (e.g. use SKIP LOCKED batches).
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ScheduledJob:
+    """A job run every ``interval_seconds`` with its latest outcome."""
+    name: str
+    func: Callable[[], Any]
+    interval_seconds: float
+    initial_delay_seconds: float = 0.0
+    runs: int = 0
+    failures: int = 0
+    last_started_at: Optional[float] = None
+    last_duration_seconds: Optional[float] = None
+    last_result: Any = None
+    last_error: Optional[str] = None
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    def status(self) -> Dict[str, Any]:
+        """Job state for logging and health reporting."""
+        return {
+            "name": self.name,
+            "interval_seconds": self.interval_seconds,
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_duration_seconds": self.last_duration_seconds,
+            "last_result": self.last_result,
+            "last_error": self.last_error
+        }
+
+
+class Scheduler:
+    """Runs registered jobs on asyncio timers until stopped."""
+
+    def __init__(self):
+        self._jobs: Dict[str, ScheduledJob] = {}
+        self._running = False
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def register(self, name: str, func: Callable[[], Any], interval_seconds: float,
+                 initial_delay_seconds: float = 0.0) -> ScheduledJob:
+        """
+        Register a job. Jobs registered while running start immediately.
+
+        Args:
+            name: Unique job name
+            func: Synchronous callable; its return value is kept as last_result
+            interval_seconds: Delay between the end of one run and the next
+            initial_delay_seconds: Delay before the first run
+
+        Returns:
+            The registered job
+        """
+        if name in self._jobs:
+            raise ValueError(f"Job already registered: {name}")
+        if interval_seconds <= 0:
+            raise ValueError("interval_seconds must be positive")
+
+        job = ScheduledJob(name=name, func=func, interval_seconds=interval_seconds,
+                           initial_delay_seconds=initial_delay_seconds)
+        self._jobs[name] = job
+        if self._running:
+            job.task = asyncio.get_running_loop().create_task(self._loop(job))
+        return job
+
+    def has_job(self, name: str) -> bool:
+        """Whether a job with this name is registered."""
+        return name in self._jobs
+
+    def jobs(self) -> List[Dict[str, Any]]:
+        """Status of every registered job."""
+        return [job.status() for job in self._jobs.values()]
+
+    async def start(self) -> None:
+        """Start a timer task per registered job."""
+        if self._running:
+            return
+        self._running = True
+        loop = asyncio.get_running_loop()
+        for job in self._jobs.values():
+            job.task = loop.create_task(self._loop(job))
+        logger.info(f"Scheduler started with {len(self._jobs)} jobs")
+
+    async def stop(self) -> None:
+        """Cancel all job timers and wait for them to finish."""
+        if not self._running:
+            return
+        self._running = False
+        tasks = [job.task for job in self._jobs.values() if job.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for job in self._jobs.values():
+            job.task = None
+        logger.info("Scheduler stopped")
+
+    async def run_now(self, name: str) -> Any:
+        """Run a job once immediately and return its result."""
+        return await self._run(self._jobs[name])
+
+    async def _loop(self, job: ScheduledJob) -> None:
+        await asyncio.sleep(job.initial_delay_seconds)
+        while True:
+            await self._run(job)
+            await asyncio.sleep(job.interval_seconds)
+
+    async def _run(self, job: ScheduledJob) -> Any:
+        started = time.monotonic()
+        job.last_started_at = time.time()
+        try:
+            job.last_result = await asyncio.to_thread(job.func)
+            job.last_error = None
+            return job.last_result
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            job.failures += 1
+            job.last_error = str(e)
+            logger.error(f"Scheduled job {job.name} failed: {str(e)}")
+            return None
+        finally:
+            job.runs += 1
+            job.last_duration_seconds = round(time.monotonic() - started, 3)
+
+
+# Singleton scheduler for the API process
+_scheduler_instance = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> Scheduler:
+    """
+    Get singleton Scheduler instance.
+
+    Returns:
+        Scheduler instance
+    """
+    global _scheduler_instance
+
+    if _scheduler_instance is None:
+        with _scheduler_lock:
+            if _scheduler_instance is None:  # Double-check locking
+                _scheduler_instance = Scheduler()
+
+    return _scheduler_instance
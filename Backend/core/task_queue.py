@@ -0,0 +1,318 @@
+"""
+In-process background task queue for post-write side effects.
+
+Services enqueue synchronous side effects (personal record maintenance and
+similar derived-data updates) and return without waiting for them. A pool of
+asyncio workers started from the FastAPI lifespan in main.py runs them in
+worker threads, so they never block the event loop:
+- One bounded priority queue: HIGH before NORMAL before LOW, FIFO within a
+  priority. When it is full a task whose key has work outstanding still
+  waits behind that work; any other task runs in the caller's thread, so
+  backpressure slows writers down rather than dropping work. Callers on the
+  event loop hand it to a thread instead, so the loop never runs a task
+- Tasks sharing a key (e.g. a user id) run one at a time in enqueue order,
+  so a set's "created" update can never land after its "deleted" one, even
+  when the queue is full
+- Failed tasks are retried with exponential backoff without holding a worker
+- Stopping drains the queue (retries waiting on backoff are run at once)
+  for up to ``drain_timeout_seconds``
+- ``stats`` reports queue depth per priority and task counters
+
+Tasks may run more than once (retries), so they must be idempotent. When the
+pool is not running (scripts, tests, after shutdown) enqueue runs the task
+inline, logging a failure like a background run would. With several worker
+processes every process runs its own pool.
+"""
+
+import asyncio
+import itertools
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from core.config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class TaskPriority(IntEnum):
+    """Task priority; lower values run first."""
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
+@dataclass(order=True)
+class BackgroundTask:
+    """A queued side effect and its retry state."""
+    priority: TaskPriority
+    seq: int
+    name: str = field(compare=False)
+    func: Callable[[], Any] = field(compare=False, repr=False)
+    key: Optional[str] = field(default=None, compare=False)
+    max_attempts: int = field(default=3, compare=False)
+    attempts: int = field(default=0, compare=False)
+
+
+class TaskQueue:
+    """Bounded priority queue drained by a pool of asyncio workers."""
+
+    def __init__(self, workers: int = 4, max_size: int = 1000, max_attempts: int = 3,
+                 backoff_seconds: float = 0.5, max_backoff_seconds: float = 30.0,
+                 drain_timeout_seconds: float = 10.0):
+        self._worker_count = max(workers, 1)
+        self._max_size = max_size
+        self._max_attempts = max(max_attempts, 1)
+        self._backoff_seconds = backoff_seconds
+        self._max_backoff_seconds = max_backoff_seconds
+        self._drain_timeout_seconds = drain_timeout_seconds
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._workers: List[asyncio.Task] = []
+        self._retry_timers: Dict[int, Tuple[asyncio.TimerHandle, BackgroundTask]] = {}
+        self._running = False
+        # Keys with a task queued, running or waiting to retry -> tasks waiting behind it
+        self._keyed: Dict[str, Deque[BackgroundTask]] = {}
+        self._pending: Dict[TaskPriority, int] = {priority: 0 for priority in TaskPriority}
+        self._in_flight = 0
+        self._counters = {"enqueued": 0, "completed": 0, "failed": 0, "retried": 0, "ran_inline": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def enqueue(self, name: str, func: Callable[[], Any], priority: TaskPriority = TaskPriority.NORMAL,
+                key: Optional[str] = None, max_attempts: Optional[int] = None) -> bool:
+        """
+        Queue a side effect from any thread and return immediately.
+
+        Args:
+            name: Task name for logs
+            func: Synchronous, idempotent callable
+            priority: Queue priority
+            key: Tasks with the same key run one at a time in enqueue order
+            max_attempts: Attempts before giving up (default from settings)
+
+        Returns:
+            True if queued, False if the task ran outside the pool (pool stopped or queue full)
+        """
+        task = BackgroundTask(
+            priority=priority, seq=next(self._seq), name=name, func=func, key=key,
+            max_attempts=max_attempts or self._max_attempts
+        )
+        with self._lock:
+            if key is not None and key in self._keyed:
+                # Another task for this key is active; run after it even if the
+                # queue is full, so the key's tasks keep their order
+                self._pending[priority] += 1
+                self._counters["enqueued"] += 1
+                self._keyed[key].append(task)
+                return True
+
+            if not self._running:
+                self._counters["ran_inline"] += 1
+                claimed = False
+            else:
+                # Full or not, the task holds its key until it finishes
+                self._pending[priority] += 1
+                if key is not None:
+                    self._keyed[key] = deque()
+                claimed = True
+                queued = sum(self._pending.values()) <= self._max_size
+                self._counters["enqueued" if queued else "ran_inline"] += 1
+
+        if not claimed:
+            self._run_inline(task)
+            return False
+        if queued:
+            self._submit(task)
+            return True
+
+        if self._on_loop():
+            logger.warning(f"Background queue full; running {name} in a thread")
+            self._loop.run_in_executor(None, self._run_overflow, task)
+        else:
+            logger.warning(f"Background queue full; running {name} inline")
+            self._run_overflow(task)
+        return False
+
+    async def start(self) -> None:
+        """Start the worker pool on the running event loop."""
+        if self._running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.PriorityQueue()
+        self._keyed.clear()
+        self._pending = {priority: 0 for priority in TaskPriority}
+        self._workers = [self._loop.create_task(self._work()) for _ in range(self._worker_count)]
+        self._running = True
+        logger.info(f"Background task queue started with {self._worker_count} workers")
+
+    async def stop(self) -> None:
+        """Stop accepting tasks, drain the queue (bounded by the drain timeout) and stop the workers."""
+        if not self._running:
+            return
+        with self._lock:
+            self._running = False
+
+        # Retries waiting on backoff get their last attempt now
+        for timer, task in self._retry_timers.values():
+            timer.cancel()
+            self._queue.put_nowait(task)
+        self._retry_timers.clear()
+
+        try:
+            await asyncio.wait_for(self._drain(), timeout=self._drain_timeout_seconds)
+        except asyncio.TimeoutError:
+            logger.error(f"Background queue drain timed out with {sum(self._pending.values())} tasks left")
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        with self._lock:
+            # Tasks left by a timed-out drain are dropped; later tasks run inline
+            self._keyed.clear()
+        logger.info("Background task queue stopped")
+
+    def stats(self) -> Dict[str, Any]:
+        """Accepted unfinished tasks per priority (queued, running or retrying), tasks running and lifetime counters."""
+        with self._lock:
+            return {
+                "depth": {priority.name.lower(): count for priority, count in self._pending.items()},
+                "in_flight": self._in_flight,
+                "retry_waiting": len(self._retry_timers),
+                **self._counters
+            }
+
+    def _submit(self, task: BackgroundTask) -> None:
+        """Put a task on the queue from any thread."""
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, task)
+
+    def _on_loop(self) -> bool:
+        """Whether the caller is running on the pool's event loop."""
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    async def _drain(self) -> None:
+        """Wait until every accepted task has finished."""
+        while True:
+            await self._queue.join()
+            await asyncio.sleep(0)  # let submissions from other threads land
+            with self._lock:
+                if not any(self._pending.values()):
+                    return
+            # Tasks run outside the pool (queue full) are still finishing
+            await asyncio.sleep(0.01)
+
+    async def _work(self) -> None:
+        while True:
+            task = await self._queue.get()
+            with self._lock:
+                self._in_flight += 1
+            try:
+                task.attempts += 1
+                await asyncio.to_thread(task.func)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._after_failure(task, e)
+            else:
+                with self._lock:
+                    self._counters["completed"] += 1
+                self._finish(task)
+            finally:
+                with self._lock:
+                    self._in_flight -= 1
+                self._queue.task_done()
+
+    def _after_failure(self, task: BackgroundTask, error: Exception) -> None:
+        if task.attempts >= task.max_attempts or not self._running:
+            logger.error(f"Background task {task.name} failed after {task.attempts} attempts: {str(error)}")
+            with self._lock:
+                self._counters["failed"] += 1
+            self._finish(task)
+            return
+
+        delay = min(self._backoff_seconds * 2 ** (task.attempts - 1), self._max_backoff_seconds)
+        logger.warning(f"Background task {task.name} failed (attempt {task.attempts}), retrying in {delay}s: {str(error)}")
+        with self._lock:
+            self._counters["retried"] += 1
+        self._retry_timers[task.seq] = (self._loop.call_later(delay, self._retry, task), task)
+
+    def _retry(self, task: BackgroundTask) -> None:
+        self._retry_timers.pop(task.seq, None)
+        self._queue.put_nowait(task)
+
+    def _finish(self, task: BackgroundTask) -> None:
+        """Release the task's slot and start the next task waiting on its key."""
+        with self._lock:
+            self._pending[task.priority] -= 1
+            if task.key is None:
+                return
+            waiting = self._keyed.get(task.key)
+            if waiting:
+                next_task = waiting.popleft()
+            else:
+                self._keyed.pop(task.key, None)
+                return
+        if self._on_loop():
+            self._queue.put_nowait(next_task)
+        else:
+            self._submit(next_task)
+
+    def _run_overflow(self, task: BackgroundTask) -> None:
+        """Run a task that found the queue full, then release its key."""
+        task.attempts += 1
+        if self._run_inline(task):
+            with self._lock:
+                self._counters["completed"] += 1
+        else:
+            with self._lock:
+                self._counters["failed"] += 1
+        self._finish(task)
+
+    @staticmethod
+    def _run_inline(task: BackgroundTask) -> bool:
+        try:
+            task.func()
+            return True
+        except Exception as e:
+            logger.error(f"Background task {task.name} failed: {str(e)}")
+            return False
+
+
+# Singleton queue shared by services and the app lifespan
+_task_queue = None
+_task_queue_lock = threading.Lock()
+
+
+def get_task_queue() -> TaskQueue:
+    """
+    Get singleton TaskQueue instance.
+
+    Returns:
+        TaskQueue instance
+    """
+    global _task_queue
+
+    if _task_queue is None:
+        with _task_queue_lock:
+            if _task_queue is None:  # Double-check locking
+                _task_queue = TaskQueue(
+                    workers=settings.task_queue_workers,
+                    max_size=settings.task_queue_max_size,
+                    max_attempts=settings.task_queue_max_attempts,
+                    backoff_seconds=settings.task_queue_backoff_seconds,
+                    drain_timeout_seconds=settings.task_queue_drain_timeout_seconds
+                )
+
+    return _task_queue
@@ -0,0 +1,99 @@
+"""
+Per-user write versions for derived-data caches.
+
+WorkoutService bumps a user's version after every write that changes their
+training data. Caches of derived results (analytics) store the version they
+were computed at and treat an entry as stale once the version moves, so
+dashboards are served from memory until the user logs something new.
+
+Versions are process-local: with several worker processes a write is only
+seen by the worker that handled it, so cached entries also carry a TTL that
+bounds how stale another worker's cache can be.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class WriteVersionRegistry:
+    """Thread-safe monotonically increasing write counter per user."""
+
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: Any) -> int:
+        """Current write version for a user (0 if never written)."""
+        return self._versions.get(str(user_id), 0)
+
+    def bump(self, user_id: Any) -> int:
+        """Record a write for a user and return the new version."""
+        key = str(user_id)
+        with self._lock:
+            version = self._versions.get(key, 0) + 1
+            self._versions[key] = version
+            return version
+
+
+class VersionedCache:
+    """
+    Bounded LRU cache whose entries are valid while the user's write version
+    is unchanged and the entry is younger than ``ttl_seconds``.
+    """
+
+    def __init__(self, registry: WriteVersionRegistry, max_entries: int = 1024, ttl_seconds: int = 300):
+        self._registry = registry
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[int, float, Any]]" = OrderedDict()
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+    def current_version(self, user_id: Any) -> int:
+        """Version to pass to ``set`` - read it before computing the value."""
+        return self._registry.get(user_id)
+
+    def get(self, user_id: Any, key: Hashable) -> Optional[Any]:
+        """Cached value for the user and key, or None if missing or stale."""
+        cache_key = (str(user_id), key)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is None:
+                return None
+            version, stored_at, value = entry
+            if version != self._registry.get(user_id) or time.monotonic() - stored_at > self._ttl_seconds:
+                del self._entries[cache_key]
+                return None
+            self._entries.move_to_end(cache_key)
+            return value
+
+    def set(self, user_id: Any, key: Hashable, value: Any, version: int) -> None:
+        """Store a value computed at ``version``."""
+        with self._lock:
+            self._entries[(str(user_id), key)] = (version, time.monotonic(), value)
+            self._entries.move_to_end((str(user_id), key))
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+
+# Singleton registry shared by writers and caches
+_write_version_registry = None
+_write_version_registry_lock = threading.Lock()
+
+
+def get_write_version_registry() -> WriteVersionRegistry:
+    """
+    Get singleton WriteVersionRegistry instance.
+
+    Returns:
+        WriteVersionRegistry instance
+    """
+    global _write_version_registry
+
+    if _write_version_registry is None:
+        with _write_version_registry_lock:
+            if _write_version_registry is None:  # Double-check locking
+                _write_version_registry = WriteVersionRegistry()
+
+    return _write_version_registry
@@ -0,0 +1,120 @@
+-- Benchmark: RLS ownership checks on workout_exercises and sets
+-- Compares the subquery policies from before migration 009 with the
+-- denormalized user_id policies, on a seeded dataset, using EXPLAIN ANALYZE
+-- as the authenticated role. Everything runs in one transaction that is
+-- rolled back, so it leaves no data or policy changes behind.
+--
+-- Run against a local or staging database with migration 009 applied:
+--   psql "$DATABASE_URL" -v users=1000 -v workouts=40 -f database/benchmarks/rls_owner_explain.sql
+-- Seeds users x workouts workouts with 5 exercises and 4 sets each.
+
+\if :{?users}
+\else
+  \set users 1000
+\endif
+\if :{?workouts}
+\else
+  \set workouts 40
+\endif
+\timing on
+
+BEGIN;
+
+DO $$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'authenticated') THEN
+    CREATE ROLE authenticated NOLOGIN;
+  END IF;
+END;
+$$;
+GRANT USAGE ON SCHEMA public, auth TO authenticated;
+GRANT SELECT, UPDATE ON workouts, workout_exercises, sets TO authenticated;
+
+-- Measure the policies alone: skip last-performance maintenance for the
+-- seed and the benchmarked UPDATE (re-enabled by the rollback)
+ALTER TABLE sets
+  DISABLE TRIGGER sets_last_performance_insert,
+  DISABLE TRIGGER sets_last_performance_update,
+  DISABLE TRIGGER sets_last_performance_delete;
+
+-- Seed
+INSERT INTO auth.users (id)
+SELECT ('00000000-0000-4000-8000-' || lpad(to_hex(u), 12, '0'))::uuid
+FROM generate_series(1, :users) u;
+
+INSERT INTO users (id, email)
+SELECT ('00000000-0000-4000-8000-' || lpad(to_hex(u), 12, '0'))::uuid, 'bench' || u || '@example.com'
+FROM generate_series(1, :users) u;
+
+INSERT INTO workouts (user_id, title, started_at, is_active)
+SELECT u.id, 'Bench', NOW() - (w || ' days')::interval, false
+FROM users u, generate_series(1, :workouts) w
+WHERE u.email LIKE 'bench%@example.com';
+
+INSERT INTO workout_exercises (workout_id, exercise_id, order_index)
+SELECT w.id, e.id, e.position * 1024
+FROM workouts w
+CROSS JOIN LATERAL (SELECT id, ROW_NUMBER() OVER (ORDER BY name) AS position FROM exercises LIMIT 5) e
+WHERE w.title = 'Bench';
+
+INSERT INTO sets (workout_exercise_id, reps, weight_grams, order_index)
+SELECT we.id, 8, (60 + s * 5) * 1000, s
+FROM workout_exercises we
+JOIN workouts w ON w.id = we.workout_id AND w.title = 'Bench'
+CROSS JOIN generate_series(0, 3) s;
+
+ANALYZE workouts;
+ANALYZE workout_exercises;
+ANALYZE sets;
+
+SELECT (SELECT count(*) FROM workout_exercises) AS workout_exercises, (SELECT count(*) FROM sets) AS sets;
+
+-- Probe a user in the middle of the data set
+SELECT set_config('request.jwt.claim.sub', id::text, true) AS bench_user
+FROM users WHERE email = 'bench' || (:users / 2) || '@example.com';
+SELECT we.id AS bench_workout_exercise_id
+FROM workout_exercises we
+WHERE we.user_id = auth.uid()::uuid
+LIMIT 1 \gset
+SELECT id AS bench_set_id FROM sets WHERE workout_exercise_id = :'bench_workout_exercise_id' LIMIT 1 \gset
+
+-- 1. Denormalized user_id policies (migration 009)
+SET LOCAL ROLE authenticated;
+\echo '=== user_id policy: all own sets ==='
+EXPLAIN (ANALYZE, BUFFERS, COSTS OFF) SELECT count(*) FROM sets;
+\echo '=== user_id policy: sets of one workout exercise ==='
+EXPLAIN (ANALYZE, BUFFERS, COSTS OFF) SELECT * FROM sets WHERE workout_exercise_id = :'bench_workout_exercise_id';
+\echo '=== user_id policy: update one set ==='
+EXPLAIN (ANALYZE, BUFFERS, COSTS OFF) UPDATE sets SET rest_time = 90 WHERE id = :'bench_set_id';
+\echo '=== user_id policy: all own workout exercises ==='
+EXPLAIN (ANALYZE, BUFFERS, COSTS OFF) SELECT count(*) FROM workout_exercises;
+RESET ROLE;
+
+-- 2. Subquery policies as they were before migration 009
+DROP POLICY "Users can manage own workout exercises" ON workout_exercises;
+CREATE POLICY "Users can manage own workout exercises" ON workout_exercises
+  FOR ALL USING (
+    workout_id IN (SELECT id FROM workouts WHERE user_id = auth.uid())
+  );
+DROP POLICY "Users can manage own sets" ON sets;
+CREATE POLICY "Users can manage own sets" ON sets
+  FOR ALL USING (
+    workout_exercise_id IN (
+      SELECT we.id FROM workout_exercises we
+      JOIN workouts w ON w.id = we.workout_id
+      WHERE w.user_id = auth.uid()
+    )
+  );
+
+SET LOCAL ROLE authenticated;
+\echo '=== subquery policy: all own sets ==='
+EXPLAIN (ANALYZE, BUFFERS, COSTS OFF) SELECT count(*) FROM sets;
+\echo '=== subquery policy: sets of one workout exercise ==='
+EXPLAIN (ANALYZE, BUFFERS, COSTS OFF) SELECT * FROM sets WHERE workout_exercise_id = :'bench_workout_exercise_id';
+\echo '=== subquery policy: update one set ==='
+EXPLAIN (ANALYZE, BUFFERS, COSTS OFF) UPDATE sets SET rest_time = 90 WHERE id = :'bench_set_id';
+\echo '=== subquery policy: all own workout exercises ==='
+EXPLAIN (ANALYZE, BUFFERS, COSTS OFF) SELECT count(*) FROM workout_exercises;
+RESET ROLE;
+
+ROLLBACK;
@@ -0,0 +1,21 @@
+-- Migration 001: Idempotency keys
+-- Backs the persistent Idempotency-Key store (IDEMPOTENCY_BACKEND=supabase).
+-- Rows are only read/written by the backend service role, so RLS is enabled
+-- without any policies.
+
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+  key TEXT PRIMARY KEY,
+  fingerprint TEXT NOT NULL,
+  completed BOOLEAN NOT NULL DEFAULT false,
+  status_code INTEGER,
+  response_body JSONB,
+  expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW())
+);
+
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_expires_at ON idempotency_keys(expires_at);
+
+ALTER TABLE idempotency_keys ENABLE ROW LEVEL SECURITY;
+
+-- Expired keys are ignored by the backend; purge them periodically with:
+-- DELETE FROM idempotency_keys WHERE expires_at < NOW();
@@ -0,0 +1,65 @@
+-- Migration 002: Bulk add and reorder workout exercises
+-- Workout exercise ordering uses gapped indexes (multiples of 1024) so a
+-- drag-and-drop move can write one row at the midpoint of its neighbours.
+
+-- Bulk add exercises to a workout in one statement. Ownership is checked in
+-- the same transaction; exercise existence is enforced by the foreign key.
+-- p_items: [{"exercise_id": uuid, "order_index": int|null, "notes": text|null}, ...]
+CREATE OR REPLACE FUNCTION add_workout_exercises(p_user_id UUID, p_workout_id UUID, p_items JSONB, p_gap INTEGER DEFAULT 1024)
+RETURNS SETOF workout_exercises
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_max_index INTEGER;
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM workouts WHERE id = p_workout_id AND user_id = p_user_id) THEN
+    RAISE EXCEPTION 'Workout not found' USING ERRCODE = 'P0002';
+  END IF;
+
+  SELECT COALESCE(MAX(order_index), -p_gap) INTO v_max_index
+  FROM workout_exercises WHERE workout_id = p_workout_id;
+
+  RETURN QUERY
+    INSERT INTO workout_exercises (workout_id, exercise_id, order_index, notes)
+    SELECT p_workout_id,
+           i.exercise_id,
+           COALESCE(i.order_index, v_max_index + p_gap * t.ordinality::INTEGER),
+           i.notes
+    FROM jsonb_array_elements(p_items) WITH ORDINALITY AS t(item, ordinality)
+    CROSS JOIN LATERAL jsonb_to_record(t.item) AS i(exercise_id UUID, order_index INTEGER, notes TEXT)
+    ORDER BY t.ordinality
+    RETURNING *;
+END;
+$$;
+
+-- Rewrite the order of every exercise in a workout with one UPDATE.
+-- Also used to rebalance when a move finds no free index between neighbours.
+CREATE OR REPLACE FUNCTION reorder_workout_exercises(p_user_id UUID, p_workout_id UUID, p_exercise_ids UUID[], p_gap INTEGER DEFAULT 1024)
+RETURNS SETOF workout_exercises
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_count INTEGER;
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM workouts WHERE id = p_workout_id AND user_id = p_user_id) THEN
+    RAISE EXCEPTION 'Workout not found' USING ERRCODE = 'P0002';
+  END IF;
+
+  IF (SELECT COUNT(*) FROM workout_exercises WHERE workout_id = p_workout_id) <> cardinality(p_exercise_ids) THEN
+    RAISE EXCEPTION 'Reorder must include every exercise in the workout' USING ERRCODE = '22023';
+  END IF;
+
+  RETURN QUERY
+    UPDATE workout_exercises we
+    SET order_index = (t.ordinality::INTEGER - 1) * p_gap
+    FROM unnest(p_exercise_ids) WITH ORDINALITY AS t(exercise_id, ordinality)
+    WHERE we.workout_id = p_workout_id
+      AND we.exercise_id = t.exercise_id
+    RETURNING we.*;
+
+  GET DIAGNOSTICS v_count = ROW_COUNT;
+  IF v_count <> cardinality(p_exercise_ids) THEN
+    RAISE EXCEPTION 'Exercise not found in workout' USING ERRCODE = 'P0002';
+  END IF;
+END;
+$$;
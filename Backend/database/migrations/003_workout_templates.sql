@@ -0,0 +1,123 @@
+-- Migration 003: Workout templates
+-- Stored routines (exercises, order, target sets/reps/weight) that materialize
+-- into a full workout - workout, workout_exercises and planned sets - in one
+-- transaction via create_workout_from_template.
+
+CREATE TABLE IF NOT EXISTS workout_templates (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  title TEXT NOT NULL CHECK (char_length(title) <= 30 AND char_length(title) > 0),
+  notes TEXT,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW()),
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW())
+);
+
+CREATE TABLE IF NOT EXISTS workout_template_exercises (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  template_id UUID NOT NULL REFERENCES workout_templates(id) ON DELETE CASCADE,
+  exercise_id UUID NOT NULL REFERENCES exercises(id) ON DELETE CASCADE,
+  order_index INTEGER NOT NULL CHECK (order_index >= 0),
+  target_sets INTEGER NOT NULL DEFAULT 1 CHECK (target_sets BETWEEN 1 AND 20),
+  target_reps INTEGER CHECK (target_reps > 0),
+  target_weight DECIMAL(5,2) CHECK (target_weight >= 0),
+  target_duration INTEGER CHECK (target_duration > 0), -- seconds
+  target_distance DECIMAL(8,2) CHECK (target_distance > 0), -- meters
+  rest_time INTEGER CHECK (rest_time >= 0), -- seconds
+  notes TEXT,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW()),
+  UNIQUE(template_id, exercise_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_workout_templates_user_id ON workout_templates(user_id);
+CREATE INDEX IF NOT EXISTS idx_workout_template_exercises_template_id ON workout_template_exercises(template_id, order_index);
+
+ALTER TABLE workout_templates ENABLE ROW LEVEL SECURITY;
+ALTER TABLE workout_template_exercises ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can manage own workout templates" ON workout_templates
+  FOR ALL USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can manage own workout template exercises" ON workout_template_exercises
+  FOR ALL USING (
+    template_id IN (SELECT id FROM workout_templates WHERE user_id = auth.uid())
+  );
+
+CREATE TRIGGER update_workout_templates_updated_at BEFORE UPDATE ON workout_templates
+  FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- Create a template and all of its exercises in one transaction.
+-- p_exercises: [{"exercise_id": uuid, "order_index": int|null, "target_sets": int|null,
+--                "target_reps": int|null, "target_weight": numeric|null, ...}, ...]
+CREATE OR REPLACE FUNCTION create_workout_template(p_user_id UUID, p_title TEXT, p_notes TEXT, p_exercises JSONB, p_gap INTEGER DEFAULT 1024)
+RETURNS SETOF workout_templates
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_template workout_templates;
+BEGIN
+  INSERT INTO workout_templates (user_id, title, notes)
+  VALUES (p_user_id, p_title, p_notes)
+  RETURNING * INTO v_template;
+
+  INSERT INTO workout_template_exercises (
+    template_id, exercise_id, order_index, target_sets, target_reps, target_weight,
+    target_duration, target_distance, rest_time, notes
+  )
+  SELECT v_template.id,
+         i.exercise_id,
+         COALESCE(i.order_index, p_gap * (t.ordinality::INTEGER - 1)),
+         COALESCE(i.target_sets, 1),
+         i.target_reps,
+         i.target_weight,
+         i.target_duration,
+         i.target_distance,
+         i.rest_time,
+         i.notes
+  FROM jsonb_array_elements(p_exercises) WITH ORDINALITY AS t(item, ordinality)
+  CROSS JOIN LATERAL jsonb_to_record(t.item) AS i(
+    exercise_id UUID, order_index INTEGER, target_sets INTEGER, target_reps INTEGER,
+    target_weight NUMERIC, target_duration INTEGER, target_distance NUMERIC,
+    rest_time INTEGER, notes TEXT
+  );
+
+  RETURN NEXT v_template;
+END;
+$$;
+
+-- Materialize a template into a new active workout: one INSERT per table, with
+-- planned (not yet completed) sets expanded from target_sets by generate_series.
+CREATE OR REPLACE FUNCTION create_workout_from_template(p_user_id UUID, p_template_id UUID, p_title TEXT DEFAULT NULL, p_started_at TIMESTAMP WITH TIME ZONE DEFAULT NULL)
+RETURNS SETOF workouts
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_template workout_templates;
+  v_workout workouts;
+BEGIN
+  SELECT * INTO v_template FROM workout_templates WHERE id = p_template_id AND user_id = p_user_id;
+  IF NOT FOUND THEN
+    RAISE EXCEPTION 'Template not found' USING ERRCODE = 'P0002';
+  END IF;
+
+  INSERT INTO workouts (user_id, title, started_at, is_active)
+  VALUES (p_user_id, COALESCE(p_title, v_template.title), COALESCE(p_started_at, TIMEZONE('utc', NOW())), true)
+  RETURNING * INTO v_workout;
+
+  WITH created AS (
+    INSERT INTO workout_exercises (workout_id, exercise_id, order_index, notes)
+    SELECT v_workout.id, te.exercise_id, te.order_index, te.notes
+    FROM workout_template_exercises te
+    WHERE te.template_id = p_template_id
+    RETURNING id, exercise_id
+  )
+  INSERT INTO sets (workout_exercise_id, reps, weight, duration, distance, rest_time, completed, order_index)
+  SELECT created.id, te.target_reps, te.target_weight, te.target_duration, te.target_distance,
+         te.rest_time, false, s.n - 1
+  FROM created
+  JOIN workout_template_exercises te
+    ON te.template_id = p_template_id AND te.exercise_id = created.exercise_id
+  CROSS JOIN LATERAL generate_series(1, te.target_sets) AS s(n);
+
+  RETURN NEXT v_workout;
+END;
+$$;
@@ -0,0 +1,53 @@
+-- Migration 004: Server-side workout cloning
+-- Copies a workout's exercises and sets into a new active workout without
+-- the data leaving the database.
+
+-- Clone a workout into a new active workout. Sets are copied as planned
+-- (not completed) sets in their original order.
+-- p_mode: 'structure' copies reps/duration/distance/rest but not weights,
+--         'with_weights' also copies the weights used last time.
+CREATE OR REPLACE FUNCTION clone_workout(p_user_id UUID, p_workout_id UUID, p_mode TEXT DEFAULT 'structure', p_title TEXT DEFAULT NULL, p_started_at TIMESTAMP WITH TIME ZONE DEFAULT NULL)
+RETURNS SETOF workouts
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_source workouts;
+  v_workout workouts;
+BEGIN
+  IF p_mode NOT IN ('structure', 'with_weights') THEN
+    RAISE EXCEPTION 'Invalid clone mode: %', p_mode USING ERRCODE = '22023';
+  END IF;
+
+  SELECT * INTO v_source FROM workouts WHERE id = p_workout_id AND user_id = p_user_id;
+  IF NOT FOUND THEN
+    RAISE EXCEPTION 'Workout not found' USING ERRCODE = 'P0002';
+  END IF;
+
+  INSERT INTO workouts (user_id, title, started_at, is_active)
+  VALUES (p_user_id, COALESCE(p_title, v_source.title), COALESCE(p_started_at, TIMEZONE('utc', NOW())), true)
+  RETURNING * INTO v_workout;
+
+  WITH created AS (
+    INSERT INTO workout_exercises (workout_id, exercise_id, order_index, notes)
+    SELECT v_workout.id, we.exercise_id, we.order_index, we.notes
+    FROM workout_exercises we
+    WHERE we.workout_id = p_workout_id
+    RETURNING id, exercise_id
+  )
+  INSERT INTO sets (workout_exercise_id, reps, weight, duration, distance, rest_time, completed, order_index)
+  SELECT created.id,
+         s.reps,
+         CASE WHEN p_mode = 'with_weights' THEN s.weight END,
+         s.duration,
+         s.distance,
+         s.rest_time,
+         false,
+         s.order_index
+  FROM created
+  JOIN workout_exercises we
+    ON we.workout_id = p_workout_id AND we.exercise_id = created.exercise_id
+  JOIN sets s ON s.workout_exercise_id = we.id;
+
+  RETURN NEXT v_workout;
+END;
+$$;
@@ -0,0 +1,135 @@
+-- Migration 005: Last performance per user and exercise
+-- Caches each user's most recent completed sets per exercise so "last time:
+-- 3x8 @ 80kg" is a primary-key lookup instead of a scan of the user's
+-- workouts -> workout_exercises -> sets history. Maintained by statement-level
+-- triggers on sets, so bulk inserts refresh each affected exercise once.
+
+CREATE TABLE IF NOT EXISTS exercise_last_performance (
+  user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  exercise_id UUID NOT NULL REFERENCES exercises(id) ON DELETE CASCADE,
+  workout_id UUID NOT NULL, -- no FK: triggers repoint the row when the source is deleted
+  workout_exercise_id UUID NOT NULL,
+  performed_at TIMESTAMP WITH TIME ZONE NOT NULL,
+  sets JSONB NOT NULL, -- [{"reps", "weight", "duration", "distance", "rest_time"}, ...] in set order
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW()),
+  PRIMARY KEY (user_id, exercise_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_exercise_last_performance_workout_exercise_id ON exercise_last_performance(workout_exercise_id);
+
+ALTER TABLE exercise_last_performance ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own last performance" ON exercise_last_performance
+  FOR SELECT USING (auth.uid() = user_id);
+
+-- Refresh the cache for the given workout exercises. Completed sets of an
+-- affected workout exercise replace the cached row when they are at least as
+-- recent; cached rows whose source lost all completed sets fall back to the
+-- next most recent workout in the user's history.
+CREATE OR REPLACE FUNCTION refresh_exercise_last_performance(p_workout_exercise_ids UUID[])
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF cardinality(p_workout_exercise_ids) = 0 THEN
+    RETURN;
+  END IF;
+
+  INSERT INTO exercise_last_performance (user_id, exercise_id, workout_id, workout_exercise_id, performed_at, sets)
+  SELECT DISTINCT ON (w.user_id, we.exercise_id)
+         w.user_id, we.exercise_id, w.id, we.id, w.started_at,
+         jsonb_agg(jsonb_build_object(
+           'reps', s.reps, 'weight', s.weight, 'duration', s.duration,
+           'distance', s.distance, 'rest_time', s.rest_time
+         ) ORDER BY s.order_index)
+  FROM workout_exercises we
+  JOIN workouts w ON w.id = we.workout_id
+  JOIN sets s ON s.workout_exercise_id = we.id AND s.completed
+  WHERE we.id = ANY(p_workout_exercise_ids)
+  GROUP BY w.user_id, we.exercise_id, w.id, we.id, w.started_at
+  ORDER BY w.user_id, we.exercise_id, w.started_at DESC
+  ON CONFLICT (user_id, exercise_id) DO UPDATE SET
+    workout_id = EXCLUDED.workout_id,
+    workout_exercise_id = EXCLUDED.workout_exercise_id,
+    performed_at = EXCLUDED.performed_at,
+    sets = EXCLUDED.sets,
+    updated_at = TIMEZONE('utc', NOW())
+  WHERE EXCLUDED.performed_at >= exercise_last_performance.performed_at
+     OR EXCLUDED.workout_exercise_id = exercise_last_performance.workout_exercise_id;
+
+  WITH stale AS (
+    DELETE FROM exercise_last_performance elp
+    WHERE elp.workout_exercise_id = ANY(p_workout_exercise_ids)
+      AND NOT EXISTS (
+        SELECT 1 FROM sets s WHERE s.workout_exercise_id = elp.workout_exercise_id AND s.completed
+      )
+    RETURNING elp.user_id, elp.exercise_id
+  )
+  INSERT INTO exercise_last_performance (user_id, exercise_id, workout_id, workout_exercise_id, performed_at, sets)
+  SELECT DISTINCT ON (w.user_id, we.exercise_id)
+         w.user_id, we.exercise_id, w.id, we.id, w.started_at, completed_sets.sets
+  FROM stale
+  JOIN workouts w ON w.user_id = stale.user_id
+  JOIN workout_exercises we ON we.workout_id = w.id AND we.exercise_id = stale.exercise_id
+  CROSS JOIN LATERAL (
+    SELECT jsonb_agg(jsonb_build_object(
+             'reps', s.reps, 'weight', s.weight, 'duration', s.duration,
+             'distance', s.distance, 'rest_time', s.rest_time
+           ) ORDER BY s.order_index) AS sets
+    FROM sets s
+    WHERE s.workout_exercise_id = we.id AND s.completed
+  ) completed_sets
+  WHERE completed_sets.sets IS NOT NULL
+  ORDER BY w.user_id, we.exercise_id, w.started_at DESC;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION sets_refresh_last_performance()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    -- Planned (uncompleted) sets from templates and clones never change the cache
+    PERFORM refresh_exercise_last_performance(ARRAY(
+      SELECT DISTINCT workout_exercise_id FROM new_sets WHERE completed
+    ));
+  ELSIF TG_OP = 'UPDATE' THEN
+    PERFORM refresh_exercise_last_performance(ARRAY(
+      SELECT workout_exercise_id FROM new_sets UNION SELECT workout_exercise_id FROM old_sets
+    ));
+  ELSE
+    PERFORM refresh_exercise_last_performance(ARRAY(
+      SELECT DISTINCT workout_exercise_id FROM old_sets
+    ));
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER sets_last_performance_insert AFTER INSERT ON sets
+  REFERENCING NEW TABLE AS new_sets
+  FOR EACH STATEMENT EXECUTE FUNCTION sets_refresh_last_performance();
+
+CREATE TRIGGER sets_last_performance_update AFTER UPDATE ON sets
+  REFERENCING OLD TABLE AS old_sets NEW TABLE AS new_sets
+  FOR EACH STATEMENT EXECUTE FUNCTION sets_refresh_last_performance();
+
+CREATE TRIGGER sets_last_performance_delete AFTER DELETE ON sets
+  REFERENCING OLD TABLE AS old_sets
+  FOR EACH STATEMENT EXECUTE FUNCTION sets_refresh_last_performance();
+
+-- Backfill from existing history
+INSERT INTO exercise_last_performance (user_id, exercise_id, workout_id, workout_exercise_id, performed_at, sets)
+SELECT DISTINCT ON (w.user_id, we.exercise_id)
+       w.user_id, we.exercise_id, w.id, we.id, w.started_at,
+       jsonb_agg(jsonb_build_object(
+         'reps', s.reps, 'weight', s.weight, 'duration', s.duration,
+         'distance', s.distance, 'rest_time', s.rest_time
+       ) ORDER BY s.order_index)
+FROM workout_exercises we
+JOIN workouts w ON w.id = we.workout_id
+JOIN sets s ON s.workout_exercise_id = we.id AND s.completed
+GROUP BY w.user_id, we.exercise_id, w.id, we.id, w.started_at
+ORDER BY w.user_id, we.exercise_id, w.started_at DESC
+ON CONFLICT (user_id, exercise_id) DO NOTHING;
@@ -0,0 +1,56 @@
+-- Migration 006: Personal records
+-- Per-(user, exercise) bests maintained incrementally by the backend on set
+-- writes, so reading records is a primary-key lookup instead of a scan of the
+-- user's sets. qualifier distinguishes records kept per weight
+-- (max_reps_at_weight); it is '' for all other record types.
+
+CREATE TABLE IF NOT EXISTS personal_records (
+  user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  exercise_id UUID NOT NULL REFERENCES exercises(id) ON DELETE CASCADE,
+  record_type TEXT NOT NULL CHECK (record_type IN (
+    'max_weight', 'max_reps_at_weight', 'estimated_1rm', 'max_volume_set', 'longest_distance', 'longest_duration'
+  )),
+  qualifier TEXT NOT NULL DEFAULT '',
+  value DECIMAL(10,2) NOT NULL,
+  set_id UUID NOT NULL, -- no FK: deleting the set triggers a recompute instead
+  workout_id UUID NOT NULL,
+  achieved_at TIMESTAMP WITH TIME ZONE NOT NULL,
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW()),
+  PRIMARY KEY (user_id, exercise_id, record_type, qualifier)
+);
+
+CREATE INDEX IF NOT EXISTS idx_personal_records_set_id ON personal_records(set_id);
+CREATE INDEX IF NOT EXISTS idx_personal_records_workout_id ON personal_records(workout_id);
+
+ALTER TABLE personal_records ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own personal records" ON personal_records
+  FOR SELECT USING (auth.uid() = user_id);
+
+-- Apply record candidates for one user and exercise. A candidate only replaces
+-- the stored record when it is strictly better, so concurrent writers cannot
+-- lower a record. Returns the records that were set or improved.
+-- p_candidates: [{"record_type", "qualifier", "value", "set_id", "workout_id", "achieved_at"}, ...]
+CREATE OR REPLACE FUNCTION apply_personal_records(p_user_id UUID, p_exercise_id UUID, p_candidates JSONB)
+RETURNS SETOF personal_records
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  RETURN QUERY
+    INSERT INTO personal_records AS pr (user_id, exercise_id, record_type, qualifier, value, set_id, workout_id, achieved_at)
+    SELECT DISTINCT ON (c.record_type, c.qualifier)
+           p_user_id, p_exercise_id, c.record_type, c.qualifier, c.value, c.set_id, c.workout_id, c.achieved_at
+    FROM jsonb_to_recordset(p_candidates) AS c(
+      record_type TEXT, qualifier TEXT, value NUMERIC, set_id UUID, workout_id UUID, achieved_at TIMESTAMP WITH TIME ZONE
+    )
+    ORDER BY c.record_type, c.qualifier, c.value DESC, c.achieved_at
+    ON CONFLICT (user_id, exercise_id, record_type, qualifier) DO UPDATE SET
+      value = EXCLUDED.value,
+      set_id = EXCLUDED.set_id,
+      workout_id = EXCLUDED.workout_id,
+      achieved_at = EXCLUDED.achieved_at,
+      updated_at = TIMEZONE('utc', NOW())
+    WHERE EXCLUDED.value > pr.value
+    RETURNING pr.*;
+END;
+$$;
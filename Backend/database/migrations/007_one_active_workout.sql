@@ -0,0 +1,18 @@
+-- Migration 007: At most one active workout per user
+-- GET /workouts/active resolves the active workout with a single probe of a
+-- partial unique index instead of filtering and sorting all of the user's
+-- workouts. The index also enforces the invariant: starting a second active
+-- workout fails with unique_violation (23505), which the API maps to 409.
+
+-- Keep only the most recently started active workout per user active
+WITH ranked AS (
+  SELECT id, ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY started_at DESC, created_at DESC) AS position
+  FROM workouts
+  WHERE is_active
+)
+UPDATE workouts
+SET is_active = false
+FROM ranked
+WHERE workouts.id = ranked.id AND ranked.position > 1;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_workouts_one_active_per_user ON workouts(user_id) WHERE is_active;
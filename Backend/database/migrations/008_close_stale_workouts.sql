@@ -0,0 +1,45 @@
+-- Migration 008: Close stale active workouts in bulk
+-- Workouts users forget to finish stay active forever, skewing stats and
+-- blocking new sessions (one active workout per user). The backend's
+-- periodic job calls close_stale_workouts until it returns fewer rows than
+-- the batch size.
+
+-- Close up to p_batch_size active workouts whose last activity (latest
+-- completed set, or the start time if none) is before p_idle_before.
+-- completed_at and duration are taken from that last activity, keeping any
+-- values already set. Rows locked by concurrent writers are skipped and
+-- picked up by a later batch. Returns the closed workouts.
+CREATE OR REPLACE FUNCTION close_stale_workouts(p_idle_before TIMESTAMP WITH TIME ZONE, p_batch_size INTEGER DEFAULT 500)
+RETURNS SETOF workouts
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF p_batch_size < 1 OR p_batch_size > 5000 THEN
+    RAISE EXCEPTION 'Invalid batch size: %', p_batch_size USING ERRCODE = '22023';
+  END IF;
+
+  RETURN QUERY
+    WITH candidates AS (
+      SELECT w.id, COALESCE(last_set.completed_at, w.started_at) AS last_activity
+      FROM workouts w
+      LEFT JOIN LATERAL (
+        SELECT MAX(s.completed_at) AS completed_at
+        FROM workout_exercises we
+        JOIN sets s ON s.workout_exercise_id = we.id
+        WHERE we.workout_id = w.id AND s.completed
+      ) last_set ON true
+      WHERE w.is_active
+        AND COALESCE(last_set.completed_at, w.started_at) < p_idle_before
+      ORDER BY w.started_at
+      LIMIT p_batch_size
+      FOR UPDATE OF w SKIP LOCKED
+    )
+    UPDATE workouts w
+    SET is_active = false,
+        completed_at = COALESCE(w.completed_at, GREATEST(c.last_activity, w.started_at)),
+        duration = COALESCE(w.duration, GREATEST(0, EXTRACT(EPOCH FROM (c.last_activity - w.started_at)))::INTEGER)
+    FROM candidates c
+    WHERE w.id = c.id
+    RETURNING w.*;
+END;
+$$;
@@ -0,0 +1,75 @@
+-- Migration 009: Denormalize user_id onto workout_exercises and sets
+-- RLS on workout_exercises and sets used to prove ownership with subqueries
+-- joining back through workouts (and workout_exercises for sets) for every
+-- row. Carrying user_id on each row turns the policies into a plain
+-- equality that an index can answer, and lets backend queries filter sets
+-- by user without joining.
+--
+-- user_id is always derived from the parent row by BEFORE triggers, so
+-- clients and the backend never supply it. workouts.user_id is never
+-- updated, so children do not need to follow parent changes.
+
+ALTER TABLE workout_exercises ADD COLUMN IF NOT EXISTS user_id UUID REFERENCES users(id) ON DELETE CASCADE;
+ALTER TABLE sets ADD COLUMN IF NOT EXISTS user_id UUID REFERENCES users(id) ON DELETE CASCADE;
+
+UPDATE workout_exercises we
+SET user_id = w.user_id
+FROM workouts w
+WHERE w.id = we.workout_id AND we.user_id IS DISTINCT FROM w.user_id;
+
+UPDATE sets s
+SET user_id = we.user_id
+FROM workout_exercises we
+WHERE we.id = s.workout_exercise_id AND s.user_id IS DISTINCT FROM we.user_id;
+
+ALTER TABLE workout_exercises ALTER COLUMN user_id SET NOT NULL;
+ALTER TABLE sets ALTER COLUMN user_id SET NOT NULL;
+
+-- Copy the owner from the parent row. A missing (or, under RLS, invisible)
+-- parent raises foreign_key_violation, as the parent FK did before.
+CREATE OR REPLACE FUNCTION workout_exercises_set_user_id()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  SELECT user_id INTO NEW.user_id FROM workouts WHERE id = NEW.workout_id;
+  IF NOT FOUND THEN
+    RAISE EXCEPTION 'Workout % not found', NEW.workout_id USING ERRCODE = '23503';
+  END IF;
+  RETURN NEW;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION sets_set_user_id()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  SELECT user_id INTO NEW.user_id FROM workout_exercises WHERE id = NEW.workout_exercise_id;
+  IF NOT FOUND THEN
+    RAISE EXCEPTION 'Workout exercise % not found', NEW.workout_exercise_id USING ERRCODE = '23503';
+  END IF;
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS workout_exercises_user_id ON workout_exercises;
+CREATE TRIGGER workout_exercises_user_id
+  BEFORE INSERT OR UPDATE OF workout_id, user_id ON workout_exercises
+  FOR EACH ROW EXECUTE FUNCTION workout_exercises_set_user_id();
+
+DROP TRIGGER IF EXISTS sets_user_id ON sets;
+CREATE TRIGGER sets_user_id
+  BEFORE INSERT OR UPDATE OF workout_exercise_id, user_id ON sets
+  FOR EACH ROW EXECUTE FUNCTION sets_set_user_id();
+
+CREATE INDEX IF NOT EXISTS idx_workout_exercises_user_id ON workout_exercises(user_id);
+CREATE INDEX IF NOT EXISTS idx_sets_user_id ON sets(user_id);
+
+DROP POLICY IF EXISTS "Users can manage own workout exercises" ON workout_exercises;
+CREATE POLICY "Users can manage own workout exercises" ON workout_exercises
+  FOR ALL USING (auth.uid() = user_id) WITH CHECK (auth.uid() = user_id);
+
+DROP POLICY IF EXISTS "Users can manage own sets" ON sets;
+CREATE POLICY "Users can manage own sets" ON sets
+  FOR ALL USING (auth.uid() = user_id) WITH CHECK (auth.uid() = user_id);
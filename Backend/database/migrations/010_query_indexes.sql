@@ -0,0 +1,24 @@
+-- Migration 010: Indexes matching the service query shapes
+-- The exercise library filters TEXT[] columns with array containment
+-- (PostgREST cs -> @>), which only a GIN index can serve. Listing workouts
+-- and appending sets filter on one column and order by another, so the
+-- composite indexes return rows already in order instead of sorting every
+-- matching row. Each composite index makes the single-column index on its
+-- leading column redundant, so those are dropped.
+-- tests/test_query_plans.py checks these plans against a seeded database.
+
+-- Exercise library: body_part / equipment containment filters
+CREATE INDEX IF NOT EXISTS idx_exercises_body_part ON exercises USING GIN (body_part);
+CREATE INDEX IF NOT EXISTS idx_exercises_equipment ON exercises USING GIN (equipment);
+
+-- Workout list: user's workouts, newest first
+CREATE INDEX IF NOT EXISTS idx_workouts_user_id_created_at ON workouts(user_id, created_at DESC);
+DROP INDEX IF EXISTS idx_workouts_user_id;
+
+-- Workout details / move exercise: exercises of a workout in display order
+CREATE INDEX IF NOT EXISTS idx_workout_exercises_workout_id_order_index ON workout_exercises(workout_id, order_index);
+DROP INDEX IF EXISTS idx_workout_exercises_workout_id;
+
+-- Add set: next order index of a workout exercise
+CREATE INDEX IF NOT EXISTS idx_sets_workout_exercise_id_order_index ON sets(workout_exercise_id, order_index);
+DROP INDEX IF EXISTS idx_sets_workout_exercise_id;
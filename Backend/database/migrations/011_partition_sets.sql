@@ -0,0 +1,158 @@
+-- Migration 011: Partition sets by month on completed_at
+-- sets is the fastest-growing table (one row per logged set). Range
+-- partitioning by month keeps each partition's heap and indexes small, lets
+-- time-bounded history queries skip old months entirely, and confines
+-- vacuum work to the months still being written. completed_at is stamped
+-- when a set is logged and never updated, so rows do not move between
+-- partitions.
+--
+-- The primary key must include the partition key, so it becomes
+-- (id, completed_at); ids are still random UUIDs and lookups by id probe
+-- each partition's key index. Monthly partitions are created ahead of time
+-- by ensure_sets_partitions (called by the backend's scheduled job); the
+-- default partition only catches rows outside every monthly range.
+
+ALTER TABLE sets RENAME TO sets_unpartitioned;
+
+-- Free the constraint names (sets_pkey, sets_*_check, sets_*_fkey) for the new table
+DO $$
+DECLARE
+  v_constraint RECORD;
+BEGIN
+  FOR v_constraint IN
+    SELECT conname FROM pg_constraint WHERE conrelid = 'sets_unpartitioned'::regclass AND conname LIKE 'sets\_%'
+  LOOP
+    EXECUTE format('ALTER TABLE sets_unpartitioned RENAME CONSTRAINT %I TO %I',
+                   v_constraint.conname, 'sets_unpartitioned' || substr(v_constraint.conname, 5));
+  END LOOP;
+END;
+$$;
+
+DROP INDEX IF EXISTS idx_sets_workout_exercise_id_order_index;
+DROP INDEX IF EXISTS idx_sets_user_id;
+
+CREATE TABLE sets (
+  id UUID NOT NULL DEFAULT gen_random_uuid(),
+  workout_exercise_id UUID NOT NULL REFERENCES workout_exercises(id) ON DELETE CASCADE,
+  user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE, -- copied from workout_exercises by trigger
+  reps INTEGER CHECK (reps > 0),
+  weight DECIMAL(5,2) CHECK (weight >= 0),
+  duration INTEGER CHECK (duration > 0), -- seconds for time-based exercises
+  distance DECIMAL(8,2) CHECK (distance > 0), -- meters for cardio
+  completed BOOLEAN DEFAULT true,
+  rest_time INTEGER CHECK (rest_time >= 0), -- seconds
+  notes TEXT,
+  order_index INTEGER NOT NULL DEFAULT 0 CHECK (order_index >= 0),
+  completed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT TIMEZONE('utc', NOW()), -- partition key
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW()),
+  PRIMARY KEY (id, completed_at)
+) PARTITION BY RANGE (completed_at);
+
+CREATE TABLE sets_default PARTITION OF sets DEFAULT;
+ALTER TABLE sets_default ENABLE ROW LEVEL SECURITY;
+
+-- Create the sets partition for the month containing p_month (UTC) if it
+-- does not exist. Rows of that month already in the default partition are
+-- moved into it before it is attached. Partitions get RLS with no policies,
+-- so they are only reachable through sets and its policies.
+-- Returns the partition name, or NULL if it already existed.
+CREATE OR REPLACE FUNCTION create_sets_partition(p_month DATE)
+RETURNS TEXT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_name TEXT := format('sets_%s', to_char(p_month, 'YYYY_MM'));
+  v_start TIMESTAMP WITH TIME ZONE := make_timestamptz(
+    EXTRACT(YEAR FROM p_month)::INTEGER, EXTRACT(MONTH FROM p_month)::INTEGER, 1, 0, 0, 0, 'UTC'
+  );
+  v_end TIMESTAMP WITH TIME ZONE := v_start + INTERVAL '1 month';
+BEGIN
+  IF to_regclass(format('public.%I', v_name)) IS NOT NULL THEN
+    RETURN NULL;
+  END IF;
+
+  EXECUTE format('CREATE TABLE public.%I (LIKE public.sets INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', v_name);
+  EXECUTE format(
+    'WITH moved AS (DELETE FROM public.sets_default WHERE completed_at >= $1 AND completed_at < $2 RETURNING *) '
+    'INSERT INTO public.%I SELECT * FROM moved', v_name
+  ) USING v_start, v_end;
+  EXECUTE format('ALTER TABLE public.sets ATTACH PARTITION public.%I FOR VALUES FROM (%L) TO (%L)', v_name, v_start, v_end);
+  EXECUTE format('ALTER TABLE public.%I ENABLE ROW LEVEL SECURITY', v_name);
+  RETURN v_name;
+END;
+$$;
+
+-- Make sure partitions exist from the current month through p_months_ahead
+-- months ahead. Idempotent; returns only the partitions it created. Runs as
+-- the table owner so the backend's service role can call it.
+CREATE OR REPLACE FUNCTION ensure_sets_partitions(p_months_ahead INTEGER DEFAULT 3)
+RETURNS TABLE (partition_name TEXT)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_month DATE := date_trunc('month', NOW() AT TIME ZONE 'UTC')::DATE;
+  v_created TEXT;
+BEGIN
+  IF p_months_ahead < 0 OR p_months_ahead > 24 THEN
+    RAISE EXCEPTION 'Invalid months ahead: %', p_months_ahead USING ERRCODE = '22023';
+  END IF;
+
+  FOR i IN 0..p_months_ahead LOOP
+    v_created := create_sets_partition((v_month + make_interval(months => i))::DATE);
+    IF v_created IS NOT NULL THEN
+      partition_name := v_created;
+      RETURN NEXT;
+    END IF;
+  END LOOP;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION create_sets_partition(DATE) FROM PUBLIC;
+
+-- One partition per month that already has sets, plus the months ahead
+SELECT create_sets_partition(month::DATE)
+FROM generate_series(
+  date_trunc('month', (SELECT MIN(COALESCE(completed_at, created_at)) FROM sets_unpartitioned) AT TIME ZONE 'UTC'),
+  date_trunc('month', NOW() AT TIME ZONE 'UTC'),
+  INTERVAL '1 month'
+) AS month;
+SELECT ensure_sets_partitions(3);
+
+-- Copy before creating triggers: user_id and the last-performance cache are
+-- already correct for existing rows
+INSERT INTO sets (
+  id, workout_exercise_id, user_id, reps, weight, duration, distance, completed,
+  rest_time, notes, order_index, completed_at, created_at
+)
+SELECT
+  id, workout_exercise_id, user_id, reps, weight, duration, distance, completed,
+  rest_time, notes, order_index, COALESCE(completed_at, created_at, TIMEZONE('utc', NOW())), created_at
+FROM sets_unpartitioned;
+
+DROP TABLE sets_unpartitioned;
+
+-- Indexes are created on every partition, including future ones
+CREATE INDEX idx_sets_workout_exercise_id_order_index ON sets(workout_exercise_id, order_index);
+CREATE INDEX idx_sets_user_id ON sets(user_id);
+
+ALTER TABLE sets ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Users can manage own sets" ON sets
+  FOR ALL USING (auth.uid() = user_id) WITH CHECK (auth.uid() = user_id);
+
+CREATE TRIGGER sets_last_performance_insert AFTER INSERT ON sets
+  REFERENCING NEW TABLE AS new_sets
+  FOR EACH STATEMENT EXECUTE FUNCTION sets_refresh_last_performance();
+
+CREATE TRIGGER sets_last_performance_update AFTER UPDATE ON sets
+  REFERENCING OLD TABLE AS old_sets NEW TABLE AS new_sets
+  FOR EACH STATEMENT EXECUTE FUNCTION sets_refresh_last_performance();
+
+CREATE TRIGGER sets_last_performance_delete AFTER DELETE ON sets
+  REFERENCING OLD TABLE AS old_sets
+  FOR EACH STATEMENT EXECUTE FUNCTION sets_refresh_last_performance();
+
+CREATE TRIGGER sets_user_id
+  BEFORE INSERT OR UPDATE OF workout_exercise_id, user_id ON sets
+  FOR EACH ROW EXECUTE FUNCTION sets_set_user_id();
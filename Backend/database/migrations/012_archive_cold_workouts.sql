@@ -0,0 +1,230 @@
+-- Migration 012: Archive the set detail of old workouts
+-- Reads of sets older than a year are almost always aggregates (charts,
+-- totals), yet every raw row stays in the hot partitions and their indexes.
+-- archive_cold_workouts moves the sets of old, finished workouts into one
+-- archived_workout_sets row per workout: a JSONB array of the set rows, which
+-- TOAST stores compressed. Each workout exercise keeps a summary row in the
+-- hot workout_exercise_summaries table with the per-session aggregates the
+-- analytics endpoints need. restore_archived_workout moves the sets back
+-- (same ids and timestamps) when an archived workout is opened or cloned.
+--
+-- Archiving and restoring leave the last-performance cache untouched: its
+-- rows are self-contained snapshots, and the sets they describe are only
+-- moving between tables.
+
+ALTER TABLE workouts ADD COLUMN IF NOT EXISTS archived_at TIMESTAMP WITH TIME ZONE; -- set while the sets are archived
+
+-- Per-session aggregates of archived workout exercises (completed sets only)
+CREATE TABLE IF NOT EXISTS workout_exercise_summaries (
+  workout_exercise_id UUID PRIMARY KEY REFERENCES workout_exercises(id) ON DELETE CASCADE,
+  workout_id UUID NOT NULL REFERENCES workouts(id) ON DELETE CASCADE,
+  user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  exercise_id UUID NOT NULL REFERENCES exercises(id) ON DELETE CASCADE,
+  set_count INTEGER NOT NULL, -- all archived sets, including planned ones
+  completed_sets INTEGER NOT NULL,
+  total_reps INTEGER NOT NULL,
+  total_volume DECIMAL(12,2) NOT NULL,
+  top_set_weight DECIMAL(5,2),
+  estimated_1rm DECIMAL(7,2)
+);
+
+-- Archived set rows of one workout, in display order
+CREATE TABLE IF NOT EXISTS archived_workout_sets (
+  workout_id UUID PRIMARY KEY REFERENCES workouts(id) ON DELETE CASCADE,
+  user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  sets JSONB NOT NULL, -- [to_jsonb(sets row), ...]
+  archived_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW())
+) WITH (toast_tuple_target = 256); -- compress even small workouts' set arrays
+
+CREATE INDEX IF NOT EXISTS idx_workout_exercise_summaries_user_id_exercise_id ON workout_exercise_summaries(user_id, exercise_id);
+CREATE INDEX IF NOT EXISTS idx_workout_exercise_summaries_workout_id ON workout_exercise_summaries(workout_id);
+CREATE INDEX IF NOT EXISTS idx_archived_workout_sets_user_id ON archived_workout_sets(user_id);
+-- Archive candidates: finished, unarchived workouts, oldest first
+CREATE INDEX IF NOT EXISTS idx_workouts_unarchived_started_at ON workouts(started_at) WHERE archived_at IS NULL AND NOT is_active;
+
+ALTER TABLE workout_exercise_summaries ENABLE ROW LEVEL SECURITY;
+ALTER TABLE archived_workout_sets ENABLE ROW LEVEL SECURITY; -- no policies: backend service role only
+
+CREATE POLICY "Users can view own workout exercise summaries" ON workout_exercise_summaries
+  FOR SELECT USING (auth.uid() = user_id);
+
+-- Skip the last-performance refresh while sets move to or from the archive
+CREATE OR REPLACE FUNCTION sets_refresh_last_performance()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF current_setting('app.archiving_sets', true) = 'on' THEN
+    RETURN NULL;
+  END IF;
+
+  IF TG_OP = 'INSERT' THEN
+    -- Planned (uncompleted) sets from templates and clones never change the cache
+    PERFORM refresh_exercise_last_performance(ARRAY(
+      SELECT DISTINCT workout_exercise_id FROM new_sets WHERE completed
+    ));
+  ELSIF TG_OP = 'UPDATE' THEN
+    PERFORM refresh_exercise_last_performance(ARRAY(
+      SELECT workout_exercise_id FROM new_sets UNION SELECT workout_exercise_id FROM old_sets
+    ));
+  ELSE
+    PERFORM refresh_exercise_last_performance(ARRAY(
+      SELECT DISTINCT workout_exercise_id FROM old_sets
+    ));
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+-- Archive up to p_batch_size finished workouts started before
+-- p_started_before: summarize each workout exercise, store the set rows as
+-- one JSONB array per workout and delete them from sets. The estimated 1RM
+-- uses the Epley formula up to 12 reps, like the analytics service
+-- (ESTIMATED_1RM_MAX_REPS). Rows locked by concurrent writers are skipped
+-- and picked up by a later batch. Returns the archived workouts.
+CREATE OR REPLACE FUNCTION archive_cold_workouts(p_started_before TIMESTAMP WITH TIME ZONE, p_batch_size INTEGER DEFAULT 200)
+RETURNS SETOF workouts
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_workout_ids UUID[];
+BEGIN
+  IF p_batch_size < 1 OR p_batch_size > 5000 THEN
+    RAISE EXCEPTION 'Invalid batch size: %', p_batch_size USING ERRCODE = '22023';
+  END IF;
+
+  SELECT array_agg(id) INTO v_workout_ids
+  FROM (
+    SELECT id FROM workouts
+    WHERE archived_at IS NULL AND NOT is_active AND started_at < p_started_before
+    ORDER BY started_at
+    LIMIT p_batch_size
+    FOR UPDATE SKIP LOCKED
+  ) candidates;
+
+  IF v_workout_ids IS NULL THEN
+    RETURN;
+  END IF;
+
+  INSERT INTO workout_exercise_summaries (
+    workout_exercise_id, workout_id, user_id, exercise_id, set_count, completed_sets,
+    total_reps, total_volume, top_set_weight, estimated_1rm
+  )
+  SELECT we.id, we.workout_id, we.user_id, we.exercise_id,
+         COUNT(s.id),
+         COUNT(s.id) FILTER (WHERE s.completed),
+         COALESCE(SUM(s.reps) FILTER (WHERE s.completed), 0),
+         COALESCE(SUM(COALESCE(s.weight, 0) * COALESCE(s.reps, 0)) FILTER (WHERE s.completed), 0),
+         MAX(s.weight) FILTER (WHERE s.completed),
+         MAX(CASE WHEN s.reps = 1 THEN s.weight WHEN s.reps BETWEEN 2 AND 12 THEN s.weight * (1 + s.reps / 30.0) END)
+           FILTER (WHERE s.completed)
+  FROM workout_exercises we
+  LEFT JOIN sets s ON s.workout_exercise_id = we.id
+  WHERE we.workout_id = ANY(v_workout_ids)
+  GROUP BY we.id;
+
+  INSERT INTO archived_workout_sets (workout_id, user_id, sets)
+  SELECT we.workout_id, we.user_id, jsonb_agg(to_jsonb(s) ORDER BY we.order_index, s.order_index)
+  FROM workout_exercises we
+  JOIN sets s ON s.workout_exercise_id = we.id
+  WHERE we.workout_id = ANY(v_workout_ids)
+  GROUP BY we.workout_id, we.user_id;
+
+  PERFORM set_config('app.archiving_sets', 'on', true);
+  DELETE FROM sets s
+  USING workout_exercises we
+  WHERE s.workout_exercise_id = we.id AND we.workout_id = ANY(v_workout_ids);
+  PERFORM set_config('app.archiving_sets', 'off', true);
+
+  RETURN QUERY
+    UPDATE workouts SET archived_at = TIMEZONE('utc', NOW())
+    WHERE id = ANY(v_workout_ids)
+    RETURNING *;
+END;
+$$;
+
+-- Move an archived workout's sets back into sets and drop its summaries.
+-- A workout that is not archived is returned unchanged.
+CREATE OR REPLACE FUNCTION restore_archived_workout(p_user_id UUID, p_workout_id UUID)
+RETURNS SETOF workouts
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_workout workouts;
+BEGIN
+  SELECT * INTO v_workout FROM workouts WHERE id = p_workout_id AND user_id = p_user_id FOR UPDATE;
+  IF NOT FOUND THEN
+    RAISE EXCEPTION 'Workout not found' USING ERRCODE = 'P0002';
+  END IF;
+
+  IF v_workout.archived_at IS NULL THEN
+    RETURN NEXT v_workout;
+    RETURN;
+  END IF;
+
+  PERFORM set_config('app.archiving_sets', 'on', true);
+  INSERT INTO sets
+  SELECT archived.*
+  FROM archived_workout_sets a,
+       jsonb_populate_recordset(NULL::sets, a.sets) AS archived
+  WHERE a.workout_id = p_workout_id;
+  PERFORM set_config('app.archiving_sets', 'off', true);
+
+  DELETE FROM archived_workout_sets WHERE workout_id = p_workout_id;
+  DELETE FROM workout_exercise_summaries WHERE workout_id = p_workout_id;
+
+  UPDATE workouts SET archived_at = NULL WHERE id = p_workout_id RETURNING * INTO v_workout;
+  RETURN NEXT v_workout;
+END;
+$$;
+
+-- Clone an archived workout from its restored sets
+CREATE OR REPLACE FUNCTION clone_workout(p_user_id UUID, p_workout_id UUID, p_mode TEXT DEFAULT 'structure', p_title TEXT DEFAULT NULL, p_started_at TIMESTAMP WITH TIME ZONE DEFAULT NULL)
+RETURNS SETOF workouts
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_source workouts;
+  v_workout workouts;
+BEGIN
+  IF p_mode NOT IN ('structure', 'with_weights') THEN
+    RAISE EXCEPTION 'Invalid clone mode: %', p_mode USING ERRCODE = '22023';
+  END IF;
+
+  SELECT * INTO v_source FROM workouts WHERE id = p_workout_id AND user_id = p_user_id;
+  IF NOT FOUND THEN
+    RAISE EXCEPTION 'Workout not found' USING ERRCODE = 'P0002';
+  END IF;
+
+  IF v_source.archived_at IS NOT NULL THEN
+    PERFORM restore_archived_workout(p_user_id, p_workout_id);
+  END IF;
+
+  INSERT INTO workouts (user_id, title, started_at, is_active)
+  VALUES (p_user_id, COALESCE(p_title, v_source.title), COALESCE(p_started_at, TIMEZONE('utc', NOW())), true)
+  RETURNING * INTO v_workout;
+
+  WITH created AS (
+    INSERT INTO workout_exercises (workout_id, exercise_id, order_index, notes)
+    SELECT v_workout.id, we.exercise_id, we.order_index, we.notes
+    FROM workout_exercises we
+    WHERE we.workout_id = p_workout_id
+    RETURNING id, exercise_id
+  )
+  INSERT INTO sets (workout_exercise_id, reps, weight, duration, distance, rest_time, completed, order_index)
+  SELECT created.id,
+         s.reps,
+         CASE WHEN p_mode = 'with_weights' THEN s.weight END,
+         s.duration,
+         s.distance,
+         s.rest_time,
+         false,
+         s.order_index
+  FROM created
+  JOIN workout_exercises we
+    ON we.workout_id = p_workout_id AND we.exercise_id = created.exercise_id
+  JOIN sets s ON s.workout_exercise_id = we.id;
+
+  RETURN NEXT v_workout;
+END;
+$$;
@@ -0,0 +1,346 @@
+-- Migration 013: Store weights and distances as scaled integers
+-- Weights become integer grams and distances integer centimetres in sets,
+-- templates, the last-performance cache, archived sets and their summaries,
+-- and personal records. The backend converts to and from the user's
+-- preferred weight unit at the API edge, so reads no longer build a Decimal
+-- per row, and the DECIMAL(5,2) cap of 999.99 is gone. Grams keep a weight
+-- entered in pounds with two decimals exact when converted back.
+--
+-- Weights were stored in whatever unit the user preferred, so existing
+-- values are converted with the user's current weightUnit preference
+-- (pounds unless set to "kg"). Distances were metres.
+
+CREATE OR REPLACE FUNCTION pg_temp.grams_per_unit(p_user_id UUID)
+RETURNS NUMERIC
+LANGUAGE sql
+AS $$
+  SELECT CASE WHEN (SELECT preferences->>'weightUnit' FROM users WHERE id = p_user_id) = 'kg'
+              THEN 1000 ELSE 453.59237 END::NUMERIC;
+$$;
+
+-- Sets: the last-performance cache is converted separately below
+ALTER TABLE sets
+  ADD COLUMN weight_grams INTEGER CHECK (weight_grams >= 0),
+  ADD COLUMN distance_cm INTEGER CHECK (distance_cm > 0);
+
+ALTER TABLE sets DISABLE TRIGGER sets_last_performance_update;
+UPDATE sets
+SET weight_grams = round(weight * pg_temp.grams_per_unit(user_id)),
+    distance_cm = round(distance * 100)
+WHERE weight IS NOT NULL OR distance IS NOT NULL;
+ALTER TABLE sets ENABLE TRIGGER sets_last_performance_update;
+
+ALTER TABLE sets DROP COLUMN weight, DROP COLUMN distance;
+
+-- Template targets
+ALTER TABLE workout_template_exercises
+  ADD COLUMN target_weight_grams INTEGER CHECK (target_weight_grams >= 0),
+  ADD COLUMN target_distance_cm INTEGER CHECK (target_distance_cm > 0);
+
+UPDATE workout_template_exercises te
+SET target_weight_grams = round(te.target_weight * pg_temp.grams_per_unit(t.user_id)),
+    target_distance_cm = round(te.target_distance * 100)
+FROM workout_templates t
+WHERE t.id = te.template_id AND (te.target_weight IS NOT NULL OR te.target_distance IS NOT NULL);
+
+ALTER TABLE workout_template_exercises DROP COLUMN target_weight, DROP COLUMN target_distance;
+
+-- Set snapshots in the last-performance cache and the archive
+CREATE OR REPLACE FUNCTION pg_temp.scale_set_json(p_set JSONB, p_grams_per_unit NUMERIC)
+RETURNS JSONB
+LANGUAGE sql
+AS $$
+  SELECT (p_set - 'weight' - 'distance') || jsonb_build_object(
+    'weight_grams', round((p_set->>'weight')::NUMERIC * p_grams_per_unit)::INTEGER,
+    'distance_cm', round((p_set->>'distance')::NUMERIC * 100)::INTEGER
+  );
+$$;
+
+UPDATE exercise_last_performance
+SET sets = (
+  SELECT jsonb_agg(pg_temp.scale_set_json(s.value, pg_temp.grams_per_unit(user_id)) ORDER BY s.ordinality)
+  FROM jsonb_array_elements(sets) WITH ORDINALITY AS s(value, ordinality)
+);
+
+UPDATE archived_workout_sets
+SET sets = (
+  SELECT jsonb_agg(pg_temp.scale_set_json(s.value, pg_temp.grams_per_unit(user_id)) ORDER BY s.ordinality)
+  FROM jsonb_array_elements(sets) WITH ORDINALITY AS s(value, ordinality)
+);
+
+-- Archived workout summaries
+ALTER TABLE workout_exercise_summaries
+  ADD COLUMN total_volume_grams BIGINT,
+  ADD COLUMN top_set_weight_grams INTEGER,
+  ADD COLUMN estimated_1rm_grams INTEGER;
+
+UPDATE workout_exercise_summaries
+SET total_volume_grams = round(total_volume * pg_temp.grams_per_unit(user_id)),
+    top_set_weight_grams = round(top_set_weight * pg_temp.grams_per_unit(user_id)),
+    estimated_1rm_grams = round(estimated_1rm * pg_temp.grams_per_unit(user_id));
+
+ALTER TABLE workout_exercise_summaries
+  ALTER COLUMN total_volume_grams SET NOT NULL,
+  DROP COLUMN total_volume,
+  DROP COLUMN top_set_weight,
+  DROP COLUMN estimated_1rm;
+
+-- Personal records: weight values in grams, volume in gram-reps, distance in
+-- centimetres; max_reps_at_weight qualifiers become the weight in grams
+ALTER TABLE personal_records ALTER COLUMN value TYPE NUMERIC;
+
+UPDATE personal_records
+SET value = CASE
+      WHEN record_type IN ('max_weight', 'estimated_1rm', 'max_volume_set') THEN value * pg_temp.grams_per_unit(user_id)
+      WHEN record_type = 'longest_distance' THEN value * 100
+      ELSE value
+    END,
+    qualifier = CASE
+      WHEN record_type = 'max_reps_at_weight' THEN round(qualifier::NUMERIC * pg_temp.grams_per_unit(user_id))::TEXT
+      ELSE qualifier
+    END;
+
+ALTER TABLE personal_records ALTER COLUMN value TYPE BIGINT USING round(value);
+
+-- Functions reading or writing the converted columns
+
+CREATE OR REPLACE FUNCTION create_workout_template(p_user_id UUID, p_title TEXT, p_notes TEXT, p_exercises JSONB, p_gap INTEGER DEFAULT 1024)
+RETURNS SETOF workout_templates
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_template workout_templates;
+BEGIN
+  INSERT INTO workout_templates (user_id, title, notes)
+  VALUES (p_user_id, p_title, p_notes)
+  RETURNING * INTO v_template;
+
+  INSERT INTO workout_template_exercises (
+    template_id, exercise_id, order_index, target_sets, target_reps, target_weight_grams,
+    target_duration, target_distance_cm, rest_time, notes
+  )
+  SELECT v_template.id,
+         i.exercise_id,
+         COALESCE(i.order_index, p_gap * (t.ordinality::INTEGER - 1)),
+         COALESCE(i.target_sets, 1),
+         i.target_reps,
+         i.target_weight_grams,
+         i.target_duration,
+         i.target_distance_cm,
+         i.rest_time,
+         i.notes
+  FROM jsonb_array_elements(p_exercises) WITH ORDINALITY AS t(item, ordinality)
+  CROSS JOIN LATERAL jsonb_to_record(t.item) AS i(
+    exercise_id UUID, order_index INTEGER, target_sets INTEGER, target_reps INTEGER,
+    target_weight_grams INTEGER, target_duration INTEGER, target_distance_cm INTEGER,
+    rest_time INTEGER, notes TEXT
+  );
+
+  RETURN NEXT v_template;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION create_workout_from_template(p_user_id UUID, p_template_id UUID, p_title TEXT DEFAULT NULL, p_started_at TIMESTAMP WITH TIME ZONE DEFAULT NULL)
+RETURNS SETOF workouts
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_template workout_templates;
+  v_workout workouts;
+BEGIN
+  SELECT * INTO v_template FROM workout_templates WHERE id = p_template_id AND user_id = p_user_id;
+  IF NOT FOUND THEN
+    RAISE EXCEPTION 'Template not found' USING ERRCODE = 'P0002';
+  END IF;
+
+  INSERT INTO workouts (user_id, title, started_at, is_active)
+  VALUES (p_user_id, COALESCE(p_title, v_template.title), COALESCE(p_started_at, TIMEZONE('utc', NOW())), true)
+  RETURNING * INTO v_workout;
+
+  WITH created AS (
+    INSERT INTO workout_exercises (workout_id, exercise_id, order_index, notes)
+    SELECT v_workout.id, te.exercise_id, te.order_index, te.notes
+    FROM workout_template_exercises te
+    WHERE te.template_id = p_template_id
+    RETURNING id, exercise_id
+  )
+  INSERT INTO sets (workout_exercise_id, reps, weight_grams, duration, distance_cm, rest_time, completed, order_index)
+  SELECT created.id, te.target_reps, te.target_weight_grams, te.target_duration, te.target_distance_cm,
+         te.rest_time, false, s.n - 1
+  FROM created
+  JOIN workout_template_exercises te
+    ON te.template_id = p_template_id AND te.exercise_id = created.exercise_id
+  CROSS JOIN LATERAL generate_series(1, te.target_sets) AS s(n);
+
+  RETURN NEXT v_workout;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION clone_workout(p_user_id UUID, p_workout_id UUID, p_mode TEXT DEFAULT 'structure', p_title TEXT DEFAULT NULL, p_started_at TIMESTAMP WITH TIME ZONE DEFAULT NULL)
+RETURNS SETOF workouts
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_source workouts;
+  v_workout workouts;
+BEGIN
+  IF p_mode NOT IN ('structure', 'with_weights') THEN
+    RAISE EXCEPTION 'Invalid clone mode: %', p_mode USING ERRCODE = '22023';
+  END IF;
+
+  SELECT * INTO v_source FROM workouts WHERE id = p_workout_id AND user_id = p_user_id;
+  IF NOT FOUND THEN
+    RAISE EXCEPTION 'Workout not found' USING ERRCODE = 'P0002';
+  END IF;
+
+  IF v_source.archived_at IS NOT NULL THEN
+    PERFORM restore_archived_workout(p_user_id, p_workout_id);
+  END IF;
+
+  INSERT INTO workouts (user_id, title, started_at, is_active)
+  VALUES (p_user_id, COALESCE(p_title, v_source.title), COALESCE(p_started_at, TIMEZONE('utc', NOW())), true)
+  RETURNING * INTO v_workout;
+
+  WITH created AS (
+    INSERT INTO workout_exercises (workout_id, exercise_id, order_index, notes)
+    SELECT v_workout.id, we.exercise_id, we.order_index, we.notes
+    FROM workout_exercises we
+    WHERE we.workout_id = p_workout_id
+    RETURNING id, exercise_id
+  )
+  INSERT INTO sets (workout_exercise_id, reps, weight_grams, duration, distance_cm, rest_time, completed, order_index)
+  SELECT created.id,
+         s.reps,
+         CASE WHEN p_mode = 'with_weights' THEN s.weight_grams END,
+         s.duration,
+         s.distance_cm,
+         s.rest_time,
+         false,
+         s.order_index
+  FROM created
+  JOIN workout_exercises we
+    ON we.workout_id = p_workout_id AND we.exercise_id = created.exercise_id
+  JOIN sets s ON s.workout_exercise_id = we.id;
+
+  RETURN NEXT v_workout;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION refresh_exercise_last_performance(p_workout_exercise_ids UUID[])
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF cardinality(p_workout_exercise_ids) = 0 THEN
+    RETURN;
+  END IF;
+
+  INSERT INTO exercise_last_performance (user_id, exercise_id, workout_id, workout_exercise_id, performed_at, sets)
+  SELECT DISTINCT ON (w.user_id, we.exercise_id)
+         w.user_id, we.exercise_id, w.id, we.id, w.started_at,
+         jsonb_agg(jsonb_build_object(
+           'reps', s.reps, 'weight_grams', s.weight_grams, 'duration', s.duration,
+           'distance_cm', s.distance_cm, 'rest_time', s.rest_time
+         ) ORDER BY s.order_index)
+  FROM workout_exercises we
+  JOIN workouts w ON w.id = we.workout_id
+  JOIN sets s ON s.workout_exercise_id = we.id AND s.completed
+  WHERE we.id = ANY(p_workout_exercise_ids)
+  GROUP BY w.user_id, we.exercise_id, w.id, we.id, w.started_at
+  ORDER BY w.user_id, we.exercise_id, w.started_at DESC
+  ON CONFLICT (user_id, exercise_id) DO UPDATE SET
+    workout_id = EXCLUDED.workout_id,
+    workout_exercise_id = EXCLUDED.workout_exercise_id,
+    performed_at = EXCLUDED.performed_at,
+    sets = EXCLUDED.sets,
+    updated_at = TIMEZONE('utc', NOW())
+  WHERE EXCLUDED.performed_at >= exercise_last_performance.performed_at
+     OR EXCLUDED.workout_exercise_id = exercise_last_performance.workout_exercise_id;
+
+  WITH stale AS (
+    DELETE FROM exercise_last_performance elp
+    WHERE elp.workout_exercise_id = ANY(p_workout_exercise_ids)
+      AND NOT EXISTS (
+        SELECT 1 FROM sets s WHERE s.workout_exercise_id = elp.workout_exercise_id AND s.completed
+      )
+    RETURNING elp.user_id, elp.exercise_id
+  )
+  INSERT INTO exercise_last_performance (user_id, exercise_id, workout_id, workout_exercise_id, performed_at, sets)
+  SELECT DISTINCT ON (w.user_id, we.exercise_id)
+         w.user_id, we.exercise_id, w.id, we.id, w.started_at, completed_sets.sets
+  FROM stale
+  JOIN workouts w ON w.user_id = stale.user_id
+  JOIN workout_exercises we ON we.workout_id = w.id AND we.exercise_id = stale.exercise_id
+  CROSS JOIN LATERAL (
+    SELECT jsonb_agg(jsonb_build_object(
+             'reps', s.reps, 'weight_grams', s.weight_grams, 'duration', s.duration,
+             'distance_cm', s.distance_cm, 'rest_time', s.rest_time
+           ) ORDER BY s.order_index) AS sets
+    FROM sets s
+    WHERE s.workout_exercise_id = we.id AND s.completed
+  ) completed_sets
+  WHERE completed_sets.sets IS NOT NULL
+  ORDER BY w.user_id, we.exercise_id, w.started_at DESC;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION archive_cold_workouts(p_started_before TIMESTAMP WITH TIME ZONE, p_batch_size INTEGER DEFAULT 200)
+RETURNS SETOF workouts
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_workout_ids UUID[];
+BEGIN
+  IF p_batch_size < 1 OR p_batch_size > 5000 THEN
+    RAISE EXCEPTION 'Invalid batch size: %', p_batch_size USING ERRCODE = '22023';
+  END IF;
+
+  SELECT array_agg(id) INTO v_workout_ids
+  FROM (
+    SELECT id FROM workouts
+    WHERE archived_at IS NULL AND NOT is_active AND started_at < p_started_before
+    ORDER BY started_at
+    LIMIT p_batch_size
+    FOR UPDATE SKIP LOCKED
+  ) candidates;
+
+  IF v_workout_ids IS NULL THEN
+    RETURN;
+  END IF;
+
+  INSERT INTO workout_exercise_summaries (
+    workout_exercise_id, workout_id, user_id, exercise_id, set_count, completed_sets,
+    total_reps, total_volume_grams, top_set_weight_grams, estimated_1rm_grams
+  )
+  SELECT we.id, we.workout_id, we.user_id, we.exercise_id,
+         COUNT(s.id),
+         COUNT(s.id) FILTER (WHERE s.completed),
+         COALESCE(SUM(s.reps) FILTER (WHERE s.completed), 0),
+         COALESCE(SUM(COALESCE(s.weight_grams, 0)::BIGINT * COALESCE(s.reps, 0)) FILTER (WHERE s.completed), 0),
+         MAX(s.weight_grams) FILTER (WHERE s.completed),
+         MAX(CASE WHEN s.reps = 1 THEN s.weight_grams WHEN s.reps BETWEEN 2 AND 12 THEN round(s.weight_grams * (30 + s.reps) / 30.0) END)
+           FILTER (WHERE s.completed)
+  FROM workout_exercises we
+  LEFT JOIN sets s ON s.workout_exercise_id = we.id
+  WHERE we.workout_id = ANY(v_workout_ids)
+  GROUP BY we.id;
+
+  INSERT INTO archived_workout_sets (workout_id, user_id, sets)
+  SELECT we.workout_id, we.user_id, jsonb_agg(to_jsonb(s) ORDER BY we.order_index, s.order_index)
+  FROM workout_exercises we
+  JOIN sets s ON s.workout_exercise_id = we.id
+  WHERE we.workout_id = ANY(v_workout_ids)
+  GROUP BY we.workout_id, we.user_id;
+
+  PERFORM set_config('app.archiving_sets', 'on', true);
+  DELETE FROM sets s
+  USING workout_exercises we
+  WHERE s.workout_exercise_id = we.id AND we.workout_id = ANY(v_workout_ids);
+  PERFORM set_config('app.archiving_sets', 'off', true);
+
+  RETURN QUERY
+    UPDATE workouts SET archived_at = TIMEZONE('utc', NOW())
+    WHERE id = ANY(v_workout_ids)
+    RETURNING *;
+END;
+$$;
@@ -0,0 +1,41 @@
+-- Migration 014: Row versions for optimistic concurrency
+-- workouts, workout_exercises and sets carry an integer version that a
+-- BEFORE UPDATE trigger increments on every change. Conditional updates
+-- (If-Match on PUT /workouts/{id} and PUT /workouts/sets/{id}) filter on the
+-- version the client last saw in the same UPDATE statement, so a stale edit
+-- from another device matches no row and is rejected with 409 instead of
+-- silently overwriting, without reading the row first.
+
+ALTER TABLE workouts ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+ALTER TABLE workout_exercises ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+ALTER TABLE sets ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+
+-- Archived sets are restored with jsonb_populate_recordset, which leaves
+-- keys missing from the snapshot NULL rather than defaulted
+UPDATE archived_workout_sets
+SET sets = (
+  SELECT jsonb_agg(s.value || '{"version": 1}'::JSONB ORDER BY s.ordinality)
+  FROM jsonb_array_elements(sets) WITH ORDINALITY AS s(value, ordinality)
+)
+WHERE EXISTS (SELECT 1 FROM jsonb_array_elements(sets) AS s(value) WHERE NOT s.value ? 'version');
+
+CREATE OR REPLACE FUNCTION bump_row_version()
+RETURNS TRIGGER AS $$
+BEGIN
+  NEW.version = OLD.version + 1;
+  RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS bump_workouts_version ON workouts;
+CREATE TRIGGER bump_workouts_version BEFORE UPDATE ON workouts
+  FOR EACH ROW EXECUTE FUNCTION bump_row_version();
+
+DROP TRIGGER IF EXISTS bump_workout_exercises_version ON workout_exercises;
+CREATE TRIGGER bump_workout_exercises_version BEFORE UPDATE ON workout_exercises
+  FOR EACH ROW EXECUTE FUNCTION bump_row_version();
+
+-- Defined on the partitioned parent, so every monthly partition inherits it
+DROP TRIGGER IF EXISTS bump_sets_version ON sets;
+CREATE TRIGGER bump_sets_version BEFORE UPDATE ON sets
+  FOR EACH ROW EXECUTE FUNCTION bump_row_version();
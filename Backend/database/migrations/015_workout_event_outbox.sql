@@ -0,0 +1,218 @@
+-- Migration 015: Transactional outbox and append-only workout event log
+-- Statement-level triggers on workouts, workout_exercises and sets write one
+-- event per changed row to workout_outbox in the transaction that made the
+-- change, so an event exists exactly when its change committed - whichever
+-- service method, database function or job issued it. relay_workout_outbox
+-- moves committed events in batches into workout_event_log, giving them
+-- gap-free increasing offsets in the order they were relayed (identity
+-- values of concurrent transactions can commit out of order; offsets
+-- cannot). Consumers read the log after their committed offset in
+-- workout_event_consumers and advance it, so derived views apply changes
+-- incrementally instead of rescanning the base tables.
+--
+-- Event types: workout_created, workout_updated, workout_completed,
+-- workout_deleted, exercise_added, exercise_updated, exercise_removed,
+-- set_logged, set_updated, set_deleted. The payload is the row after the
+-- change (before it, for deletes) in storage units. Moving sets into or out
+-- of the cold archive is storage, not a change, and emits nothing.
+
+CREATE TABLE IF NOT EXISTS workout_outbox (
+  id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+  user_id UUID NOT NULL, -- no FK: events of a deleted user are still relayed
+  event_type TEXT NOT NULL,
+  entity_id UUID NOT NULL,
+  workout_id UUID,
+  payload JSONB NOT NULL,
+  occurred_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT TIMEZONE('utc', NOW())
+);
+
+CREATE TABLE IF NOT EXISTS workout_event_log (
+  log_offset BIGINT PRIMARY KEY, -- gap-free, assigned by relay_workout_outbox
+  outbox_id BIGINT NOT NULL UNIQUE,
+  user_id UUID NOT NULL,
+  event_type TEXT NOT NULL,
+  entity_id UUID NOT NULL,
+  workout_id UUID,
+  payload JSONB NOT NULL,
+  occurred_at TIMESTAMP WITH TIME ZONE NOT NULL,
+  relayed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT TIMEZONE('utc', NOW())
+);
+
+CREATE TABLE IF NOT EXISTS workout_event_consumers (
+  consumer TEXT PRIMARY KEY,
+  committed_offset BIGINT NOT NULL DEFAULT 0, -- last log_offset fully processed
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW())
+);
+
+CREATE INDEX IF NOT EXISTS idx_workout_event_log_user_id_log_offset ON workout_event_log(user_id, log_offset);
+
+ALTER TABLE workout_outbox ENABLE ROW LEVEL SECURITY; -- no policies: backend service role only
+ALTER TABLE workout_event_log ENABLE ROW LEVEL SECURITY; -- no policies: backend service role only
+ALTER TABLE workout_event_consumers ENABLE ROW LEVEL SECURITY; -- no policies: backend service role only
+
+CREATE OR REPLACE FUNCTION workouts_write_outbox()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    INSERT INTO workout_outbox (user_id, event_type, entity_id, workout_id, payload)
+    SELECT n.user_id, 'workout_created', n.id, n.id, to_jsonb(n) FROM new_workouts n;
+  ELSIF TG_OP = 'UPDATE' THEN
+    INSERT INTO workout_outbox (user_id, event_type, entity_id, workout_id, payload)
+    SELECT n.user_id,
+           CASE WHEN o.is_active AND NOT n.is_active THEN 'workout_completed' ELSE 'workout_updated' END,
+           n.id, n.id, to_jsonb(n)
+    FROM new_workouts n
+    JOIN old_workouts o ON o.id = n.id
+    WHERE n.archived_at IS NOT DISTINCT FROM o.archived_at;
+  ELSE
+    INSERT INTO workout_outbox (user_id, event_type, entity_id, workout_id, payload)
+    SELECT o.user_id, 'workout_deleted', o.id, o.id, to_jsonb(o) FROM old_workouts o;
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION workout_exercises_write_outbox()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    INSERT INTO workout_outbox (user_id, event_type, entity_id, workout_id, payload)
+    SELECT n.user_id, 'exercise_added', n.id, n.workout_id, to_jsonb(n) FROM new_workout_exercises n;
+  ELSIF TG_OP = 'UPDATE' THEN
+    INSERT INTO workout_outbox (user_id, event_type, entity_id, workout_id, payload)
+    SELECT n.user_id, 'exercise_updated', n.id, n.workout_id, to_jsonb(n) FROM new_workout_exercises n;
+  ELSE
+    INSERT INTO workout_outbox (user_id, event_type, entity_id, workout_id, payload)
+    SELECT o.user_id, 'exercise_removed', o.id, o.workout_id, to_jsonb(o) FROM old_workout_exercises o;
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+-- workout_id is looked up from the parent and is NULL when the parent was
+-- deleted by the same statement (cascade)
+CREATE OR REPLACE FUNCTION sets_write_outbox()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF current_setting('app.archiving_sets', true) = 'on' THEN
+    RETURN NULL;
+  END IF;
+
+  IF TG_OP = 'INSERT' THEN
+    INSERT INTO workout_outbox (user_id, event_type, entity_id, workout_id, payload)
+    SELECT n.user_id, 'set_logged', n.id, we.workout_id, to_jsonb(n)
+    FROM new_sets n LEFT JOIN workout_exercises we ON we.id = n.workout_exercise_id;
+  ELSIF TG_OP = 'UPDATE' THEN
+    INSERT INTO workout_outbox (user_id, event_type, entity_id, workout_id, payload)
+    SELECT n.user_id, 'set_updated', n.id, we.workout_id, to_jsonb(n)
+    FROM new_sets n LEFT JOIN workout_exercises we ON we.id = n.workout_exercise_id;
+  ELSE
+    INSERT INTO workout_outbox (user_id, event_type, entity_id, workout_id, payload)
+    SELECT o.user_id, 'set_deleted', o.id, we.workout_id, to_jsonb(o)
+    FROM old_sets o LEFT JOIN workout_exercises we ON we.id = o.workout_exercise_id;
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS workouts_outbox_insert ON workouts;
+CREATE TRIGGER workouts_outbox_insert AFTER INSERT ON workouts
+  REFERENCING NEW TABLE AS new_workouts
+  FOR EACH STATEMENT EXECUTE FUNCTION workouts_write_outbox();
+
+DROP TRIGGER IF EXISTS workouts_outbox_update ON workouts;
+CREATE TRIGGER workouts_outbox_update AFTER UPDATE ON workouts
+  REFERENCING OLD TABLE AS old_workouts NEW TABLE AS new_workouts
+  FOR EACH STATEMENT EXECUTE FUNCTION workouts_write_outbox();
+
+DROP TRIGGER IF EXISTS workouts_outbox_delete ON workouts;
+CREATE TRIGGER workouts_outbox_delete AFTER DELETE ON workouts
+  REFERENCING OLD TABLE AS old_workouts
+  FOR EACH STATEMENT EXECUTE FUNCTION workouts_write_outbox();
+
+DROP TRIGGER IF EXISTS workout_exercises_outbox_insert ON workout_exercises;
+CREATE TRIGGER workout_exercises_outbox_insert AFTER INSERT ON workout_exercises
+  REFERENCING NEW TABLE AS new_workout_exercises
+  FOR EACH STATEMENT EXECUTE FUNCTION workout_exercises_write_outbox();
+
+DROP TRIGGER IF EXISTS workout_exercises_outbox_update ON workout_exercises;
+CREATE TRIGGER workout_exercises_outbox_update AFTER UPDATE ON workout_exercises
+  REFERENCING OLD TABLE AS old_workout_exercises NEW TABLE AS new_workout_exercises
+  FOR EACH STATEMENT EXECUTE FUNCTION workout_exercises_write_outbox();
+
+DROP TRIGGER IF EXISTS workout_exercises_outbox_delete ON workout_exercises;
+CREATE TRIGGER workout_exercises_outbox_delete AFTER DELETE ON workout_exercises
+  REFERENCING OLD TABLE AS old_workout_exercises
+  FOR EACH STATEMENT EXECUTE FUNCTION workout_exercises_write_outbox();
+
+DROP TRIGGER IF EXISTS sets_outbox_insert ON sets;
+CREATE TRIGGER sets_outbox_insert AFTER INSERT ON sets
+  REFERENCING NEW TABLE AS new_sets
+  FOR EACH STATEMENT EXECUTE FUNCTION sets_write_outbox();
+
+DROP TRIGGER IF EXISTS sets_outbox_update ON sets;
+CREATE TRIGGER sets_outbox_update AFTER UPDATE ON sets
+  REFERENCING OLD TABLE AS old_sets NEW TABLE AS new_sets
+  FOR EACH STATEMENT EXECUTE FUNCTION sets_write_outbox();
+
+DROP TRIGGER IF EXISTS sets_outbox_delete ON sets;
+CREATE TRIGGER sets_outbox_delete AFTER DELETE ON sets
+  REFERENCING OLD TABLE AS old_sets
+  FOR EACH STATEMENT EXECUTE FUNCTION sets_write_outbox();
+
+-- Move up to p_batch_size committed outbox events into the log, oldest
+-- first. One relay runs at a time (transaction advisory lock); a concurrent
+-- call returns 0 immediately. Returns the number of events relayed.
+CREATE OR REPLACE FUNCTION relay_workout_outbox(p_batch_size INTEGER DEFAULT 500)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_last_offset BIGINT;
+  v_relayed INTEGER;
+BEGIN
+  IF p_batch_size < 1 OR p_batch_size > 10000 THEN
+    RAISE EXCEPTION 'Invalid batch size: %', p_batch_size USING ERRCODE = '22023';
+  END IF;
+
+  IF NOT pg_try_advisory_xact_lock(hashtext('relay_workout_outbox')) THEN
+    RETURN 0;
+  END IF;
+
+  SELECT COALESCE(MAX(log_offset), 0) INTO v_last_offset FROM workout_event_log;
+
+  WITH batch AS (
+    DELETE FROM workout_outbox
+    WHERE id IN (SELECT id FROM workout_outbox ORDER BY id LIMIT p_batch_size)
+    RETURNING *
+  )
+  INSERT INTO workout_event_log (log_offset, outbox_id, user_id, event_type, entity_id, workout_id, payload, occurred_at)
+  SELECT v_last_offset + ROW_NUMBER() OVER (ORDER BY b.id), b.id, b.user_id, b.event_type,
+         b.entity_id, b.workout_id, b.payload, b.occurred_at
+  FROM batch b;
+
+  GET DIAGNOSTICS v_relayed = ROW_COUNT;
+  RETURN v_relayed;
+END;
+$$;
+
+-- Record that p_consumer has processed the log through p_offset. Offsets
+-- only move forward, so a late retry cannot rewind a consumer. Returns the
+-- committed offset.
+CREATE OR REPLACE FUNCTION commit_workout_event_offset(p_consumer TEXT, p_offset BIGINT)
+RETURNS BIGINT
+LANGUAGE sql
+AS $$
+  INSERT INTO workout_event_consumers (consumer, committed_offset)
+  VALUES (p_consumer, p_offset)
+  ON CONFLICT (consumer) DO UPDATE
+    SET committed_offset = GREATEST(workout_event_consumers.committed_offset, EXCLUDED.committed_offset),
+        updated_at = TIMEZONE('utc', NOW())
+  RETURNING committed_offset;
+$$;
@@ -0,0 +1,6 @@
+-- Migration 016: Replay response headers with idempotent responses
+-- A retried PUT must return the same ETag as the original response, or the
+-- client loses the row version it needs for its next If-Match. The headers
+-- worth replaying (currently just ETag) are stored next to the body.
+
+ALTER TABLE idempotency_keys ADD COLUMN IF NOT EXISTS response_headers JSONB;
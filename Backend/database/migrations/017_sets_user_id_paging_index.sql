@@ -0,0 +1,10 @@
+-- Migration 017: Page a user's sets in primary-key order
+-- Full-history reads (record rebuilds, analytics) page through a user's sets
+-- with ORDER BY id LIMIT/OFFSET, because PostgREST caps every response at
+-- max_rows. With an index on user_id alone the planner walks the primary key
+-- for that order and filters out other users' rows; leading with user_id and
+-- then id returns one user's sets already in page order. It serves every
+-- lookup the user_id index did, so that index is dropped.
+
+CREATE INDEX IF NOT EXISTS idx_sets_user_id_id ON sets(user_id, id);
+DROP INDEX IF EXISTS idx_sets_user_id;
@@ -0,0 +1,44 @@
+-- Migration 018: Retention for the workout event log
+-- Consumers only read events after their committed offset, so events every
+-- consumer has processed are never read again. prune_workout_event_log
+-- deletes up to p_batch_size of them, oldest first. The caller names the
+-- consumers (the ones registered in the API); a named consumer without a
+-- committed offset holds the whole log, and no consumers prunes nothing.
+-- The newest event is always kept, because relay_workout_outbox numbers
+-- new events after MAX(log_offset).
+
+CREATE OR REPLACE FUNCTION prune_workout_event_log(p_consumers TEXT[], p_batch_size INTEGER DEFAULT 5000)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_below BIGINT;
+  v_pruned INTEGER;
+BEGIN
+  IF p_batch_size < 1 OR p_batch_size > 50000 THEN
+    RAISE EXCEPTION 'Invalid batch size: %', p_batch_size USING ERRCODE = '22023';
+  END IF;
+
+  SELECT MIN(COALESCE(c.committed_offset, 0))
+  INTO v_below
+  FROM unnest(p_consumers) AS n(consumer)
+  LEFT JOIN workout_event_consumers c ON c.consumer = n.consumer;
+
+  IF v_below IS NULL THEN
+    RETURN 0;
+  END IF;
+
+  SELECT LEAST(v_below, MAX(log_offset)) INTO v_below FROM workout_event_log;
+
+  DELETE FROM workout_event_log
+  WHERE log_offset IN (
+    SELECT log_offset FROM workout_event_log
+    WHERE log_offset < v_below
+    ORDER BY log_offset
+    LIMIT p_batch_size
+  );
+
+  GET DIAGNOSTICS v_pruned = ROW_COUNT;
+  RETURN v_pruned;
+END;
+$$;
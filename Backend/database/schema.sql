@@ -30,6 +30,8 @@ CREATE TABLE workouts (
   completed_at TIMESTAMP WITH TIME ZONE,
   duration INTEGER CHECK (duration >= 0), -- seconds
   is_active BOOLEAN DEFAULT true,
+  archived_at TIMESTAMP WITH TIME ZONE, -- set while the sets are archived (archive_cold_workouts)
+  version INTEGER NOT NULL DEFAULT 1, -- bumped on every update (optimistic concurrency)
   created_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW()),
   updated_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW())
 );
@@ -49,42 +51,199 @@ CREATE TABLE exercises (
 CREATE TABLE workout_exercises (
   id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
   workout_id UUID NOT NULL REFERENCES workouts(id) ON DELETE CASCADE,
+  user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE, -- copied from workouts by trigger
   exercise_id UUID NOT NULL REFERENCES exercises(id) ON DELETE CASCADE,
   order_index INTEGER NOT NULL CHECK (order_index >= 0),
   notes TEXT,
+  version INTEGER NOT NULL DEFAULT 1, -- bumped on every update (optimistic concurrency)
   created_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW()),
   UNIQUE(workout_id, exercise_id)
 );
 
--- Sets table
+-- Sets table (range-partitioned by month on completed_at; monthly partitions
+-- are created ahead of time by ensure_sets_partitions)
 CREATE TABLE sets (
-  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  id UUID NOT NULL DEFAULT gen_random_uuid(),
   workout_exercise_id UUID NOT NULL REFERENCES workout_exercises(id) ON DELETE CASCADE,
+  user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE, -- copied from workout_exercises by trigger
   reps INTEGER CHECK (reps > 0),
-  weight DECIMAL(5,2) CHECK (weight >= 0),
+  weight_grams INTEGER CHECK (weight_grams >= 0), -- converted from the user's unit by the backend
   duration INTEGER CHECK (duration > 0), -- seconds for time-based exercises
-  distance DECIMAL(8,2) CHECK (distance > 0), -- meters for cardio
+  distance_cm INTEGER CHECK (distance_cm > 0), -- cardio
   completed BOOLEAN DEFAULT true,
   rest_time INTEGER CHECK (rest_time >= 0), -- seconds
   notes TEXT,
   order_index INTEGER NOT NULL DEFAULT 0 CHECK (order_index >= 0),
-  completed_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW()),
+  completed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT TIMEZONE('utc', NOW()), -- partition key
+  version INTEGER NOT NULL DEFAULT 1, -- bumped on every update (optimistic concurrency)
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW()),
+  PRIMARY KEY (id, completed_at)
+) PARTITION BY RANGE (completed_at);
+
+-- Catches sets outside every monthly partition
+CREATE TABLE sets_default PARTITION OF sets DEFAULT;
+
+-- Idempotency keys for replaying mutating requests (service role only)
+CREATE TABLE idempotency_keys (
+  key TEXT PRIMARY KEY,
+  fingerprint TEXT NOT NULL,
+  completed BOOLEAN NOT NULL DEFAULT false,
+  status_code INTEGER,
+  response_body JSONB,
+  response_headers JSONB, -- replayed with the body (e.g. ETag)
+  expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
   created_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW())
 );
 
+-- Workout templates (stored routines materialized by create_workout_from_template)
+CREATE TABLE workout_templates (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  title TEXT NOT NULL CHECK (char_length(title) <= 30 AND char_length(title) > 0),
+  notes TEXT,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW()),
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW())
+);
+
+-- Template exercises with target sets/reps/weight
+CREATE TABLE workout_template_exercises (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  template_id UUID NOT NULL REFERENCES workout_templates(id) ON DELETE CASCADE,
+  exercise_id UUID NOT NULL REFERENCES exercises(id) ON DELETE CASCADE,
+  order_index INTEGER NOT NULL CHECK (order_index >= 0),
+  target_sets INTEGER NOT NULL DEFAULT 1 CHECK (target_sets BETWEEN 1 AND 20),
+  target_reps INTEGER CHECK (target_reps > 0),
+  target_weight_grams INTEGER CHECK (target_weight_grams >= 0),
+  target_duration INTEGER CHECK (target_duration > 0), -- seconds
+  target_distance_cm INTEGER CHECK (target_distance_cm > 0),
+  rest_time INTEGER CHECK (rest_time >= 0), -- seconds
+  notes TEXT,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW()),
+  UNIQUE(template_id, exercise_id)
+);
+
+-- Most recent completed sets per user and exercise (maintained by triggers on sets)
+CREATE TABLE exercise_last_performance (
+  user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  exercise_id UUID NOT NULL REFERENCES exercises(id) ON DELETE CASCADE,
+  workout_id UUID NOT NULL, -- no FK: triggers repoint the row when the source is deleted
+  workout_exercise_id UUID NOT NULL,
+  performed_at TIMESTAMP WITH TIME ZONE NOT NULL,
+  sets JSONB NOT NULL, -- [{"reps", "weight_grams", "duration", "distance_cm", "rest_time"}, ...] in set order
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW()),
+  PRIMARY KEY (user_id, exercise_id)
+);
+
+-- Personal records per user and exercise (maintained by the backend on set writes)
+CREATE TABLE personal_records (
+  user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  exercise_id UUID NOT NULL REFERENCES exercises(id) ON DELETE CASCADE,
+  record_type TEXT NOT NULL CHECK (record_type IN (
+    'max_weight', 'max_reps_at_weight', 'estimated_1rm', 'max_volume_set', 'longest_distance', 'longest_duration'
+  )),
+  qualifier TEXT NOT NULL DEFAULT '', -- weight in grams (max_reps_at_weight only)
+  value BIGINT NOT NULL, -- grams, gram-reps, reps, centimetres or seconds by record_type
+  set_id UUID NOT NULL, -- no FK: deleting the set triggers a recompute instead
+  workout_id UUID NOT NULL,
+  achieved_at TIMESTAMP WITH TIME ZONE NOT NULL,
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW()),
+  PRIMARY KEY (user_id, exercise_id, record_type, qualifier)
+);
+
+-- Per-session aggregates of archived workout exercises (completed sets only)
+CREATE TABLE workout_exercise_summaries (
+  workout_exercise_id UUID PRIMARY KEY REFERENCES workout_exercises(id) ON DELETE CASCADE,
+  workout_id UUID NOT NULL REFERENCES workouts(id) ON DELETE CASCADE,
+  user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  exercise_id UUID NOT NULL REFERENCES exercises(id) ON DELETE CASCADE,
+  set_count INTEGER NOT NULL, -- all archived sets, including planned ones
+  completed_sets INTEGER NOT NULL,
+  total_reps INTEGER NOT NULL,
+  total_volume_grams BIGINT NOT NULL, -- sum of weight_grams x reps
+  top_set_weight_grams INTEGER,
+  estimated_1rm_grams INTEGER
+);
+
+-- Archived set rows of one workout, in display order
+CREATE TABLE archived_workout_sets (
+  workout_id UUID PRIMARY KEY REFERENCES workouts(id) ON DELETE CASCADE,
+  user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  sets JSONB NOT NULL, -- [to_jsonb(sets row), ...]
+  archived_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW())
+) WITH (toast_tuple_target = 256); -- compress even small workouts' set arrays
+
+-- Workout change events written by triggers in the changing transaction
+CREATE TABLE workout_outbox (
+  id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+  user_id UUID NOT NULL, -- no FK: events of a deleted user are still relayed
+  event_type TEXT NOT NULL,
+  entity_id UUID NOT NULL,
+  workout_id UUID,
+  payload JSONB NOT NULL,
+  occurred_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT TIMEZONE('utc', NOW())
+);
+
+-- Append-only log of relayed workout events, read by offset and pruned once
+-- every consumer has processed them (prune_workout_event_log)
+CREATE TABLE workout_event_log (
+  log_offset BIGINT PRIMARY KEY, -- gap-free, assigned by relay_workout_outbox
+  outbox_id BIGINT NOT NULL UNIQUE,
+  user_id UUID NOT NULL,
+  event_type TEXT NOT NULL,
+  entity_id UUID NOT NULL,
+  workout_id UUID,
+  payload JSONB NOT NULL,
+  occurred_at TIMESTAMP WITH TIME ZONE NOT NULL,
+  relayed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT TIMEZONE('utc', NOW())
+);
+
+-- Position of each event log consumer
+CREATE TABLE workout_event_consumers (
+  consumer TEXT PRIMARY KEY,
+  committed_offset BIGINT NOT NULL DEFAULT 0, -- last log_offset fully processed
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW())
+);
+
 -- Indexes for performance
-CREATE INDEX idx_workouts_user_id ON workouts(user_id);
+CREATE INDEX idx_workouts_user_id_created_at ON workouts(user_id, created_at DESC);
 CREATE INDEX idx_workouts_created_at ON workouts(created_at DESC);
-CREATE INDEX idx_workout_exercises_workout_id ON workout_exercises(workout_id);
+CREATE INDEX idx_workouts_unarchived_started_at ON workouts(started_at) WHERE archived_at IS NULL AND NOT is_active; -- archive candidates
+CREATE UNIQUE INDEX idx_workouts_one_active_per_user ON workouts(user_id) WHERE is_active; -- at most one active workout
+CREATE INDEX idx_workout_exercises_workout_id_order_index ON workout_exercises(workout_id, order_index);
 CREATE INDEX idx_workout_exercises_exercise_id ON workout_exercises(exercise_id);
-CREATE INDEX idx_sets_workout_exercise_id ON sets(workout_exercise_id);
+CREATE INDEX idx_sets_workout_exercise_id_order_index ON sets(workout_exercise_id, order_index);
+CREATE INDEX idx_workout_exercises_user_id ON workout_exercises(user_id);
+CREATE INDEX idx_sets_user_id_id ON sets(user_id, id); -- user lookups and ORDER BY id paging
 CREATE INDEX idx_exercises_category ON exercises(category);
+CREATE INDEX idx_exercises_body_part ON exercises USING GIN (body_part);
+CREATE INDEX idx_exercises_equipment ON exercises USING GIN (equipment);
+CREATE INDEX idx_idempotency_keys_expires_at ON idempotency_keys(expires_at);
+CREATE INDEX idx_workout_templates_user_id ON workout_templates(user_id);
+CREATE INDEX idx_workout_template_exercises_template_id ON workout_template_exercises(template_id, order_index);
+CREATE INDEX idx_exercise_last_performance_workout_exercise_id ON exercise_last_performance(workout_exercise_id);
+CREATE INDEX idx_personal_records_set_id ON personal_records(set_id);
+CREATE INDEX idx_personal_records_workout_id ON personal_records(workout_id);
+CREATE INDEX idx_workout_exercise_summaries_user_id_exercise_id ON workout_exercise_summaries(user_id, exercise_id);
+CREATE INDEX idx_workout_exercise_summaries_workout_id ON workout_exercise_summaries(workout_id);
+CREATE INDEX idx_archived_workout_sets_user_id ON archived_workout_sets(user_id);
+CREATE INDEX idx_workout_event_log_user_id_log_offset ON workout_event_log(user_id, log_offset);
 
 -- Enable Row Level Security
 ALTER TABLE users ENABLE ROW LEVEL SECURITY;
 ALTER TABLE workouts ENABLE ROW LEVEL SECURITY;
 ALTER TABLE workout_exercises ENABLE ROW LEVEL SECURITY;
 ALTER TABLE sets ENABLE ROW LEVEL SECURITY;
+ALTER TABLE sets_default ENABLE ROW LEVEL SECURITY; -- no policies: reached through sets only
+ALTER TABLE idempotency_keys ENABLE ROW LEVEL SECURITY; -- no policies: backend service role only
+ALTER TABLE workout_templates ENABLE ROW LEVEL SECURITY;
+ALTER TABLE workout_template_exercises ENABLE ROW LEVEL SECURITY;
+ALTER TABLE exercise_last_performance ENABLE ROW LEVEL SECURITY;
+ALTER TABLE personal_records ENABLE ROW LEVEL SECURITY;
+ALTER TABLE workout_exercise_summaries ENABLE ROW LEVEL SECURITY;
+ALTER TABLE archived_workout_sets ENABLE ROW LEVEL SECURITY; -- no policies: backend service role only
+ALTER TABLE workout_outbox ENABLE ROW LEVEL SECURITY; -- no policies: backend service role only
+ALTER TABLE workout_event_log ENABLE ROW LEVEL SECURITY; -- no policies: backend service role only
+ALTER TABLE workout_event_consumers ENABLE ROW LEVEL SECURITY; -- no policies: backend service role only
 -- exercises table RLS handled separately (read-only for all authenticated users)
 
 -- RLS Policies for Users table
@@ -116,21 +275,35 @@ CREATE POLICY "Authenticated users can view exercises" ON exercises
   FOR SELECT USING (auth.role() = 'authenticated');
 
 -- RLS Policies for Workout Exercises junction table
+-- (user_id is denormalized from workouts so the check is an index lookup)
 CREATE POLICY "Users can manage own workout exercises" ON workout_exercises 
-  FOR ALL USING (
-    workout_id IN (SELECT id FROM workouts WHERE user_id = auth.uid())
-  );
+  FOR ALL USING (auth.uid() = user_id) WITH CHECK (auth.uid() = user_id);
 
 -- RLS Policies for Sets table  
 CREATE POLICY "Users can manage own sets" ON sets 
+  FOR ALL USING (auth.uid() = user_id) WITH CHECK (auth.uid() = user_id);
+
+-- RLS Policies for Workout Templates
+CREATE POLICY "Users can manage own workout templates" ON workout_templates
+  FOR ALL USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can manage own workout template exercises" ON workout_template_exercises
   FOR ALL USING (
-    workout_exercise_id IN (
-      SELECT we.id FROM workout_exercises we
-      JOIN workouts w ON w.id = we.workout_id
-      WHERE w.user_id = auth.uid()
-    )
+    template_id IN (SELECT id FROM workout_templates WHERE user_id = auth.uid())
   );
 
+-- RLS Policies for Last Performance cache (written only by triggers)
+CREATE POLICY "Users can view own last performance" ON exercise_last_performance
+  FOR SELECT USING (auth.uid() = user_id);
+
+-- RLS Policies for Personal Records (written only by the backend)
+CREATE POLICY "Users can view own personal records" ON personal_records
+  FOR SELECT USING (auth.uid() = user_id);
+
+-- RLS Policies for archived workout summaries (written only by archive functions)
+CREATE POLICY "Users can view own workout exercise summaries" ON workout_exercise_summaries
+  FOR SELECT USING (auth.uid() = user_id);
+
 -- Triggers for updated_at timestamps
 CREATE OR REPLACE FUNCTION update_updated_at_column()
 RETURNS TRIGGER AS $$
@@ -144,4 +317,808 @@ CREATE TRIGGER update_users_updated_at BEFORE UPDATE ON users
   FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
 CREATE TRIGGER update_workouts_updated_at BEFORE UPDATE ON workouts
-  FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
\ No newline at end of file
+  FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+CREATE TRIGGER update_workout_templates_updated_at BEFORE UPDATE ON workout_templates
+  FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- Row versions for conditional updates: a client sends the version it last
+-- saw and the UPDATE filters on it, so a stale edit matches no row
+CREATE OR REPLACE FUNCTION bump_row_version()
+RETURNS TRIGGER AS $$
+BEGIN
+  NEW.version = OLD.version + 1;
+  RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER bump_workouts_version BEFORE UPDATE ON workouts
+  FOR EACH ROW EXECUTE FUNCTION bump_row_version();
+
+CREATE TRIGGER bump_workout_exercises_version BEFORE UPDATE ON workout_exercises
+  FOR EACH ROW EXECUTE FUNCTION bump_row_version();
+
+-- Defined on the partitioned parent, so every monthly partition inherits it
+CREATE TRIGGER bump_sets_version BEFORE UPDATE ON sets
+  FOR EACH ROW EXECUTE FUNCTION bump_row_version();
+
+-- Workout exercise ordering functions
+-- Workout exercise ordering uses gapped indexes (multiples of 1024) so a
+-- drag-and-drop move can write one row at the midpoint of its neighbours.
+
+-- Bulk add exercises to a workout in one statement. Ownership is checked in
+-- the same transaction; exercise existence is enforced by the foreign key.
+-- p_items: [{"exercise_id": uuid, "order_index": int|null, "notes": text|null}, ...]
+CREATE OR REPLACE FUNCTION add_workout_exercises(p_user_id UUID, p_workout_id UUID, p_items JSONB, p_gap INTEGER DEFAULT 1024)
+RETURNS SETOF workout_exercises
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_max_index INTEGER;
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM workouts WHERE id = p_workout_id AND user_id = p_user_id) THEN
+    RAISE EXCEPTION 'Workout not found' USING ERRCODE = 'P0002';
+  END IF;
+
+  SELECT COALESCE(MAX(order_index), -p_gap) INTO v_max_index
+  FROM workout_exercises WHERE workout_id = p_workout_id;
+
+  RETURN QUERY
+    INSERT INTO workout_exercises (workout_id, exercise_id, order_index, notes)
+    SELECT p_workout_id,
+           i.exercise_id,
+           COALESCE(i.order_index, v_max_index + p_gap * t.ordinality::INTEGER),
+           i.notes
+    FROM jsonb_array_elements(p_items) WITH ORDINALITY AS t(item, ordinality)
+    CROSS JOIN LATERAL jsonb_to_record(t.item) AS i(exercise_id UUID, order_index INTEGER, notes TEXT)
+    ORDER BY t.ordinality
+    RETURNING *;
+END;
+$$;
+
+-- Rewrite the order of every exercise in a workout with one UPDATE.
+-- Also used to rebalance when a move finds no free index between neighbours.
+CREATE OR REPLACE FUNCTION reorder_workout_exercises(p_user_id UUID, p_workout_id UUID, p_exercise_ids UUID[], p_gap INTEGER DEFAULT 1024)
+RETURNS SETOF workout_exercises
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_count INTEGER;
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM workouts WHERE id = p_workout_id AND user_id = p_user_id) THEN
+    RAISE EXCEPTION 'Workout not found' USING ERRCODE = 'P0002';
+  END IF;
+
+  IF (SELECT COUNT(*) FROM workout_exercises WHERE workout_id = p_workout_id) <> cardinality(p_exercise_ids) THEN
+    RAISE EXCEPTION 'Reorder must include every exercise in the workout' USING ERRCODE = '22023';
+  END IF;
+
+  RETURN QUERY
+    UPDATE workout_exercises we
+    SET order_index = (t.ordinality::INTEGER - 1) * p_gap
+    FROM unnest(p_exercise_ids) WITH ORDINALITY AS t(exercise_id, ordinality)
+    WHERE we.workout_id = p_workout_id
+      AND we.exercise_id = t.exercise_id
+    RETURNING we.*;
+
+  GET DIAGNOSTICS v_count = ROW_COUNT;
+  IF v_count <> cardinality(p_exercise_ids) THEN
+    RAISE EXCEPTION 'Exercise not found in workout' USING ERRCODE = 'P0002';
+  END IF;
+END;
+$$;
+
+-- Workout template functions
+-- Create a template and all of its exercises in one transaction.
+-- p_exercises: [{"exercise_id": uuid, "order_index": int|null, "target_sets": int|null,
+--                "target_reps": int|null, "target_weight_grams": int|null, ...}, ...]
+CREATE OR REPLACE FUNCTION create_workout_template(p_user_id UUID, p_title TEXT, p_notes TEXT, p_exercises JSONB, p_gap INTEGER DEFAULT 1024)
+RETURNS SETOF workout_templates
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_template workout_templates;
+BEGIN
+  INSERT INTO workout_templates (user_id, title, notes)
+  VALUES (p_user_id, p_title, p_notes)
+  RETURNING * INTO v_template;
+
+  INSERT INTO workout_template_exercises (
+    template_id, exercise_id, order_index, target_sets, target_reps, target_weight_grams,
+    target_duration, target_distance_cm, rest_time, notes
+  )
+  SELECT v_template.id,
+         i.exercise_id,
+         COALESCE(i.order_index, p_gap * (t.ordinality::INTEGER - 1)),
+         COALESCE(i.target_sets, 1),
+         i.target_reps,
+         i.target_weight_grams,
+         i.target_duration,
+         i.target_distance_cm,
+         i.rest_time,
+         i.notes
+  FROM jsonb_array_elements(p_exercises) WITH ORDINALITY AS t(item, ordinality)
+  CROSS JOIN LATERAL jsonb_to_record(t.item) AS i(
+    exercise_id UUID, order_index INTEGER, target_sets INTEGER, target_reps INTEGER,
+    target_weight_grams INTEGER, target_duration INTEGER, target_distance_cm INTEGER,
+    rest_time INTEGER, notes TEXT
+  );
+
+  RETURN NEXT v_template;
+END;
+$$;
+
+-- Materialize a template into a new active workout: one INSERT per table, with
+-- planned (not yet completed) sets expanded from target_sets by generate_series.
+CREATE OR REPLACE FUNCTION create_workout_from_template(p_user_id UUID, p_template_id UUID, p_title TEXT DEFAULT NULL, p_started_at TIMESTAMP WITH TIME ZONE DEFAULT NULL)
+RETURNS SETOF workouts
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_template workout_templates;
+  v_workout workouts;
+BEGIN
+  SELECT * INTO v_template FROM workout_templates WHERE id = p_template_id AND user_id = p_user_id;
+  IF NOT FOUND THEN
+    RAISE EXCEPTION 'Template not found' USING ERRCODE = 'P0002';
+  END IF;
+
+  INSERT INTO workouts (user_id, title, started_at, is_active)
+  VALUES (p_user_id, COALESCE(p_title, v_template.title), COALESCE(p_started_at, TIMEZONE('utc', NOW())), true)
+  RETURNING * INTO v_workout;
+
+  WITH created AS (
+    INSERT INTO workout_exercises (workout_id, exercise_id, order_index, notes)
+    SELECT v_workout.id, te.exercise_id, te.order_index, te.notes
+    FROM workout_template_exercises te
+    WHERE te.template_id = p_template_id
+    RETURNING id, exercise_id
+  )
+  INSERT INTO sets (workout_exercise_id, reps, weight_grams, duration, distance_cm, rest_time, completed, order_index)
+  SELECT created.id, te.target_reps, te.target_weight_grams, te.target_duration, te.target_distance_cm,
+         te.rest_time, false, s.n - 1
+  FROM created
+  JOIN workout_template_exercises te
+    ON te.template_id = p_template_id AND te.exercise_id = created.exercise_id
+  CROSS JOIN LATERAL generate_series(1, te.target_sets) AS s(n);
+
+  RETURN NEXT v_workout;
+END;
+$$;
+
+-- Workout cloning function
+-- Clone a workout into a new active workout. Sets are copied as planned
+-- (not completed) sets in their original order. An archived source is
+-- restored first.
+-- p_mode: 'structure' copies reps/duration/distance/rest but not weights,
+--         'with_weights' also copies the weights used last time.
+CREATE OR REPLACE FUNCTION clone_workout(p_user_id UUID, p_workout_id UUID, p_mode TEXT DEFAULT 'structure', p_title TEXT DEFAULT NULL, p_started_at TIMESTAMP WITH TIME ZONE DEFAULT NULL)
+RETURNS SETOF workouts
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_source workouts;
+  v_workout workouts;
+BEGIN
+  IF p_mode NOT IN ('structure', 'with_weights') THEN
+    RAISE EXCEPTION 'Invalid clone mode: %', p_mode USING ERRCODE = '22023';
+  END IF;
+
+  SELECT * INTO v_source FROM workouts WHERE id = p_workout_id AND user_id = p_user_id;
+  IF NOT FOUND THEN
+    RAISE EXCEPTION 'Workout not found' USING ERRCODE = 'P0002';
+  END IF;
+
+  IF v_source.archived_at IS NOT NULL THEN
+    PERFORM restore_archived_workout(p_user_id, p_workout_id);
+  END IF;
+
+  INSERT INTO workouts (user_id, title, started_at, is_active)
+  VALUES (p_user_id, COALESCE(p_title, v_source.title), COALESCE(p_started_at, TIMEZONE('utc', NOW())), true)
+  RETURNING * INTO v_workout;
+
+  WITH created AS (
+    INSERT INTO workout_exercises (workout_id, exercise_id, order_index, notes)
+    SELECT v_workout.id, we.exercise_id, we.order_index, we.notes
+    FROM workout_exercises we
+    WHERE we.workout_id = p_workout_id
+    RETURNING id, exercise_id
+  )
+  INSERT INTO sets (workout_exercise_id, reps, weight_grams, duration, distance_cm, rest_time, completed, order_index)
+  SELECT created.id,
+         s.reps,
+         CASE WHEN p_mode = 'with_weights' THEN s.weight_grams END,
+         s.duration,
+         s.distance_cm,
+         s.rest_time,
+         false,
+         s.order_index
+  FROM created
+  JOIN workout_exercises we
+    ON we.workout_id = p_workout_id AND we.exercise_id = created.exercise_id
+  JOIN sets s ON s.workout_exercise_id = we.id;
+
+  RETURN NEXT v_workout;
+END;
+$$;
+
+-- Last performance cache maintenance
+-- Refresh the cache for the given workout exercises. Completed sets of an
+-- affected workout exercise replace the cached row when they are at least as
+-- recent; cached rows whose source lost all completed sets fall back to the
+-- next most recent workout in the user's history. Sets moving to or from
+-- the archive leave the cache alone.
+CREATE OR REPLACE FUNCTION refresh_exercise_last_performance(p_workout_exercise_ids UUID[])
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF cardinality(p_workout_exercise_ids) = 0 THEN
+    RETURN;
+  END IF;
+
+  INSERT INTO exercise_last_performance (user_id, exercise_id, workout_id, workout_exercise_id, performed_at, sets)
+  SELECT DISTINCT ON (w.user_id, we.exercise_id)
+         w.user_id, we.exercise_id, w.id, we.id, w.started_at,
+         jsonb_agg(jsonb_build_object(
+           'reps', s.reps, 'weight_grams', s.weight_grams, 'duration', s.duration,
+           'distance_cm', s.distance_cm, 'rest_time', s.rest_time
+         ) ORDER BY s.order_index)
+  FROM workout_exercises we
+  JOIN workouts w ON w.id = we.workout_id
+  JOIN sets s ON s.workout_exercise_id = we.id AND s.completed
+  WHERE we.id = ANY(p_workout_exercise_ids)
+  GROUP BY w.user_id, we.exercise_id, w.id, we.id, w.started_at
+  ORDER BY w.user_id, we.exercise_id, w.started_at DESC
+  ON CONFLICT (user_id, exercise_id) DO UPDATE SET
+    workout_id = EXCLUDED.workout_id,
+    workout_exercise_id = EXCLUDED.workout_exercise_id,
+    performed_at = EXCLUDED.performed_at,
+    sets = EXCLUDED.sets,
+    updated_at = TIMEZONE('utc', NOW())
+  WHERE EXCLUDED.performed_at >= exercise_last_performance.performed_at
+     OR EXCLUDED.workout_exercise_id = exercise_last_performance.workout_exercise_id;
+
+  WITH stale AS (
+    DELETE FROM exercise_last_performance elp
+    WHERE elp.workout_exercise_id = ANY(p_workout_exercise_ids)
+      AND NOT EXISTS (
+        SELECT 1 FROM sets s WHERE s.workout_exercise_id = elp.workout_exercise_id AND s.completed
+      )
+    RETURNING elp.user_id, elp.exercise_id
+  )
+  INSERT INTO exercise_last_performance (user_id, exercise_id, workout_id, workout_exercise_id, performed_at, sets)
+  SELECT DISTINCT ON (w.user_id, we.exercise_id)
+         w.user_id, we.exercise_id, w.id, we.id, w.started_at, completed_sets.sets
+  FROM stale
+  JOIN workouts w ON w.user_id = stale.user_id
+  JOIN workout_exercises we ON we.workout_id = w.id AND we.exercise_id = stale.exercise_id
+  CROSS JOIN LATERAL (
+    SELECT jsonb_agg(jsonb_build_object(
+             'reps', s.reps, 'weight_grams', s.weight_grams, 'duration', s.duration,
+             'distance_cm', s.distance_cm, 'rest_time', s.rest_time
+           ) ORDER BY s.order_index) AS sets
+    FROM sets s
+    WHERE s.workout_exercise_id = we.id AND s.completed
+  ) completed_sets
+  WHERE completed_sets.sets IS NOT NULL
+  ORDER BY w.user_id, we.exercise_id, w.started_at DESC;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION sets_refresh_last_performance()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF current_setting('app.archiving_sets', true) = 'on' THEN
+    RETURN NULL;
+  END IF;
+
+  IF TG_OP = 'INSERT' THEN
+    -- Planned (uncompleted) sets from templates and clones never change the cache
+    PERFORM refresh_exercise_last_performance(ARRAY(
+      SELECT DISTINCT workout_exercise_id FROM new_sets WHERE completed
+    ));
+  ELSIF TG_OP = 'UPDATE' THEN
+    PERFORM refresh_exercise_last_performance(ARRAY(
+      SELECT workout_exercise_id FROM new_sets UNION SELECT workout_exercise_id FROM old_sets
+    ));
+  ELSE
+    PERFORM refresh_exercise_last_performance(ARRAY(
+      SELECT DISTINCT workout_exercise_id FROM old_sets
+    ));
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER sets_last_performance_insert AFTER INSERT ON sets
+  REFERENCING NEW TABLE AS new_sets
+  FOR EACH STATEMENT EXECUTE FUNCTION sets_refresh_last_performance();
+
+CREATE TRIGGER sets_last_performance_update AFTER UPDATE ON sets
+  REFERENCING OLD TABLE AS old_sets NEW TABLE AS new_sets
+  FOR EACH STATEMENT EXECUTE FUNCTION sets_refresh_last_performance();
+
+CREATE TRIGGER sets_last_performance_delete AFTER DELETE ON sets
+  REFERENCING OLD TABLE AS old_sets
+  FOR EACH STATEMENT EXECUTE FUNCTION sets_refresh_last_performance();
+
+-- Personal record maintenance
+-- Apply record candidates for one user and exercise. A candidate only replaces
+-- the stored record when it is strictly better, so concurrent writers cannot
+-- lower a record. Returns the records that were set or improved.
+-- p_candidates: [{"record_type", "qualifier", "value", "set_id", "workout_id", "achieved_at"}, ...]
+CREATE OR REPLACE FUNCTION apply_personal_records(p_user_id UUID, p_exercise_id UUID, p_candidates JSONB)
+RETURNS SETOF personal_records
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  RETURN QUERY
+    INSERT INTO personal_records AS pr (user_id, exercise_id, record_type, qualifier, value, set_id, workout_id, achieved_at)
+    SELECT DISTINCT ON (c.record_type, c.qualifier)
+           p_user_id, p_exercise_id, c.record_type, c.qualifier, c.value, c.set_id, c.workout_id, c.achieved_at
+    FROM jsonb_to_recordset(p_candidates) AS c(
+      record_type TEXT, qualifier TEXT, value NUMERIC, set_id UUID, workout_id UUID, achieved_at TIMESTAMP WITH TIME ZONE
+    )
+    ORDER BY c.record_type, c.qualifier, c.value DESC, c.achieved_at
+    ON CONFLICT (user_id, exercise_id, record_type, qualifier) DO UPDATE SET
+      value = EXCLUDED.value,
+      set_id = EXCLUDED.set_id,
+      workout_id = EXCLUDED.workout_id,
+      achieved_at = EXCLUDED.achieved_at,
+      updated_at = TIMEZONE('utc', NOW())
+    WHERE EXCLUDED.value > pr.value
+    RETURNING pr.*;
+END;
+$$;
+
+-- Stale workout maintenance
+-- Close up to p_batch_size active workouts whose last activity (latest
+-- completed set, or the start time if none) is before p_idle_before.
+-- completed_at and duration are taken from that last activity, keeping any
+-- values already set. Rows locked by concurrent writers are skipped and
+-- picked up by a later batch. Returns the closed workouts.
+CREATE OR REPLACE FUNCTION close_stale_workouts(p_idle_before TIMESTAMP WITH TIME ZONE, p_batch_size INTEGER DEFAULT 500)
+RETURNS SETOF workouts
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF p_batch_size < 1 OR p_batch_size > 5000 THEN
+    RAISE EXCEPTION 'Invalid batch size: %', p_batch_size USING ERRCODE = '22023';
+  END IF;
+
+  RETURN QUERY
+    WITH candidates AS (
+      SELECT w.id, COALESCE(last_set.completed_at, w.started_at) AS last_activity
+      FROM workouts w
+      LEFT JOIN LATERAL (
+        SELECT MAX(s.completed_at) AS completed_at
+        FROM workout_exercises we
+        JOIN sets s ON s.workout_exercise_id = we.id
+        WHERE we.workout_id = w.id AND s.completed
+      ) last_set ON true
+      WHERE w.is_active
+        AND COALESCE(last_set.completed_at, w.started_at) < p_idle_before
+      ORDER BY w.started_at
+      LIMIT p_batch_size
+      FOR UPDATE OF w SKIP LOCKED
+    )
+    UPDATE workouts w
+    SET is_active = false,
+        completed_at = COALESCE(w.completed_at, GREATEST(c.last_activity, w.started_at)),
+        duration = COALESCE(w.duration, GREATEST(0, EXTRACT(EPOCH FROM (c.last_activity - w.started_at)))::INTEGER)
+    FROM candidates c
+    WHERE w.id = c.id
+    RETURNING w.*;
+END;
+$$;
+
+-- Owner denormalization
+-- Copy the owner from the parent row. A missing (or, under RLS, invisible)
+-- parent raises foreign_key_violation, as the parent FK did before.
+CREATE OR REPLACE FUNCTION workout_exercises_set_user_id()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  SELECT user_id INTO NEW.user_id FROM workouts WHERE id = NEW.workout_id;
+  IF NOT FOUND THEN
+    RAISE EXCEPTION 'Workout % not found', NEW.workout_id USING ERRCODE = '23503';
+  END IF;
+  RETURN NEW;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION sets_set_user_id()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  SELECT user_id INTO NEW.user_id FROM workout_exercises WHERE id = NEW.workout_exercise_id;
+  IF NOT FOUND THEN
+    RAISE EXCEPTION 'Workout exercise % not found', NEW.workout_exercise_id USING ERRCODE = '23503';
+  END IF;
+  RETURN NEW;
+END;
+$$;
+
+CREATE TRIGGER workout_exercises_user_id
+  BEFORE INSERT OR UPDATE OF workout_id, user_id ON workout_exercises
+  FOR EACH ROW EXECUTE FUNCTION workout_exercises_set_user_id();
+
+CREATE TRIGGER sets_user_id
+  BEFORE INSERT OR UPDATE OF workout_exercise_id, user_id ON sets
+  FOR EACH ROW EXECUTE FUNCTION sets_set_user_id();
+
+-- Monthly partitions of sets
+-- Create the sets partition for the month containing p_month (UTC) if it
+-- does not exist. Rows of that month already in the default partition are
+-- moved into it before it is attached. Partitions get RLS with no policies,
+-- so they are only reachable through sets and its policies.
+-- Returns the partition name, or NULL if it already existed.
+CREATE OR REPLACE FUNCTION create_sets_partition(p_month DATE)
+RETURNS TEXT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_name TEXT := format('sets_%s', to_char(p_month, 'YYYY_MM'));
+  v_start TIMESTAMP WITH TIME ZONE := make_timestamptz(
+    EXTRACT(YEAR FROM p_month)::INTEGER, EXTRACT(MONTH FROM p_month)::INTEGER, 1, 0, 0, 0, 'UTC'
+  );
+  v_end TIMESTAMP WITH TIME ZONE := v_start + INTERVAL '1 month';
+BEGIN
+  IF to_regclass(format('public.%I', v_name)) IS NOT NULL THEN
+    RETURN NULL;
+  END IF;
+
+  EXECUTE format('CREATE TABLE public.%I (LIKE public.sets INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', v_name);
+  EXECUTE format(
+    'WITH moved AS (DELETE FROM public.sets_default WHERE completed_at >= $1 AND completed_at < $2 RETURNING *) '
+    'INSERT INTO public.%I SELECT * FROM moved', v_name
+  ) USING v_start, v_end;
+  EXECUTE format('ALTER TABLE public.sets ATTACH PARTITION public.%I FOR VALUES FROM (%L) TO (%L)', v_name, v_start, v_end);
+  EXECUTE format('ALTER TABLE public.%I ENABLE ROW LEVEL SECURITY', v_name);
+  RETURN v_name;
+END;
+$$;
+
+-- Make sure partitions exist from the current month through p_months_ahead
+-- months ahead. Idempotent; returns only the partitions it created. Runs as
+-- the table owner so the backend's service role can call it.
+CREATE OR REPLACE FUNCTION ensure_sets_partitions(p_months_ahead INTEGER DEFAULT 3)
+RETURNS TABLE (partition_name TEXT)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_month DATE := date_trunc('month', NOW() AT TIME ZONE 'UTC')::DATE;
+  v_created TEXT;
+BEGIN
+  IF p_months_ahead < 0 OR p_months_ahead > 24 THEN
+    RAISE EXCEPTION 'Invalid months ahead: %', p_months_ahead USING ERRCODE = '22023';
+  END IF;
+
+  FOR i IN 0..p_months_ahead LOOP
+    v_created := create_sets_partition((v_month + make_interval(months => i))::DATE);
+    IF v_created IS NOT NULL THEN
+      partition_name := v_created;
+      RETURN NEXT;
+    END IF;
+  END LOOP;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION create_sets_partition(DATE) FROM PUBLIC;
+
+SELECT ensure_sets_partitions(3);
+
+-- Cold workout archive
+-- Archive up to p_batch_size finished workouts started before
+-- p_started_before: summarize each workout exercise, store the set rows as
+-- one JSONB array per workout and delete them from sets. The estimated 1RM
+-- uses the Epley formula up to 12 reps, like the analytics service
+-- (ESTIMATED_1RM_MAX_REPS). Rows locked by concurrent writers are skipped
+-- and picked up by a later batch. Returns the archived workouts.
+CREATE OR REPLACE FUNCTION archive_cold_workouts(p_started_before TIMESTAMP WITH TIME ZONE, p_batch_size INTEGER DEFAULT 200)
+RETURNS SETOF workouts
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_workout_ids UUID[];
+BEGIN
+  IF p_batch_size < 1 OR p_batch_size > 5000 THEN
+    RAISE EXCEPTION 'Invalid batch size: %', p_batch_size USING ERRCODE = '22023';
+  END IF;
+
+  SELECT array_agg(id) INTO v_workout_ids
+  FROM (
+    SELECT id FROM workouts
+    WHERE archived_at IS NULL AND NOT is_active AND started_at < p_started_before
+    ORDER BY started_at
+    LIMIT p_batch_size
+    FOR UPDATE SKIP LOCKED
+  ) candidates;
+
+  IF v_workout_ids IS NULL THEN
+    RETURN;
+  END IF;
+
+  INSERT INTO workout_exercise_summaries (
+    workout_exercise_id, workout_id, user_id, exercise_id, set_count, completed_sets,
+    total_reps, total_volume_grams, top_set_weight_grams, estimated_1rm_grams
+  )
+  SELECT we.id, we.workout_id, we.user_id, we.exercise_id,
+         COUNT(s.id),
+         COUNT(s.id) FILTER (WHERE s.completed),
+         COALESCE(SUM(s.reps) FILTER (WHERE s.completed), 0),
+         COALESCE(SUM(COALESCE(s.weight_grams, 0)::BIGINT * COALESCE(s.reps, 0)) FILTER (WHERE s.completed), 0),
+         MAX(s.weight_grams) FILTER (WHERE s.completed),
+         MAX(CASE WHEN s.reps = 1 THEN s.weight_grams WHEN s.reps BETWEEN 2 AND 12 THEN round(s.weight_grams * (30 + s.reps) / 30.0) END)
+           FILTER (WHERE s.completed)
+  FROM workout_exercises we
+  LEFT JOIN sets s ON s.workout_exercise_id = we.id
+  WHERE we.workout_id = ANY(v_workout_ids)
+  GROUP BY we.id;
+
+  INSERT INTO archived_workout_sets (workout_id, user_id, sets)
+  SELECT we.workout_id, we.user_id, jsonb_agg(to_jsonb(s) ORDER BY we.order_index, s.order_index)
+  FROM workout_exercises we
+  JOIN sets s ON s.workout_exercise_id = we.id
+  WHERE we.workout_id = ANY(v_workout_ids)
+  GROUP BY we.workout_id, we.user_id;
+
+  PERFORM set_config('app.archiving_sets', 'on', true);
+  DELETE FROM sets s
+  USING workout_exercises we
+  WHERE s.workout_exercise_id = we.id AND we.workout_id = ANY(v_workout_ids);
+  PERFORM set_config('app.archiving_sets', 'off', true);
+
+  RETURN QUERY
+    UPDATE workouts SET archived_at = TIMEZONE('utc', NOW())
+    WHERE id = ANY(v_workout_ids)
+    RETURNING *;
+END;
+$$;
+
+-- Move an archived workout's sets back into sets and drop its summaries.
+-- A workout that is not archived is returned unchanged.
+CREATE OR REPLACE FUNCTION restore_archived_workout(p_user_id UUID, p_workout_id UUID)
+RETURNS SETOF workouts
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_workout workouts;
+BEGIN
+  SELECT * INTO v_workout FROM workouts WHERE id = p_workout_id AND user_id = p_user_id FOR UPDATE;
+  IF NOT FOUND THEN
+    RAISE EXCEPTION 'Workout not found' USING ERRCODE = 'P0002';
+  END IF;
+
+  IF v_workout.archived_at IS NULL THEN
+    RETURN NEXT v_workout;
+    RETURN;
+  END IF;
+
+  PERFORM set_config('app.archiving_sets', 'on', true);
+  INSERT INTO sets
+  SELECT archived.*
+  FROM archived_workout_sets a,
+       jsonb_populate_recordset(NULL::sets, a.sets) AS archived
+  WHERE a.workout_id = p_workout_id;
+  PERFORM set_config('app.archiving_sets', 'off', true);
+
+  DELETE FROM archived_workout_sets WHERE workout_id = p_workout_id;
+  DELETE FROM workout_exercise_summaries WHERE workout_id = p_workout_id;
+
+  UPDATE workouts SET archived_at = NULL WHERE id = p_workout_id RETURNING * INTO v_workout;
+  RETURN NEXT v_workout;
+END;
+$$;
+
+-- Workout event outbox
+-- One event per changed workout, workout exercise and set row, written in
+-- the changing transaction. Event types: workout_created, workout_updated,
+-- workout_completed, workout_deleted, exercise_added, exercise_updated,
+-- exercise_removed, set_logged, set_updated, set_deleted. The payload is the
+-- row after the change (before it, for deletes). Archiving moves are not
+-- changes and emit nothing.
+CREATE OR REPLACE FUNCTION workouts_write_outbox()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    INSERT INTO workout_outbox (user_id, event_type, entity_id, workout_id, payload)
+    SELECT n.user_id, 'workout_created', n.id, n.id, to_jsonb(n) FROM new_workouts n;
+  ELSIF TG_OP = 'UPDATE' THEN
+    INSERT INTO workout_outbox (user_id, event_type, entity_id, workout_id, payload)
+    SELECT n.user_id,
+           CASE WHEN o.is_active AND NOT n.is_active THEN 'workout_completed' ELSE 'workout_updated' END,
+           n.id, n.id, to_jsonb(n)
+    FROM new_workouts n
+    JOIN old_workouts o ON o.id = n.id
+    WHERE n.archived_at IS NOT DISTINCT FROM o.archived_at;
+  ELSE
+    INSERT INTO workout_outbox (user_id, event_type, entity_id, workout_id, payload)
+    SELECT o.user_id, 'workout_deleted', o.id, o.id, to_jsonb(o) FROM old_workouts o;
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION workout_exercises_write_outbox()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    INSERT INTO workout_outbox (user_id, event_type, entity_id, workout_id, payload)
+    SELECT n.user_id, 'exercise_added', n.id, n.workout_id, to_jsonb(n) FROM new_workout_exercises n;
+  ELSIF TG_OP = 'UPDATE' THEN
+    INSERT INTO workout_outbox (user_id, event_type, entity_id, workout_id, payload)
+    SELECT n.user_id, 'exercise_updated', n.id, n.workout_id, to_jsonb(n) FROM new_workout_exercises n;
+  ELSE
+    INSERT INTO workout_outbox (user_id, event_type, entity_id, workout_id, payload)
+    SELECT o.user_id, 'exercise_removed', o.id, o.workout_id, to_jsonb(o) FROM old_workout_exercises o;
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+-- workout_id is looked up from the parent and is NULL when the parent was
+-- deleted by the same statement (cascade)
+CREATE OR REPLACE FUNCTION sets_write_outbox()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF current_setting('app.archiving_sets', true) = 'on' THEN
+    RETURN NULL;
+  END IF;
+
+  IF TG_OP = 'INSERT' THEN
+    INSERT INTO workout_outbox (user_id, event_type, entity_id, workout_id, payload)
+    SELECT n.user_id, 'set_logged', n.id, we.workout_id, to_jsonb(n)
+    FROM new_sets n LEFT JOIN workout_exercises we ON we.id = n.workout_exercise_id;
+  ELSIF TG_OP = 'UPDATE' THEN
+    INSERT INTO workout_outbox (user_id, event_type, entity_id, workout_id, payload)
+    SELECT n.user_id, 'set_updated', n.id, we.workout_id, to_jsonb(n)
+    FROM new_sets n LEFT JOIN workout_exercises we ON we.id = n.workout_exercise_id;
+  ELSE
+    INSERT INTO workout_outbox (user_id, event_type, entity_id, workout_id, payload)
+    SELECT o.user_id, 'set_deleted', o.id, we.workout_id, to_jsonb(o)
+    FROM old_sets o LEFT JOIN workout_exercises we ON we.id = o.workout_exercise_id;
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER workouts_outbox_insert AFTER INSERT ON workouts
+  REFERENCING NEW TABLE AS new_workouts
+  FOR EACH STATEMENT EXECUTE FUNCTION workouts_write_outbox();
+
+CREATE TRIGGER workouts_outbox_update AFTER UPDATE ON workouts
+  REFERENCING OLD TABLE AS old_workouts NEW TABLE AS new_workouts
+  FOR EACH STATEMENT EXECUTE FUNCTION workouts_write_outbox();
+
+CREATE TRIGGER workouts_outbox_delete AFTER DELETE ON workouts
+  REFERENCING OLD TABLE AS old_workouts
+  FOR EACH STATEMENT EXECUTE FUNCTION workouts_write_outbox();
+
+CREATE TRIGGER workout_exercises_outbox_insert AFTER INSERT ON workout_exercises
+  REFERENCING NEW TABLE AS new_workout_exercises
+  FOR EACH STATEMENT EXECUTE FUNCTION workout_exercises_write_outbox();
+
+CREATE TRIGGER workout_exercises_outbox_update AFTER UPDATE ON workout_exercises
+  REFERENCING OLD TABLE AS old_workout_exercises NEW TABLE AS new_workout_exercises
+  FOR EACH STATEMENT EXECUTE FUNCTION workout_exercises_write_outbox();
+
+CREATE TRIGGER workout_exercises_outbox_delete AFTER DELETE ON workout_exercises
+  REFERENCING OLD TABLE AS old_workout_exercises
+  FOR EACH STATEMENT EXECUTE FUNCTION workout_exercises_write_outbox();
+
+CREATE TRIGGER sets_outbox_insert AFTER INSERT ON sets
+  REFERENCING NEW TABLE AS new_sets
+  FOR EACH STATEMENT EXECUTE FUNCTION sets_write_outbox();
+
+CREATE TRIGGER sets_outbox_update AFTER UPDATE ON sets
+  REFERENCING OLD TABLE AS old_sets NEW TABLE AS new_sets
+  FOR EACH STATEMENT EXECUTE FUNCTION sets_write_outbox();
+
+CREATE TRIGGER sets_outbox_delete AFTER DELETE ON sets
+  REFERENCING OLD TABLE AS old_sets
+  FOR EACH STATEMENT EXECUTE FUNCTION sets_write_outbox();
+
+-- Move up to p_batch_size committed outbox events into the log, oldest
+-- first. One relay runs at a time (transaction advisory lock); a concurrent
+-- call returns 0 immediately. Returns the number of events relayed.
+CREATE OR REPLACE FUNCTION relay_workout_outbox(p_batch_size INTEGER DEFAULT 500)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_last_offset BIGINT;
+  v_relayed INTEGER;
+BEGIN
+  IF p_batch_size < 1 OR p_batch_size > 10000 THEN
+    RAISE EXCEPTION 'Invalid batch size: %', p_batch_size USING ERRCODE = '22023';
+  END IF;
+
+  IF NOT pg_try_advisory_xact_lock(hashtext('relay_workout_outbox')) THEN
+    RETURN 0;
+  END IF;
+
+  SELECT COALESCE(MAX(log_offset), 0) INTO v_last_offset FROM workout_event_log;
+
+  WITH batch AS (
+    DELETE FROM workout_outbox
+    WHERE id IN (SELECT id FROM workout_outbox ORDER BY id LIMIT p_batch_size)
+    RETURNING *
+  )
+  INSERT INTO workout_event_log (log_offset, outbox_id, user_id, event_type, entity_id, workout_id, payload, occurred_at)
+  SELECT v_last_offset + ROW_NUMBER() OVER (ORDER BY b.id), b.id, b.user_id, b.event_type,
+         b.entity_id, b.workout_id, b.payload, b.occurred_at
+  FROM batch b;
+
+  GET DIAGNOSTICS v_relayed = ROW_COUNT;
+  RETURN v_relayed;
+END;
+$$;
+
+-- Record that p_consumer has processed the log through p_offset. Offsets
+-- only move forward, so a late retry cannot rewind a consumer. Returns the
+-- committed offset.
+CREATE OR REPLACE FUNCTION commit_workout_event_offset(p_consumer TEXT, p_offset BIGINT)
+RETURNS BIGINT
+LANGUAGE sql
+AS $$
+  INSERT INTO workout_event_consumers (consumer, committed_offset)
+  VALUES (p_consumer, p_offset)
+  ON CONFLICT (consumer) DO UPDATE
+    SET committed_offset = GREATEST(workout_event_consumers.committed_offset, EXCLUDED.committed_offset),
+        updated_at = TIMEZONE('utc', NOW())
+  RETURNING committed_offset;
+$$;
+
+-- Delete up to p_batch_size log events that every named consumer has
+-- committed, oldest first. A named consumer without an offset holds the
+-- whole log, and the newest event is always kept (relay_workout_outbox
+-- numbers new events after it). Returns the number of events deleted.
+CREATE OR REPLACE FUNCTION prune_workout_event_log(p_consumers TEXT[], p_batch_size INTEGER DEFAULT 5000)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_below BIGINT;
+  v_pruned INTEGER;
+BEGIN
+  IF p_batch_size < 1 OR p_batch_size > 50000 THEN
+    RAISE EXCEPTION 'Invalid batch size: %', p_batch_size USING ERRCODE = '22023';
+  END IF;
+
+  SELECT MIN(COALESCE(c.committed_offset, 0))
+  INTO v_below
+  FROM unnest(p_consumers) AS n(consumer)
+  LEFT JOIN workout_event_consumers c ON c.consumer = n.consumer;
+
+  IF v_below IS NULL THEN
+    RETURN 0;
+  END IF;
+
+  SELECT LEAST(v_below, MAX(log_offset)) INTO v_below FROM workout_event_log;
+
+  DELETE FROM workout_event_log
+  WHERE log_offset IN (
+    SELECT log_offset FROM workout_event_log
+    WHERE log_offset < v_below
+    ORDER BY log_offset
+    LIMIT p_batch_size
+  );
+
+  GET DIAGNOSTICS v_pruned = ROW_COUNT;
+  RETURN v_pruned;
+END;
+$$;
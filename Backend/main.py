@@ -3,19 +3,162 @@ FastAPI Backend for FM-SetLogger Phase 5.4
 Workout & Exercise CRUD Endpoints with Authentication
 """
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from core.config import settings
+from core.scheduler import get_scheduler
+from core.task_queue import get_task_queue
+from services.set_coalescing_service import get_set_write_coalescer
+from services.session_buffer_service import get_session_buffer
+from services.live_session_service import get_live_hub
+from services.event_log_service import register_event_consumer
+from services.record_service import RECORDS_EVENT_CONSUMER, reconcile_records_from_events
 from routers.auth import router as auth_router
 from routers.workouts import router as workouts_router
 from routers.exercises import router as exercises_router
 from routers.users import router as users_router
+from routers.templates import router as templates_router
+from routers.records import router as records_router
+from routers.analytics import router as analytics_router
+from routers.home import router as home_router
+
+def close_stale_workouts():
+    """Scheduled job: close active workouts users forgot to finish."""
+    from services.workout_service import WorkoutService
+
+    report = WorkoutService().close_stale_workouts(
+        idle_hours=settings.stale_workout_idle_hours,
+        batch_size=settings.stale_workout_batch_size,
+        max_batches=settings.stale_workout_max_batches
+    )
+    return report.model_dump(mode="json")
+
+
+def ensure_set_partitions():
+    """Scheduled job: create monthly sets partitions before they are needed."""
+    from services.workout_service import WorkoutService
+
+    return WorkoutService().ensure_set_partitions(months_ahead=settings.set_partition_months_ahead)
+
+
+def archive_cold_workouts():
+    """Scheduled job: move the sets of old workouts into the compressed archive."""
+    from services.workout_service import WorkoutService
+
+    report = WorkoutService().archive_cold_workouts(
+        archive_after_days=settings.workout_archive_after_days,
+        batch_size=settings.workout_archive_batch_size,
+        max_batches=settings.workout_archive_max_batches
+    )
+    return report.model_dump(mode="json")
+
+
+def relay_workout_events():
+    """Scheduled job: move outbox events into the workout event log and run its consumers."""
+    from services.event_log_service import WorkoutEventLogService
+
+    event_log = WorkoutEventLogService()
+    report = event_log.relay_outbox(
+        batch_size=settings.workout_event_relay_batch_size,
+        max_batches=settings.workout_event_relay_max_batches
+    )
+    consumed = event_log.run_consumers(
+        batch_size=settings.workout_event_relay_batch_size,
+        max_batches=settings.workout_event_relay_max_batches
+    )
+    return dict(report.model_dump(mode="json"), consumed=consumed)
+
+
+def prune_workout_event_log():
+    """Scheduled job: delete workout event log entries every consumer has processed."""
+    from services.event_log_service import WorkoutEventLogService
+
+    report = WorkoutEventLogService().prune_log(
+        batch_size=settings.workout_event_log_prune_batch_size,
+        max_batches=settings.workout_event_log_prune_max_batches
+    )
+    return report.model_dump(mode="json")
+
+
+def flush_session_buffer():
+    """Scheduled job: write buffered active-session set logging to the database."""
+    return get_session_buffer().flush_all()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Replay the session journal, connect the live hub and start background work; flush, drain and stop it on shutdown."""
+    scheduler = get_scheduler()
+    if settings.stale_workout_closer_enabled and not settings.testing and not scheduler.has_job("close_stale_workouts"):
+        scheduler.register(
+            "close_stale_workouts",
+            close_stale_workouts,
+            interval_seconds=settings.stale_workout_interval_seconds,
+            initial_delay_seconds=60
+        )
+    if settings.set_partition_maintenance_enabled and not settings.testing and not scheduler.has_job("ensure_set_partitions"):
+        scheduler.register(
+            "ensure_set_partitions",
+            ensure_set_partitions,
+            interval_seconds=settings.set_partition_interval_seconds
+        )
+    if settings.workout_archive_enabled and not settings.testing and not scheduler.has_job("archive_cold_workouts"):
+        scheduler.register(
+            "archive_cold_workouts",
+            archive_cold_workouts,
+            interval_seconds=settings.workout_archive_interval_seconds,
+            initial_delay_seconds=300
+        )
+    if settings.workout_event_relay_enabled and not settings.testing and not scheduler.has_job("relay_workout_events"):
+        register_event_consumer(RECORDS_EVENT_CONSUMER, reconcile_records_from_events)
+        scheduler.register(
+            "relay_workout_events",
+            relay_workout_events,
+            interval_seconds=settings.workout_event_relay_interval_seconds
+        )
+    if settings.workout_event_log_prune_enabled and not settings.testing and not scheduler.has_job("prune_workout_event_log"):
+        scheduler.register(
+            "prune_workout_event_log",
+            prune_workout_event_log,
+            interval_seconds=settings.workout_event_log_prune_interval_seconds,
+            initial_delay_seconds=600
+        )
+    session_buffer = get_session_buffer()
+    if session_buffer.enabled and not settings.testing:
+        from services.workout_service import WorkoutService
+
+        session_buffer.replay(WorkoutService())
+        if not scheduler.has_job("flush_session_buffer"):
+            scheduler.register(
+                "flush_session_buffer",
+                flush_session_buffer,
+                interval_seconds=settings.session_buffer_flush_interval_seconds,
+                initial_delay_seconds=settings.session_buffer_flush_interval_seconds
+            )
+    live_hub = get_live_hub()
+    if not settings.testing:
+        await live_hub.start()
+    task_queue = get_task_queue()
+    await task_queue.start()
+    await scheduler.start()
+    try:
+        yield
+    finally:
+        get_set_write_coalescer().flush_all()
+        await scheduler.stop()
+        session_buffer.flush_all()
+        await task_queue.stop()
+        await live_hub.stop()
+
 
 app = FastAPI(
     title="FM-SetLogger API",
     description="Fitness tracking backend with secure multi-user configuration and CORS",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware configuration for React Native app
@@ -30,7 +173,8 @@ app.add_middleware(
     allow_origins=cors_origins,
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-    allow_headers=["Authorization", "Content-Type", "x-requested-with"],
+    allow_headers=["Authorization", "Content-Type", "x-requested-with", "Idempotency-Key", "If-Match"],
+    expose_headers=["Idempotent-Replayed", "ETag"],
 )
 
 # Register routers
@@ -38,6 +182,10 @@ app.include_router(auth_router)
 app.include_router(workouts_router)
 app.include_router(exercises_router)
 app.include_router(users_router)
+app.include_router(templates_router)
+app.include_router(records_router)
+app.include_router(analytics_router)
+app.include_router(home_router)
 
 class HealthResponse(BaseModel):
     status: str
@@ -0,0 +1,109 @@
+"""
+Analytics Pydantic Models
+
+Defines analytics data models for:
+- Exercise progression time series in columnar form
+- Downsampling method and metric selection
+- Training load (daily/weekly volume, acute:chronic ratio, monotony, strain)
+- Volume distribution across body parts
+- Training calendar (streaks, yearly heatmap, weekly frequency)
+
+Time series are returned as parallel arrays (one entry per session) rather
+than a list of objects, which keeps multi-year histories to a few KB.
+"""
+
+from datetime import date
+from typing import Optional, List
+from uuid import UUID
+from pydantic import BaseModel, Field
+from enum import Enum
+
+
+class DownsampleMethod(str, Enum):
+    """Server-side downsampling method for time series."""
+    LTTB = "lttb"
+    MAX = "max"
+
+
+class ProgressionMetric(str, Enum):
+    """Per-session progression metric."""
+    TOP_SET_WEIGHT = "top_set_weight"
+    ESTIMATED_1RM = "estimated_1rm"
+    TOTAL_VOLUME = "total_volume"
+    TOTAL_REPS = "total_reps"
+
+
+class ProgressionResponse(BaseModel):
+    """Columnar per-session progression for one exercise."""
+    exercise_id: UUID = Field(..., description="Exercise ID")
+    total_sessions: int = Field(..., description="Sessions in the full history")
+    downsampled: bool = Field(..., description="Whether the series was reduced to the requested points")
+    method: Optional[DownsampleMethod] = Field(None, description="Downsampling method used")
+    timestamps: List[int] = Field(..., description="Session start times (epoch milliseconds)")
+    top_set_weight: List[Optional[float]] = Field(..., description="Heaviest completed set per session")
+    estimated_1rm: List[Optional[float]] = Field(..., description="Best Epley estimated 1RM per session")
+    total_volume: List[float] = Field(..., description="Sum of weight x reps per session")
+    total_reps: List[int] = Field(..., description="Sum of reps per session")
+
+    class Config:
+        use_enum_values = True
+
+
+class TrainingLoadResponse(BaseModel):
+    """Columnar daily training load for one user."""
+    start_date: date = Field(..., description="First day in the series")
+    end_date: date = Field(..., description="Last day in the series")
+    dates: List[date] = Field(..., description="Calendar days (UTC)")
+    daily_volume: List[float] = Field(..., description="Sum of weight x reps per day")
+    acute_load: List[float] = Field(..., description="Mean daily volume over the trailing 7 days")
+    chronic_load: List[float] = Field(..., description="Mean daily volume over the trailing 28 days")
+    acwr: List[Optional[float]] = Field(..., description="Acute:chronic workload ratio (None without chronic load)")
+    monotony: List[Optional[float]] = Field(..., description="7-day mean / standard deviation of daily volume")
+    strain: List[Optional[float]] = Field(..., description="7-day total volume x monotony")
+    week_starts: List[date] = Field(..., description="Monday of each week in the series")
+    weekly_volume: List[float] = Field(..., description="Sum of daily volume per week")
+
+
+class BodyPartVolume(BaseModel):
+    """Training volume attributed to one body part."""
+    body_part: str = Field(..., description="Body part name")
+    volume: float = Field(..., description="Sum of weight x reps attributed to this body part")
+    sets: float = Field(..., description="Completed sets attributed to this body part (fractional for multi-part exercises)")
+    share: float = Field(..., description="Fraction of total volume (0-1)")
+
+
+class BodyPartVolumeResponse(BaseModel):
+    """Volume per body part over a date range."""
+    start_date: date = Field(..., description="First day of the range")
+    end_date: date = Field(..., description="Last day of the range")
+    total_volume: float = Field(..., description="Sum of weight x reps over the range")
+    total_sets: int = Field(..., description="Completed sets over the range")
+    body_parts: List[BodyPartVolume] = Field(..., description="Body parts ordered by volume, highest first")
+
+
+class StreakResponse(BaseModel):
+    """Training streaks from the user's workout calendar."""
+    current_streak: int = Field(..., description="Consecutive training days ending today (or yesterday)")
+    longest_streak: int = Field(..., description="Longest run of consecutive training days")
+    active_days_this_month: int = Field(..., description="Days with a completed workout this month")
+    workouts_this_month: int = Field(..., description="Completed workouts this month")
+    last_workout_date: Optional[date] = Field(None, description="Most recent training day")
+    timezone: str = Field(..., description="Time zone used for calendar days")
+
+
+class HeatmapResponse(BaseModel):
+    """Completed workouts per day for one calendar year."""
+    year: int = Field(..., description="Calendar year")
+    start_date: date = Field(..., description="Day of the first count (January 1)")
+    timezone: str = Field(..., description="Time zone used for calendar days")
+    active_days: int = Field(..., description="Days with at least one completed workout")
+    counts: List[int] = Field(..., description="Completed workouts per day, starting at start_date")
+
+
+class WeeklyFrequencyResponse(BaseModel):
+    """Training frequency per week (Monday-Sunday)."""
+    timezone: str = Field(..., description="Time zone used for calendar days")
+    week_starts: List[date] = Field(..., description="Monday of each week, oldest first")
+    active_days: List[int] = Field(..., description="Days with a completed workout per week")
+    workouts: List[int] = Field(..., description="Completed workouts per week")
+    average_active_days: float = Field(..., description="Mean training days per week")
@@ -15,6 +15,7 @@ from typing import Optional, Dict, Any
 from uuid import UUID
 from pydantic import BaseModel, Field, EmailStr, field_validator
 from enum import Enum
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 
 class GoogleAuthRequest(BaseModel):
@@ -83,6 +84,16 @@ class UserPreferences(BaseModel):
     hapticFeedback: bool = Field(default=True, description="Enable haptic feedback")
     soundEnabled: bool = Field(default=True, description="Enable sound feedback")
     autoStartRestTimer: bool = Field(default=False, description="Auto-start rest timer after set")
+    timezone: str = Field(default="UTC", description="IANA time zone used for calendar days and streaks")
+
+    @field_validator('timezone')
+    @classmethod
+    def validate_timezone(cls, v):
+        try:
+            ZoneInfo(v)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError(f"Unknown time zone: {v}")
+        return v
 
     class Config:
         use_enum_values = True
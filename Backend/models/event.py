@@ -0,0 +1,59 @@
+"""
+Workout Event Pydantic Models
+
+Defines workout event log data models for:
+- Event type enumeration matching the outbox triggers
+- Events read from the append-only workout event log
+- Relay and retention run reports
+
+Events are written by database triggers in the transaction that changed the
+row, so these models only describe what the log already holds.
+"""
+
+from datetime import datetime
+from typing import Optional, Dict, Any
+from uuid import UUID
+from pydantic import BaseModel, Field
+from enum import Enum
+
+
+class WorkoutEventType(str, Enum):
+    """Workout event type enumeration matching the outbox triggers."""
+    WORKOUT_CREATED = "workout_created"
+    WORKOUT_UPDATED = "workout_updated"
+    WORKOUT_COMPLETED = "workout_completed"
+    WORKOUT_DELETED = "workout_deleted"
+    EXERCISE_ADDED = "exercise_added"
+    EXERCISE_UPDATED = "exercise_updated"
+    EXERCISE_REMOVED = "exercise_removed"
+    SET_LOGGED = "set_logged"
+    SET_UPDATED = "set_updated"
+    SET_DELETED = "set_deleted"
+
+
+class WorkoutEvent(BaseModel):
+    """One entry of the workout event log."""
+    log_offset: int = Field(..., description="Position in the log (gap-free, increasing)")
+    user_id: UUID = Field(..., description="Owner user ID")
+    event_type: WorkoutEventType = Field(..., description="What changed")
+    entity_id: UUID = Field(..., description="ID of the changed workout, workout exercise or set")
+    workout_id: Optional[UUID] = Field(None, description="Workout the entity belongs to (unknown for cascaded set deletes)")
+    payload: Dict[str, Any] = Field(..., description="Row after the change (before it, for deletes) in storage units")
+    occurred_at: datetime = Field(..., description="When the change was written")
+
+    class Config:
+        from_attributes = True
+
+
+class OutboxRelayReport(BaseModel):
+    """Outcome of one outbox relay run."""
+    relayed: int = Field(..., description="Events moved into the log")
+    batches: int = Field(..., description="Batches executed")
+    more_pending: bool = Field(..., description="Whether the batch limit stopped the run before the outbox was drained")
+
+
+class EventLogPruneReport(BaseModel):
+    """Outcome of one event log retention run."""
+    pruned: int = Field(..., description="Events deleted from the log")
+    batches: int = Field(..., description="Batches executed")
+    more_pending: bool = Field(..., description="Whether the batch limit stopped the run before every processed event was deleted")
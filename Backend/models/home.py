@@ -0,0 +1,24 @@
+"""
+Home Screen Pydantic Models
+
+Defines the aggregate payload returned by GET /home so the app can render
+its dashboard from a single request:
+- User profile and preferences
+- Active workout with exercises and sets
+- Workout statistics
+- Most recent workouts
+"""
+
+from typing import Optional, List
+from pydantic import BaseModel, Field
+
+from models.auth import UserResponse
+from models.workout import WorkoutResponse, WorkoutWithExercisesResponse, WorkoutStatsResponse
+
+
+class HomeResponse(BaseModel):
+    """Everything the home screen needs on launch."""
+    profile: UserResponse = Field(..., description="User profile and preferences")
+    active_workout: Optional[WorkoutWithExercisesResponse] = Field(None, description="Active workout with exercises and sets")
+    stats: WorkoutStatsResponse = Field(..., description="Workout statistics")
+    recent_workouts: List[WorkoutResponse] = Field(..., description="Most recent workouts, newest first")
@@ -0,0 +1,51 @@
+"""
+Personal Record Pydantic Models
+
+Defines personal record data models for:
+- Record type enumeration (weight, reps, estimated 1RM, volume, distance, duration)
+- Per-exercise record responses for the /records endpoints
+
+Records are maintained incrementally on set writes, so these models only
+describe stored bests; nothing here is computed on read.
+"""
+
+from datetime import datetime
+from typing import List
+from uuid import UUID
+from pydantic import BaseModel, Field
+from enum import Enum
+
+
+class RecordType(str, Enum):
+    """Personal record type enumeration matching database constraints."""
+    MAX_WEIGHT = "max_weight"
+    MAX_REPS_AT_WEIGHT = "max_reps_at_weight"
+    ESTIMATED_1RM = "estimated_1rm"
+    MAX_VOLUME_SET = "max_volume_set"
+    LONGEST_DISTANCE = "longest_distance"
+    LONGEST_DURATION = "longest_duration"
+
+
+class PersonalRecordResponse(BaseModel):
+    """Response model for a single personal record."""
+    exercise_id: UUID = Field(..., description="Exercise ID")
+    record_type: RecordType = Field(..., description="Record type")
+    qualifier: str = Field("", description="Weight the record is kept for (max_reps_at_weight only)")
+    value: float = Field(..., description="Record value (weight in user's preferred unit, reps, weight x reps, meters or seconds)")
+    set_id: UUID = Field(..., description="Set that holds the record")
+    workout_id: UUID = Field(..., description="Workout the record was set in")
+    achieved_at: datetime = Field(..., description="When the record was set")
+
+    class Config:
+        from_attributes = True
+        use_enum_values = True
+        json_encoders = {
+            datetime: lambda v: v.isoformat() if v else None
+        }
+
+
+class ExerciseRecordsResponse(BaseModel):
+    """All personal records for one exercise."""
+    exercise_id: UUID = Field(..., description="Exercise ID")
+    records: List[PersonalRecordResponse] = Field(..., description="Records for this exercise")
+
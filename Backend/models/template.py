@@ -0,0 +1,108 @@
+"""
+Workout Template Request/Response Pydantic Models
+
+Defines workout template data models for:
+- Template creation with ordered exercises and target sets/reps/weight
+- Template retrieval with embedded exercise details
+- Materializing a template into a new workout session
+
+Templates store a user's routine so a session can be started with a single
+request instead of rebuilding it exercise by exercise and set by set.
+"""
+
+from datetime import datetime
+from typing import Optional, List
+from uuid import UUID
+from pydantic import BaseModel, Field, field_validator
+from decimal import Decimal
+
+from models.workout import ExerciseDetails
+
+
+class TemplateExerciseRequest(BaseModel):
+    """Exercise entry in a template creation request."""
+    exercise_id: UUID = Field(..., description="Exercise ID from library")
+    order_index: Optional[int] = Field(None, ge=0, description="Explicit order index (request order if omitted)")
+    target_sets: int = Field(1, ge=1, le=20, description="Number of planned sets")
+    target_reps: Optional[int] = Field(None, gt=0, description="Planned repetitions per set")
+    target_weight: Optional[Decimal] = Field(None, ge=0, description="Planned weight per set")
+    target_duration: Optional[int] = Field(None, gt=0, description="Planned duration per set in seconds")
+    target_distance: Optional[Decimal] = Field(None, gt=0, description="Planned distance per set in meters")
+    rest_time: Optional[int] = Field(None, ge=0, description="Planned rest after each set in seconds")
+    notes: Optional[str] = Field(None, description="Exercise-specific notes")
+
+
+class CreateTemplateRequest(BaseModel):
+    """Request model for creating a workout template."""
+    title: str = Field(..., min_length=1, max_length=30, description="Template title (1-30 characters)")
+    notes: Optional[str] = Field(None, description="Template notes")
+    exercises: List[TemplateExerciseRequest] = Field(..., min_length=1, max_length=50, description="Template exercises, in order")
+
+    @field_validator('title')
+    @classmethod
+    def validate_title_not_empty(cls, v):
+        if not v or not v.strip():
+            raise ValueError("Template title cannot be empty")
+        return v.strip()
+
+    @field_validator('exercises')
+    @classmethod
+    def validate_unique_exercises(cls, v):
+        exercise_ids = [item.exercise_id for item in v]
+        if len(set(exercise_ids)) != len(exercise_ids):
+            raise ValueError("Template exercises must be unique")
+        return v
+
+
+class CreateWorkoutFromTemplateRequest(BaseModel):
+    """Optional overrides when starting a workout from a template."""
+    title: Optional[str] = Field(None, min_length=1, max_length=30, description="Workout title (defaults to template title)")
+    started_at: Optional[datetime] = Field(None, description="Workout start timestamp (defaults to now)")
+
+    @field_validator('title')
+    @classmethod
+    def validate_title_if_provided(cls, v):
+        if v is not None and (not v or not v.strip()):
+            raise ValueError("Workout title cannot be empty")
+        return v.strip() if v else v
+
+    class Config:
+        json_encoders = {
+            datetime: lambda v: v.isoformat() if v else None
+        }
+
+
+class TemplateExerciseResponse(BaseModel):
+    """Template exercise with embedded exercise details."""
+    id: UUID = Field(..., description="Template exercise ID")
+    template_id: UUID = Field(..., description="Parent template ID")
+    exercise_id: UUID = Field(..., description="Exercise ID")
+    order_index: int = Field(..., description="Exercise order in template")
+    target_sets: int = Field(..., description="Number of planned sets")
+    target_reps: Optional[int] = Field(None, description="Planned repetitions per set")
+    target_weight: Optional[float] = Field(None, description="Planned weight per set in user's preferred unit")
+    target_duration: Optional[int] = Field(None, description="Planned duration per set in seconds")
+    target_distance: Optional[float] = Field(None, description="Planned distance per set in meters")
+    rest_time: Optional[int] = Field(None, description="Planned rest in seconds")
+    notes: Optional[str] = Field(None, description="Exercise notes")
+    exercise_details: ExerciseDetails = Field(..., description="Full exercise information")
+
+    class Config:
+        from_attributes = True
+
+
+class TemplateResponse(BaseModel):
+    """Response model for a workout template with its exercises."""
+    id: UUID = Field(..., description="Template UUID")
+    user_id: UUID = Field(..., description="Owner user ID")
+    title: str = Field(..., description="Template title")
+    notes: Optional[str] = Field(None, description="Template notes")
+    created_at: datetime = Field(..., description="Creation timestamp")
+    updated_at: datetime = Field(..., description="Last update timestamp")
+    exercises: List[TemplateExerciseResponse] = Field(..., description="Template exercises in order")
+
+    class Config:
+        from_attributes = True
+        json_encoders = {
+            datetime: lambda v: v.isoformat() if v else None
+        }
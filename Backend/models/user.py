@@ -114,6 +114,7 @@ class UserPreferencesUpdate(BaseModel):
     hapticFeedback: Optional[bool] = Field(None, description="Enable haptic feedback")
     soundEnabled: Optional[bool] = Field(None, description="Enable sound feedback")
     autoStartRestTimer: Optional[bool] = Field(None, description="Auto-start rest timer after set")
+    timezone: Optional[str] = Field(None, description="IANA time zone used for calendar days and streaks")
 
     class Config:
         use_enum_values = True
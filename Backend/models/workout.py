@@ -16,6 +16,7 @@ from typing import Optional, List, Dict, Any, Union
 from uuid import UUID
 from pydantic import BaseModel, Field, field_validator
 from decimal import Decimal
+from enum import Enum
 
 
 class CreateWorkoutRequest(BaseModel):
@@ -63,6 +64,61 @@ class WorkoutExerciseRequest(BaseModel):
     notes: Optional[str] = Field(None, description="Exercise-specific notes")
 
 
+class BulkWorkoutExerciseItem(BaseModel):
+    """Single exercise entry in a bulk add request."""
+    exercise_id: UUID = Field(..., description="Exercise ID from library")
+    order_index: Optional[int] = Field(None, ge=0, description="Explicit order index (appended after existing exercises if omitted)")
+    notes: Optional[str] = Field(None, description="Exercise-specific notes")
+
+
+class BulkAddExercisesRequest(BaseModel):
+    """Request model for adding many exercises to a workout in one transaction."""
+    exercises: List[BulkWorkoutExerciseItem] = Field(..., min_length=1, max_length=50, description="Exercises to add, in order")
+
+
+class ReorderExercisesRequest(BaseModel):
+    """Request model for rewriting the order of every exercise in a workout."""
+    exercise_ids: List[UUID] = Field(..., min_length=1, description="All workout exercise IDs in their new order")
+    
+    @field_validator('exercise_ids')
+    @classmethod
+    def validate_unique_ids(cls, v):
+        if len(set(v)) != len(v):
+            raise ValueError("Exercise IDs must be unique")
+        return v
+
+
+class MoveExerciseRequest(BaseModel):
+    """Request model for moving one exercise within a workout (drag and drop)."""
+    after_exercise_id: Optional[UUID] = Field(None, description="Exercise to place this one after (None moves it to the top)")
+
+
+class CloneMode(str, Enum):
+    """What a cloned workout copies from its source sets."""
+    STRUCTURE = "structure"
+    WITH_WEIGHTS = "with_weights"
+
+
+class CloneWorkoutRequest(BaseModel):
+    """Request model for repeating a past workout as a new session."""
+    mode: CloneMode = Field(CloneMode.STRUCTURE, description="'structure' copies exercises and sets without weights, 'with_weights' also copies weights")
+    title: Optional[str] = Field(None, min_length=1, max_length=30, description="Workout title (defaults to source title)")
+    started_at: Optional[datetime] = Field(None, description="Workout start timestamp (defaults to now)")
+    
+    @field_validator('title')
+    @classmethod
+    def validate_title_if_provided(cls, v):
+        if v is not None and (not v or not v.strip()):
+            raise ValueError("Workout title cannot be empty")
+        return v.strip() if v else v
+    
+    class Config:
+        use_enum_values = True
+        json_encoders = {
+            datetime: lambda v: v.isoformat() if v else None
+        }
+
+
 class CreateSetRequest(BaseModel):
     """Request model for creating a new set."""
     reps: Optional[int] = Field(None, gt=0, description="Number of repetitions (strength exercises)")
@@ -104,21 +160,44 @@ class SetResponse(BaseModel):
     id: UUID = Field(..., description="Set UUID")
     workout_exercise_id: UUID = Field(..., description="Parent workout exercise ID")
     reps: Optional[int] = Field(None, description="Number of repetitions")
-    weight: Optional[Decimal] = Field(None, description="Weight used")
+    weight: Optional[float] = Field(None, description="Weight used in user's preferred unit")
     duration: Optional[int] = Field(None, description="Duration in seconds")
-    distance: Optional[Decimal] = Field(None, description="Distance covered")
+    distance: Optional[float] = Field(None, description="Distance covered in meters")
     completed: bool = Field(..., description="Completion status")
     rest_time: Optional[int] = Field(None, description="Rest time in seconds")
     notes: Optional[str] = Field(None, description="Set notes")
     order_index: int = Field(..., description="Set order within exercise")
     completed_at: datetime = Field(..., description="Set completion timestamp")
     created_at: datetime = Field(..., description="Set creation timestamp")
+    version: int = Field(1, description="Row version, incremented on every update (send as If-Match)")
     
     class Config:
         from_attributes = True
         json_encoders = {
-            datetime: lambda v: v.isoformat() if v else None,
-            Decimal: lambda v: float(v) if v is not None else None
+            datetime: lambda v: v.isoformat() if v else None
+        }
+
+
+class LastPerformanceSet(BaseModel):
+    """One completed set from the most recent session of an exercise."""
+    reps: Optional[int] = Field(None, description="Number of repetitions")
+    weight: Optional[float] = Field(None, description="Weight used in user's preferred unit")
+    duration: Optional[int] = Field(None, description="Duration in seconds")
+    distance: Optional[float] = Field(None, description="Distance covered in meters")
+    rest_time: Optional[int] = Field(None, description="Rest time in seconds")
+
+
+class LastPerformanceResponse(BaseModel):
+    """Most recent completed sets of an exercise for the authenticated user."""
+    exercise_id: UUID = Field(..., description="Exercise ID")
+    workout_id: UUID = Field(..., description="Workout the sets were performed in")
+    performed_at: datetime = Field(..., description="Start time of that workout")
+    sets: List[LastPerformanceSet] = Field(..., description="Completed sets in order")
+    
+    class Config:
+        from_attributes = True
+        json_encoders = {
+            datetime: lambda v: v.isoformat() if v else None
         }
 
 
@@ -130,6 +209,8 @@ class WorkoutExerciseResponse(BaseModel):
     order_index: int = Field(..., description="Exercise order in workout")
     notes: Optional[str] = Field(None, description="Exercise notes")
     created_at: datetime = Field(..., description="Creation timestamp")
+    version: int = Field(1, description="Row version, incremented on every update")
+    last_performance: Optional[LastPerformanceResponse] = Field(None, description="Most recent completed sets (only when requested)")
     
     class Config:
         from_attributes = True
@@ -159,6 +240,7 @@ class WorkoutExerciseWithDetails(BaseModel):
     order_index: int = Field(..., description="Exercise order in workout")
     notes: Optional[str] = Field(None, description="Exercise notes")
     created_at: datetime = Field(..., description="Creation timestamp")
+    version: int = Field(1, description="Row version, incremented on every update")
     exercise_details: ExerciseDetails = Field(..., description="Full exercise information")
     sets: List[SetResponse] = Field(..., description="All sets for this exercise")
     
@@ -180,6 +262,7 @@ class WorkoutResponse(BaseModel):
     is_active: bool = Field(..., description="Whether workout is active")
     created_at: datetime = Field(..., description="Creation timestamp")
     updated_at: datetime = Field(..., description="Last update timestamp")
+    version: int = Field(1, description="Row version, incremented on every update (send as If-Match)")
     
     class Config:
         from_attributes = True
@@ -199,6 +282,7 @@ class WorkoutWithExercisesResponse(BaseModel):
     is_active: bool = Field(..., description="Whether workout is active")
     created_at: datetime = Field(..., description="Creation timestamp")
     updated_at: datetime = Field(..., description="Last update timestamp")
+    version: int = Field(1, description="Row version, incremented on every update (send as If-Match)")
     exercises: List[WorkoutExerciseWithDetails] = Field(..., description="Workout exercises with sets")
     
     class Config:
@@ -230,6 +314,24 @@ class WorkoutStatsResponse(BaseModel):
         from_attributes = True
 
 
+class StaleWorkoutCloseReport(BaseModel):
+    """Outcome of one stale workout closer run."""
+    idle_before: datetime = Field(..., description="Workouts idle since before this time were closed")
+    closed: int = Field(..., description="Workouts closed")
+    users: int = Field(..., description="Distinct users affected")
+    batches: int = Field(..., description="Batches executed")
+    more_pending: bool = Field(..., description="Whether the batch limit stopped the run before all stale workouts were closed")
+
+
+class ColdWorkoutArchiveReport(BaseModel):
+    """Outcome of one cold workout archive run."""
+    started_before: datetime = Field(..., description="Finished workouts started before this time were archived")
+    archived: int = Field(..., description="Workouts archived")
+    users: int = Field(..., description="Distinct users affected")
+    batches: int = Field(..., description="Batches executed")
+    more_pending: bool = Field(..., description="Whether the batch limit stopped the run before all cold workouts were archived")
+
+
 class WorkoutErrorResponse(BaseModel):
     """Standard error response model for workout endpoints."""
     detail: str = Field(..., description="Error message")
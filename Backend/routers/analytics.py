@@ -0,0 +1,265 @@
+"""
+Analytics Router - Training Analytics
+
+FastAPI router implementing user-level analytics endpoints:
+- GET /analytics/load - Get daily training load, ACWR, monotony, strain and weekly volume
+- GET /analytics/body-parts - Get training volume per body part over a date range
+- GET /analytics/streaks - Get current and longest training streaks
+- GET /analytics/heatmap - Get completed workouts per day for a year
+- GET /analytics/frequency - Get training days and workouts per week
+
+Per-exercise progression lives under /exercises/{exercise_id}/progression.
+Volume responses are computed with vectorized NumPy windows and cached per
+user until the user's next workout write. Calendar responses are answered
+from an in-memory per-user day bitmap in the user's time zone.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Any, Optional
+import logging
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.security import HTTPBearer
+
+from services.auth_service import get_current_user
+from services.analytics_service import AnalyticsService
+from services.activity_service import ActivityService
+from services.unit_service import get_weight_unit
+from models.auth import WeightUnit
+from models.analytics import (
+    TrainingLoadResponse,
+    BodyPartVolumeResponse,
+    StreakResponse,
+    HeatmapResponse,
+    WeeklyFrequencyResponse
+)
+from models.workout import WorkoutErrorResponse
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Router configuration
+router = APIRouter(
+    prefix="/analytics",
+    tags=["analytics"],
+    responses={
+        401: {"model": WorkoutErrorResponse, "description": "Authentication required"},
+        422: {"model": WorkoutErrorResponse, "description": "Validation error"},
+        500: {"model": WorkoutErrorResponse, "description": "Internal server error"}
+    }
+)
+
+# Security scheme for Swagger documentation
+security = HTTPBearer()
+
+# Initialize service
+analytics_service = AnalyticsService()
+activity_service = ActivityService()
+
+
+@router.get("/load", response_model=TrainingLoadResponse, status_code=200)
+async def get_training_load(
+    days: int = Query(28, ge=7, le=365, description="Number of trailing days to return"),
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    weight_unit: WeightUnit = Depends(get_weight_unit)
+) -> TrainingLoadResponse:
+    """
+    Get training load for authenticated user.
+
+    Returns one entry per day (UTC) for daily volume, acute (7-day) and
+    chronic (28-day) load, their ratio, monotony and strain, plus weekly
+    volume totals.
+
+    Args:
+        days: Number of trailing days to return (7-365)
+        current_user: Current user data from JWT (injected by dependency)
+        weight_unit: User's preferred weight unit (injected by dependency)
+
+    Returns:
+        Columnar training load series
+
+    Raises:
+        HTTPException: 401 for invalid JWT, 422 for invalid days, 500 for server errors
+    """
+    try:
+        return analytics_service.get_training_load(
+            user_id=UUID(current_user["id"]),
+            days=days,
+            weight_unit=weight_unit
+        )
+
+    except HTTPException:
+        # Re-raise HTTP exceptions from services
+        raise
+    except Exception as e:
+        logger.error(f"Training load retrieval failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Training load retrieval failed"
+        )
+
+
+@router.get("/body-parts", response_model=BodyPartVolumeResponse, status_code=200)
+async def get_body_part_volume(
+    start_date: Optional[date] = Query(None, description="First day of the range (defaults to 29 days before end_date)"),
+    end_date: Optional[date] = Query(None, description="Last day of the range, inclusive (defaults to today, UTC)"),
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    weight_unit: WeightUnit = Depends(get_weight_unit)
+) -> BodyPartVolumeResponse:
+    """
+    Get training volume per body part for authenticated user.
+
+    Each completed set's volume (weight x reps) is split evenly across the
+    body parts its exercise targets.
+
+    Args:
+        start_date: First day of the range
+        end_date: Last day of the range (inclusive)
+        current_user: Current user data from JWT (injected by dependency)
+        weight_unit: User's preferred weight unit (injected by dependency)
+
+    Returns:
+        Volume, fractional set counts and share per body part
+
+    Raises:
+        HTTPException: 400 if start_date is after end_date, 401 for invalid JWT, 500 for server errors
+    """
+    try:
+        end_date = end_date or datetime.now(timezone.utc).date()
+        start_date = start_date or end_date - timedelta(days=29)
+
+        return analytics_service.get_body_part_volume(
+            user_id=UUID(current_user["id"]),
+            start_date=start_date,
+            end_date=end_date,
+            weight_unit=weight_unit
+        )
+
+    except HTTPException:
+        # Re-raise HTTP exceptions from services
+        raise
+    except Exception as e:
+        logger.error(f"Body part volume retrieval failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Body part volume retrieval failed"
+        )
+
+
+@router.get("/streaks", response_model=StreakResponse, status_code=200)
+async def get_streaks(
+    current_user: Dict[str, Any] = Depends(get_current_user)
+) -> StreakResponse:
+    """
+    Get training streaks for authenticated user.
+
+    A training day is a local calendar day (per the user's timezone
+    preference) with at least one completed workout.
+
+    Args:
+        current_user: Current user data from JWT (injected by dependency)
+
+    Returns:
+        Current and longest streak plus this month's training days
+
+    Raises:
+        HTTPException: 401 for invalid JWT, 500 for server errors
+    """
+    try:
+        return activity_service.get_streaks(user_id=UUID(current_user["id"]))
+
+    except HTTPException:
+        # Re-raise HTTP exceptions from services
+        raise
+    except Exception as e:
+        logger.error(f"Streak retrieval failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Streak retrieval failed"
+        )
+
+
+@router.get("/heatmap", response_model=HeatmapResponse, status_code=200)
+async def get_heatmap(
+    year: Optional[int] = Query(None, ge=2000, le=2100, description="Calendar year (defaults to the current year)"),
+    current_user: Dict[str, Any] = Depends(get_current_user)
+) -> HeatmapResponse:
+    """
+    Get completed workouts per day for a calendar year.
+
+    Args:
+        year: Calendar year (defaults to the current year in the user's time zone)
+        current_user: Current user data from JWT (injected by dependency)
+
+    Returns:
+        One workout count per day of the year
+
+    Raises:
+        HTTPException: 401 for invalid JWT, 422 for invalid year, 500 for server errors
+    """
+    try:
+        return activity_service.get_heatmap(
+            user_id=UUID(current_user["id"]),
+            year=year
+        )
+
+    except HTTPException:
+        # Re-raise HTTP exceptions from services
+        raise
+    except Exception as e:
+        logger.error(f"Heatmap retrieval failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Heatmap retrieval failed"
+        )
+
+
+@router.get("/frequency", response_model=WeeklyFrequencyResponse, status_code=200)
+async def get_weekly_frequency(
+    weeks: int = Query(12, ge=1, le=104, description="Number of weeks ending with the current week"),
+    current_user: Dict[str, Any] = Depends(get_current_user)
+) -> WeeklyFrequencyResponse:
+    """
+    Get training days and workouts per week for authenticated user.
+
+    Args:
+        weeks: Number of weeks ending with the current week (1-104)
+        current_user: Current user data from JWT (injected by dependency)
+
+    Returns:
+        Per-week training days and workout counts, oldest first
+
+    Raises:
+        HTTPException: 401 for invalid JWT, 422 for invalid weeks, 500 for server errors
+    """
+    try:
+        return activity_service.get_weekly_frequency(
+            user_id=UUID(current_user["id"]),
+            weeks=weeks
+        )
+
+    except HTTPException:
+        # Re-raise HTTP exceptions from services
+        raise
+    except Exception as e:
+        logger.error(f"Weekly frequency retrieval failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Frequency retrieval failed"
+        )
+
+
+@router.get("/health")
+async def analytics_health_check():
+    """Health check endpoint for analytics service."""
+    return {
+        "status": "healthy",
+        "service": "analytics",
+        "endpoints": [
+            "GET /analytics/load - Get daily training load, ACWR, monotony, strain and weekly volume",
+            "GET /analytics/body-parts - Get training volume per body part over a date range",
+            "GET /analytics/streaks - Get current and longest training streaks",
+            "GET /analytics/heatmap - Get completed workouts per day for a year",
+            "GET /analytics/frequency - Get training days and workouts per week"
+        ]
+    }
@@ -4,6 +4,7 @@ Exercises Router - Phase 5.4 Exercise Library Implementation
 FastAPI router implementing exercise library endpoints:
 - GET /exercises - Retrieve exercise library with filtering and search
 - GET /exercises/{exercise_id} - Get specific exercise details
+- GET /exercises/{exercise_id}/progression - Per-session progression series for the user
 - GET /exercises/stats - Get exercise library statistics
 - GET /exercises/summaries - Get lightweight exercise summaries
 - GET /exercises/filter-options - Get available filter options
@@ -13,6 +14,7 @@ Pydantic models for request/response validation. Follows clean architecture
 patterns from Phase 5.2 and authentication patterns from Phase 5.3.
 """
 
+from datetime import date
 from typing import Dict, Any, List, Optional
 import logging
 from uuid import UUID
@@ -22,6 +24,9 @@ from fastapi.security import HTTPBearer
 # Import existing services and models
 from services.auth_service import get_current_user
 from services.exercise_service import ExerciseService
+from services.analytics_service import AnalyticsService
+from services.unit_service import get_weight_unit
+from models.auth import WeightUnit
 from models.exercise import (
     ExerciseResponse,
     ExerciseListQuery,
@@ -31,6 +36,7 @@ from models.exercise import (
     ExerciseCategory,
     ExerciseErrorResponse
 )
+from models.analytics import DownsampleMethod, ProgressionMetric, ProgressionResponse
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -50,8 +56,9 @@ router = APIRouter(
 # Security scheme for Swagger documentation
 security = HTTPBearer()
 
-# Initialize service
+# Initialize services
 exercise_service = ExerciseService()
+analytics_service = AnalyticsService()
 
 
 @router.get("/body-parts", response_model=List[Dict[str, Any]], status_code=200)
@@ -247,6 +254,62 @@ async def get_exercise_details(
         )
 
 
+@router.get("/{exercise_id}/progression", response_model=ProgressionResponse, status_code=200)
+async def get_exercise_progression(
+    exercise_id: UUID,
+    points: Optional[int] = Query(None, ge=3, le=1000, description="Maximum points to return (downsampled server-side)"),
+    method: DownsampleMethod = Query(DownsampleMethod.LTTB, description="Downsampling method: lttb or bucketed max"),
+    metric: ProgressionMetric = Query(ProgressionMetric.ESTIMATED_1RM, description="Metric whose shape LTTB preserves"),
+    since: Optional[date] = Query(None, description="Only include sessions on or after this date"),
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    weight_unit: WeightUnit = Depends(get_weight_unit)
+) -> ProgressionResponse:
+    """
+    Get the authenticated user's progression for one exercise.
+    
+    Returns per-session top set, estimated 1RM, total volume and total reps
+    as parallel arrays for charting. When ``points`` is set and the history
+    is longer, the series is downsampled on the server.
+    
+    Args:
+        exercise_id: Unique identifier for the exercise
+        points: Maximum number of points to return
+        method: Downsampling method (lttb keeps visual shape, max keeps peaks per bucket)
+        metric: Metric used to pick LTTB points
+        since: First day of sessions to include (whole history when omitted)
+        current_user: Current user data from JWT (injected by dependency)
+        weight_unit: User's preferred weight unit (injected by dependency)
+        
+    Returns:
+        Columnar progression series
+        
+    Raises:
+        HTTPException: 401 for invalid JWT, 422 for validation errors, 500 for server errors
+    """
+    try:
+        logger.debug(f"Exercise progression request: {exercise_id} from user {current_user['id']}")
+        
+        return analytics_service.get_exercise_progression(
+            user_id=UUID(current_user["id"]),
+            exercise_id=exercise_id,
+            points=points,
+            method=method,
+            metric=metric,
+            since=since,
+            weight_unit=weight_unit
+        )
+        
+    except HTTPException:
+        # Re-raise HTTP exceptions from services
+        raise
+    except Exception as e:
+        logger.error(f"Exercise progression retrieval failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Exercise progression retrieval failed"
+        )
+
+
 @router.get("/stats", response_model=ExerciseStatsResponse, status_code=200)
 async def get_exercise_stats(
     current_user: Dict[str, Any] = Depends(get_current_user)
@@ -418,6 +481,7 @@ async def exercise_health_check():
         "endpoints": [
             "GET /exercises - Retrieve exercise library with filtering and search",
             "GET /exercises/{exercise_id} - Get specific exercise details",
+            "GET /exercises/{exercise_id}/progression - Per-session progression series for the user",
             "GET /exercises/stats - Get exercise library statistics",
             "GET /exercises/summaries - Get lightweight exercise summaries",
             "GET /exercises/filter-options - Get available filter options",
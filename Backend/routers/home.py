@@ -0,0 +1,135 @@
+"""
+Home Router - Dashboard Aggregate
+
+FastAPI router implementing the home screen endpoint:
+- GET /home - Get profile, active workout, stats and recent workouts in one call
+
+The app previously issued five requests on launch, each verifying the JWT
+and querying the database separately. This endpoint verifies the token once
+and runs the independent service calls concurrently in worker threads (the
+Supabase client is synchronous), so latency is that of the slowest query
+rather than the sum. The active workout is loaded after the profile, in the
+profile's weight unit, alongside the other calls.
+"""
+
+import asyncio
+from typing import Dict, Any, Optional, Tuple
+import logging
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.security import HTTPBearer
+
+from services.auth_service import AuthService, get_current_user
+from services.workout_service import WorkoutService
+from services.unit_service import get_weight_unit_cache
+from services.session_buffer_service import get_session_buffer
+from models.auth import UserResponse
+from models.home import HomeResponse
+from models.workout import WorkoutListQuery, WorkoutErrorResponse, WorkoutWithExercisesResponse
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Router configuration
+router = APIRouter(
+    prefix="/home",
+    tags=["home"],
+    responses={
+        401: {"model": WorkoutErrorResponse, "description": "Authentication required"},
+        404: {"model": WorkoutErrorResponse, "description": "User profile not found"},
+        500: {"model": WorkoutErrorResponse, "description": "Internal server error"}
+    }
+)
+
+# Security scheme for Swagger documentation
+security = HTTPBearer()
+
+# Initialize services
+auth_service = AuthService()
+workout_service = WorkoutService()
+
+
+def _get_profile(user_id: UUID) -> UserResponse:
+    """Load the user's profile as the same payload as GET /users/profile."""
+    user_profile = auth_service.get_user_profile_by_id(user_id)
+    return UserResponse(
+        id=user_profile.id,
+        email=user_profile.email,
+        display_name=user_profile.display_name,
+        preferences=user_profile.preferences,
+        created_at=user_profile.created_at,
+        updated_at=user_profile.updated_at
+    )
+
+
+def _get_profile_and_active_workout(user_id: UUID) -> Tuple[UserResponse, Optional[WorkoutWithExercisesResponse]]:
+    """
+    Load the profile, then the active workout in the profile's weight unit.
+
+    The profile already carries the unit, so no separate preferences read
+    precedes the gathered calls; the unit cache is refreshed from it.
+    """
+    profile = _get_profile(user_id)
+    weight_unit = profile.preferences.weightUnit
+    get_weight_unit_cache().put(user_id, weight_unit)
+    return profile, get_session_buffer().get_active_workout(workout_service, user_id, weight_unit)
+
+
+@router.get("", response_model=HomeResponse, status_code=200)
+async def get_home(
+    limit: int = Query(10, ge=1, le=100, description="Number of recent workouts to include"),
+    current_user: Dict[str, Any] = Depends(get_current_user)
+) -> HomeResponse:
+    """
+    Get everything the home screen needs for authenticated user.
+
+    Combines GET /users/profile, the active workout with details,
+    GET /workouts/stats and the first page of GET /workouts.
+
+    Args:
+        limit: Number of recent workouts to include (1-100)
+        current_user: Current user data from JWT (injected by dependency)
+
+    Returns:
+        Aggregate home screen payload
+
+    Raises:
+        HTTPException: 401 for invalid JWT, 404 if profile not found, 500 for server errors
+    """
+    try:
+        user_id = UUID(current_user["id"])
+
+        (profile, active_workout), stats, recent_workouts = await asyncio.gather(
+            asyncio.to_thread(_get_profile_and_active_workout, user_id),
+            asyncio.to_thread(workout_service.get_workout_stats, user_id),
+            asyncio.to_thread(workout_service.get_user_workouts, user_id, WorkoutListQuery(limit=limit))
+        )
+
+        return HomeResponse(
+            profile=profile,
+            active_workout=active_workout,
+            stats=stats,
+            recent_workouts=recent_workouts
+        )
+
+    except HTTPException:
+        # Re-raise HTTP exceptions from services
+        raise
+    except Exception as e:
+        logger.error(f"Home screen retrieval failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Home screen retrieval failed"
+        )
+
+
+@router.get("/health")
+async def home_health_check():
+    """Health check endpoint for home service."""
+    return {
+        "status": "healthy",
+        "service": "home",
+        "endpoints": [
+            "GET /home - Get profile, active workout, stats and recent workouts in one call"
+        ]
+    }
@@ -0,0 +1,132 @@
+"""
+Records Router - Personal Records
+
+FastAPI router implementing personal record endpoints:
+- GET /records - Get all personal records grouped by exercise
+- GET /records/{exercise_id} - Get personal records for one exercise
+
+Records are maintained incrementally by WorkoutService on set writes, so
+these endpoints are keyed lookups and never scan the user's sets.
+"""
+
+from typing import Dict, Any, List, Optional
+import logging
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.security import HTTPBearer
+
+from services.auth_service import get_current_user
+from services.record_service import RecordService
+from services.unit_service import get_weight_unit
+from models.auth import WeightUnit
+from models.record import RecordType, ExerciseRecordsResponse
+from models.workout import WorkoutErrorResponse
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Router configuration
+router = APIRouter(
+    prefix="/records",
+    tags=["records"],
+    responses={
+        401: {"model": WorkoutErrorResponse, "description": "Authentication required"},
+        422: {"model": WorkoutErrorResponse, "description": "Validation error"},
+        500: {"model": WorkoutErrorResponse, "description": "Internal server error"}
+    }
+)
+
+# Security scheme for Swagger documentation
+security = HTTPBearer()
+
+# Initialize service
+record_service = RecordService()
+
+
+@router.get("", response_model=List[ExerciseRecordsResponse], status_code=200)
+async def get_user_records(
+    record_type: Optional[RecordType] = Query(None, description="Filter by record type"),
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    weight_unit: WeightUnit = Depends(get_weight_unit)
+) -> List[ExerciseRecordsResponse]:
+    """
+    Get all personal records for authenticated user.
+
+    Args:
+        record_type: Optional filter by record type
+        current_user: Current user data from JWT (injected by dependency)
+        weight_unit: User's preferred weight unit (injected by dependency)
+
+    Returns:
+        Personal records grouped by exercise
+
+    Raises:
+        HTTPException: 401 for invalid JWT, 422 for invalid record type, 500 for server errors
+    """
+    try:
+        return record_service.get_user_records(
+            user_id=UUID(current_user["id"]),
+            record_type=record_type,
+            weight_unit=weight_unit
+        )
+
+    except HTTPException:
+        # Re-raise HTTP exceptions from services
+        raise
+    except Exception as e:
+        logger.error(f"Personal record retrieval failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Record retrieval failed"
+        )
+
+
+@router.get("/health")
+async def record_health_check():
+    """Health check endpoint for record service."""
+    return {
+        "status": "healthy",
+        "service": "records",
+        "endpoints": [
+            "GET /records - Get all personal records grouped by exercise",
+            "GET /records/{exercise_id} - Get personal records for one exercise"
+        ]
+    }
+
+
+@router.get("/{exercise_id}", response_model=ExerciseRecordsResponse, status_code=200)
+async def get_exercise_records(
+    exercise_id: UUID,
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    weight_unit: WeightUnit = Depends(get_weight_unit)
+) -> ExerciseRecordsResponse:
+    """
+    Get personal records for one exercise.
+
+    Args:
+        exercise_id: Unique identifier for the exercise
+        current_user: Current user data from JWT (injected by dependency)
+        weight_unit: User's preferred weight unit (injected by dependency)
+
+    Returns:
+        Records for the exercise (empty list if none yet)
+
+    Raises:
+        HTTPException: 401 for invalid JWT, 500 for server errors
+    """
+    try:
+        return record_service.get_exercise_records(
+            user_id=UUID(current_user["id"]),
+            exercise_id=exercise_id,
+            weight_unit=weight_unit
+        )
+
+    except HTTPException:
+        # Re-raise HTTP exceptions from services
+        raise
+    except Exception as e:
+        logger.error(f"Exercise record retrieval failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Record retrieval failed"
+        )
@@ -0,0 +1,231 @@
+"""
+Templates Router - Workout Template Management
+
+FastAPI router implementing workout template endpoints:
+- POST /templates - Create template with exercises and targets
+- GET /templates - Get all templates for authenticated user
+- GET /templates/{template_id} - Get template with exercises
+- DELETE /templates/{template_id} - Delete template
+
+Workouts are started from a template with POST /workouts/from-template/{template_id}
+in the workouts router. Mutating endpoints accept an optional Idempotency-Key header.
+"""
+
+from typing import Dict, Any, List
+import logging
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPBearer
+
+from services.auth_service import get_current_user
+from services.template_service import TemplateService
+from services.unit_service import get_weight_unit, get_write_weight_unit
+from services.idempotency_service import IdempotencyGuard, idempotency_guard
+from models.auth import WeightUnit
+from models.template import CreateTemplateRequest, TemplateResponse
+from models.workout import WorkoutErrorResponse
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Router configuration
+router = APIRouter(
+    prefix="/templates",
+    tags=["templates"],
+    responses={
+        401: {"model": WorkoutErrorResponse, "description": "Authentication required"},
+        404: {"model": WorkoutErrorResponse, "description": "Template not found"},
+        422: {"model": WorkoutErrorResponse, "description": "Validation error"},
+        500: {"model": WorkoutErrorResponse, "description": "Internal server error"}
+    }
+)
+
+# Security scheme for Swagger documentation
+security = HTTPBearer()
+
+# Initialize service
+template_service = TemplateService()
+
+
+@router.post("", response_model=TemplateResponse, status_code=201)
+async def create_template(
+    template_data: CreateTemplateRequest,
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    weight_unit: WeightUnit = Depends(get_write_weight_unit),
+    idempotency: IdempotencyGuard = Depends(idempotency_guard)
+) -> TemplateResponse:
+    """
+    Create workout template for authenticated user.
+
+    Stores the template and all of its exercises with their target sets,
+    reps and weight in a single transaction.
+
+    Args:
+        template_data: Template creation data
+        current_user: Current user data from JWT (injected by dependency)
+        weight_unit: User's weight unit, read fresh for the incoming weights (injected by dependency)
+
+    Returns:
+        Created template with exercises
+
+    Raises:
+        HTTPException: 401 for invalid JWT, 400 if an exercise is not found,
+            422 for validation errors, 500 for server errors
+    """
+    if idempotency.replay_response is not None:
+        return idempotency.replay_response
+
+    try:
+        logger.info(f"Creating template '{template_data.title}' for user {current_user['id']}")
+
+        template = template_service.create_template(
+            user_id=UUID(current_user["id"]),
+            template_data=template_data,
+            weight_unit=weight_unit
+        )
+
+        idempotency.store(201, template)
+        return template
+
+    except HTTPException:
+        # Re-raise HTTP exceptions from services
+        raise
+    except Exception as e:
+        logger.error(f"Template creation failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Template creation failed"
+        )
+
+
+@router.get("", response_model=List[TemplateResponse], status_code=200)
+async def get_user_templates(
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    weight_unit: WeightUnit = Depends(get_weight_unit)
+) -> List[TemplateResponse]:
+    """
+    Get all workout templates for authenticated user.
+
+    Args:
+        current_user: Current user data from JWT (injected by dependency)
+        weight_unit: User's preferred weight unit (injected by dependency)
+
+    Returns:
+        User's templates with exercises, most recently updated first
+
+    Raises:
+        HTTPException: 401 for invalid JWT, 500 for server errors
+    """
+    try:
+        templates = template_service.get_user_templates(
+            user_id=UUID(current_user["id"]),
+            weight_unit=weight_unit
+        )
+
+        logger.debug(f"Retrieved {len(templates)} templates for user {current_user['id']}")
+        return templates
+
+    except HTTPException:
+        # Re-raise HTTP exceptions from services
+        raise
+    except Exception as e:
+        logger.error(f"Template retrieval failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Template retrieval failed"
+        )
+
+
+@router.get("/health")
+async def template_health_check():
+    """Health check endpoint for template service."""
+    return {
+        "status": "healthy",
+        "service": "templates",
+        "endpoints": [
+            "POST /templates - Create template with exercises and targets",
+            "GET /templates - Get all templates for authenticated user",
+            "GET /templates/{template_id} - Get template with exercises",
+            "DELETE /templates/{template_id} - Delete template"
+        ]
+    }
+
+
+@router.get("/{template_id}", response_model=TemplateResponse, status_code=200)
+async def get_template(
+    template_id: UUID,
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    weight_unit: WeightUnit = Depends(get_weight_unit)
+) -> TemplateResponse:
+    """
+    Get workout template with its exercises.
+
+    Args:
+        template_id: Unique identifier for the template
+        current_user: Current user data from JWT (injected by dependency)
+        weight_unit: User's preferred weight unit (injected by dependency)
+
+    Returns:
+        Template with exercises in order
+
+    Raises:
+        HTTPException: 401 for invalid JWT, 404 if template not found, 500 for server errors
+    """
+    try:
+        return template_service.get_template(
+            user_id=UUID(current_user["id"]),
+            template_id=template_id,
+            weight_unit=weight_unit
+        )
+
+    except HTTPException:
+        # Re-raise HTTP exceptions from services
+        raise
+    except Exception as e:
+        logger.error(f"Template retrieval failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Template retrieval failed"
+        )
+
+
+@router.delete("/{template_id}", status_code=204)
+async def delete_template(
+    template_id: UUID,
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    idempotency: IdempotencyGuard = Depends(idempotency_guard)
+):
+    """
+    Delete workout template.
+
+    Workouts previously started from the template are not affected.
+
+    Args:
+        template_id: Unique identifier for the template
+        current_user: Current user data from JWT (injected by dependency)
+
+    Raises:
+        HTTPException: 401 for invalid JWT, 404 if template not found, 500 for server errors
+    """
+    if idempotency.replay_response is not None:
+        return idempotency.replay_response
+
+    try:
+        logger.info(f"Deleting template {template_id} for user {current_user['id']}")
+
+        template_service.delete_template(
+            user_id=UUID(current_user["id"]),
+            template_id=template_id
+        )
+
+        idempotency.store(204)
+
+    except HTTPException:
+        # Re-raise HTTP exceptions from services
+        raise
+    except Exception as e:
+        logger.error(f"Template deletion failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Template deletion failed"
+        )
@@ -18,6 +18,8 @@ from fastapi.security import HTTPBearer
 
 # Import existing services and models - no new files needed
 from services.auth_service import AuthService, get_current_user
+from services.activity_service import get_activity_calendar_registry
+from services.unit_service import get_weight_unit_cache
 from models.auth import UserResponse, AuthErrorResponse
 from models.user import UpdateUserRequest
 
@@ -159,6 +161,11 @@ async def update_user_profile(
                 detail="User profile not found"
             )
         
+        if update_data.preferences is not None:
+            # Calendar days depend on the timezone preference; rebuild on next read
+            get_activity_calendar_registry().invalidate(user_id)
+            get_weight_unit_cache().invalidate(user_id)
+        
         # Convert to UserResponse using existing model
         user_response = UserResponse(
             id=updated_profile.id,
@@ -3,11 +3,19 @@ Workouts Router - Phase 5.4 TDD Implementation
 
 FastAPI router implementing workout and exercise management endpoints:
 - POST /workouts - Create new workout session
+- POST /workouts/from-template/{template_id} - Start workout from a stored template
 - GET /workouts - Get all workouts for authenticated user
+- GET /workouts/last-performance - Most recent completed sets for many exercises
+- GET /workouts/active - Get the active workout with exercises and sets
 - GET /workouts/{workout_id} - Get workout details with exercises and sets
+- WS /workouts/{workout_id}/live - Workout snapshot followed by live changes
 - PUT /workouts/{workout_id} - Update workout (complete session)
 - DELETE /workouts/{workout_id} - Delete workout
+- POST /workouts/{workout_id}/clone - Repeat a past workout as a new session
 - POST /workouts/{workout_id}/exercises - Add exercise to workout
+- POST /workouts/{workout_id}/exercises/bulk - Add many exercises in one transaction
+- PUT /workouts/{workout_id}/exercises/order - Reorder all exercises in a workout
+- PUT /workouts/{workout_id}/exercises/{exercise_id}/position - Move one exercise
 - POST /workouts/{workout_id}/exercises/{exercise_id}/sets - Add set to exercise
 - PUT /sets/{set_id} - Update set
 - DELETE /sets/{set_id} - Delete set
@@ -16,31 +24,59 @@ FastAPI router implementing workout and exercise management endpoints:
 Integrates with existing services layer (WorkoutService) and uses established
 Pydantic models for request/response validation. Follows clean architecture
 patterns from Phase 5.2 and authentication patterns from Phase 5.3.
+
+All POST/PUT/DELETE endpoints accept an optional Idempotency-Key header; the
+first successful response is stored and replayed for retries with the same key.
+PUT /workouts/{workout_id} and PUT /sets/{set_id} also accept If-Match with
+the resource's version and answer 409 if it changed in the meantime. Updates
+to one set without If-Match can be merged into a single write
+(set_write_coalesce_window_ms), and
+in active-session mode set writes for the active workout are acknowledged from
+a local journal and flushed in batches (session_buffer_enabled).
+
+Devices following a workout can open the live WebSocket instead of polling
+GET /workouts/{workout_id}: it sends the workout once, then each set and
+exercise change as it is written (live_hub_backend fans changes out across
+workers).
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+import asyncio
 import logging
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query, WebSocket, WebSocketDisconnect
 from fastapi.security import HTTPBearer
 
 # Import existing services and models - no new files needed
 from services.auth_service import get_current_user
 from services.workout_service import WorkoutService
+from services.unit_service import get_weight_unit, resolve_weight_unit, resolve_write_weight_unit
+from services.concurrency_service import ETAG_HEADER, format_etag, if_match_version
+from services.set_coalescing_service import get_set_write_coalescer
+from services.session_buffer_service import get_session_buffer
+from services.live_session_service import get_live_hub, LiveWorkoutView
+from services.idempotency_service import IdempotencyGuard, idempotency_guard
 from models.workout import (
     CreateWorkoutRequest,
     UpdateWorkoutRequest,
     WorkoutExerciseRequest,
+    BulkAddExercisesRequest,
+    ReorderExercisesRequest,
+    MoveExerciseRequest,
+    CloneWorkoutRequest,
     CreateSetRequest,
     UpdateSetRequest,
     WorkoutResponse,
     WorkoutWithExercisesResponse,
     WorkoutExerciseResponse,
+    LastPerformanceResponse,
     SetResponse,
     WorkoutListQuery,
     WorkoutStatsResponse,
     WorkoutErrorResponse
 )
+from models.auth import WeightUnit
+from models.template import CreateWorkoutFromTemplateRequest
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -65,10 +101,17 @@ security = HTTPBearer()
 workout_service = WorkoutService()
 
 
+def _flush_buffered_writes(user_id: str) -> None:
+    """Write coalesced and session-buffered set edits before another change to the user's workouts."""
+    get_set_write_coalescer().flush_user(user_id)
+    get_session_buffer().close_user(user_id)
+
+
 @router.post("", response_model=WorkoutResponse, status_code=201)
 async def create_workout(
     workout_data: CreateWorkoutRequest,
-    current_user: Dict[str, Any] = Depends(get_current_user)
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    idempotency: IdempotencyGuard = Depends(idempotency_guard)
 ) -> WorkoutResponse:
     """
     Create new workout session for authenticated user.
@@ -84,8 +127,11 @@ async def create_workout(
         WorkoutResponse with created workout details
         
     Raises:
-        HTTPException: 401 for invalid/missing JWT, 422 for validation errors, 500 for server errors
+        HTTPException: 401 for invalid/missing JWT, 409 if a workout is already active, 422 for validation errors, 500 for server errors
     """
+    if idempotency.replay_response is not None:
+        return idempotency.replay_response
+
     try:
         logger.info(f"Creating workout '{workout_data.title}' for user {current_user['id']}")
         
@@ -97,6 +143,7 @@ async def create_workout(
         )
         
         logger.info(f"Workout created successfully: {workout_response.id}")
+        idempotency.store(201, workout_response)
         return workout_response
         
     except HTTPException:
@@ -110,6 +157,61 @@ async def create_workout(
         )
 
 
+@router.post("/from-template/{template_id}", response_model=WorkoutWithExercisesResponse, status_code=201)
+async def create_workout_from_template(
+    template_id: UUID,
+    overrides: Optional[CreateWorkoutFromTemplateRequest] = None,
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    weight_unit: WeightUnit = Depends(get_weight_unit),
+    idempotency: IdempotencyGuard = Depends(idempotency_guard)
+) -> WorkoutWithExercisesResponse:
+    """
+    Start a new workout session from a stored template.
+    
+    Creates the workout, its exercises and the planned sets from the template's
+    targets in a single transaction, replacing one request per exercise and set.
+    
+    Args:
+        template_id: Unique identifier for the template
+        overrides: Optional title and start time for the new workout
+        current_user: Current user data from JWT (injected by dependency)
+        weight_unit: User's preferred weight unit (injected by dependency)
+        
+    Returns:
+        Created workout with exercises and planned sets
+        
+    Raises:
+        HTTPException: 401 for invalid JWT, 404 if template not found, 422 for validation errors,
+            500 for server errors
+    """
+    if idempotency.replay_response is not None:
+        return idempotency.replay_response
+
+    try:
+        logger.info(f"Creating workout from template {template_id} for user {current_user['id']}")
+        
+        workout_details = workout_service.create_workout_from_template(
+            user_id=UUID(current_user["id"]),
+            template_id=template_id,
+            overrides=overrides,
+            weight_unit=weight_unit
+        )
+        
+        logger.info(f"Workout created from template successfully: {workout_details.id}")
+        idempotency.store(201, workout_details)
+        return workout_details
+        
+    except HTTPException:
+        # Re-raise HTTP exceptions from services
+        raise
+    except Exception as e:
+        logger.error(f"Workout creation from template failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Workout creation failed"
+        )
+
+
 @router.get("", response_model=List[WorkoutResponse], status_code=200)
 async def get_user_workouts(
     is_active: bool = Query(None, description="Filter by active status"),
@@ -165,10 +267,95 @@ async def get_user_workouts(
         )
 
 
+@router.get("/last-performance", response_model=List[LastPerformanceResponse], status_code=200)
+async def get_last_performance(
+    exercise_ids: List[UUID] = Query(..., min_length=1, max_length=100, description="Exercise IDs to look up"),
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    weight_unit: WeightUnit = Depends(get_weight_unit)
+) -> List[LastPerformanceResponse]:
+    """
+    Get the most recent completed sets for many exercises in one request.
+    
+    Backs "last time: 3x8 @ 80kg" hints when building a workout. Exercises the
+    user has never completed a set for are omitted from the result.
+    
+    Args:
+        exercise_ids: Exercise IDs to look up (repeat the query parameter, max 100)
+        current_user: Current user data from JWT (injected by dependency)
+        weight_unit: User's preferred weight unit (injected by dependency)
+        
+    Returns:
+        Last performance for each exercise with history
+        
+    Raises:
+        HTTPException: 401 for invalid JWT, 422 for validation errors, 500 for server errors
+    """
+    try:
+        return workout_service.get_last_performance(
+            user_id=UUID(current_user["id"]),
+            exercise_ids=exercise_ids,
+            weight_unit=weight_unit
+        )
+        
+    except HTTPException:
+        # Re-raise HTTP exceptions from services
+        raise
+    except Exception as e:
+        logger.error(f"Last performance retrieval failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Last performance retrieval failed"
+        )
+
+
+@router.get("/active", response_model=WorkoutWithExercisesResponse, status_code=200)
+async def get_active_workout(
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    weight_unit: WeightUnit = Depends(get_weight_unit)
+) -> WorkoutWithExercisesResponse:
+    """
+    Get the active workout with exercises and sets.
+    
+    Replaces listing /workouts?is_active=true and then fetching details. A
+    user has at most one active workout; starting another returns 409.
+    
+    Args:
+        current_user: Current user data from JWT (injected by dependency)
+        weight_unit: User's preferred weight unit (injected by dependency)
+        
+    Returns:
+        Active workout with exercises and sets
+        
+    Raises:
+        HTTPException: 401 for invalid JWT, 404 if no workout is active, 500 for server errors
+    """
+    try:
+        workout = get_session_buffer().get_active_workout(workout_service, UUID(current_user["id"]), weight_unit)
+        
+        if workout is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No active workout"
+            )
+        
+        return workout
+        
+    except HTTPException:
+        # Re-raise HTTP exceptions from services
+        raise
+    except Exception as e:
+        logger.error(f"Active workout retrieval failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Active workout retrieval failed"
+        )
+
+
 @router.get("/{workout_id}", response_model=WorkoutWithExercisesResponse, status_code=200)
 async def get_workout_details(
     workout_id: UUID,
-    current_user: Dict[str, Any] = Depends(get_current_user)
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    weight_unit: WeightUnit = Depends(get_weight_unit)
 ) -> WorkoutWithExercisesResponse:
     """
     Get workout details including exercises and sets.
@@ -179,6 +366,7 @@ async def get_workout_details(
     Args:
         workout_id: Unique identifier for the workout
         current_user: Current user data from JWT (injected by dependency)
+        weight_unit: User's preferred weight unit (injected by dependency)
         
     Returns:
         Complete workout details with exercises and sets
@@ -190,9 +378,11 @@ async def get_workout_details(
         logger.debug(f"Retrieving workout details: {workout_id} for user {current_user['id']}")
         
         # Get workout details using existing WorkoutService
-        workout_details = workout_service.get_workout_details(
+        workout_details = get_session_buffer().get_workout_details(
+            workout_service,
             user_id=UUID(current_user["id"]),
-            workout_id=workout_id
+            workout_id=workout_id,
+            weight_unit=weight_unit
         )
         
         logger.debug(f"Retrieved workout details with {len(workout_details.exercises)} exercises")
@@ -209,40 +399,131 @@ async def get_workout_details(
         )
 
 
+@router.websocket("/{workout_id}/live")
+async def live_workout(
+    websocket: WebSocket,
+    workout_id: UUID,
+    token: Optional[str] = Query(None, description="Access token for clients that cannot set headers")
+) -> None:
+    """
+    Stream a workout's changes to a connected device.
+    
+    Sends {"type": "snapshot", "data": <workout details>} once, then one
+    message per change to the workout, its exercises or their sets
+    ({"type": "set_added" | "set_updated" | ..., "workout_id",
+    "workout_exercise_id", "data"}). A {"type": "resync"} message means
+    changes were dropped and the client should reload the workout.
+    
+    Args:
+        websocket: WebSocket connection
+        workout_id: Unique identifier for the workout
+        token: Access token, used when no Authorization header is sent
+    """
+    try:
+        authorization = websocket.headers.get("authorization") or (f"Bearer {token}" if token else None)
+        current_user = get_current_user(authorization)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    user_id = UUID(current_user["id"])
+    # Subscribe before reading the snapshot so no change falls in between
+    async with get_live_hub().subscribe(user_id) as subscription:
+        try:
+            workout_details = get_session_buffer().get_workout_details(
+                workout_service,
+                user_id=user_id,
+                workout_id=workout_id,
+                weight_unit=resolve_weight_unit(user_id)
+            )
+        except HTTPException:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+        if workout_details.user_id != user_id:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+        
+        view = LiveWorkoutView(workout_id, {str(exercise.id) for exercise in workout_details.exercises})
+        await websocket.accept()
+        await websocket.send_json({"type": "snapshot", "data": workout_details.model_dump(mode="json")})
+        logger.debug(f"Live workout {workout_id} opened for user {user_id}")
+        
+        # Clients only listen; receiving is how a disconnect is noticed
+        receiver = asyncio.ensure_future(websocket.receive_text())
+        next_event = asyncio.ensure_future(subscription.get())
+        try:
+            while True:
+                done, _ = await asyncio.wait({receiver, next_event}, return_when=asyncio.FIRST_COMPLETED)
+                if receiver in done:
+                    receiver.result()
+                    receiver = asyncio.ensure_future(websocket.receive_text())
+                if next_event in done:
+                    event = next_event.result()
+                    next_event = asyncio.ensure_future(subscription.get())
+                    if view.accepts(event):
+                        await websocket.send_json(event)
+                    if event["type"] == "workout_deleted" and event["workout_id"] == view.workout_id:
+                        await websocket.close()
+                        break
+        except WebSocketDisconnect:
+            logger.debug(f"Live workout {workout_id} closed for user {user_id}")
+        finally:
+            receiver.cancel()
+            next_event.cancel()
+
+
 @router.put("/{workout_id}", response_model=WorkoutResponse, status_code=200)
 async def update_workout(
     workout_id: UUID,
     update_data: UpdateWorkoutRequest,
-    current_user: Dict[str, Any] = Depends(get_current_user)
+    response: Response,
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    expected_version: Optional[int] = Depends(if_match_version),
+    idempotency: IdempotencyGuard = Depends(idempotency_guard)
 ) -> WorkoutResponse:
     """
     Update workout session (typically to mark as completed).
     
     Updates workout properties such as title, completion status, duration,
     and active status. Commonly used to complete active workout sessions.
+    With an If-Match header carrying the workout's version the update only
+    applies if nobody changed the workout since; the new version is returned
+    in the body and the ETag header.
     
     Args:
         workout_id: Unique identifier for the workout
         update_data: Workout update data
+        response: Outgoing response (for the ETag header)
         current_user: Current user data from JWT (injected by dependency)
+        expected_version: Version from the If-Match header (injected by dependency)
         
     Returns:
         Updated workout details
         
     Raises:
-        HTTPException: 401 for invalid JWT, 404 if workout not found, 422 for validation errors, 500 for server errors
+        HTTPException: 400 for a malformed If-Match, 401 for invalid JWT, 404 if workout not found,
+            409 if the workout was modified since that version, 422 for validation errors, 500 for server errors
     """
+    if idempotency.replay_response is not None:
+        return idempotency.replay_response
+
     try:
         logger.info(f"Updating workout: {workout_id} for user {current_user['id']}")
         
+        # Buffered set edits land before the workout changes (e.g. is completed)
+        _flush_buffered_writes(current_user["id"])
+        
         # Update workout using existing WorkoutService
         updated_workout = workout_service.update_workout(
             user_id=UUID(current_user["id"]),
             workout_id=workout_id,
-            update_data=update_data
+            update_data=update_data,
+            expected_version=expected_version
         )
         
         logger.info(f"Workout updated successfully: {workout_id}")
+        response.headers[ETAG_HEADER] = format_etag(updated_workout.version)
+        idempotency.store(200, updated_workout, headers={ETAG_HEADER: response.headers[ETAG_HEADER]})
         return updated_workout
         
     except HTTPException:
@@ -259,7 +540,8 @@ async def update_workout(
 @router.delete("/{workout_id}", status_code=204)
 async def delete_workout(
     workout_id: UUID,
-    current_user: Dict[str, Any] = Depends(get_current_user)
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    idempotency: IdempotencyGuard = Depends(idempotency_guard)
 ) -> None:
     """
     Delete workout and cascade delete related data.
@@ -277,16 +559,21 @@ async def delete_workout(
     Raises:
         HTTPException: 401 for invalid JWT, 404 if workout not found, 500 for server errors
     """
+    if idempotency.replay_response is not None:
+        return idempotency.replay_response
+
     try:
         logger.info(f"Deleting workout: {workout_id} for user {current_user['id']}")
         
-        # Delete workout using existing WorkoutService
+        # Delete workout using existing WorkoutService, after any buffered set edits
+        _flush_buffered_writes(current_user["id"])
         workout_service.delete_workout(
             user_id=UUID(current_user["id"]),
             workout_id=workout_id
         )
         
         logger.info(f"Workout deleted successfully: {workout_id}")
+        idempotency.store(204)
         
     except HTTPException:
         # Re-raise HTTP exceptions from services
@@ -299,11 +586,70 @@ async def delete_workout(
         )
 
 
+@router.post("/{workout_id}/clone", response_model=WorkoutWithExercisesResponse, status_code=201)
+async def clone_workout(
+    workout_id: UUID,
+    clone_data: Optional[CloneWorkoutRequest] = None,
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    weight_unit: WeightUnit = Depends(get_weight_unit),
+    idempotency: IdempotencyGuard = Depends(idempotency_guard)
+) -> WorkoutWithExercisesResponse:
+    """
+    Repeat a past workout as a new active session.
+    
+    Copies the workout's exercises and sets inside the database. By default
+    only the structure (exercises, reps, durations) is copied; mode
+    "with_weights" also copies the weights used last time.
+    
+    Args:
+        workout_id: Unique identifier for the workout to repeat
+        clone_data: Clone mode and optional title/start time overrides
+        current_user: Current user data from JWT (injected by dependency)
+        weight_unit: User's preferred weight unit (injected by dependency)
+        
+    Returns:
+        Created workout with exercises and planned sets
+        
+    Raises:
+        HTTPException: 401 for invalid JWT, 404 if workout not found, 422 for validation errors,
+            500 for server errors
+    """
+    if idempotency.replay_response is not None:
+        return idempotency.replay_response
+
+    try:
+        logger.info(f"Cloning workout {workout_id} for user {current_user['id']}")
+        
+        workout_details = workout_service.clone_workout(
+            user_id=UUID(current_user["id"]),
+            workout_id=workout_id,
+            clone_data=clone_data,
+            weight_unit=weight_unit
+        )
+        
+        logger.info(f"Workout cloned successfully: {workout_details.id}")
+        idempotency.store(201, workout_details)
+        return workout_details
+        
+    except HTTPException:
+        # Re-raise HTTP exceptions from services
+        raise
+    except Exception as e:
+        logger.error(f"Workout clone failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Workout clone failed"
+        )
+
+
 @router.post("/{workout_id}/exercises", response_model=WorkoutExerciseResponse, status_code=201)
 async def add_exercise_to_workout(
     workout_id: UUID,
     exercise_data: WorkoutExerciseRequest,
-    current_user: Dict[str, Any] = Depends(get_current_user)
+    include_last_performance: bool = Query(False, description="Include the most recent completed sets for this exercise"),
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    weight_unit: WeightUnit = Depends(get_weight_unit),
+    idempotency: IdempotencyGuard = Depends(idempotency_guard)
 ) -> WorkoutExerciseResponse:
     """
     Add exercise to workout with order tracking.
@@ -314,7 +660,9 @@ async def add_exercise_to_workout(
     Args:
         workout_id: Unique identifier for the workout
         exercise_data: Exercise addition data including exercise_id and order_index
+        include_last_performance: Attach the user's last completed sets for the exercise
         current_user: Current user data from JWT (injected by dependency)
+        weight_unit: User's preferred weight unit (injected by dependency)
         
     Returns:
         Created workout-exercise relationship
@@ -322,17 +670,25 @@ async def add_exercise_to_workout(
     Raises:
         HTTPException: 401 for invalid JWT, 404 if workout/exercise not found, 409 for duplicates, 500 for server errors
     """
+    if idempotency.replay_response is not None:
+        return idempotency.replay_response
+
     try:
         logger.info(f"Adding exercise {exercise_data.exercise_id} to workout {workout_id}")
         
+        _flush_buffered_writes(current_user["id"])
+        
         # Add exercise to workout using existing WorkoutService
         workout_exercise = workout_service.add_exercise_to_workout(
             user_id=UUID(current_user["id"]),
             workout_id=workout_id,
-            exercise_data=exercise_data
+            exercise_data=exercise_data,
+            include_last_performance=include_last_performance,
+            weight_unit=weight_unit
         )
         
         logger.info(f"Exercise added to workout successfully: {workout_exercise.id}")
+        idempotency.store(201, workout_exercise)
         return workout_exercise
         
     except HTTPException:
@@ -346,11 +702,172 @@ async def add_exercise_to_workout(
         )
 
 
+@router.post("/{workout_id}/exercises/bulk", response_model=List[WorkoutExerciseResponse], status_code=201)
+async def add_exercises_to_workout(
+    workout_id: UUID,
+    bulk_data: BulkAddExercisesRequest,
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    idempotency: IdempotencyGuard = Depends(idempotency_guard)
+) -> List[WorkoutExerciseResponse]:
+    """
+    Add many exercises to a workout in one transaction.
+    
+    All exercises are inserted in a single statement; if any exercise is
+    unknown or already in the workout, none are added. Exercises without an
+    explicit order_index are appended after the existing ones.
+    
+    Args:
+        workout_id: Unique identifier for the workout
+        bulk_data: Exercises to add
+        current_user: Current user data from JWT (injected by dependency)
+        
+    Returns:
+        Created workout-exercise relationships
+        
+    Raises:
+        HTTPException: 401 for invalid JWT, 400 if an exercise is not found, 404 if workout not found,
+            409 for duplicates, 500 for server errors
+    """
+    if idempotency.replay_response is not None:
+        return idempotency.replay_response
+
+    try:
+        logger.info(f"Adding {len(bulk_data.exercises)} exercises to workout {workout_id}")
+        
+        _flush_buffered_writes(current_user["id"])
+        
+        workout_exercises = workout_service.add_exercises_to_workout(
+            user_id=UUID(current_user["id"]),
+            workout_id=workout_id,
+            bulk_data=bulk_data
+        )
+        
+        logger.info(f"Exercises added to workout successfully: {workout_id}")
+        idempotency.store(201, workout_exercises)
+        return workout_exercises
+        
+    except HTTPException:
+        # Re-raise HTTP exceptions from services
+        raise
+    except Exception as e:
+        logger.error(f"Bulk exercise addition to workout failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Exercise addition to workout failed"
+        )
+
+
+@router.put("/{workout_id}/exercises/order", response_model=List[WorkoutExerciseResponse], status_code=200)
+async def reorder_workout_exercises(
+    workout_id: UUID,
+    reorder_data: ReorderExercisesRequest,
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    idempotency: IdempotencyGuard = Depends(idempotency_guard)
+) -> List[WorkoutExerciseResponse]:
+    """
+    Reorder all exercises in a workout.
+    
+    Args:
+        workout_id: Unique identifier for the workout
+        reorder_data: Every exercise ID in the workout, in the new order
+        current_user: Current user data from JWT (injected by dependency)
+        
+    Returns:
+        Workout exercises in their new order
+        
+    Raises:
+        HTTPException: 401 for invalid JWT, 400 if the list does not match the workout,
+            404 if workout not found, 500 for server errors
+    """
+    if idempotency.replay_response is not None:
+        return idempotency.replay_response
+
+    try:
+        logger.info(f"Reordering exercises in workout {workout_id}")
+        
+        _flush_buffered_writes(current_user["id"])
+        
+        workout_exercises = workout_service.reorder_workout_exercises(
+            user_id=UUID(current_user["id"]),
+            workout_id=workout_id,
+            reorder_data=reorder_data
+        )
+        
+        idempotency.store(200, workout_exercises)
+        return workout_exercises
+        
+    except HTTPException:
+        # Re-raise HTTP exceptions from services
+        raise
+    except Exception as e:
+        logger.error(f"Workout exercise reorder failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Exercise reorder failed"
+        )
+
+
+@router.put("/{workout_id}/exercises/{exercise_id}/position", response_model=WorkoutExerciseResponse, status_code=200)
+async def move_exercise_in_workout(
+    workout_id: UUID,
+    exercise_id: UUID,
+    move_data: MoveExerciseRequest,
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    idempotency: IdempotencyGuard = Depends(idempotency_guard)
+) -> WorkoutExerciseResponse:
+    """
+    Move one exercise within a workout (drag and drop).
+    
+    Only the moved exercise's row is rewritten; the rest of the workout keeps
+    its order indexes unless the neighbours leave no free index.
+    
+    Args:
+        workout_id: Unique identifier for the workout
+        exercise_id: Unique identifier for the exercise to move
+        move_data: Exercise to place it after (omit to move to the top)
+        current_user: Current user data from JWT (injected by dependency)
+        
+    Returns:
+        Moved workout exercise with its new order index
+        
+    Raises:
+        HTTPException: 401 for invalid JWT, 404 if workout/exercise not found, 500 for server errors
+    """
+    if idempotency.replay_response is not None:
+        return idempotency.replay_response
+
+    try:
+        logger.info(f"Moving exercise {exercise_id} in workout {workout_id}")
+        
+        _flush_buffered_writes(current_user["id"])
+        
+        workout_exercise = workout_service.move_exercise_in_workout(
+            user_id=UUID(current_user["id"]),
+            workout_id=workout_id,
+            exercise_id=exercise_id,
+            move_data=move_data
+        )
+        
+        idempotency.store(200, workout_exercise)
+        return workout_exercise
+        
+    except HTTPException:
+        # Re-raise HTTP exceptions from services
+        raise
+    except Exception as e:
+        logger.error(f"Workout exercise move failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Exercise move failed"
+        )
+
+
 @router.delete("/{workout_id}/exercises/{exercise_id}", status_code=204)
 async def remove_exercise_from_workout(
     workout_id: UUID,
     exercise_id: UUID,
-    current_user: Dict[str, Any] = Depends(get_current_user)
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    idempotency: IdempotencyGuard = Depends(idempotency_guard)
 ) -> None:
     """
     Remove exercise from workout and cascade delete sets.
@@ -369,9 +886,14 @@ async def remove_exercise_from_workout(
     Raises:
         HTTPException: 401 for invalid JWT, 404 if workout/exercise not found, 500 for server errors
     """
+    if idempotency.replay_response is not None:
+        return idempotency.replay_response
+
     try:
         logger.info(f"Removing exercise {exercise_id} from workout {workout_id}")
         
+        _flush_buffered_writes(current_user["id"])
+        
         # Remove exercise from workout using existing WorkoutService
         workout_service.remove_exercise_from_workout(
             user_id=UUID(current_user["id"]),
@@ -380,6 +902,7 @@ async def remove_exercise_from_workout(
         )
         
         logger.info(f"Exercise removed from workout successfully")
+        idempotency.store(204)
         
     except HTTPException:
         # Re-raise HTTP exceptions from services
@@ -397,7 +920,9 @@ async def add_set_to_exercise(
     workout_id: UUID,
     exercise_id: UUID,
     set_data: CreateSetRequest,
-    current_user: Dict[str, Any] = Depends(get_current_user)
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    weight_unit: WeightUnit = Depends(get_weight_unit),
+    idempotency: IdempotencyGuard = Depends(idempotency_guard)
 ) -> SetResponse:
     """
     Add set to exercise in workout.
@@ -410,6 +935,7 @@ async def add_set_to_exercise(
         exercise_id: Unique identifier for the exercise
         set_data: Set creation data (reps, weight, duration, distance, etc.)
         current_user: Current user data from JWT (injected by dependency)
+        weight_unit: User's weight unit, read fresh when the write carries a weight (injected by dependency)
         
     Returns:
         Created set details
@@ -417,18 +943,32 @@ async def add_set_to_exercise(
     Raises:
         HTTPException: 401 for invalid JWT, 404 if workout/exercise not found, 422 for validation errors, 500 for server errors
     """
+    if idempotency.replay_response is not None:
+        return idempotency.replay_response
+
     try:
         logger.info(f"Adding set to exercise {exercise_id} in workout {workout_id}")
         
-        # Add set to exercise using existing WorkoutService
-        set_response = workout_service.add_set_to_exercise(
+        # Acknowledge from the session journal when the workout is buffered, otherwise write through
+        set_response = get_session_buffer().add_set_to_exercise(
+            workout_service,
             user_id=UUID(current_user["id"]),
             workout_id=workout_id,
             exercise_id=exercise_id,
-            set_data=set_data
+            set_data=set_data,
+            weight_unit=weight_unit
         )
+        if set_response is None:
+            set_response = workout_service.add_set_to_exercise(
+                user_id=UUID(current_user["id"]),
+                workout_id=workout_id,
+                exercise_id=exercise_id,
+                set_data=set_data,
+                weight_unit=resolve_write_weight_unit(current_user["id"], set_data.weight, weight_unit)
+            )
         
         logger.info(f"Set added to exercise successfully: {set_response.id}")
+        idempotency.store(201, set_response)
         return set_response
         
     except HTTPException:
@@ -446,36 +986,66 @@ async def add_set_to_exercise(
 async def update_set(
     set_id: UUID,
     update_data: UpdateSetRequest,
-    current_user: Dict[str, Any] = Depends(get_current_user)
+    response: Response,
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    weight_unit: WeightUnit = Depends(get_weight_unit),
+    expected_version: Optional[int] = Depends(if_match_version),
+    idempotency: IdempotencyGuard = Depends(idempotency_guard)
 ) -> SetResponse:
     """
     Update existing set data.
     
     Updates set properties such as reps, weight, completion status, or notes.
-    Only provided fields will be updated.
+    Only provided fields will be updated. With an If-Match header carrying
+    the set's version the update only applies if the set is unchanged since.
+    When write coalescing is enabled, updates to this set without If-Match
+    inside the window are written once and every caller receives the merged
+    result; conditional updates are always written on their own.
     
     Args:
         set_id: Unique identifier for the set
         update_data: Set update data
+        response: Outgoing response (for the ETag header)
         current_user: Current user data from JWT (injected by dependency)
+        weight_unit: User's weight unit, read fresh when the write carries a weight (injected by dependency)
+        expected_version: Version from the If-Match header (injected by dependency)
         
     Returns:
         Updated set details
         
     Raises:
-        HTTPException: 401 for invalid JWT, 404 if set not found, 422 for validation errors, 500 for server errors
+        HTTPException: 400 for a malformed If-Match, 401 for invalid JWT, 404 if set not found,
+            409 if the set was modified since that version, 422 for validation errors, 500 for server errors
     """
+    if idempotency.replay_response is not None:
+        return idempotency.replay_response
+
     try:
         logger.info(f"Updating set: {set_id} for user {current_user['id']}")
         
-        # Update set using existing WorkoutService
-        updated_set = workout_service.update_set(
+        # Acknowledge from the session journal when the set is buffered, otherwise
+        # write it merged with other edits to it inside the coalescing window
+        updated_set = get_session_buffer().update_set(
+            workout_service,
             user_id=UUID(current_user["id"]),
             set_id=set_id,
-            update_data=update_data
+            update_data=update_data,
+            weight_unit=weight_unit,
+            expected_version=expected_version
         )
+        if updated_set is None:
+            updated_set = await get_set_write_coalescer().update_set(
+                workout_service,
+                user_id=UUID(current_user["id"]),
+                set_id=set_id,
+                update_data=update_data,
+                weight_unit=resolve_write_weight_unit(current_user["id"], update_data.weight, weight_unit),
+                expected_version=expected_version
+            )
         
         logger.info(f"Set updated successfully: {set_id}")
+        response.headers[ETAG_HEADER] = format_etag(updated_set.version)
+        idempotency.store(200, updated_set, headers={ETAG_HEADER: response.headers[ETAG_HEADER]})
         return updated_set
         
     except HTTPException:
@@ -492,7 +1062,8 @@ async def update_set(
 @router.delete("/sets/{set_id}", status_code=204)
 async def delete_set(
     set_id: UUID,
-    current_user: Dict[str, Any] = Depends(get_current_user)
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    idempotency: IdempotencyGuard = Depends(idempotency_guard)
 ) -> None:
     """
     Delete set from exercise.
@@ -509,16 +1080,21 @@ async def delete_set(
     Raises:
         HTTPException: 401 for invalid JWT, 404 if set not found, 500 for server errors
     """
+    if idempotency.replay_response is not None:
+        return idempotency.replay_response
+
     try:
         logger.info(f"Deleting set: {set_id} for user {current_user['id']}")
         
-        # Delete set using existing WorkoutService
+        # Delete set using existing WorkoutService, after any buffered edits
+        _flush_buffered_writes(current_user["id"])
         workout_service.delete_set(
             user_id=UUID(current_user["id"]),
             set_id=set_id
         )
         
         logger.info(f"Set deleted successfully: {set_id}")
+        idempotency.store(204)
         
     except HTTPException:
         # Re-raise HTTP exceptions from services
@@ -580,11 +1156,18 @@ async def workout_health_check():
         "service": "workouts",
         "endpoints": [
             "POST /workouts - Create new workout session",
+            "POST /workouts/from-template/{template_id} - Start workout from a stored template",
             "GET /workouts - Get all workouts for authenticated user",
+            "GET /workouts/last-performance - Most recent completed sets for many exercises",
+            "GET /workouts/active - Get the active workout with exercises and sets",
             "GET /workouts/{workout_id} - Get workout details with exercises and sets",
             "PUT /workouts/{workout_id} - Update workout (complete session)",
             "DELETE /workouts/{workout_id} - Delete workout",
+            "POST /workouts/{workout_id}/clone - Repeat a past workout as a new session",
             "POST /workouts/{workout_id}/exercises - Add exercise to workout",
+            "POST /workouts/{workout_id}/exercises/bulk - Add many exercises in one transaction",
+            "PUT /workouts/{workout_id}/exercises/order - Reorder all exercises in a workout",
+            "PUT /workouts/{workout_id}/exercises/{exercise_id}/position - Move one exercise",
             "POST /workouts/{workout_id}/exercises/{exercise_id}/sets - Add set to exercise",
             "PUT /sets/{set_id} - Update set",
             "DELETE /sets/{set_id} - Delete set",
@@ -0,0 +1,409 @@
+"""
+Activity Service Layer - Workout Calendar, Streaks and Heatmaps
+
+Implements calendar analytics for FM-SetLogger backend:
+- Current and longest streak of training days
+- Yearly heatmap of workouts per day
+- Weekly training frequency
+
+Each user's completed workouts are held in memory as a day bitmap (a Python
+int, one bit per local calendar day) with a sparse per-day count map. The
+calendar is built from one narrow query on first use and then maintained
+incrementally by WorkoutService on workout create, complete and delete, so
+reads are bit operations rather than scans of ``workouts``. Days are local
+to the user's ``timezone`` preference.
+
+Calendars are per process; entries are rebuilt after
+``analytics_cache_ttl_seconds`` so writes handled by other workers are
+picked up.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional, List, Dict, Any, TYPE_CHECKING
+from uuid import UUID
+from zoneinfo import ZoneInfo
+
+from fastapi import HTTPException, status
+from postgrest.exceptions import APIError
+
+from core.config import settings
+from core.write_versions import get_write_version_registry
+from models.analytics import StreakResponse, HeatmapResponse, WeeklyFrequencyResponse
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+EPOCH = date(1970, 1, 1)
+
+
+def local_day(timestamp: Any, tz: ZoneInfo) -> int:
+    """Days since 1970-01-01 of a timestamp's calendar date in ``tz``."""
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return (timestamp.astimezone(tz).date() - EPOCH).days
+
+
+def run_length_ending_at(bits: int, day: int) -> int:
+    """Number of consecutive set bits ending at bit ``day``."""
+    if day < 0 or not (bits >> day) & 1:
+        return 0
+    window = (1 << (day + 1)) - 1
+    gaps = ~bits & window
+    # Highest unset bit at or below ``day`` bounds the run
+    return day + 1 - gaps.bit_length()
+
+
+def longest_run(bits: int) -> int:
+    """Length of the longest run of consecutive set bits."""
+    length = 0
+    while bits:
+        bits &= bits << 1
+        length += 1
+    return length
+
+
+class ActivityCalendar:
+    """
+    Completed-workout calendar for one user in one time zone.
+
+    Bit ``d`` of ``bits`` is set when the user completed at least one workout
+    on epoch day ``d``; ``counts`` holds the number of workouts on those days.
+    ``days_by_workout`` makes incremental updates idempotent.
+    """
+
+    def __init__(self, tz_name: str):
+        self.tz_name = tz_name
+        self.tz = ZoneInfo(tz_name)
+        self.bits = 0
+        self.counts: Dict[int, int] = {}
+        self.days_by_workout: Dict[str, int] = {}
+        self.built_at = time.monotonic()
+
+    def add(self, workout_id: str, day: int) -> None:
+        """Count a completed workout on ``day`` (moving it if already counted elsewhere)."""
+        previous = self.days_by_workout.get(workout_id)
+        if previous == day:
+            return
+        if previous is not None:
+            self.discard(workout_id)
+        self.days_by_workout[workout_id] = day
+        self.counts[day] = self.counts.get(day, 0) + 1
+        self.bits |= 1 << day
+
+    def discard(self, workout_id: str) -> None:
+        """Stop counting a workout (deleted or reopened)."""
+        day = self.days_by_workout.pop(workout_id, None)
+        if day is None:
+            return
+        remaining = self.counts[day] - 1
+        if remaining:
+            self.counts[day] = remaining
+        else:
+            del self.counts[day]
+            self.bits &= ~(1 << day)
+
+    def today(self) -> int:
+        """Epoch day of the current date in the calendar's time zone."""
+        return local_day(datetime.now(timezone.utc), self.tz)
+
+    def range_bits(self, start: int, length: int) -> int:
+        """Bits for ``length`` days starting at epoch day ``start`` (bit 0 = start)."""
+        return (self.bits >> start) & ((1 << length) - 1)
+
+    def range_workouts(self, start: int, length: int) -> int:
+        """Total workouts over ``length`` days starting at epoch day ``start``."""
+        span = self.range_bits(start, length)
+        total = 0
+        while span:
+            low = span & -span
+            total += self.counts.get(start + low.bit_length() - 1, 0)
+            span ^= low
+        return total
+
+
+class ActivityCalendarRegistry:
+    """Thread-safe, bounded per-process store of user calendars."""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: int = 300):
+        self._calendars: "OrderedDict[str, ActivityCalendar]" = OrderedDict()
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+    def get(self, user_id: Any) -> Optional[ActivityCalendar]:
+        """Loaded calendar for a user, or None if missing or expired."""
+        key = str(user_id)
+        with self._lock:
+            calendar = self._calendars.get(key)
+            if calendar is None:
+                return None
+            if time.monotonic() - calendar.built_at > self._ttl_seconds:
+                del self._calendars[key]
+                return None
+            self._calendars.move_to_end(key)
+            return calendar
+
+    def put(self, user_id: Any, calendar: ActivityCalendar) -> None:
+        """Store a freshly built calendar."""
+        with self._lock:
+            self._calendars[str(user_id)] = calendar
+            self._calendars.move_to_end(str(user_id))
+            while len(self._calendars) > self._max_entries:
+                self._calendars.popitem(last=False)
+
+    def invalidate(self, user_id: Any) -> None:
+        """Drop a user's calendar so the next read rebuilds it."""
+        with self._lock:
+            self._calendars.pop(str(user_id), None)
+
+    def record_workout(self, user_id: Any, workout: Dict[str, Any]) -> None:
+        """
+        Apply a written workout row to the user's calendar if it is loaded.
+
+        Completed (inactive) workouts are counted on their start day; active
+        workouts are not counted.
+        """
+        with self._lock:
+            calendar = self._calendars.get(str(user_id))
+            if calendar is None:
+                return
+            if workout.get("is_active") is False and workout.get("started_at"):
+                calendar.add(str(workout["id"]), local_day(workout["started_at"], calendar.tz))
+            else:
+                calendar.discard(str(workout["id"]))
+
+    def forget_workout(self, user_id: Any, workout_id: Any) -> None:
+        """Remove a deleted workout from the user's calendar if it is loaded."""
+        with self._lock:
+            calendar = self._calendars.get(str(user_id))
+            if calendar is not None:
+                calendar.discard(str(workout_id))
+
+
+# Singleton registry shared by WorkoutService writers and ActivityService readers
+_activity_calendar_registry = None
+_activity_calendar_registry_lock = threading.Lock()
+
+
+def get_activity_calendar_registry() -> ActivityCalendarRegistry:
+    """
+    Get singleton ActivityCalendarRegistry instance.
+
+    Returns:
+        ActivityCalendarRegistry instance
+    """
+    global _activity_calendar_registry
+
+    if _activity_calendar_registry is None:
+        with _activity_calendar_registry_lock:
+            if _activity_calendar_registry is None:  # Double-check locking
+                _activity_calendar_registry = ActivityCalendarRegistry(
+                    max_entries=settings.analytics_cache_max_entries,
+                    ttl_seconds=settings.analytics_cache_ttl_seconds
+                )
+
+    return _activity_calendar_registry
+
+
+class ActivityService:
+    """
+    Activity service answering calendar queries from in-memory day bitmaps.
+
+    All queries filter by user_id explicitly because the backend client
+    uses the service role key, which bypasses RLS.
+    """
+
+    def __init__(self, supabase_client: Optional['Client'] = None):
+        """Initialize activity service with optional Supabase client."""
+        if supabase_client:
+            self.supabase = supabase_client
+        else:
+            from services.supabase_client import SupabaseService
+            self.supabase = SupabaseService().client
+
+    def get_streaks(self, user_id: UUID) -> StreakResponse:
+        """
+        Get current and longest training streaks.
+
+        The current streak counts consecutive days with a completed workout
+        ending today, or yesterday if the user has not trained yet today.
+
+        Args:
+            user_id: User's unique identifier
+
+        Returns:
+            Streak summary with this month's training days
+
+        Raises:
+            HTTPException: If streak retrieval fails
+        """
+        try:
+            calendar = self._get_calendar(user_id)
+            today = calendar.today()
+            current = run_length_ending_at(calendar.bits, today) or run_length_ending_at(calendar.bits, today - 1)
+
+            today_date = EPOCH + timedelta(days=today)
+            month_start = (today_date.replace(day=1) - EPOCH).days
+            month_days = today - month_start + 1
+
+            return StreakResponse(
+                current_streak=current,
+                longest_streak=longest_run(calendar.bits),
+                active_days_this_month=calendar.range_bits(month_start, month_days).bit_count(),
+                workouts_this_month=calendar.range_workouts(month_start, month_days),
+                last_workout_date=EPOCH + timedelta(days=calendar.bits.bit_length() - 1) if calendar.bits else None,
+                timezone=calendar.tz_name
+            )
+
+        except HTTPException:
+            raise
+        except APIError as e:
+            logger.error(f"Database error retrieving streaks: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Database error during streak retrieval"
+            )
+        except Exception as e:
+            logger.error(f"Unexpected error retrieving streaks: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Streak retrieval failed"
+            )
+
+    def get_heatmap(self, user_id: UUID, year: Optional[int] = None) -> HeatmapResponse:
+        """
+        Get completed workouts per day for a calendar year.
+
+        Args:
+            user_id: User's unique identifier
+            year: Calendar year (defaults to the current year in the user's time zone)
+
+        Returns:
+            One count per day of the year
+
+        Raises:
+            HTTPException: If heatmap retrieval fails
+        """
+        try:
+            calendar = self._get_calendar(user_id)
+            year = year or (EPOCH + timedelta(days=calendar.today())).year
+            start_date = date(year, 1, 1)
+            start = (start_date - EPOCH).days
+            length = (date(year + 1, 1, 1) - start_date).days
+
+            span = calendar.range_bits(start, length)
+            counts = [0] * length
+            while span:
+                low = span & -span
+                offset = low.bit_length() - 1
+                counts[offset] = calendar.counts.get(start + offset, 0)
+                span ^= low
+
+            return HeatmapResponse(
+                year=year,
+                start_date=start_date,
+                timezone=calendar.tz_name,
+                active_days=sum(1 for c in counts if c),
+                counts=counts
+            )
+
+        except HTTPException:
+            raise
+        except APIError as e:
+            logger.error(f"Database error retrieving heatmap: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Database error during heatmap retrieval"
+            )
+        except Exception as e:
+            logger.error(f"Unexpected error retrieving heatmap: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Heatmap retrieval failed"
+            )
+
+    def get_weekly_frequency(self, user_id: UUID, weeks: int = 12) -> WeeklyFrequencyResponse:
+        """
+        Get training days and workouts per week (Monday-Sunday).
+
+        Args:
+            user_id: User's unique identifier
+            weeks: Number of weeks ending with the current week
+
+        Returns:
+            Per-week training days and workout counts, oldest first
+
+        Raises:
+            HTTPException: If frequency retrieval fails
+        """
+        try:
+            calendar = self._get_calendar(user_id)
+            today_date = EPOCH + timedelta(days=calendar.today())
+            first_monday = today_date - timedelta(days=today_date.weekday(), weeks=weeks - 1)
+
+            week_starts: List[date] = []
+            active_days: List[int] = []
+            workouts: List[int] = []
+            for week in range(weeks):
+                week_start = first_monday + timedelta(weeks=week)
+                start = (week_start - EPOCH).days
+                week_starts.append(week_start)
+                active_days.append(calendar.range_bits(start, 7).bit_count())
+                workouts.append(calendar.range_workouts(start, 7))
+
+            return WeeklyFrequencyResponse(
+                timezone=calendar.tz_name,
+                week_starts=week_starts,
+                active_days=active_days,
+                workouts=workouts,
+                average_active_days=round(sum(active_days) / weeks, 2)
+            )
+
+        except HTTPException:
+            raise
+        except APIError as e:
+            logger.error(f"Database error retrieving weekly frequency: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Database error during frequency retrieval"
+            )
+        except Exception as e:
+            logger.error(f"Unexpected error retrieving weekly frequency: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Frequency retrieval failed"
+            )
+
+    def _get_calendar(self, user_id: UUID) -> ActivityCalendar:
+        """Return the user's loaded calendar, building it on first use."""
+        registry = get_activity_calendar_registry()
+        calendar = registry.get(user_id)
+        if calendar is not None:
+            return calendar
+
+        # A write landing while the calendar is built makes it stale; don't keep it then
+        version = get_write_version_registry().get(user_id)
+        user = self.supabase.table("users").select("preferences").eq("id", str(user_id)).execute()
+        preferences = (user.data[0].get("preferences") if user.data else None) or {}
+        calendar = ActivityCalendar(preferences.get("timezone") or "UTC")
+
+        result = self.supabase.table("workouts").select("id, started_at").eq(
+            "user_id", str(user_id)
+        ).eq("is_active", False).execute()
+        for workout in result.data or []:
+            if workout.get("started_at"):
+                calendar.add(str(workout["id"]), local_day(workout["started_at"], calendar.tz))
+
+        if get_write_version_registry().get(user_id) == version:
+            registry.put(user_id, calendar)
+        logger.debug(f"Built activity calendar for user {user_id}: {len(calendar.days_by_workout)} workouts")
+        return calendar
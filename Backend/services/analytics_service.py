@@ -0,0 +1,750 @@
+"""
+Analytics Service Layer - Vectorized Training Analytics
+
+Implements read-only analytics for FM-SetLogger backend:
+- Per-session exercise progression (top set, estimated 1RM, volume, reps)
+- Server-side downsampling with LTTB or bucketed max
+- Training load (daily/weekly volume, acute:chronic ratio, monotony, strain)
+- Volume distribution across body parts
+
+Set rows are fetched with one filtered query, paged past PostgREST's row
+cap, and reduced with NumPy ufuncs (reduceat over session boundaries,
+bincount into dense per-day arrays), so multi-year histories aggregate in
+milliseconds and are returned as compact columnar arrays. Workouts whose
+sets were archived contribute their per-exercise summary rows instead.
+Weights are aggregated in stored grams and scaled to the user's weight
+unit once per response. Training load responses are cached per user
+until their next write.
+"""
+
+import logging
+import threading
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional, List, Dict, Any, Tuple, TYPE_CHECKING
+from uuid import UUID
+
+import numpy as np
+from fastapi import HTTPException, status
+from postgrest.exceptions import APIError
+
+from core.config import settings
+from core.write_versions import VersionedCache, get_write_version_registry
+from models.auth import WeightUnit
+from models.analytics import (
+    DownsampleMethod,
+    ProgressionMetric,
+    ProgressionResponse,
+    TrainingLoadResponse,
+    BodyPartVolume,
+    BodyPartVolumeResponse
+)
+from services.pagination_service import fetch_all_rows
+from services.record_service import ESTIMATED_1RM_MAX_REPS
+from services.unit_service import grams_per_unit
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Completed sets of one exercise with the owning workout's start time
+PROGRESSION_SELECT = "weight_grams, reps, workout_exercises!inner(workout_id, exercise_id, workouts!inner(started_at))"
+
+PROGRESSION_COLUMNS = ("top_set_weight", "estimated_1rm", "total_volume", "total_reps")
+
+# Progression columns measured in weight (grams until converted for the response)
+PROGRESSION_WEIGHT_COLUMNS = ("top_set_weight", "estimated_1rm", "total_volume")
+
+# Completed sets of all exercises with the owning workout's start time
+LOAD_SELECT = "weight_grams, reps, workout_exercises!inner(workout_id, workouts!inner(started_at))"
+
+# Completed sets with their exercise and the owning workout's start time
+BODY_PART_SELECT = "weight_grams, reps, workout_exercises!inner(exercise_id, workouts!inner(started_at))"
+
+# Per-session aggregates of archived workouts, matching the set selects above
+PROGRESSION_SUMMARY_SELECT = (
+    "workout_id, top_set_weight_grams, estimated_1rm_grams, total_volume_grams, total_reps, workouts!inner(started_at)"
+)
+LOAD_SUMMARY_SELECT = "total_volume_grams, workouts!inner(started_at)"
+BODY_PART_SUMMARY_SELECT = "exercise_id, total_volume_grams, completed_sets, workouts!inner(started_at)"
+
+# Summary column holding each progression column
+PROGRESSION_SUMMARY_COLUMNS = {
+    "top_set_weight": "top_set_weight_grams",
+    "estimated_1rm": "estimated_1rm_grams",
+    "total_volume": "total_volume_grams",
+    "total_reps": "total_reps"
+}
+
+# Rolling windows for acute and chronic training load (days)
+ACUTE_WINDOW_DAYS = 7
+CHRONIC_WINDOW_DAYS = 28
+
+
+def session_metrics(session_codes: np.ndarray, started_at_ms: np.ndarray,
+                    weights: np.ndarray, reps: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Aggregate set rows into per-session metric columns.
+
+    Args:
+        session_codes: Integer session (workout) code per set row
+        started_at_ms: Session start time per set row (epoch milliseconds)
+        weights: Set weight per row in grams (NaN when not recorded)
+        reps: Set reps per row (0 when not recorded)
+
+    Returns:
+        Columns keyed by name, one entry per session in chronological order;
+        top_set_weight and estimated_1rm are NaN for sessions without weights
+    """
+    # Sort rows so each session is one contiguous run, sessions in time order
+    order = np.lexsort((session_codes, started_at_ms))
+    codes = session_codes[order]
+    weights = weights[order]
+    reps = reps[order]
+    boundaries = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+
+    with np.errstate(invalid="ignore"):
+        estimated = np.where(reps == 1, weights, weights * (1 + reps / 30.0))
+    estimated = np.where((reps >= 1) & (reps <= ESTIMATED_1RM_MAX_REPS), estimated, np.nan)
+
+    return {
+        "timestamps": started_at_ms[order][boundaries],
+        "top_set_weight": np.fmax.reduceat(weights, boundaries),
+        "estimated_1rm": np.fmax.reduceat(estimated, boundaries),
+        "total_volume": np.add.reduceat(np.nan_to_num(weights) * reps, boundaries),
+        "total_reps": np.add.reduceat(reps, boundaries)
+    }
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets point selection.
+
+    Keeps the first and last points and, for each bucket in between, the point
+    forming the largest triangle with the previously kept point and the mean
+    of the next bucket. Missing values in y count as zero.
+
+    Args:
+        x: Monotonic x values
+        y: Values to preserve the visual shape of
+        threshold: Number of points to keep
+
+    Returns:
+        Sorted indices of the kept points
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = x.astype(float)
+    y = np.nan_to_num(y.astype(float))
+    every = (n - 2) / (threshold - 2)
+    indices = np.empty(threshold, dtype=int)
+    indices[0], indices[-1] = 0, n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        range_start = int(i * every) + 1
+        range_end = int((i + 1) * every) + 1
+        next_start = range_end
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        areas = np.abs(
+            (x[a] - avg_x) * (y[range_start:range_end] - y[a])
+            - (x[a] - x[range_start:range_end]) * (avg_y - y[a])
+        )
+        a = range_start + int(np.argmax(areas))
+        indices[i + 1] = a
+
+    return indices
+
+
+def bucket_max(columns: Dict[str, np.ndarray], points: int) -> Dict[str, np.ndarray]:
+    """
+    Reduce columns to ``points`` equal-count buckets, keeping each column's max.
+
+    Bucket timestamps are the start of each bucket.
+    """
+    n = len(columns["timestamps"])
+    if points >= n:
+        return columns
+    boundaries = np.unique(np.linspace(0, n, points, endpoint=False).astype(int))
+    reduced = {"timestamps": columns["timestamps"][boundaries]}
+    for name in PROGRESSION_COLUMNS:
+        reduced[name] = np.fmax.reduceat(columns[name], boundaries)
+    return reduced
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Trailing mean over ``window`` entries using a cumulative sum.
+
+    Returns ``len(values) - window + 1`` entries, each aligned to the last
+    entry of its window.
+    """
+    cumulative = np.concatenate(([0.0], np.cumsum(values, dtype=float)))
+    return (cumulative[window:] - cumulative[:-window]) / window
+
+
+def training_load(daily_volume: np.ndarray, days: int) -> Dict[str, np.ndarray]:
+    """
+    Compute rolling training-load columns over a dense per-day volume array.
+
+    Args:
+        daily_volume: Volume per calendar day; must cover the ``days`` output
+            days plus the ``CHRONIC_WINDOW_DAYS - 1`` days before them
+        days: Number of trailing days to return
+
+    Returns:
+        Columns keyed by name, one entry per output day; acwr is NaN without
+        chronic load and monotony/strain are NaN when the week has no variation
+    """
+    acute = rolling_mean(daily_volume, ACUTE_WINDOW_DAYS)[-days:]
+    chronic = rolling_mean(daily_volume, CHRONIC_WINDOW_DAYS)[-days:]
+    # Standard deviation per window directly, avoiding cancellation in E[x^2] - E[x]^2
+    weekly_std = np.lib.stride_tricks.sliding_window_view(daily_volume, ACUTE_WINDOW_DAYS).std(axis=1)[-days:]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        acwr = np.where(chronic > 0, acute / chronic, np.nan)
+        monotony = np.where(weekly_std > 0, acute / weekly_std, np.nan)
+
+    return {
+        "daily_volume": daily_volume[-days:],
+        "acute_load": acute,
+        "chronic_load": chronic,
+        "acwr": acwr,
+        "monotony": monotony,
+        "strain": acute * ACUTE_WINDOW_DAYS * monotony
+    }
+
+
+class ExerciseBodyPartIndex:
+    """
+    In-memory exercise -> body part mapping for vectorized attribution.
+
+    The exercise library is shared, read-only reference data, so the mapping
+    is loaded once per process and reloaded only when an unknown exercise
+    appears. It is stored as parallel (exercise code, body part code, weight)
+    arrays; an exercise targeting N body parts contributes 1/N of its volume
+    to each.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Replaced atomically so readers always see a consistent snapshot
+        self._snapshot = ({}, [], np.array([], dtype=np.int64), np.array([], dtype=np.int64), np.array([], dtype=float))
+
+    def covers(self, exercise_ids) -> bool:
+        """Whether every exercise ID is known to the index."""
+        exercise_codes = self._snapshot[0]
+        return all(str(exercise_id) in exercise_codes for exercise_id in exercise_ids)
+
+    def load(self, rows: List[Dict[str, Any]]) -> None:
+        """Rebuild the index from exercise rows with ``id`` and ``body_part``."""
+        exercise_codes: Dict[str, int] = {}
+        part_codes: Dict[str, int] = {}
+        pair_exercise: List[int] = []
+        pair_part: List[int] = []
+        pair_weight: List[float] = []
+
+        for row in rows:
+            code = exercise_codes[str(row["id"])] = len(exercise_codes)
+            parts = list(dict.fromkeys(row.get("body_part") or []))
+            for part in parts:
+                pair_exercise.append(code)
+                pair_part.append(part_codes.setdefault(part, len(part_codes)))
+                pair_weight.append(1.0 / len(parts))
+
+        with self._lock:
+            self._snapshot = (
+                exercise_codes,
+                list(part_codes),
+                np.asarray(pair_exercise, dtype=np.int64),
+                np.asarray(pair_part, dtype=np.int64),
+                np.asarray(pair_weight, dtype=float)
+            )
+
+    def distribute(self, exercise_ids: List[str], values: np.ndarray) -> Tuple[List[str], np.ndarray]:
+        """
+        Attribute per-row values to body parts.
+
+        Args:
+            exercise_ids: Exercise ID per row
+            values: Value per row (e.g. volume, or 1 to count sets)
+
+        Returns:
+            (body part names, attributed total per body part); rows for
+            exercises missing from the index are ignored
+        """
+        exercise_codes, body_parts, pair_exercise, pair_part, pair_weight = self._snapshot
+        codes = np.fromiter((exercise_codes.get(str(e), -1) for e in exercise_ids), dtype=np.int64, count=len(exercise_ids))
+        known = codes >= 0
+        per_exercise = np.bincount(codes[known], weights=values[known], minlength=len(exercise_codes))
+        per_part = np.bincount(pair_part, weights=per_exercise[pair_exercise] * pair_weight, minlength=len(body_parts))
+        return body_parts, per_part
+
+
+# Singleton body part index shared by analytics services
+_body_part_index = None
+_body_part_index_lock = threading.Lock()
+
+
+def get_body_part_index() -> ExerciseBodyPartIndex:
+    """
+    Get singleton ExerciseBodyPartIndex instance.
+
+    Returns:
+        ExerciseBodyPartIndex instance
+    """
+    global _body_part_index
+
+    if _body_part_index is None:
+        with _body_part_index_lock:
+            if _body_part_index is None:  # Double-check locking
+                _body_part_index = ExerciseBodyPartIndex()
+
+    return _body_part_index
+
+
+def _to_list(column: np.ndarray, integer: bool = False) -> List[Any]:
+    """Convert a NumPy column to JSON-safe values (NaN becomes None)."""
+    if integer:
+        return [int(v) for v in column]
+    return [None if np.isnan(v) else round(float(v), 2) for v in column]
+
+
+class AnalyticsService:
+    """
+    Analytics service computing training metrics from set history.
+
+    All queries filter by user_id explicitly because the backend client
+    uses the service role key, which bypasses RLS.
+    """
+
+    def __init__(self, supabase_client: Optional['Client'] = None):
+        """Initialize analytics service with optional Supabase client."""
+        if supabase_client:
+            self.supabase = supabase_client
+        else:
+            from services.supabase_client import SupabaseService
+            self.supabase = SupabaseService().client
+
+        self.cache = VersionedCache(
+            get_write_version_registry(),
+            max_entries=settings.analytics_cache_max_entries,
+            ttl_seconds=settings.analytics_cache_ttl_seconds
+        )
+
+    def get_exercise_progression(self, user_id: UUID, exercise_id: UUID, points: Optional[int] = None,
+                                 method: DownsampleMethod = DownsampleMethod.LTTB,
+                                 metric: ProgressionMetric = ProgressionMetric.ESTIMATED_1RM,
+                                 since: Optional[date] = None,
+                                 weight_unit: WeightUnit = WeightUnit.KG) -> ProgressionResponse:
+        """
+        Get per-session progression metrics for one exercise.
+
+        Args:
+            user_id: User's unique identifier
+            exercise_id: Exercise's unique identifier
+            points: Maximum number of points to return (None for every session)
+            method: Downsampling method when the history exceeds ``points``
+            metric: Metric whose shape LTTB preserves
+            since: First day of sessions to include (None for the whole history)
+            weight_unit: Unit to report weights and volume in
+
+        Returns:
+            Columnar progression series
+
+        Raises:
+            HTTPException: If progression retrieval fails
+        """
+        try:
+            def set_query():
+                query_builder = self.supabase.table("sets").select(PROGRESSION_SELECT).eq(
+                    "completed", True
+                ).eq(
+                    "workout_exercises.exercise_id", str(exercise_id)
+                ).eq(
+                    "user_id", str(user_id)
+                )
+                if since is not None:
+                    # Bound the sets partition key too so older months are pruned
+                    query_builder = query_builder.gte(
+                        "completed_at", since.isoformat()
+                    ).gte(
+                        "workout_exercises.workouts.started_at", since.isoformat()
+                    )
+                return query_builder
+
+            def summary_query():
+                query_builder = self.supabase.table("workout_exercise_summaries").select(
+                    PROGRESSION_SUMMARY_SELECT
+                ).eq(
+                    "user_id", str(user_id)
+                ).eq(
+                    "exercise_id", str(exercise_id)
+                ).gt(
+                    "completed_sets", 0
+                )
+                if since is not None:
+                    query_builder = query_builder.gte("workouts.started_at", since.isoformat())
+                return query_builder
+
+            rows = fetch_all_rows(set_query)
+            summaries = []
+            if self._reaches_archive(since):
+                summaries = fetch_all_rows(summary_query, order_column="workout_exercise_id")
+
+            columns = self._build_session_columns(rows, summaries)
+            total_sessions = len(columns["timestamps"])
+
+            downsampled = points is not None and total_sessions > points
+            if downsampled:
+                method = DownsampleMethod(method)
+                if method == DownsampleMethod.LTTB:
+                    keep = lttb_indices(columns["timestamps"], columns[ProgressionMetric(metric).value], points)
+                    columns = {name: column[keep] for name, column in columns.items()}
+                else:
+                    columns = bucket_max(columns, points)
+
+            logger.debug(f"Progression for exercise {exercise_id}: {total_sessions} sessions, {len(columns['timestamps'])} points")
+
+            scale = grams_per_unit(weight_unit)
+            for name in PROGRESSION_WEIGHT_COLUMNS:
+                columns[name] = columns[name] / scale
+
+            return ProgressionResponse(
+                exercise_id=exercise_id,
+                total_sessions=total_sessions,
+                downsampled=downsampled,
+                method=method if downsampled else None,
+                timestamps=_to_list(columns["timestamps"], integer=True),
+                top_set_weight=_to_list(columns["top_set_weight"]),
+                estimated_1rm=_to_list(columns["estimated_1rm"]),
+                total_volume=_to_list(np.nan_to_num(columns["total_volume"])),
+                total_reps=_to_list(columns["total_reps"], integer=True)
+            )
+
+        except HTTPException:
+            raise
+        except APIError as e:
+            logger.error(f"Database error retrieving exercise progression: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Database error during progression retrieval"
+            )
+        except Exception as e:
+            logger.error(f"Unexpected error retrieving exercise progression: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Progression retrieval failed"
+            )
+
+    def get_training_load(self, user_id: UUID, days: int = 28, end_date: Optional[date] = None,
+                          weight_unit: WeightUnit = WeightUnit.KG) -> TrainingLoadResponse:
+        """
+        Get daily training load for the trailing ``days`` days.
+
+        Served from cache while the user's write version is unchanged.
+
+        Args:
+            user_id: User's unique identifier
+            days: Number of days in the series
+            end_date: Last day of the series (defaults to today, UTC)
+            weight_unit: Unit to report volume in
+
+        Returns:
+            Columnar training load series with weekly volume totals
+
+        Raises:
+            HTTPException: If training load retrieval fails
+        """
+        try:
+            end_date = end_date or datetime.now(timezone.utc).date()
+            cache_key = ("training_load", days, end_date, WeightUnit(weight_unit).value)
+            cached = self.cache.get(user_id, cache_key)
+            if cached is not None:
+                return cached
+            # Read the version before querying so a concurrent write invalidates this entry
+            version = self.cache.current_version(user_id)
+
+            # Chronic load on the first output day needs the 27 days before it
+            history_start = end_date - timedelta(days=days + CHRONIC_WINDOW_DAYS - 2)
+            # Sets are logged after their workout starts, so bounding the
+            # sets partition key as well prunes months before the window
+            rows = fetch_all_rows(lambda: self.supabase.table("sets").select(LOAD_SELECT).eq(
+                "completed", True
+            ).eq(
+                "user_id", str(user_id)
+            ).gte(
+                "completed_at", history_start.isoformat()
+            ).gte(
+                "workout_exercises.workouts.started_at", history_start.isoformat()
+            ).lt(
+                "workout_exercises.workouts.started_at", (end_date + timedelta(days=1)).isoformat()
+            ))
+
+            summaries = []
+            if self._reaches_archive(history_start):
+                summaries = fetch_all_rows(lambda: self.supabase.table("workout_exercise_summaries").select(LOAD_SUMMARY_SELECT).eq(
+                    "user_id", str(user_id)
+                ).gt(
+                    "completed_sets", 0
+                ).gte(
+                    "workouts.started_at", history_start.isoformat()
+                ).lt(
+                    "workouts.started_at", (end_date + timedelta(days=1)).isoformat()
+                ), order_column="workout_exercise_id")
+
+            total_days = (end_date - history_start).days + 1
+            day_index, volume = self._build_daily_rows(rows, summaries, history_start)
+            daily_volume = np.bincount(day_index, weights=volume, minlength=total_days)[:total_days] / grams_per_unit(weight_unit)
+            columns = training_load(daily_volume, days)
+
+            start_date = end_date - timedelta(days=days - 1)
+            week_index = (np.arange(days) + start_date.weekday()) // 7
+            weekly_volume = np.bincount(week_index, weights=columns["daily_volume"])
+            first_monday = start_date - timedelta(days=start_date.weekday())
+
+            response = TrainingLoadResponse(
+                start_date=start_date,
+                end_date=end_date,
+                dates=[start_date + timedelta(days=i) for i in range(days)],
+                daily_volume=_to_list(columns["daily_volume"]),
+                acute_load=_to_list(columns["acute_load"]),
+                chronic_load=_to_list(columns["chronic_load"]),
+                acwr=_to_list(columns["acwr"]),
+                monotony=_to_list(columns["monotony"]),
+                strain=_to_list(columns["strain"]),
+                week_starts=[first_monday + timedelta(weeks=i) for i in range(len(weekly_volume))],
+                weekly_volume=_to_list(weekly_volume)
+            )
+            self.cache.set(user_id, cache_key, response, version)
+
+            logger.debug(f"Training load for user {user_id}: {len(rows)} sets over {total_days} days")
+
+            return response
+
+        except HTTPException:
+            raise
+        except APIError as e:
+            logger.error(f"Database error retrieving training load: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Database error during training load retrieval"
+            )
+        except Exception as e:
+            logger.error(f"Unexpected error retrieving training load: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Training load retrieval failed"
+            )
+
+    def get_body_part_volume(self, user_id: UUID, start_date: date, end_date: date,
+                             weight_unit: WeightUnit = WeightUnit.KG) -> BodyPartVolumeResponse:
+        """
+        Get training volume per body part over a date range.
+
+        Served from cache while the user's write version is unchanged.
+
+        Args:
+            user_id: User's unique identifier
+            start_date: First day of the range (UTC)
+            end_date: Last day of the range (UTC, inclusive)
+            weight_unit: Unit to report volume in
+
+        Returns:
+            Volume, fractional set counts and share per body part
+
+        Raises:
+            HTTPException: If the range is invalid or retrieval fails
+        """
+        try:
+            if start_date > end_date:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="start_date must not be after end_date"
+                )
+
+            cache_key = ("body_parts", start_date, end_date, WeightUnit(weight_unit).value)
+            cached = self.cache.get(user_id, cache_key)
+            if cached is not None:
+                return cached
+            version = self.cache.current_version(user_id)
+
+            rows = fetch_all_rows(lambda: self.supabase.table("sets").select(BODY_PART_SELECT).eq(
+                "completed", True
+            ).eq(
+                "user_id", str(user_id)
+            ).gte(
+                "completed_at", start_date.isoformat()
+            ).gte(
+                "workout_exercises.workouts.started_at", start_date.isoformat()
+            ).lt(
+                "workout_exercises.workouts.started_at", (end_date + timedelta(days=1)).isoformat()
+            ))
+
+            summaries = []
+            if self._reaches_archive(start_date):
+                summaries = fetch_all_rows(lambda: self.supabase.table("workout_exercise_summaries").select(BODY_PART_SUMMARY_SELECT).eq(
+                    "user_id", str(user_id)
+                ).gt(
+                    "completed_sets", 0
+                ).gte(
+                    "workouts.started_at", start_date.isoformat()
+                ).lt(
+                    "workouts.started_at", (end_date + timedelta(days=1)).isoformat()
+                ), order_column="workout_exercise_id")
+
+            # One entry per set row, then one per archived exercise summary
+            exercise_ids = [row["workout_exercises"]["exercise_id"] for row in rows]
+            exercise_ids += [summary["exercise_id"] for summary in summaries]
+            weights = np.fromiter((row.get("weight_grams") or 0 for row in rows), dtype=float, count=len(rows))
+            reps = np.fromiter((row.get("reps") or 0 for row in rows), dtype=float, count=len(rows))
+            volume = np.concatenate((
+                weights * reps,
+                np.fromiter((summary["total_volume_grams"] for summary in summaries), dtype=float, count=len(summaries))
+            )) / grams_per_unit(weight_unit)
+            set_counts = np.concatenate((
+                np.ones(len(rows)),
+                np.fromiter((summary["completed_sets"] for summary in summaries), dtype=float, count=len(summaries))
+            ))
+
+            index = get_body_part_index()
+            if not index.covers(set(exercise_ids)):
+                self._load_body_part_index(index)
+            body_parts, part_volume = index.distribute(exercise_ids, volume)
+            _, part_sets = index.distribute(exercise_ids, set_counts)
+
+            total_volume = float(volume.sum())
+            order = np.argsort(-part_volume, kind="stable")
+            response = BodyPartVolumeResponse(
+                start_date=start_date,
+                end_date=end_date,
+                total_volume=round(total_volume, 2),
+                total_sets=int(set_counts.sum()),
+                body_parts=[
+                    BodyPartVolume(
+                        body_part=body_parts[i],
+                        volume=round(float(part_volume[i]), 2),
+                        sets=round(float(part_sets[i]), 2),
+                        share=round(float(part_volume[i]) / total_volume, 4) if total_volume > 0 else 0.0
+                    )
+                    for i in order if part_sets[i] > 0
+                ]
+            )
+            self.cache.set(user_id, cache_key, response, version)
+
+            return response
+
+        except HTTPException:
+            raise
+        except APIError as e:
+            logger.error(f"Database error retrieving body part volume: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Database error during body part volume retrieval"
+            )
+        except Exception as e:
+            logger.error(f"Unexpected error retrieving body part volume: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Body part volume retrieval failed"
+            )
+
+    def _load_body_part_index(self, index: ExerciseBodyPartIndex) -> None:
+        """Load the exercise -> body part mapping from the exercise library."""
+        result = self.supabase.table("exercises").select("id, body_part").execute()
+        index.load(result.data or [])
+        logger.info(f"Loaded body part index for {len(result.data or [])} exercises")
+
+    def _reaches_archive(self, start: Optional[date]) -> bool:
+        """Whether a history window starting on ``start`` can include archived workouts."""
+        archive_cutoff = datetime.now(timezone.utc) - timedelta(days=settings.workout_archive_after_days)
+        return start is None or start <= archive_cutoff.date()
+
+    def _build_daily_rows(self, rows: List[Dict[str, Any]], summaries: List[Dict[str, Any]],
+                          history_start: date) -> Tuple[np.ndarray, np.ndarray]:
+        """Convert fetched set and summary rows to (day index, volume in grams) arrays relative to ``history_start``."""
+        workout_day: Dict[str, int] = {}
+        day_index = np.empty(len(rows), dtype=np.int64)
+        weights = np.empty(len(rows), dtype=float)
+        reps = np.empty(len(rows), dtype=float)
+
+        for i, row in enumerate(rows):
+            workout = row["workout_exercises"]
+            day = workout_day.get(workout["workout_id"])
+            if day is None:
+                started_at = datetime.fromisoformat(workout["workouts"]["started_at"].replace("Z", "+00:00"))
+                day = workout_day[workout["workout_id"]] = (started_at.astimezone(timezone.utc).date() - history_start).days
+            day_index[i] = day
+            weights[i] = row.get("weight_grams") or 0
+            reps[i] = row.get("reps") or 0
+
+        summary_day = np.empty(len(summaries), dtype=np.int64)
+        summary_volume = np.empty(len(summaries), dtype=float)
+        for i, summary in enumerate(summaries):
+            started_at = datetime.fromisoformat(summary["workouts"]["started_at"].replace("Z", "+00:00"))
+            summary_day[i] = (started_at.astimezone(timezone.utc).date() - history_start).days
+            summary_volume[i] = summary["total_volume_grams"]
+
+        return np.concatenate((day_index, summary_day)), np.concatenate((weights * reps, summary_volume))
+
+    def _build_session_columns(self, rows: List[Dict[str, Any]],
+                               summaries: Optional[List[Dict[str, Any]]] = None) -> Dict[str, np.ndarray]:
+        """
+        Convert fetched set rows to NumPy arrays and aggregate per session.
+
+        Summary rows of archived sessions are already aggregated; they are
+        merged into the columns in chronological order.
+        """
+        columns = self._aggregate_session_rows(rows)
+        if not summaries:
+            return columns
+
+        archived = {
+            "timestamps": np.fromiter(
+                (int(datetime.fromisoformat(summary["workouts"]["started_at"].replace("Z", "+00:00")).timestamp() * 1000)
+                 for summary in summaries),
+                dtype=np.int64, count=len(summaries)
+            ),
+            **{
+                name: np.fromiter(
+                    (np.nan if summary[column] is None else summary[column] for summary in summaries),
+                    dtype=float, count=len(summaries)
+                )
+                for name, column in PROGRESSION_SUMMARY_COLUMNS.items()
+            }
+        }
+        merged = {name: np.concatenate((columns[name], archived[name])) for name in columns}
+        order = np.argsort(merged["timestamps"], kind="stable")
+        return {name: column[order] for name, column in merged.items()}
+
+    def _aggregate_session_rows(self, rows: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """Aggregate set rows into per-session columns."""
+        if not rows:
+            empty = np.array([], dtype=float)
+            return {"timestamps": np.array([], dtype=np.int64), **{name: empty for name in PROGRESSION_COLUMNS}}
+
+        session_index: Dict[str, int] = {}
+        session_start: List[int] = []
+        codes = np.empty(len(rows), dtype=np.int64)
+        weights = np.empty(len(rows), dtype=float)
+        reps = np.empty(len(rows), dtype=np.int64)
+
+        for i, row in enumerate(rows):
+            workout = row["workout_exercises"]
+            code = session_index.get(workout["workout_id"])
+            if code is None:
+                code = session_index[workout["workout_id"]] = len(session_start)
+                started_at = datetime.fromisoformat(workout["workouts"]["started_at"].replace("Z", "+00:00"))
+                session_start.append(int(started_at.timestamp() * 1000))
+            codes[i] = code
+            weights[i] = row["weight_grams"] if row.get("weight_grams") is not None else np.nan
+            reps[i] = row.get("reps") or 0
+
+        started_at_ms = np.asarray(session_start, dtype=np.int64)[codes]
+        return session_metrics(codes, started_at_ms, weights, reps)
@@ -0,0 +1,111 @@
+"""
+Concurrency Service - Optimistic Concurrency with Row Versions
+
+workouts, workout_exercises and sets carry an integer ``version`` that the
+database increments on every update. Clients echo the version they last saw
+in an ``If-Match`` header; the update then filters on it in the same
+statement, so edits from two devices cannot overwrite each other and no
+read is needed beforehand:
+- ``If-Match`` parsing as a FastAPI dependency (``"3"``, ``W/"3"``, ``3`` or ``*``)
+- ``ETag`` formatting for responses carrying a version
+- The 404-or-409 decision when a conditional update matched no row
+"""
+
+import logging
+from typing import Optional, Any
+
+from fastapi import Header, HTTPException, status
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+ETAG_HEADER = "ETag"
+
+
+def format_etag(version: int) -> str:
+    """Strong ETag for a row version."""
+    return f'"{version}"'
+
+
+def parse_if_match(value: Optional[str]) -> Optional[int]:
+    """
+    Parse an If-Match header into the expected row version.
+
+    Args:
+        value: Raw header value (None when absent)
+
+    Returns:
+        The expected version, or None for an unconditional update (no header or ``*``)
+
+    Raises:
+        HTTPException: 400 if the header is not a single version ETag
+    """
+    if value is None:
+        return None
+
+    tag = value.strip()
+    if tag == "*":
+        return None
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    if len(tag) >= 2 and tag[0] == tag[-1] == '"':
+        tag = tag[1:-1]
+
+    if not tag.isdigit():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="If-Match must be the resource version, e.g. \"3\""
+        )
+    return int(tag)
+
+
+def if_match_version(if_match: Optional[str] = Header(None, alias="If-Match")) -> Optional[int]:
+    """
+    FastAPI dependency returning the version a conditional update expects.
+
+    Args:
+        if_match: If-Match request header
+
+    Returns:
+        Expected row version, or None when the update is unconditional
+    """
+    return parse_if_match(if_match)
+
+
+def raise_for_missed_update(supabase_client: Any, table: str, record_id: Any, user_id: Any,
+                            expected_version: Optional[int], resource: str) -> None:
+    """
+    Raise the right error for an update that matched no row.
+
+    Only a conditional update pays for a second query: it looks up the
+    row's current version to tell a stale version (409) from a missing row.
+
+    Args:
+        supabase_client: Supabase client used for the update
+        table: Table that was updated
+        record_id: Primary key of the row
+        user_id: Owner of the row
+        expected_version: Version from If-Match (None for unconditional updates)
+        resource: Resource name for error messages ("Workout", "Set")
+
+    Raises:
+        HTTPException: 409 if the row exists at another version, 404 otherwise
+    """
+    if expected_version is not None:
+        current = supabase_client.table(table).select("version").eq(
+            "id", str(record_id)
+        ).eq("user_id", str(user_id)).limit(1).execute()
+        if current.data:
+            current_version = current.data[0]["version"]
+            logger.info(
+                f"{resource} {record_id} version conflict: expected {expected_version}, current {current_version}"
+            )
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"{resource} was modified (current version {current_version}); reload and retry"
+            )
+
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"{resource} not found"
+    )
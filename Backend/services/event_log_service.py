@@ -0,0 +1,344 @@
+"""
+Workout Event Log Service - Outbox Relay and Event Consumers
+
+Every change to workouts, workout_exercises and sets writes an event to the
+workout_outbox table from a database trigger, in the same transaction as the
+change itself (migration 015). This service:
+- Relays committed outbox events in bounded batches into the append-only
+  workout_event_log, where they get gap-free increasing offsets
+- Reads the log after a consumer's committed offset
+- Runs registered consumers: each gets its unseen events in order and its
+  offset is committed after the handler returns
+- Prunes log events every registered consumer has committed, so the log
+  only holds what some consumer has yet to process
+
+Delivery is at least once: a consumer that fails, or a process that stops
+between handling and committing, sees the same events again, so handlers
+must be idempotent (e.g. upserts keyed on entity_id). Derived views built
+this way apply only the changes since their offset and never rescan the
+base tables.
+"""
+
+import logging
+import threading
+from typing import Optional, List, Dict, Callable, TYPE_CHECKING
+
+from fastapi import HTTPException, status
+from postgrest.exceptions import APIError
+
+from models.event import WorkoutEvent, OutboxRelayReport, EventLogPruneReport
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+EventHandler = Callable[[List[WorkoutEvent]], None]
+
+# Registered consumers, run after each relay by the scheduled job
+_consumers: Dict[str, EventHandler] = {}
+_consumers_lock = threading.Lock()
+
+
+def register_event_consumer(name: str, handler: EventHandler) -> None:
+    """
+    Register a consumer of the workout event log.
+
+    Args:
+        name: Stable consumer name (its offset is stored under this name)
+        handler: Called with each batch of unseen events, oldest first
+    """
+    with _consumers_lock:
+        _consumers[name] = handler
+
+
+def get_event_consumers() -> Dict[str, EventHandler]:
+    """Registered consumers by name."""
+    with _consumers_lock:
+        return dict(_consumers)
+
+
+class WorkoutEventLogService:
+    """
+    Workout event log service relaying the outbox and serving consumers.
+
+    The outbox, log and consumer tables have no RLS policies and are only
+    reachable with the backend's service role key.
+    """
+
+    def __init__(self, supabase_client: Optional['Client'] = None):
+        """Initialize event log service with optional Supabase client."""
+        if supabase_client:
+            self.supabase = supabase_client
+        else:
+            from services.supabase_client import SupabaseService
+            self.supabase = SupabaseService().client
+
+    def relay_outbox(self, batch_size: int, max_batches: int) -> OutboxRelayReport:
+        """
+        Move committed outbox events into the event log.
+
+        Runs the relay_workout_outbox database function in bounded batches
+        until a batch comes back short or ``max_batches`` is reached. Only one
+        relay runs at a time; a concurrent run relays nothing.
+
+        Args:
+            batch_size: Maximum events relayed per batch
+            max_batches: Maximum batches per run
+
+        Returns:
+            Report of what was relayed
+
+        Raises:
+            HTTPException: If a batch fails
+        """
+        try:
+            relayed = 0
+            batches = 0
+            more_pending = False
+
+            while batches < max_batches:
+                result = self.supabase.rpc("relay_workout_outbox", {"p_batch_size": batch_size}).execute()
+                count = result.data or 0
+                batches += 1
+                relayed += count
+
+                more_pending = count == batch_size
+                if not more_pending:
+                    break
+
+            if relayed:
+                logger.info(f"Relayed {relayed} workout events in {batches} batches")
+
+            return OutboxRelayReport(relayed=relayed, batches=batches, more_pending=more_pending)
+
+        except APIError as e:
+            logger.error(f"Database error relaying workout events: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Database error during workout event relay"
+            )
+        except Exception as e:
+            logger.error(f"Unexpected error relaying workout events: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Workout event relay failed"
+            )
+
+    def prune_log(self, batch_size: int, max_batches: int) -> EventLogPruneReport:
+        """
+        Delete log events every registered consumer has processed.
+
+        Runs the prune_workout_event_log database function in bounded batches
+        until a batch comes back short or ``max_batches`` is reached. A
+        registered consumer that has never committed holds the whole log, and
+        nothing is pruned while no consumer is registered.
+
+        Args:
+            batch_size: Maximum events deleted per batch
+            max_batches: Maximum batches per run
+
+        Returns:
+            Report of what was pruned
+
+        Raises:
+            HTTPException: If a batch fails
+        """
+        consumers = sorted(get_event_consumers())
+        if not consumers:
+            return EventLogPruneReport(pruned=0, batches=0, more_pending=False)
+
+        try:
+            pruned = 0
+            batches = 0
+            more_pending = False
+
+            while batches < max_batches:
+                result = self.supabase.rpc("prune_workout_event_log", {
+                    "p_consumers": consumers,
+                    "p_batch_size": batch_size
+                }).execute()
+                count = result.data or 0
+                batches += 1
+                pruned += count
+
+                more_pending = count == batch_size
+                if not more_pending:
+                    break
+
+            if pruned:
+                logger.info(f"Pruned {pruned} processed workout events in {batches} batches")
+
+            return EventLogPruneReport(pruned=pruned, batches=batches, more_pending=more_pending)
+
+        except APIError as e:
+            logger.error(f"Database error pruning workout events: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Database error during workout event pruning"
+            )
+        except Exception as e:
+            logger.error(f"Unexpected error pruning workout events: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Workout event pruning failed"
+            )
+
+    def get_committed_offset(self, consumer: str) -> int:
+        """
+        Get the last log offset a consumer has processed.
+
+        Args:
+            consumer: Consumer name
+
+        Returns:
+            The committed offset (0 for a new consumer)
+
+        Raises:
+            HTTPException: If lookup fails
+        """
+        try:
+            result = self.supabase.table("workout_event_consumers").select("committed_offset").eq(
+                "consumer", consumer
+            ).execute()
+            return result.data[0]["committed_offset"] if result.data else 0
+
+        except APIError as e:
+            logger.error(f"Database error retrieving event consumer offset: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Database error during event offset retrieval"
+            )
+        except Exception as e:
+            logger.error(f"Unexpected error retrieving event consumer offset: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Event offset retrieval failed"
+            )
+
+    def read_events(self, after_offset: int, limit: int) -> List[WorkoutEvent]:
+        """
+        Read log events after an offset, oldest first.
+
+        Args:
+            after_offset: Return events with a greater offset
+            limit: Maximum events returned
+
+        Returns:
+            Up to ``limit`` events in offset order
+
+        Raises:
+            HTTPException: If the read fails
+        """
+        try:
+            result = self.supabase.table("workout_event_log").select(
+                "log_offset, user_id, event_type, entity_id, workout_id, payload, occurred_at"
+            ).gt("log_offset", after_offset).order("log_offset").limit(limit).execute()
+
+            return [WorkoutEvent(**record) for record in result.data or []]
+
+        except APIError as e:
+            logger.error(f"Database error reading workout events: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Database error during workout event read"
+            )
+        except Exception as e:
+            logger.error(f"Unexpected error reading workout events: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Workout event read failed"
+            )
+
+    def commit_offset(self, consumer: str, log_offset: int) -> int:
+        """
+        Record that a consumer has processed the log through an offset.
+
+        Offsets only move forward, so a late retry cannot rewind a consumer.
+
+        Args:
+            consumer: Consumer name
+            log_offset: Last offset the consumer processed
+
+        Returns:
+            The consumer's committed offset
+
+        Raises:
+            HTTPException: If the commit fails
+        """
+        try:
+            result = self.supabase.rpc("commit_workout_event_offset", {
+                "p_consumer": consumer,
+                "p_offset": log_offset
+            }).execute()
+            return result.data
+
+        except APIError as e:
+            logger.error(f"Database error committing event offset for {consumer}: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Database error during event offset commit"
+            )
+        except Exception as e:
+            logger.error(f"Unexpected error committing event offset for {consumer}: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Event offset commit failed"
+            )
+
+    def consume(self, consumer: str, handler: EventHandler, batch_size: int, max_batches: int) -> int:
+        """
+        Hand a consumer its unseen events in batches, committing after each.
+
+        A handler exception stops the run without committing that batch, so
+        the batch is delivered again on the next run.
+
+        Args:
+            consumer: Consumer name
+            handler: Called with each batch of events, oldest first
+            batch_size: Maximum events per batch
+            max_batches: Maximum batches per run
+
+        Returns:
+            Number of events handled and committed
+        """
+        handled = 0
+        offset = self.get_committed_offset(consumer)
+
+        for _ in range(max_batches):
+            events = self.read_events(offset, batch_size)
+            if not events:
+                break
+
+            handler(events)
+            offset = self.commit_offset(consumer, events[-1].log_offset)
+            handled += len(events)
+
+            if len(events) < batch_size:
+                break
+
+        return handled
+
+    def run_consumers(self, batch_size: int, max_batches: int) -> Dict[str, int]:
+        """
+        Run every registered consumer once.
+
+        A failing consumer is logged and retried on the next run; it does not
+        hold back the others.
+
+        Args:
+            batch_size: Maximum events per batch
+            max_batches: Maximum batches per consumer
+
+        Returns:
+            Events handled per consumer (-1 for a consumer that failed)
+        """
+        handled = {}
+        for name, handler in get_event_consumers().items():
+            try:
+                handled[name] = self.consume(name, handler, batch_size, max_batches)
+            except Exception as e:
+                logger.error(f"Workout event consumer {name} failed: {str(e)}")
+                handled[name] = -1
+        return handled
@@ -0,0 +1,377 @@
+"""
+Idempotency Service - Safe Retries for Mutating Endpoints
+
+Stores the first successful response for each client-supplied Idempotency-Key
+so retried POST/PUT/DELETE requests are replayed without touching the database:
+- TTL-bounded in-memory store (default, per worker process)
+- Pluggable persistent store backed by the idempotency_keys table
+- Request fingerprinting to reject key reuse with a different payload
+- Response headers the client needs again (e.g. ETag) replayed with the body
+- In-flight reservation so concurrent duplicates cannot both execute
+
+Keys are scoped to the authenticated user, HTTP method and path, so two users
+(or two endpoints) can never collide on the same client-generated key.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, AsyncGenerator, TYPE_CHECKING
+
+from fastapi import Depends, Header, HTTPException, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from postgrest.exceptions import APIError
+
+from core.config import settings
+from services.auth_service import get_current_user
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Header echoed on replayed responses so clients can tell a replay apart
+REPLAY_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+# Reservation attempts when the conflicting row disappears or has expired
+RESERVE_ATTEMPTS = 3
+
+
+class IdempotencyStore(ABC):
+    """
+    Storage backend interface for idempotency records.
+
+    A record is a dict with ``fingerprint``, ``completed``, ``status_code``,
+    ``body`` and ``headers`` keys. Implementations must make ``reserve`` atomic.
+    """
+
+    @abstractmethod
+    def reserve(self, key: str, fingerprint: str, ttl_seconds: int) -> Optional[Dict[str, Any]]:
+        """
+        Atomically reserve a key for an in-flight request.
+
+        Args:
+            key: Scoped idempotency key
+            fingerprint: Hash of the request payload
+            ttl_seconds: Lifetime of the record
+
+        Returns:
+            None if the key was reserved by this call, otherwise the existing record
+        """
+
+    @abstractmethod
+    def save(self, key: str, record: Dict[str, Any], ttl_seconds: int) -> None:
+        """Persist the completed response for a reserved key."""
+
+    @abstractmethod
+    def release(self, key: str) -> None:
+        """Drop a reservation so the request can be retried."""
+
+
+class InMemoryIdempotencyStore(IdempotencyStore):
+    """
+    Thread-safe, TTL-bounded in-memory store.
+
+    Entries expire lazily and the oldest entries are evicted once
+    ``max_entries`` is reached, so memory stays bounded under load.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def reserve(self, key: str, fingerprint: str, ttl_seconds: int) -> Optional[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            self._purge_expired(now)
+            existing = self._entries.get(key)
+            if existing is not None:
+                return dict(existing)
+
+            self._entries[key] = {
+                "fingerprint": fingerprint,
+                "completed": False,
+                "status_code": None,
+                "body": None,
+                "headers": None,
+                "expires_at": now + ttl_seconds
+            }
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+            return None
+
+    def save(self, key: str, record: Dict[str, Any], ttl_seconds: int) -> None:
+        with self._lock:
+            self._entries[key] = {**record, "expires_at": time.monotonic() + ttl_seconds}
+            self._entries.move_to_end(key)
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _purge_expired(self, now: float) -> None:
+        """Drop expired entries from the head of the insertion-ordered dict."""
+        while self._entries:
+            oldest_key, oldest = next(iter(self._entries.items()))
+            if oldest["expires_at"] > now:
+                break
+            self._entries.pop(oldest_key)
+
+
+class SupabaseIdempotencyStore(IdempotencyStore):
+    """
+    Persistent store backed by the idempotency_keys table.
+
+    Shares idempotency records across worker processes and restarts.
+    The primary key on ``key`` makes reservation atomic.
+    """
+
+    def __init__(self, supabase_client: Optional['Client'] = None):
+        if supabase_client:
+            self.supabase = supabase_client
+        else:
+            from services.supabase_client import SupabaseService
+            self.supabase = SupabaseService().client
+
+    def reserve(self, key: str, fingerprint: str, ttl_seconds: int) -> Optional[Dict[str, Any]]:
+        for _ in range(RESERVE_ATTEMPTS):
+            expires_at = datetime.now(timezone.utc) + timedelta(seconds=ttl_seconds)
+            try:
+                self.supabase.table("idempotency_keys").insert({
+                    "key": key,
+                    "fingerprint": fingerprint,
+                    "completed": False,
+                    "expires_at": expires_at.isoformat()
+                }).execute()
+                return None
+            except APIError as e:
+                if "duplicate key" not in str(e).lower():
+                    raise
+
+            result = self.supabase.table("idempotency_keys").select("*").eq("key", key).execute()
+            if not result.data:
+                continue  # released between our insert and select
+
+            record = result.data[0]
+            expired = datetime.fromisoformat(record["expires_at"].replace("Z", "+00:00")) <= datetime.now(timezone.utc)
+            if expired:
+                self.release(key)
+                continue
+
+            return {
+                "fingerprint": record["fingerprint"],
+                "completed": record["completed"],
+                "status_code": record.get("status_code"),
+                "body": record.get("response_body"),
+                "headers": record.get("response_headers")
+            }
+
+        # Other requests keep releasing or re-reserving the key
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is already in progress"
+        )
+
+    def save(self, key: str, record: Dict[str, Any], ttl_seconds: int) -> None:
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=ttl_seconds)
+        self.supabase.table("idempotency_keys").update({
+            "completed": True,
+            "status_code": record["status_code"],
+            "response_body": record["body"],
+            "response_headers": record.get("headers"),
+            "expires_at": expires_at.isoformat()
+        }).eq("key", key).execute()
+
+    def release(self, key: str) -> None:
+        self.supabase.table("idempotency_keys").delete().eq("key", key).execute()
+
+
+class IdempotencyService:
+    """
+    Coordinates reservation, replay and completion of idempotent requests.
+
+    Only successful responses are stored; failed requests release their
+    reservation so the client can retry with the same key.
+    """
+
+    def __init__(self, store: Optional[IdempotencyStore] = None, ttl_seconds: Optional[int] = None):
+        """Initialize idempotency service with an optional store override."""
+        if store is None:
+            if settings.idempotency_backend == "supabase":
+                store = SupabaseIdempotencyStore()
+            else:
+                store = InMemoryIdempotencyStore(max_entries=settings.idempotency_max_entries)
+        self.store = store
+        self.ttl_seconds = ttl_seconds or settings.idempotency_ttl_seconds
+
+    @staticmethod
+    def build_key(user_id: str, method: str, path: str, idempotency_key: str) -> str:
+        """Scope a client key to the user, method and path."""
+        return f"{user_id}:{method.upper()}:{path}:{idempotency_key}"
+
+    @staticmethod
+    def fingerprint(body: bytes) -> str:
+        """Hash the raw request body so key reuse with a new payload is detected."""
+        return hashlib.sha256(body or b"").hexdigest()
+
+    def begin(self, key: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """
+        Start an idempotent request.
+
+        Args:
+            key: Scoped idempotency key
+            fingerprint: Request payload fingerprint
+
+        Returns:
+            Completed record to replay, or None if the request should execute
+
+        Raises:
+            HTTPException: 422 if the key was used with a different payload,
+                409 if the original request is still in progress
+        """
+        existing = self.store.reserve(key, fingerprint, self.ttl_seconds)
+        if existing is None:
+            return None
+
+        if existing["fingerprint"] != fingerprint:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key was already used with a different request payload"
+            )
+
+        if not existing["completed"]:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key is already in progress"
+            )
+
+        logger.debug(f"Replaying stored response for idempotency key {key}")
+        return existing
+
+    def complete(self, key: str, fingerprint: str, status_code: int, body: Any = None,
+                 headers: Optional[Dict[str, str]] = None) -> None:
+        """Store the successful response (and headers to replay with it) for future replays."""
+        self.store.save(key, {
+            "fingerprint": fingerprint,
+            "completed": True,
+            "status_code": status_code,
+            "body": jsonable_encoder(body) if body is not None else None,
+            "headers": dict(headers) if headers else None
+        }, self.ttl_seconds)
+
+    def abandon(self, key: str) -> None:
+        """Release a reservation after a failed request."""
+        try:
+            self.store.release(key)
+        except Exception as e:
+            logger.error(f"Failed to release idempotency key {key}: {str(e)}")
+
+
+class IdempotencyGuard:
+    """
+    Per-request handle returned by the ``idempotency_guard`` dependency.
+
+    Endpoints return ``replay_response`` when it is set, otherwise execute
+    normally and call ``store`` with the response they are about to return.
+    """
+
+    def __init__(self, service: Optional[IdempotencyService] = None, key: Optional[str] = None,
+                 fingerprint: Optional[str] = None, record: Optional[Dict[str, Any]] = None):
+        self._service = service
+        self._key = key
+        self._fingerprint = fingerprint
+        self._record = record
+        self.pending = service is not None and record is None
+
+    @property
+    def replay_response(self) -> Optional[Response]:
+        """Stored response for a repeated key, or None."""
+        if self._record is None:
+            return None
+        headers = {**(self._record.get("headers") or {}), REPLAY_HEADER: "true"}
+        if self._record["body"] is None:
+            return Response(status_code=self._record["status_code"], headers=headers)
+        return JSONResponse(
+            status_code=self._record["status_code"],
+            content=self._record["body"],
+            headers=headers
+        )
+
+    def store(self, status_code: int, body: Any = None, headers: Optional[Dict[str, str]] = None) -> None:
+        """Record the successful response (and headers to replay, e.g. ETag) for this request's key."""
+        if not self.pending:
+            return
+        try:
+            self._service.complete(self._key, self._fingerprint, status_code, body, headers)
+        except Exception as e:
+            # Failing to store must not fail a request that already succeeded
+            logger.error(f"Failed to store idempotent response for {self._key}: {str(e)}")
+            self._service.abandon(self._key)
+        self.pending = False
+
+
+# Singleton instance for dependency injection
+_idempotency_service_instance = None
+_idempotency_service_lock = threading.Lock()
+
+
+def get_idempotency_service() -> IdempotencyService:
+    """
+    Get singleton IdempotencyService instance for dependency injection.
+
+    Returns:
+        IdempotencyService instance
+    """
+    global _idempotency_service_instance
+
+    if _idempotency_service_instance is None:
+        with _idempotency_service_lock:
+            if _idempotency_service_instance is None:  # Double-check locking
+                _idempotency_service_instance = IdempotencyService()
+
+    return _idempotency_service_instance
+
+
+async def idempotency_guard(
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    current_user: Dict[str, Any] = Depends(get_current_user)
+) -> AsyncGenerator[IdempotencyGuard, None]:
+    """
+    FastAPI dependency implementing Idempotency-Key handling.
+
+    Requests without the header pass straight through. Reservations that are
+    not completed by the endpoint (errors, exceptions) are released on exit.
+
+    Raises:
+        HTTPException: 400 for malformed keys, 409/422 from IdempotencyService.begin
+    """
+    if idempotency_key is None:
+        yield IdempotencyGuard()
+        return
+
+    idempotency_key = idempotency_key.strip()
+    if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters"
+        )
+
+    service = get_idempotency_service()
+    key = service.build_key(current_user["id"], request.method, request.url.path, idempotency_key)
+    fingerprint = service.fingerprint(await request.body())
+    record = service.begin(key, fingerprint)
+
+    guard = IdempotencyGuard(service, key, fingerprint, record)
+    try:
+        yield guard
+    finally:
+        if guard.pending:
+            service.abandon(key)
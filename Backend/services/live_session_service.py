@@ -0,0 +1,343 @@
+"""
+Live Session Service - Workout Change Fan-Out for Connected Devices
+
+Phones and watches following a workout subscribe to GET
+/workouts/{workout_id}/live (WebSocket) instead of polling the nested
+workout query. WorkoutService publishes a small delta for every workout,
+exercise and set mutation; the hub fans it out to the owner's open
+subscriptions:
+- Topics are user ids, so publishing needs nothing beyond what a write
+  already knows; each connection filters the deltas to its workout
+- Subscriptions are bounded queues; a subscriber that falls behind gets a
+  single ``resync`` event (refetch the workout) instead of unbounded memory
+- ``publish`` is synchronous and thread-safe, so services call it inline
+- Pluggable cross-worker backend: in-process only (default) or Postgres
+  LISTEN/NOTIFY so a write on one worker reaches devices on every worker.
+  While the backend is disconnected events are delivered to this worker
+  only and it reconnects with backoff; once back, every subscription gets a
+  ``resync`` because events from other workers may have been missed
+
+Deltas carry the same response models the REST endpoints return, with
+weights in the writing request's unit (the owner's preference).
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any, Set, Callable, AsyncIterator
+
+from core.config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+RESYNC_EVENT = "resync"
+NOTIFY_CHANNEL = "workout_live"
+# pg_notify payloads must stay below 8000 bytes
+MAX_NOTIFY_PAYLOAD_BYTES = 7900
+
+
+def build_event(event_type: str, data: Any = None, workout_id: Any = None,
+                workout_exercise_id: Any = None) -> Dict[str, Any]:
+    """Build a JSON-serialisable live event."""
+    if hasattr(data, "model_dump"):
+        data = data.model_dump(mode="json")
+    elif isinstance(data, list):
+        data = [item.model_dump(mode="json") if hasattr(item, "model_dump") else item for item in data]
+    return {
+        "type": event_type,
+        "workout_id": str(workout_id) if workout_id is not None else None,
+        "workout_exercise_id": str(workout_exercise_id) if workout_exercise_id is not None else None,
+        "data": data
+    }
+
+
+class LiveSubscription:
+    """One connection's bounded queue of events, owned by its event loop."""
+
+    def __init__(self, user_id: str, queue_size: int):
+        self.user_id = user_id
+        self._loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    async def get(self) -> Dict[str, Any]:
+        """Wait for the next event."""
+        return await self._queue.get()
+
+    def offer(self, event: Dict[str, Any]) -> None:
+        """Queue an event from any thread."""
+        self._loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event: Dict[str, Any]) -> None:
+        if self._queue.full():
+            # Too far behind for deltas to be useful: replace the backlog with a resync
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            event = build_event(RESYNC_EVENT)
+        self._queue.put_nowait(event)
+
+
+class LiveWorkoutView:
+    """Filters a user's events down to one workout, following its exercises."""
+
+    def __init__(self, workout_id: Any, workout_exercise_ids: Set[str]):
+        self.workout_id = str(workout_id)
+        self.workout_exercise_ids = set(workout_exercise_ids)
+
+    def accepts(self, event: Dict[str, Any]) -> bool:
+        """Whether an event concerns this workout (resyncs always do)."""
+        if event["type"] == RESYNC_EVENT:
+            return True
+        if event.get("workout_id") == self.workout_id:
+            if event.get("workout_exercise_id"):
+                if event["type"] == "exercise_removed":
+                    self.workout_exercise_ids.discard(event["workout_exercise_id"])
+                else:
+                    self.workout_exercise_ids.add(event["workout_exercise_id"])
+            return True
+        return event.get("workout_exercise_id") in self.workout_exercise_ids
+
+
+class LiveHubBackend(ABC):
+    """
+    Cross-worker transport interface.
+
+    ``publish`` hands an event to every worker (including this one); each
+    worker passes events it receives to the ``deliver`` callback given to
+    ``start``, and calls ``resync`` after an outage in which events may have
+    been missed.
+    """
+
+    @abstractmethod
+    async def start(self, deliver: Callable[[str, Dict[str, Any]], None], resync: Callable[[], None]) -> None:
+        """Connect and start receiving events."""
+
+    @abstractmethod
+    async def stop(self) -> None:
+        """Disconnect."""
+
+    @abstractmethod
+    def publish(self, user_id: str, event: Dict[str, Any]) -> bool:
+        """Send an event from any thread; False if the backend is not connected."""
+
+
+class PostgresLiveHubBackend(LiveHubBackend):
+    """
+    LISTEN/NOTIFY transport over a dedicated asyncpg connection.
+
+    A closed connection, a failed NOTIFY or a terminated listener starts a
+    reconnect loop with exponential backoff; events published meanwhile are
+    delivered to this worker only.
+    """
+
+    def __init__(self, dsn: str, channel: str = NOTIFY_CHANNEL, reconnect_backoff_seconds: float = 1.0,
+                 max_reconnect_backoff_seconds: float = 30.0):
+        self._dsn = dsn
+        self._channel = channel
+        self._reconnect_backoff_seconds = reconnect_backoff_seconds
+        self._max_reconnect_backoff_seconds = max_reconnect_backoff_seconds
+        self._connection = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._deliver: Optional[Callable[[str, Dict[str, Any]], None]] = None
+        self._resync: Optional[Callable[[], None]] = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    async def start(self, deliver: Callable[[str, Dict[str, Any]], None], resync: Callable[[], None]) -> None:
+        self._deliver = deliver
+        self._resync = resync
+        self._loop = asyncio.get_running_loop()
+        self._stopping = False
+        try:
+            await self._connect()
+        except Exception as e:
+            logger.error(f"Live hub backend unavailable, delivering to this worker only until reconnected: {str(e)}")
+            self._start_reconnect()
+
+    async def stop(self) -> None:
+        self._stopping = True
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            await asyncio.gather(self._reconnect_task, return_exceptions=True)
+            self._reconnect_task = None
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            await connection.close()
+
+    def publish(self, user_id: str, event: Dict[str, Any]) -> bool:
+        if self._loop is None:
+            return False
+        connection = self._connection
+        if connection is None or connection.is_closed():
+            self._loop.call_soon_threadsafe(self._start_reconnect)
+            return False
+
+        payload = json.dumps({"user_id": user_id, "event": event}, default=str)
+        if len(payload.encode()) > MAX_NOTIFY_PAYLOAD_BYTES:
+            payload = json.dumps({"user_id": user_id, "event": build_event(RESYNC_EVENT)})
+        future = asyncio.run_coroutine_threadsafe(
+            connection.execute("SELECT pg_notify($1, $2)", self._channel, payload), self._loop
+        )
+        future.add_done_callback(lambda done: self._after_notify(done, user_id, event))
+        return True
+
+    async def _connect(self) -> None:
+        import asyncpg
+
+        connection = await asyncpg.connect(self._dsn)
+        try:
+            await connection.add_listener(self._channel, self._on_notify)
+        except Exception:
+            connection.terminate()
+            raise
+        connection.add_termination_listener(self._on_terminated)
+        self._connection = connection
+        logger.info(f"Live hub listening on channel {self._channel}")
+
+    def _start_reconnect(self) -> None:
+        """Start the reconnect loop unless it is already running (event loop only)."""
+        if self._stopping or (self._reconnect_task is not None and not self._reconnect_task.done()):
+            return
+        self._reconnect_task = self._loop.create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            connection.terminate()
+
+        delay = self._reconnect_backoff_seconds
+        while not self._stopping:
+            try:
+                await self._connect()
+            except Exception as e:
+                logger.warning(f"Live hub reconnect failed, retrying in {delay}s: {str(e)}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self._max_reconnect_backoff_seconds)
+            else:
+                # Events other workers sent while this one was not listening are lost
+                self._resync()
+                return
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        message = json.loads(payload)
+        self._deliver(message["user_id"], message["event"])
+
+    def _on_terminated(self, connection) -> None:
+        if connection is self._connection and not self._stopping:
+            logger.warning("Live hub connection lost, reconnecting")
+            self._start_reconnect()
+
+    def _after_notify(self, future, user_id: str, event: Dict[str, Any]) -> None:
+        """Deliver locally and reconnect if NOTIFY failed (runs on the event loop)."""
+        if future.cancelled() or future.exception() is None:
+            return
+        logger.error(f"Live event notify failed, delivering to this worker only: {str(future.exception())}")
+        self._deliver(user_id, event)
+        self._start_reconnect()
+
+
+class LiveHub:
+    """
+    Per-process pub/sub hub keyed by user id.
+
+    Publishing with no subscribers (and no backend) is a dictionary lookup,
+    so services publish unconditionally.
+    """
+
+    def __init__(self, backend: Optional[LiveHubBackend] = None, queue_size: int = 256):
+        self._backend = backend
+        self._queue_size = queue_size
+        self._subscriptions: Dict[str, Set[LiveSubscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    async def start(self) -> None:
+        """Start the cross-worker backend, if any (falls back to this worker only if it cannot connect)."""
+        if self._backend is not None:
+            try:
+                await self._backend.start(self.deliver, self.resync_all)
+            except Exception as e:
+                logger.error(f"Live hub backend unavailable, delivering to this worker only: {str(e)}")
+
+    async def stop(self) -> None:
+        """Stop the cross-worker backend, if any."""
+        if self._backend is not None:
+            await self._backend.stop()
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: Any) -> AsyncIterator[LiveSubscription]:
+        """Receive the user's events for the duration of the block."""
+        subscription = LiveSubscription(str(user_id), self._queue_size)
+        with self._lock:
+            self._subscriptions[subscription.user_id].add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                subscribers = self._subscriptions.get(subscription.user_id)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscriptions[subscription.user_id]
+
+    def publish(self, user_id: Any, event_type: str, data: Any = None, workout_id: Any = None,
+                workout_exercise_id: Any = None) -> None:
+        """
+        Publish a change to the user's subscribers on every worker.
+
+        Never raises: live updates must not fail the write that caused them.
+        """
+        try:
+            event = build_event(event_type, data, workout_id, workout_exercise_id)
+            if self._backend is None or not self._backend.publish(str(user_id), event):
+                self.deliver(str(user_id), event)
+        except Exception as e:
+            logger.error(f"Live event publish failed for {event_type}: {str(e)}")
+
+    def deliver(self, user_id: str, event: Dict[str, Any]) -> None:
+        """Hand an event to this worker's subscriptions for the user."""
+        with self._lock:
+            subscribers = list(self._subscriptions.get(user_id, ()))
+        for subscription in subscribers:
+            subscription.offer(event)
+
+    def resync_all(self) -> None:
+        """Send every subscription in this worker a resync (events may have been missed)."""
+        with self._lock:
+            subscriptions = [subscription for subscribers in self._subscriptions.values() for subscription in subscribers]
+        event = build_event(RESYNC_EVENT)
+        for subscription in subscriptions:
+            subscription.offer(event)
+
+    def subscriber_count(self) -> int:
+        """Open subscriptions in this worker."""
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscriptions.values())
+
+
+# Singleton hub shared by services, the live endpoint and the app lifespan
+_live_hub = None
+_live_hub_lock = threading.Lock()
+
+
+def get_live_hub() -> LiveHub:
+    """
+    Get singleton LiveHub instance.
+
+    Returns:
+        LiveHub instance (Postgres-backed when live_hub_backend is "postgres")
+    """
+    global _live_hub
+
+    if _live_hub is None:
+        with _live_hub_lock:
+            if _live_hub is None:  # Double-check locking
+                backend = None
+                if settings.live_hub_backend == "postgres" and settings.database_url:
+                    backend = PostgresLiveHubBackend(settings.database_url)
+                _live_hub = LiveHub(backend=backend, queue_size=settings.live_hub_queue_size)
+
+    return _live_hub
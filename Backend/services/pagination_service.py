@@ -0,0 +1,40 @@
+"""
+Pagination Service - Complete Reads Past PostgREST's Row Cap
+
+PostgREST truncates every response at its ``max_rows`` setting (1000 by
+default) without an error, so a select over a user's whole history can
+silently drop rows. Full-history reads (record rebuilds, analytics
+progression and load) page through the result with ``.range()`` instead:
+- Pages of ``query_page_size`` rows, ordered on a unique column so pages
+  neither overlap nor skip rows
+- A short page ends the read, so histories under one page cost one request
+"""
+
+from typing import Optional, List, Dict, Any, Callable
+
+from core.config import settings
+
+
+def fetch_all_rows(build_query: Callable[[], Any], order_column: str = "id",
+                   page_size: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Read every row of a select, one page at a time.
+
+    ``.range()`` adds parameters to the builder it is called on, so each
+    page is requested from a fresh builder.
+
+    Args:
+        build_query: Returns a new filtered select builder (without order or range)
+        order_column: Unique column the pages are ordered by
+        page_size: Rows per page (defaults to ``query_page_size``)
+
+    Returns:
+        All rows of the select
+    """
+    page_size = page_size or settings.query_page_size
+    rows: List[Dict[str, Any]] = []
+    while True:
+        page = build_query().order(order_column).range(len(rows), len(rows) + page_size - 1).execute().data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
@@ -0,0 +1,484 @@
+"""
+Personal Record Service - Incremental Personal Record Tracking
+
+Maintains per-(user, exercise) bests in the personal_records table:
+- Candidate records computed from each completed set as it is written
+- Atomic "only if better" application via the apply_personal_records function
+- Bounded recompute from one exercise's history (hot sets and archived
+  workouts' set rows) when a record-holding set is updated or deleted
+- Primary-key lookups for the /records endpoints
+
+WorkoutService calls the maintenance methods after set writes; reads never
+scan the user's sets. The personal_records workout event log consumer
+replays the same maintenance from the log, catching up on updates the
+post-write background task never finished. Values are integers in the sets' storage units (grams,
+gram-reps, centimetres) and are converted to the user's weight unit on read.
+"""
+
+import logging
+from collections import defaultdict
+from typing import Optional, List, Dict, Any, Iterable, Tuple, TYPE_CHECKING
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from postgrest.exceptions import APIError
+
+from models.auth import WeightUnit
+from models.event import WorkoutEvent, WorkoutEventType
+from models.record import RecordType, PersonalRecordResponse, ExerciseRecordsResponse
+from services.pagination_service import fetch_all_rows
+from services.unit_service import grams_to_weight, cm_to_meters
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Epley estimates become unreliable for high-rep sets
+ESTIMATED_1RM_MAX_REPS = 12
+
+# Set fields that can change a set's record candidates
+RECORD_FIELDS = frozenset({"reps", "weight_grams", "duration", "distance_cm", "completed"})
+
+# Columns needed to rebuild records from one exercise's history
+HISTORY_SELECT = (
+    "id, reps, weight_grams, duration, distance_cm, completed, completed_at, created_at, "
+    "workout_exercises!inner(workout_id, exercise_id)"
+)
+
+# Columns needed to re-apply a set's records from the event log
+EVENT_SET_SELECT = (
+    "id, user_id, reps, weight_grams, duration, distance_cm, completed, completed_at, created_at, "
+    "workout_exercises!inner(workout_id, exercise_id)"
+)
+
+# Rows read per in_() lookup (ids travel in the query string)
+ID_LOOKUP_BATCH_SIZE = 100
+
+# Workout event log consumer name (its offset is stored under this name)
+RECORDS_EVENT_CONSUMER = "personal_records"
+
+# Record types whose values are weights (grams, or gram-reps for volume)
+WEIGHT_RECORD_TYPES = frozenset({
+    RecordType.MAX_WEIGHT.value, RecordType.ESTIMATED_1RM.value, RecordType.MAX_VOLUME_SET.value
+})
+
+
+def estimated_one_rep_max(weight_grams: int, reps: int) -> int:
+    """Epley estimate of the one-rep max for a set, rounded to whole grams."""
+    if reps == 1:
+        return weight_grams
+    return (weight_grams * (30 + reps) + 15) // 30
+
+
+def weight_qualifier(weight_grams: Optional[int]) -> str:
+    """Weight key for max_reps_at_weight records, in grams ('0' for bodyweight)."""
+    return str(weight_grams or 0)
+
+
+def record_candidates(set_record: Dict[str, Any], workout_id: Any) -> List[Dict[str, Any]]:
+    """
+    Compute the record candidates a single set qualifies for.
+
+    Args:
+        set_record: Set row (reps, weight_grams, duration, distance_cm, completed, timestamps)
+        workout_id: Workout the set belongs to
+
+    Returns:
+        Candidate dicts ready for apply_personal_records; empty for uncompleted sets
+    """
+    if not set_record.get("completed"):
+        return []
+
+    reps = set_record.get("reps")
+    weight = set_record.get("weight_grams")
+    duration = set_record.get("duration")
+    distance = set_record.get("distance_cm")
+
+    values: List[Tuple[RecordType, int, str]] = []
+    if weight:
+        values.append((RecordType.MAX_WEIGHT, weight, ""))
+    if reps:
+        values.append((RecordType.MAX_REPS_AT_WEIGHT, reps, weight_qualifier(weight)))
+    if reps and weight:
+        values.append((RecordType.MAX_VOLUME_SET, weight * reps, ""))
+        if reps <= ESTIMATED_1RM_MAX_REPS:
+            values.append((RecordType.ESTIMATED_1RM, estimated_one_rep_max(weight, reps), ""))
+    if distance:
+        values.append((RecordType.LONGEST_DISTANCE, distance, ""))
+    if duration:
+        values.append((RecordType.LONGEST_DURATION, duration, ""))
+
+    achieved_at = set_record.get("completed_at") or set_record.get("created_at")
+    return [
+        {
+            "record_type": record_type.value,
+            "qualifier": qualifier,
+            "value": value,
+            "set_id": str(set_record["id"]),
+            "workout_id": str(workout_id),
+            "achieved_at": achieved_at
+        }
+        for record_type, value, qualifier in values
+    ]
+
+
+def best_candidates(candidates: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Reduce candidates to the best (earliest on ties) per record type and qualifier."""
+    best: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for candidate in candidates:
+        key = (candidate["record_type"], candidate["qualifier"])
+        current = best.get(key)
+        if (current is None or candidate["value"] > current["value"]
+                or (candidate["value"] == current["value"] and candidate["achieved_at"] < current["achieved_at"])):
+            best[key] = candidate
+    return list(best.values())
+
+
+class RecordService:
+    """
+    Personal record service handling incremental maintenance and lookups.
+
+    All queries filter by user_id explicitly because the backend client
+    uses the service role key, which bypasses RLS.
+    """
+
+    def __init__(self, supabase_client: Optional['Client'] = None):
+        """Initialize record service with optional Supabase client."""
+        if supabase_client:
+            self.supabase = supabase_client
+        else:
+            from services.supabase_client import SupabaseService
+            self.supabase = SupabaseService().client
+
+    def record_set(self, user_id: UUID, exercise_id: UUID, workout_id: UUID,
+                   set_record: Dict[str, Any]) -> List[PersonalRecordResponse]:
+        """
+        Apply a newly written set's candidates to the user's records.
+
+        Args:
+            user_id: User's unique identifier
+            exercise_id: Exercise the set was performed for
+            workout_id: Workout the set belongs to
+            set_record: Written set row
+
+        Returns:
+            Records that were set or improved by this set
+        """
+        candidates = record_candidates(set_record, workout_id)
+        if not candidates:
+            return []
+        return self._apply(user_id, exercise_id, candidates)
+
+    def refresh_for_set(self, user_id: UUID, exercise_id: UUID, workout_id: UUID,
+                        set_record: Dict[str, Any]) -> List[PersonalRecordResponse]:
+        """
+        Update records after a set was edited.
+
+        Records the set held are rebuilt from history (its values may have
+        dropped), then its new candidates are applied.
+        """
+        self._rebuild_held_records(user_id, exercise_id, set_id=set_record["id"])
+        return self.record_set(user_id, exercise_id, workout_id, set_record)
+
+    def remove_set(self, user_id: UUID, exercise_id: UUID, set_id: UUID) -> None:
+        """Rebuild any records held by a deleted set from the remaining history."""
+        self._rebuild_held_records(user_id, exercise_id, set_id=set_id)
+
+    def remove_workout_exercise(self, user_id: UUID, workout_id: UUID, exercise_id: UUID) -> None:
+        """Rebuild records held by the sets of an exercise removed from a workout."""
+        held = self.supabase.table("personal_records").delete().eq(
+            "user_id", str(user_id)
+        ).eq(
+            "exercise_id", str(exercise_id)
+        ).eq(
+            "workout_id", str(workout_id)
+        ).execute()
+
+        if held.data:
+            self._rebuild(user_id, exercise_id, held.data)
+
+    def remove_workout(self, user_id: UUID, workout_id: UUID) -> None:
+        """Rebuild records held by any set of a deleted workout."""
+        held = self.supabase.table("personal_records").delete().eq(
+            "user_id", str(user_id)
+        ).eq(
+            "workout_id", str(workout_id)
+        ).execute()
+
+        held_by_exercise: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for record in held.data or []:
+            held_by_exercise[record["exercise_id"]].append(record)
+
+        for exercise_id, records in held_by_exercise.items():
+            self._rebuild(user_id, exercise_id, records)
+
+    def apply_events(self, events: List[WorkoutEvent]) -> None:
+        """
+        Replay record maintenance for a batch of workout event log events.
+
+        Logged and updated sets are re-read so the current row is applied,
+        never a stale payload; sets that no longer exist are skipped (their
+        workout or exercise removal has its own event). Every step is safe
+        to repeat, as at-least-once delivery requires.
+        """
+        workouts: Dict[str, UUID] = {}
+        exercises: Dict[Tuple[str, str], UUID] = {}
+        deleted_sets: Dict[str, Tuple[UUID, str]] = {}
+        written_sets: Dict[str, WorkoutEventType] = {}
+
+        for event in events:
+            entity_id = str(event.entity_id)
+            if event.event_type == WorkoutEventType.WORKOUT_DELETED:
+                workouts[entity_id] = event.user_id
+            elif event.event_type == WorkoutEventType.EXERCISE_REMOVED:
+                key = (event.payload["workout_id"], event.payload["exercise_id"])
+                exercises[key] = event.user_id
+            elif event.event_type == WorkoutEventType.SET_DELETED:
+                written_sets.pop(entity_id, None)
+                deleted_sets[entity_id] = (event.user_id, event.payload["workout_exercise_id"])
+            elif event.event_type in (WorkoutEventType.SET_LOGGED, WorkoutEventType.SET_UPDATED):
+                if written_sets.get(entity_id) != WorkoutEventType.SET_UPDATED:
+                    written_sets[entity_id] = event.event_type
+
+        for workout_id, user_id in workouts.items():
+            self.remove_workout(user_id, workout_id)
+        for (workout_id, exercise_id), user_id in exercises.items():
+            self.remove_workout_exercise(user_id, workout_id, exercise_id)
+
+        exercise_ids = self._exercise_ids({workout_exercise_id for _, workout_exercise_id in deleted_sets.values()})
+        for set_id, (user_id, workout_exercise_id) in deleted_sets.items():
+            if workout_exercise_id in exercise_ids:
+                self.remove_set(user_id, exercise_ids[workout_exercise_id], set_id)
+
+        set_ids = sorted(written_sets)
+        for start in range(0, len(set_ids), ID_LOOKUP_BATCH_SIZE):
+            rows = self.supabase.table("sets").select(EVENT_SET_SELECT).in_(
+                "id", set_ids[start:start + ID_LOOKUP_BATCH_SIZE]
+            ).execute()
+            for set_record in rows.data or []:
+                user_id = set_record["user_id"]
+                exercise_id = set_record["workout_exercises"]["exercise_id"]
+                workout_id = set_record["workout_exercises"]["workout_id"]
+                if written_sets[set_record["id"]] == WorkoutEventType.SET_UPDATED:
+                    self.refresh_for_set(user_id, exercise_id, workout_id, set_record)
+                else:
+                    self.record_set(user_id, exercise_id, workout_id, set_record)
+
+    def get_user_records(self, user_id: UUID, record_type: Optional[RecordType] = None,
+                         weight_unit: WeightUnit = WeightUnit.KG) -> List[ExerciseRecordsResponse]:
+        """
+        Get all personal records for user, grouped by exercise.
+
+        Args:
+            user_id: User's unique identifier
+            record_type: Optional filter by record type
+            weight_unit: Unit to report weights in
+
+        Returns:
+            Records grouped by exercise
+
+        Raises:
+            HTTPException: If record retrieval fails
+        """
+        try:
+            query_builder = self.supabase.table("personal_records").select("*").eq("user_id", str(user_id))
+            if record_type is not None:
+                query_builder = query_builder.eq("record_type", RecordType(record_type).value)
+            result = query_builder.order("exercise_id").execute()
+
+            grouped: Dict[str, List[PersonalRecordResponse]] = defaultdict(list)
+            for record in result.data or []:
+                grouped[record["exercise_id"]].append(self._convert_to_record_response(record, weight_unit))
+
+            return [
+                ExerciseRecordsResponse(exercise_id=exercise_id, records=records)
+                for exercise_id, records in grouped.items()
+            ]
+
+        except APIError as e:
+            logger.error(f"Database error retrieving personal records: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Database error during record retrieval"
+            )
+        except Exception as e:
+            logger.error(f"Unexpected error retrieving personal records: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Record retrieval failed"
+            )
+
+    def get_exercise_records(self, user_id: UUID, exercise_id: UUID,
+                             weight_unit: WeightUnit = WeightUnit.KG) -> ExerciseRecordsResponse:
+        """
+        Get personal records for one exercise (primary-key prefix lookup).
+
+        Args:
+            user_id: User's unique identifier
+            exercise_id: Exercise's unique identifier
+            weight_unit: Unit to report weights in
+
+        Returns:
+            Records for the exercise (empty if the user has none yet)
+
+        Raises:
+            HTTPException: If record retrieval fails
+        """
+        try:
+            result = self.supabase.table("personal_records").select("*").eq(
+                "user_id", str(user_id)
+            ).eq(
+                "exercise_id", str(exercise_id)
+            ).execute()
+
+            return ExerciseRecordsResponse(
+                exercise_id=exercise_id,
+                records=[self._convert_to_record_response(record, weight_unit) for record in result.data or []]
+            )
+
+        except APIError as e:
+            logger.error(f"Database error retrieving exercise records: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Database error during record retrieval"
+            )
+        except Exception as e:
+            logger.error(f"Unexpected error retrieving exercise records: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Record retrieval failed"
+            )
+
+    def _apply(self, user_id: UUID, exercise_id: Any, candidates: List[Dict[str, Any]]) -> List[PersonalRecordResponse]:
+        """Apply candidates through apply_personal_records and return improved records."""
+        result = self.supabase.rpc("apply_personal_records", {
+            "p_user_id": str(user_id),
+            "p_exercise_id": str(exercise_id),
+            "p_candidates": candidates
+        }).execute()
+
+        improved = [self._convert_to_record_response(record) for record in result.data or []]
+        if improved:
+            logger.info(f"{len(improved)} personal records set for user {user_id} on exercise {exercise_id}")
+        return improved
+
+    def _rebuild_held_records(self, user_id: UUID, exercise_id: Any, set_id: Any) -> None:
+        """Drop the records a set holds and rebuild just those from history."""
+        held = self.supabase.table("personal_records").delete().eq(
+            "user_id", str(user_id)
+        ).eq(
+            "exercise_id", str(exercise_id)
+        ).eq(
+            "set_id", str(set_id)
+        ).execute()
+
+        if held.data:
+            self._rebuild(user_id, exercise_id, held.data)
+
+    def _rebuild(self, user_id: UUID, exercise_id: Any, held_records: List[Dict[str, Any]]) -> None:
+        """
+        Recompute the given record keys from one exercise's completed sets.
+
+        Bounded to a single (user, exercise) pair and only runs when a
+        record-holding set changed, so normal writes stay incremental.
+        """
+        keys = {(record["record_type"], record["qualifier"]) for record in held_records}
+
+        hot = fetch_all_rows(lambda: self.supabase.table("sets").select(HISTORY_SELECT).eq(
+            "completed", True
+        ).eq(
+            "workout_exercises.exercise_id", str(exercise_id)
+        ).eq(
+            "user_id", str(user_id)
+        ))
+
+        history = [(set_record, set_record["workout_exercises"]["workout_id"]) for set_record in hot]
+        history.extend(self._archived_history(user_id, exercise_id))
+
+        candidates = [
+            candidate
+            for set_record, workout_id in history
+            for candidate in record_candidates(set_record, workout_id)
+            if (candidate["record_type"], candidate["qualifier"]) in keys
+        ]
+
+        logger.debug(f"Rebuilding {len(keys)} personal records for exercise {exercise_id} from {len(history)} sets")
+        if candidates:
+            self._apply(user_id, exercise_id, best_candidates(candidates))
+
+    def _archived_history(self, user_id: UUID, exercise_id: Any) -> List[Tuple[Dict[str, Any], str]]:
+        """
+        Completed set rows of one exercise in the user's archived workouts.
+
+        Archived sets live in one row per workout, so the exercise's
+        archive summaries select which rows to read and which of their
+        sets belong to the exercise.
+        """
+        summaries = fetch_all_rows(lambda: self.supabase.table("workout_exercise_summaries").select(
+            "workout_exercise_id, workout_id"
+        ).eq(
+            "user_id", str(user_id)
+        ).eq(
+            "exercise_id", str(exercise_id)
+        ).gt(
+            "completed_sets", 0
+        ), order_column="workout_exercise_id")
+
+        workout_exercise_ids = {summary["workout_exercise_id"] for summary in summaries}
+        workout_ids = sorted({summary["workout_id"] for summary in summaries})
+
+        history: List[Tuple[Dict[str, Any], str]] = []
+        for start in range(0, len(workout_ids), ID_LOOKUP_BATCH_SIZE):
+            archives = self.supabase.table("archived_workout_sets").select("workout_id, sets").eq(
+                "user_id", str(user_id)
+            ).in_(
+                "workout_id", workout_ids[start:start + ID_LOOKUP_BATCH_SIZE]
+            ).execute()
+            history.extend(
+                (set_record, archive["workout_id"])
+                for archive in archives.data or []
+                for set_record in archive["sets"]
+                if set_record.get("completed") and set_record["workout_exercise_id"] in workout_exercise_ids
+            )
+        return history
+
+    def _exercise_ids(self, workout_exercise_ids: Iterable[str]) -> Dict[str, str]:
+        """Exercise IDs of existing workout exercises, keyed by workout exercise ID."""
+        ids = sorted(workout_exercise_ids)
+        exercise_ids: Dict[str, str] = {}
+        for start in range(0, len(ids), ID_LOOKUP_BATCH_SIZE):
+            rows = self.supabase.table("workout_exercises").select("id, exercise_id").in_(
+                "id", ids[start:start + ID_LOOKUP_BATCH_SIZE]
+            ).execute()
+            exercise_ids.update((row["id"], row["exercise_id"]) for row in rows.data or [])
+        return exercise_ids
+
+    def _convert_to_record_response(self, record: Dict[str, Any],
+                                    weight_unit: WeightUnit = WeightUnit.KG) -> PersonalRecordResponse:
+        """Convert database record to PersonalRecordResponse in the given weight unit."""
+        record_type = record["record_type"]
+        value = record["value"]
+        qualifier = record.get("qualifier") or ""
+        if record_type in WEIGHT_RECORD_TYPES:
+            value = grams_to_weight(value, weight_unit)
+        elif record_type == RecordType.LONGEST_DISTANCE.value:
+            value = cm_to_meters(value)
+        elif record_type == RecordType.MAX_REPS_AT_WEIGHT.value and qualifier:
+            qualifier = f"{grams_to_weight(int(qualifier), weight_unit):.2f}"
+
+        return PersonalRecordResponse(
+            exercise_id=record["exercise_id"],
+            record_type=record_type,
+            qualifier=qualifier,
+            value=value,
+            set_id=record["set_id"],
+            workout_id=record["workout_id"],
+            achieved_at=record["achieved_at"]
+        )
+
+
+def reconcile_records_from_events(events: List[WorkoutEvent]) -> None:
+    """Workout event log consumer keeping personal records in step with set writes."""
+    RecordService().apply_events(events)
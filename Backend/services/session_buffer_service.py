@@ -0,0 +1,515 @@
+"""
+Session Buffer Service - Write-Behind Set Logging for the Active Workout
+
+In active-session mode (``session_buffer_enabled``) set creates and updates
+for a user's active workout are acknowledged once they are appended to a
+local append-only journal, instead of after a PostgREST round trip:
+- The first write opens a session: one read loads the workout tree as a
+  snapshot, which then serves set writes and reads of that workout, and
+  the user's weight unit is read once and pinned to convert its weights
+- Each acknowledged write is appended (and fsynced) to a JSON-lines journal
+  before the response is sent, then applied to the snapshot
+- A scheduled job flushes pending writes every
+  ``session_buffer_flush_interval_seconds``: new sets with one insert, then
+  each update in order
+- Completing or otherwise changing the workout (PUT /workouts/{id}, exercise
+  changes, deletes) flushes and closes the session first, as does shutdown
+- On startup, journal entries not marked as flushed are replayed
+
+Set ids and completed_at are assigned when a set is buffered, so replaying a
+create that already reached the database is a no-op. Updates write absolute
+values; replaying one can only bump the row version an extra time, which at
+worst makes a client's next If-Match fail with 409 and reload.
+
+Sessions and journals are per process: run a single worker (or route a
+user's requests to one worker) when the mode is enabled. Live subscribers
+get buffered writes as they are acknowledged; analytics and records see
+them after the next flush.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Optional, Dict, Any, List, TYPE_CHECKING
+from uuid import UUID, uuid4
+
+from fastapi import HTTPException, status
+
+from core.config import settings
+from models.auth import WeightUnit
+from models.workout import CreateSetRequest, UpdateSetRequest, SetResponse, WorkoutWithExercisesResponse
+from services.live_session_service import get_live_hub
+from services.set_coalescing_service import get_set_write_coalescer
+from services.unit_service import resolve_weight_unit
+
+if TYPE_CHECKING:
+    from services.workout_service import WorkoutService
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class SessionJournal:
+    """
+    Append-only JSON-lines journal of acknowledged buffered writes.
+
+    Every entry carries an increasing ``seq``. ``flushed`` markers record that
+    a user's entries up to a sequence number reached the database; the file
+    is truncated whenever nothing is pending.
+    """
+
+    def __init__(self, path: str, fsync: bool = True):
+        self._path = path
+        self._fsync = fsync
+        self._seq = 0
+        self._file = None
+
+    def append(self, entry: Dict[str, Any]) -> int:
+        """Durably append an entry and return its sequence number."""
+        if self._file is None:
+            directory = os.path.dirname(self._path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self._path, "a", encoding="utf-8")
+
+        self._seq += 1
+        self._file.write(json.dumps(dict(entry, seq=self._seq), default=str) + "\n")
+        self._file.flush()
+        if self._fsync:
+            os.fsync(self._file.fileno())
+        return self._seq
+
+    def mark_flushed(self, user_id: Any, through_seq: int) -> None:
+        """Record that a user's entries up to ``through_seq`` are in the database."""
+        self.append({"op": "flushed", "user_id": str(user_id), "through": through_seq})
+
+    def reset(self) -> None:
+        """Truncate the journal once every entry is in the database."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        open(self._path, "w", encoding="utf-8").close()
+
+    def read_unflushed(self) -> List[Dict[str, Any]]:
+        """
+        Entries not covered by a ``flushed`` marker, in journal order.
+
+        A torn last line (crash mid-append) was never acknowledged and is skipped.
+        """
+        if not os.path.exists(self._path):
+            return []
+
+        entries = []
+        with open(self._path, encoding="utf-8") as journal:
+            for line in journal:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping torn session journal line in {self._path}")
+        if entries:
+            self._seq = max(self._seq, max(entry["seq"] for entry in entries))
+
+        flushed_through: Dict[str, int] = defaultdict(int)
+        for entry in entries:
+            if entry["op"] == "flushed":
+                flushed_through[entry["user_id"]] = max(flushed_through[entry["user_id"]], entry["through"])
+        return [
+            entry for entry in entries
+            if entry["op"] != "flushed" and entry["seq"] > flushed_through[entry["user_id"]]
+        ]
+
+
+class _ActiveSession:
+    """Snapshot and pending writes of one user's active workout."""
+
+    def __init__(self, service: "WorkoutService", user_id: UUID, snapshot: Dict[str, Any], weight_unit: WeightUnit):
+        self.service = service
+        self.user_id = str(user_id)
+        self.workout_id = str(snapshot["id"])
+        self.snapshot = snapshot
+        self.weight_unit = weight_unit  # converts buffered weights; read once when the session opens
+        self.exercises: Dict[str, Dict[str, Any]] = {}
+        self.rows: Dict[str, Dict[str, Any]] = {}
+        for we_record in snapshot.get("workout_exercises") or []:
+            we_record["sets"] = list(we_record.get("sets") or [])
+            self.exercises[str(we_record["exercise_id"])] = we_record
+            for row in we_record["sets"]:
+                self.rows[str(row["id"])] = row
+        self.created: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.updated: List[Dict[str, Any]] = []
+        self.last_seq = 0
+        self.last_write = time.monotonic()
+        self.resync = False
+
+    @property
+    def pending(self) -> bool:
+        return bool(self.created or self.updated)
+
+
+class SessionBuffer:
+    """
+    Per-process write-behind buffer for users' active workouts.
+
+    Writes and reads happen on the event loop (or request threads) while
+    flushes run in the scheduler thread, so session state is guarded by a
+    lock; flushes are serialized by a second lock so a session never has
+    two batches in flight.
+    """
+
+    def __init__(self, journal: Optional[SessionJournal] = None, enabled: bool = False,
+                 idle_close_seconds: float = 600):
+        self._journal = journal
+        self._enabled = enabled and journal is not None
+        self._idle_close_seconds = idle_close_seconds
+        self._sessions: Dict[str, _ActiveSession] = {}
+        self._recovered: Dict[str, List[Dict[str, Any]]] = {}
+        self._recovery_service: Optional["WorkoutService"] = None
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether active-session mode is on."""
+        return self._enabled
+
+    def add_set_to_exercise(self, service: "WorkoutService", user_id: UUID, workout_id: UUID, exercise_id: UUID,
+                            set_data: CreateSetRequest,
+                            weight_unit: WeightUnit = WeightUnit.KG) -> Optional[SetResponse]:
+        """
+        Buffer a new set for the user's active workout.
+
+        Returns:
+            The acknowledged set, or None if the workout is not buffered (the caller writes through)
+
+        Raises:
+            HTTPException: 404 if the exercise is not in the workout
+        """
+        for _ in range(2):
+            session = self._session_for(service, user_id, workout_id)
+            if session is None:
+                return None
+
+            with self._lock:
+                if self._sessions.get(session.user_id) is not session:
+                    continue  # closed by a concurrent flush; open it again
+
+                we_record = session.exercises.get(str(exercise_id))
+                if we_record is None:
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail="Exercise not found in workout"
+                    )
+
+                next_order = max((row["order_index"] for row in we_record["sets"]), default=-1) + 1
+                row = service.build_set_insert(we_record["id"], next_order, set_data, session.weight_unit)
+                row["id"] = str(uuid4())
+                row["created_at"] = row["completed_at"]
+
+                entry = {"exercise_id": str(exercise_id), "workout_id": session.workout_id, "row": row}
+                session.last_seq = self._journal.append(dict(entry, op="create", user_id=session.user_id))
+
+                snapshot_row = dict(row, user_id=session.user_id, version=1)
+                we_record["sets"].append(snapshot_row)
+                session.rows[row["id"]] = snapshot_row
+                session.created[row["id"]] = entry
+                session.last_write = time.monotonic()
+                created_set = service.hydrate_set(snapshot_row, weight_unit)
+            get_live_hub().publish(
+                user_id, "set_added", created_set,
+                workout_id=session.workout_id, workout_exercise_id=we_record["id"]
+            )
+            return created_set
+        return None
+
+    def update_set(self, service: "WorkoutService", user_id: UUID, set_id: UUID, update_data: UpdateSetRequest,
+                   weight_unit: WeightUnit = WeightUnit.KG,
+                   expected_version: Optional[int] = None) -> Optional[SetResponse]:
+        """
+        Buffer an update to a set of the user's open session.
+
+        Conditional updates (If-Match) are checked by the database, so they
+        flush and close the session and write through.
+
+        Returns:
+            The acknowledged set, or None if the set is not buffered (the caller writes through)
+
+        Raises:
+            HTTPException: 400 if no fields are provided
+        """
+        if not self._enabled:
+            return None
+
+        with self._lock:
+            session = self._sessions.get(str(user_id))
+            if session is None or str(set_id) not in session.rows:
+                return None
+        if expected_version is not None:
+            self.close_user(user_id)
+            return None
+
+        with self._lock:
+            if self._sessions.get(str(user_id)) is not session:
+                return None
+
+            fields = service.build_set_update(update_data, session.weight_unit)
+            if not fields:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="No valid update fields provided"
+                )
+
+            snapshot_row = session.rows[str(set_id)]
+            exercise_id = next(
+                exercise_id for exercise_id, we_record in session.exercises.items()
+                if we_record["id"] == snapshot_row["workout_exercise_id"]
+            )
+            entry = {"exercise_id": exercise_id, "workout_id": session.workout_id, "set_id": str(set_id), "fields": fields}
+            session.last_seq = self._journal.append(dict(entry, op="update", user_id=session.user_id))
+
+            snapshot_row.update(fields)
+            pending_create = session.created.get(str(set_id))
+            if pending_create is not None:
+                # Not written yet: the insert carries the new values (version stays 1)
+                pending_create["row"].update(fields)
+            else:
+                # Each buffered update is one UPDATE, so the version moves as the trigger will
+                session.updated.append(entry)
+                snapshot_row["version"] = snapshot_row.get("version", 1) + 1
+            session.last_write = time.monotonic()
+            updated_set = service.hydrate_set(snapshot_row, weight_unit)
+        get_live_hub().publish(
+            user_id, "set_updated", updated_set, workout_exercise_id=snapshot_row["workout_exercise_id"]
+        )
+        return updated_set
+
+    def get_workout_details(self, service: "WorkoutService", user_id: UUID, workout_id: UUID,
+                            weight_unit: WeightUnit = WeightUnit.KG) -> WorkoutWithExercisesResponse:
+        """Workout details, served from the open session (with buffered sets) when there is one."""
+        with self._lock:
+            session = self._sessions.get(str(user_id))
+            if session is not None and session.workout_id == str(workout_id):
+                return service.hydrate_workout(session.snapshot, weight_unit)
+        return service.get_workout_details(user_id, workout_id, weight_unit)
+
+    def get_active_workout(self, service: "WorkoutService", user_id: UUID,
+                           weight_unit: WeightUnit = WeightUnit.KG) -> Optional[WorkoutWithExercisesResponse]:
+        """The active workout, served from the open session (with buffered sets) when there is one."""
+        with self._lock:
+            session = self._sessions.get(str(user_id))
+            if session is not None:
+                return service.hydrate_workout(session.snapshot, weight_unit)
+        return service.get_active_workout(user_id, weight_unit)
+
+    def close_user(self, user_id: Any) -> None:
+        """
+        Flush and close the user's session before another change to their workouts.
+
+        Raises:
+            HTTPException: 503 if buffered writes could not be written (the session stays open)
+        """
+        if not self._enabled:
+            return
+
+        with self._flush_lock:
+            with self._lock:
+                session = self._sessions.get(str(user_id))
+            if session is None:
+                return
+            if not self._flush_session(session):
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Buffered sets could not be saved yet; retry shortly"
+                )
+            with self._lock:
+                if not session.pending:
+                    self._sessions.pop(str(user_id), None)
+                self._compact()
+
+    def flush_all(self) -> Dict[str, int]:
+        """
+        Flush every session and recovered journal entry (scheduled job and shutdown).
+
+        Sessions idle for ``idle_close_seconds`` (or whose versions may have
+        drifted after a failed flush) are closed once written.
+
+        Returns:
+            Counts of flushed, failed and open sessions
+        """
+        report = {"flushed": 0, "failed": 0, "open": 0}
+        if not self._enabled:
+            return report
+
+        with self._flush_lock:
+            self._flush_recovered()
+            with self._lock:
+                sessions = list(self._sessions.values())
+
+            for session in sessions:
+                if session.pending:
+                    report["flushed" if self._flush_session(session) else "failed"] += 1
+
+            now = time.monotonic()
+            with self._lock:
+                for session in sessions:
+                    if not session.pending and (session.resync or now - session.last_write > self._idle_close_seconds):
+                        self._sessions.pop(session.user_id, None)
+                report["open"] = len(self._sessions)
+                self._compact()
+        return report
+
+    def replay(self, service: "WorkoutService") -> int:
+        """
+        Apply journal entries that were acknowledged but not flushed before a restart.
+
+        Entries that cannot be written now are retried by ``flush_all``.
+
+        Returns:
+            Number of replayed entries
+        """
+        if not self._enabled:
+            return 0
+
+        entries = self._journal.read_unflushed()
+        if not entries:
+            self._journal.reset()
+            return 0
+
+        with self._flush_lock:
+            with self._lock:
+                self._recovery_service = service
+                for entry in entries:
+                    self._recovered.setdefault(entry["user_id"], []).append(entry)
+            logger.info(f"Replaying {len(entries)} session journal entries")
+            self._flush_recovered()
+            with self._lock:
+                self._compact()
+        return len(entries)
+
+    def stats(self) -> Dict[str, int]:
+        """Open sessions and pending writes."""
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "pending_creates": sum(len(session.created) for session in self._sessions.values()),
+                "pending_updates": sum(len(session.updated) for session in self._sessions.values()),
+                "recovered": sum(len(entries) for entries in self._recovered.values())
+            }
+
+    def _session_for(self, service: "WorkoutService", user_id: UUID, workout_id: UUID) -> Optional[_ActiveSession]:
+        """The user's session for this workout, opened from one read if needed."""
+        if not self._enabled:
+            return None
+
+        with self._lock:
+            session = self._sessions.get(str(user_id))
+            if session is not None and session.workout_id == str(workout_id):
+                return session
+        if session is not None:
+            self.close_user(user_id)
+
+        # Coalesced updates must land before the snapshot is read
+        get_set_write_coalescer().flush_user(user_id)
+        snapshot = service.load_active_workout_snapshot(user_id, workout_id)
+        if snapshot is None:
+            return None
+        weight_unit = resolve_weight_unit(user_id, service.supabase, fresh=True)
+
+        with self._lock:
+            session = self._sessions.get(str(user_id))
+            if session is None or session.workout_id != str(workout_id):
+                session = _ActiveSession(service, user_id, snapshot, weight_unit)
+                self._sessions[session.user_id] = session
+                logger.info(f"Opened buffered session for workout {workout_id}")
+            return session
+
+    def _flush_session(self, session: _ActiveSession) -> bool:
+        """Write a session's pending batch (called under the flush lock)."""
+        with self._lock:
+            if not session.pending:
+                return True
+            created = [dict(entry, row=dict(entry["row"])) for entry in session.created.values()]
+            updated = list(session.updated)
+            through_seq = session.last_seq
+            session.created.clear()
+            session.updated.clear()
+
+        try:
+            session.service.write_buffered_sets(session.user_id, created, updated)
+        except Exception as e:
+            logger.error(f"Buffered set flush failed for workout {session.workout_id}: {str(e)}")
+            with self._lock:
+                # Retry the whole batch first; a partial write may have bumped versions,
+                # so the session is reloaded from the database once it succeeds
+                session.created = OrderedDict(
+                    [(entry["row"]["id"], entry) for entry in created] + list(session.created.items())
+                )
+                session.updated = updated + session.updated
+                session.resync = True
+            return False
+
+        with self._lock:
+            # Every entry up to through_seq was in this batch; later ones are still pending
+            self._journal.mark_flushed(session.user_id, through_seq)
+        return True
+
+    def _flush_recovered(self) -> None:
+        """Write replayed journal entries, keeping those that fail (called under the flush lock)."""
+        with self._lock:
+            recovered = dict(self._recovered)
+
+        for user_id, entries in recovered.items():
+            created = OrderedDict(
+                (entry["row"]["id"], dict(entry, row=dict(entry["row"])))
+                for entry in entries if entry["op"] == "create"
+            )
+            updated = []
+            for entry in entries:
+                if entry["op"] != "update":
+                    continue
+                if entry["set_id"] in created:
+                    created[entry["set_id"]]["row"].update(entry["fields"])
+                else:
+                    updated.append(entry)
+            try:
+                self._recovery_service.write_buffered_sets(user_id, list(created.values()), updated)
+            except Exception as e:
+                logger.error(f"Replaying session journal for user {user_id} failed: {str(e)}")
+                continue
+            with self._lock:
+                self._recovered.pop(user_id, None)
+                self._journal.mark_flushed(user_id, max(entry["seq"] for entry in entries))
+
+    def _compact(self) -> None:
+        """Truncate the journal when nothing is pending (called under the lock)."""
+        if not self._recovered and not any(session.pending for session in self._sessions.values()):
+            self._journal.reset()
+
+
+# Singleton buffer shared by the workouts and home routers and the app lifespan
+_session_buffer = None
+_session_buffer_lock = threading.Lock()
+
+
+def get_session_buffer() -> SessionBuffer:
+    """
+    Get singleton SessionBuffer instance.
+
+    Returns:
+        SessionBuffer instance (disabled unless session_buffer_enabled)
+    """
+    global _session_buffer
+
+    if _session_buffer is None:
+        with _session_buffer_lock:
+            if _session_buffer is None:  # Double-check locking
+                journal = SessionJournal(settings.session_buffer_journal_path) if settings.session_buffer_enabled else None
+                _session_buffer = SessionBuffer(
+                    journal=journal,
+                    enabled=settings.session_buffer_enabled,
+                    idle_close_seconds=settings.session_buffer_idle_close_seconds
+                )
+
+    return _session_buffer
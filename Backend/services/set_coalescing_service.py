@@ -0,0 +1,194 @@
+"""
+Set Coalescing Service - Merged Writes for Rapid Set Edits
+
+The set editor sends PUT /workouts/sets/{set_id} for every nudge of weight or
+reps. With a coalescing window configured, updates to the same set arriving
+within ``set_write_coalesce_window_ms`` of the first one are merged (later
+fields win) and written with a single UPDATE; every caller receives the
+final state of the set.
+
+Durability guarantees:
+- A caller is only answered after the merged UPDATE has committed, so no
+  acknowledged edit lives only in memory. A crash inside the window loses
+  exactly the edits whose callers are still waiting, and those clients see
+  the request fail and retry.
+- Callers in a batch share its outcome: the merged set, or the same error.
+- Only unconditional updates merge. An update carrying an If-Match version
+  flushes the set's pending batch and is written on its own, so a second
+  update against the same version still gets 409 instead of overwriting
+  the first.
+- Updates with another owner or weight unit flush the pending batch first.
+- Pending batches are flushed before the owner's workout is updated or
+  deleted (e.g. completed), before the set is deleted, and on shutdown.
+
+A window of 0 (the default) disables coalescing and writes each update
+immediately. Batches are per worker process.
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Optional, Dict, Any, List, TYPE_CHECKING
+from uuid import UUID
+
+from core.config import settings
+from models.auth import WeightUnit
+from models.workout import UpdateSetRequest, SetResponse
+
+if TYPE_CHECKING:
+    from services.workout_service import WorkoutService
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class _PendingSetWrite:
+    """Merged fields of one set's updates waiting for the window to close."""
+
+    __slots__ = ("service", "user_id", "weight_unit", "fields", "waiters", "timer")
+
+    def __init__(self, service: "WorkoutService", user_id: UUID, weight_unit: WeightUnit):
+        self.service = service
+        self.user_id = user_id
+        self.weight_unit = weight_unit
+        self.fields: Dict[str, Any] = {}
+        self.waiters: List[asyncio.Future] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+    def accepts(self, user_id: UUID, weight_unit: WeightUnit) -> bool:
+        """Whether an update can be merged into this batch."""
+        return str(self.user_id) == str(user_id) and self.weight_unit == weight_unit
+
+
+class SetWriteCoalescer:
+    """
+    Per-process coalescer merging updates to the same set within a window.
+
+    Merged writes run on the event loop like the request handlers that
+    would otherwise have issued them, so a set never has two writes in
+    flight and batches are applied in arrival order.
+    """
+
+    def __init__(self, window_ms: int = 0):
+        self._window_seconds = max(window_ms, 0) / 1000
+        self._pending: Dict[str, _PendingSetWrite] = {}
+        self._submitted = 0
+        self._written = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether updates are held for a window before writing."""
+        return self._window_seconds > 0
+
+    async def update_set(self, service: "WorkoutService", user_id: UUID, set_id: UUID,
+                         update_data: UpdateSetRequest, weight_unit: WeightUnit = WeightUnit.KG,
+                         expected_version: Optional[int] = None) -> SetResponse:
+        """
+        Update a set, merging with other updates to it inside the window.
+
+        Conditional updates (``expected_version`` given) are never merged:
+        the set's pending batch is written first, then the update on its own.
+
+        Args:
+            service: WorkoutService performing the write
+            user_id: User's unique identifier
+            set_id: Set's unique identifier
+            update_data: Set update data
+            weight_unit: Unit of the updated weight (also used for the response)
+            expected_version: Only update if the set is still at this version
+
+        Returns:
+            The set after the merged update
+
+        Raises:
+            HTTPException: Whatever WorkoutService.update_set raised for the merged update
+        """
+        self._submitted += 1
+        if not self.enabled or expected_version is not None:
+            self.flush_set(set_id)
+            self._written += 1
+            return service.update_set(
+                user_id=user_id, set_id=set_id, update_data=update_data,
+                weight_unit=weight_unit, expected_version=expected_version
+            )
+
+        key = str(set_id)
+        pending = self._pending.get(key)
+        if pending is not None and not pending.accepts(user_id, weight_unit):
+            self.flush_set(set_id)
+            pending = None
+
+        loop = asyncio.get_running_loop()
+        if pending is None:
+            pending = _PendingSetWrite(service, user_id, weight_unit)
+            pending.timer = loop.call_later(self._window_seconds, self.flush_set, set_id)
+            self._pending[key] = pending
+
+        pending.fields.update(update_data.model_dump(exclude_none=True))
+        waiter = loop.create_future()
+        pending.waiters.append(waiter)
+        return await waiter
+
+    def flush_set(self, set_id: Any) -> None:
+        """Write one set's pending batch now and answer its callers."""
+        pending = self._pending.pop(str(set_id), None)
+        if pending is None:
+            return
+        if pending.timer is not None:
+            pending.timer.cancel()
+
+        self._written += 1
+        try:
+            result = pending.service.update_set(
+                user_id=pending.user_id,
+                set_id=UUID(str(set_id)),
+                update_data=UpdateSetRequest(**pending.fields),
+                weight_unit=pending.weight_unit
+            )
+        except Exception as e:
+            for waiter in pending.waiters:
+                if not waiter.done():
+                    waiter.set_exception(e)
+            return
+
+        if len(pending.waiters) > 1:
+            logger.debug(f"Coalesced {len(pending.waiters)} updates to set {set_id} into one write")
+        for waiter in pending.waiters:
+            if not waiter.done():
+                waiter.set_result(result)
+
+    def flush_user(self, user_id: Any) -> None:
+        """Write every pending batch owned by a user (before their workout changes)."""
+        for key in [key for key, pending in self._pending.items() if str(pending.user_id) == str(user_id)]:
+            self.flush_set(key)
+
+    def flush_all(self) -> None:
+        """Write every pending batch (on shutdown)."""
+        for key in list(self._pending):
+            self.flush_set(key)
+
+    def stats(self) -> Dict[str, int]:
+        """Updates received, database writes issued and batches still pending."""
+        return {"submitted": self._submitted, "written": self._written, "pending": len(self._pending)}
+
+
+# Singleton coalescer shared by the workouts router and the app lifespan
+_set_write_coalescer = None
+_set_write_coalescer_lock = threading.Lock()
+
+
+def get_set_write_coalescer() -> SetWriteCoalescer:
+    """
+    Get singleton SetWriteCoalescer instance.
+
+    Returns:
+        SetWriteCoalescer instance
+    """
+    global _set_write_coalescer
+
+    if _set_write_coalescer is None:
+        with _set_write_coalescer_lock:
+            if _set_write_coalescer is None:  # Double-check locking
+                _set_write_coalescer = SetWriteCoalescer(window_ms=settings.set_write_coalesce_window_ms)
+
+    return _set_write_coalescer
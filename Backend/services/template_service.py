@@ -0,0 +1,288 @@
+"""
+Template Service Layer - Business Logic for Workout Templates
+
+Implements workout template operations for FM-SetLogger backend:
+- Template creation with exercises in a single transaction
+- Template retrieval with embedded exercise details in one nested query
+- Template deletion (cascades to template exercises)
+
+Materializing a template into a workout lives in WorkoutService, since it
+creates workouts, workout exercises and sets.
+"""
+
+import logging
+from typing import Optional, List, Dict, Any, TYPE_CHECKING
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from postgrest.exceptions import APIError
+
+from models.template import (
+    CreateTemplateRequest,
+    TemplateResponse,
+    TemplateExerciseResponse
+)
+from models.auth import WeightUnit
+from models.workout import ExerciseDetails
+from services.unit_service import weight_to_grams, grams_to_weight, meters_to_cm, cm_to_meters
+from services.workout_service import ORDER_INDEX_GAP
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Nested PostgREST select returning a template with its exercises
+TEMPLATE_DETAILS_SELECT = "*, workout_template_exercises(*, exercises(*))"
+
+
+class TemplateService:
+    """
+    Workout template service handling template CRUD.
+
+    All queries filter by user_id explicitly because the backend client
+    uses the service role key, which bypasses RLS.
+    """
+
+    def __init__(self, supabase_client: Optional['Client'] = None):
+        """Initialize template service with optional Supabase client."""
+        if supabase_client:
+            self.supabase = supabase_client
+        else:
+            from services.supabase_client import SupabaseService
+            self.supabase = SupabaseService().client
+
+    def create_template(self, user_id: UUID, template_data: CreateTemplateRequest,
+                        weight_unit: WeightUnit = WeightUnit.KG) -> TemplateResponse:
+        """
+        Create a workout template and its exercises in one transaction.
+
+        Args:
+            user_id: User's unique identifier
+            template_data: Template creation data
+            weight_unit: Unit of the target weights (also used for the response)
+
+        Returns:
+            Created template with exercises
+
+        Raises:
+            HTTPException: 400 if an exercise is not found, 500 if creation fails
+        """
+        try:
+            exercises = [
+                {
+                    "exercise_id": str(item.exercise_id),
+                    "order_index": item.order_index,
+                    "target_sets": item.target_sets,
+                    "target_reps": item.target_reps,
+                    "target_weight_grams": weight_to_grams(item.target_weight, weight_unit),
+                    "target_duration": item.target_duration,
+                    "target_distance_cm": meters_to_cm(item.target_distance),
+                    "rest_time": item.rest_time,
+                    "notes": item.notes
+                }
+                for item in template_data.exercises
+            ]
+
+            result = self.supabase.rpc("create_workout_template", {
+                "p_user_id": str(user_id),
+                "p_title": template_data.title,
+                "p_notes": template_data.notes,
+                "p_exercises": exercises,
+                "p_gap": ORDER_INDEX_GAP
+            }).execute()
+
+            if not result.data:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Template creation failed"
+                )
+
+            template_id = result.data[0]["id"]
+            logger.info(f"Template created: {template_id} for user {user_id}")
+
+            return self.get_template(user_id, template_id, weight_unit)
+
+        except APIError as e:
+            if getattr(e, "code", None) == "23503":
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Exercise not found"
+                )
+            logger.error(f"Database error creating template: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Database error during template creation"
+            )
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error creating template: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Template creation failed"
+            )
+
+    def get_user_templates(self, user_id: UUID, weight_unit: WeightUnit = WeightUnit.KG) -> List[TemplateResponse]:
+        """
+        Get all templates for user with their exercises.
+
+        Args:
+            user_id: User's unique identifier
+            weight_unit: Unit to report target weights in
+
+        Returns:
+            List of user's templates, most recently updated first
+
+        Raises:
+            HTTPException: If template retrieval fails
+        """
+        try:
+            result = self.supabase.table("workout_templates").select(TEMPLATE_DETAILS_SELECT).eq(
+                "user_id", str(user_id)
+            ).order(
+                "order_index", foreign_table="workout_template_exercises"
+            ).order("updated_at", desc=True).execute()
+
+            return [self._convert_to_template_response(record, weight_unit) for record in result.data or []]
+
+        except APIError as e:
+            logger.error(f"Database error retrieving templates: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Database error during template retrieval"
+            )
+        except Exception as e:
+            logger.error(f"Unexpected error retrieving templates: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Template retrieval failed"
+            )
+
+    def get_template(self, user_id: UUID, template_id: UUID,
+                     weight_unit: WeightUnit = WeightUnit.KG) -> TemplateResponse:
+        """
+        Get one template with its exercises.
+
+        Args:
+            user_id: User's unique identifier
+            template_id: Template's unique identifier
+            weight_unit: Unit to report target weights in
+
+        Returns:
+            Template with exercises in order
+
+        Raises:
+            HTTPException: If template not found or retrieval fails
+        """
+        try:
+            result = self.supabase.table("workout_templates").select(TEMPLATE_DETAILS_SELECT).eq(
+                "id", str(template_id)
+            ).eq(
+                "user_id", str(user_id)
+            ).order(
+                "order_index", foreign_table="workout_template_exercises"
+            ).maybe_single().execute()
+
+            if not result or not result.data:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Template not found"
+                )
+
+            return self._convert_to_template_response(result.data, weight_unit)
+
+        except HTTPException:
+            raise
+        except APIError as e:
+            logger.error(f"Database error retrieving template: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Database error during template retrieval"
+            )
+        except Exception as e:
+            logger.error(f"Unexpected error retrieving template: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Template retrieval failed"
+            )
+
+    def delete_template(self, user_id: UUID, template_id: UUID) -> None:
+        """
+        Delete template (cascade deletes template exercises).
+
+        Args:
+            user_id: User's unique identifier
+            template_id: Template's unique identifier
+
+        Raises:
+            HTTPException: If template not found or deletion fails
+        """
+        try:
+            result = self.supabase.table("workout_templates").delete().eq(
+                "id", str(template_id)
+            ).eq(
+                "user_id", str(user_id)
+            ).execute()
+
+            if not result.data:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Template not found"
+                )
+
+            logger.info(f"Template deleted: {template_id}")
+
+        except HTTPException:
+            raise
+        except APIError as e:
+            logger.error(f"Database error deleting template: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Database error during template deletion"
+            )
+        except Exception as e:
+            logger.error(f"Unexpected error deleting template: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Template deletion failed"
+            )
+
+    def _convert_to_template_response(self, record: Dict[str, Any],
+                                      weight_unit: WeightUnit = WeightUnit.KG) -> TemplateResponse:
+        """Convert a nested template record (TEMPLATE_DETAILS_SELECT) to a response."""
+        exercises = []
+        for te_record in record.get("workout_template_exercises") or []:
+            exercise_record = te_record["exercises"]
+            exercises.append(TemplateExerciseResponse(
+                id=te_record["id"],
+                template_id=te_record["template_id"],
+                exercise_id=te_record["exercise_id"],
+                order_index=te_record["order_index"],
+                target_sets=te_record["target_sets"],
+                target_reps=te_record.get("target_reps"),
+                target_weight=grams_to_weight(te_record.get("target_weight_grams"), weight_unit),
+                target_duration=te_record.get("target_duration"),
+                target_distance=cm_to_meters(te_record.get("target_distance_cm")),
+                rest_time=te_record.get("rest_time"),
+                notes=te_record.get("notes"),
+                exercise_details=ExerciseDetails(
+                    id=exercise_record["id"],
+                    name=exercise_record["name"],
+                    category=exercise_record["category"],
+                    body_part=exercise_record["body_part"],
+                    equipment=exercise_record["equipment"],
+                    description=exercise_record.get("description")
+                )
+            ))
+
+        return TemplateResponse(
+            id=record["id"],
+            user_id=record["user_id"],
+            title=record["title"],
+            notes=record.get("notes"),
+            created_at=record["created_at"],
+            updated_at=record["updated_at"],
+            exercises=exercises
+        )
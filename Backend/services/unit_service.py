@@ -0,0 +1,224 @@
+"""
+Unit Service - Fixed-Point Weights and Distances
+
+Weights are stored as integer grams and distances as integer centimetres
+(sets, template targets, the last-performance cache, archive summaries and
+personal records). This module converts between those integers and the
+units the API speaks:
+- Weights in the user's ``weightUnit`` preference (kg or lbs)
+- Distances in meters
+- A per-process cache of each user's weight unit, resolved once per request
+  by the ``get_weight_unit`` dependency for converting responses
+
+Writes carrying a weight convert it with a unit read fresh
+(``resolve_write_weight_unit`` or the ``get_write_weight_unit`` dependency);
+writes without one, and buffered sessions which pin the unit when they
+open, skip that read. The cache is only invalidated by the
+worker that handled the profile update, so another worker could otherwise
+store a weight converted with the old unit until its entry expires; on the
+read side that staleness only affects display.
+
+Requests convert once on write; responses convert each value with one float
+division, so reads never build Decimals. Grams keep a weight entered in
+pounds with two decimals exact when it is converted back and rounded.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Optional, Dict, Any, Union
+from uuid import UUID
+
+from fastapi import Depends
+
+from core.config import settings
+from models.auth import WeightUnit
+from services.auth_service import get_current_user
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+GRAMS_PER_UNIT = {
+    WeightUnit.KG: Decimal("1000"),
+    WeightUnit.LBS: Decimal("453.59237")
+}
+CM_PER_METER = 100
+
+# Float factors for the read path
+_GRAMS_PER_UNIT_FLOAT = {unit: float(grams) for unit, grams in GRAMS_PER_UNIT.items()}
+
+
+def grams_per_unit(unit: Union[WeightUnit, str]) -> float:
+    """Grams in one ``unit`` (for converting whole arrays)."""
+    return _GRAMS_PER_UNIT_FLOAT[WeightUnit(unit)]
+
+
+def weight_to_grams(weight: Optional[Union[Decimal, float, int]], unit: Union[WeightUnit, str]) -> Optional[int]:
+    """Convert a weight in ``unit`` to integer grams (None stays None)."""
+    if weight is None:
+        return None
+    grams = Decimal(str(weight)) * GRAMS_PER_UNIT[WeightUnit(unit)]
+    return int(grams.to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def grams_to_weight(grams: Optional[Union[int, float]], unit: Union[WeightUnit, str]) -> Optional[float]:
+    """Convert integer grams to a weight in ``unit``, rounded to 2 decimals."""
+    if grams is None:
+        return None
+    return round(grams / _GRAMS_PER_UNIT_FLOAT[WeightUnit(unit)], 2)
+
+
+def meters_to_cm(distance: Optional[Union[Decimal, float, int]]) -> Optional[int]:
+    """Convert a distance in meters to integer centimetres (None stays None)."""
+    if distance is None:
+        return None
+    return int((Decimal(str(distance)) * CM_PER_METER).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def cm_to_meters(cm: Optional[Union[int, float]]) -> Optional[float]:
+    """Convert integer centimetres to meters."""
+    if cm is None:
+        return None
+    return round(cm / CM_PER_METER, 2)
+
+
+class WeightUnitCache:
+    """Thread-safe, bounded per-process cache of users' weight unit preference."""
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: int = 300):
+        self._units: "OrderedDict[str, tuple]" = OrderedDict()
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+    def get(self, user_id: Any) -> Optional[WeightUnit]:
+        """Cached unit for a user, or None if missing or expired."""
+        key = str(user_id)
+        with self._lock:
+            entry = self._units.get(key)
+            if entry is None:
+                return None
+            unit, stored_at = entry
+            if time.monotonic() - stored_at > self._ttl_seconds:
+                del self._units[key]
+                return None
+            self._units.move_to_end(key)
+            return unit
+
+    def put(self, user_id: Any, unit: WeightUnit) -> None:
+        """Store a user's unit."""
+        with self._lock:
+            self._units[str(user_id)] = (unit, time.monotonic())
+            self._units.move_to_end(str(user_id))
+            while len(self._units) > self._max_entries:
+                self._units.popitem(last=False)
+
+    def invalidate(self, user_id: Any) -> None:
+        """Drop a user's unit so the next request reloads it."""
+        with self._lock:
+            self._units.pop(str(user_id), None)
+
+
+# Singleton cache shared by request dependencies and the profile router
+_weight_unit_cache = None
+_weight_unit_cache_lock = threading.Lock()
+
+
+def get_weight_unit_cache() -> WeightUnitCache:
+    """
+    Get singleton WeightUnitCache instance.
+
+    Returns:
+        WeightUnitCache instance
+    """
+    global _weight_unit_cache
+
+    if _weight_unit_cache is None:
+        with _weight_unit_cache_lock:
+            if _weight_unit_cache is None:  # Double-check locking
+                _weight_unit_cache = WeightUnitCache(
+                    max_entries=settings.weight_unit_cache_max_entries,
+                    ttl_seconds=settings.weight_unit_cache_ttl_seconds
+                )
+
+    return _weight_unit_cache
+
+
+def resolve_weight_unit(user_id: UUID, supabase_client=None, fresh: bool = False) -> WeightUnit:
+    """
+    Return the user's weight unit preference, loading it on a cache miss.
+
+    Args:
+        user_id: User's unique identifier
+        supabase_client: Optional Supabase client (defaults to the service client)
+        fresh: Skip the cache and read the preference (the cache is refreshed)
+
+    Returns:
+        The user's weight unit (the preference default when unset)
+    """
+    cache = get_weight_unit_cache()
+    unit = None if fresh else cache.get(user_id)
+    if unit is not None:
+        return unit
+
+    if supabase_client is None:
+        from services.supabase_client import SupabaseService
+        supabase_client = SupabaseService().client
+
+    user = supabase_client.table("users").select("preferences").eq("id", str(user_id)).execute()
+    preferences: Dict[str, Any] = (user.data[0].get("preferences") if user.data else None) or {}
+    unit = WeightUnit(preferences.get("weightUnit") or WeightUnit.LBS)
+    cache.put(user_id, unit)
+    return unit
+
+
+def get_weight_unit(current_user: Dict[str, Any] = Depends(get_current_user)) -> WeightUnit:
+    """
+    FastAPI dependency resolving the authenticated user's weight unit.
+
+    Args:
+        current_user: Current authenticated user
+
+    Returns:
+        The user's weight unit
+    """
+    return resolve_weight_unit(current_user["id"])
+
+
+def get_write_weight_unit(current_user: Dict[str, Any] = Depends(get_current_user)) -> WeightUnit:
+    """
+    FastAPI dependency resolving the unit of weights sent in a write.
+
+    Reads the preference instead of trusting this worker's cache, which
+    may predate a unit change handled by another worker.
+
+    Args:
+        current_user: Current authenticated user
+
+    Returns:
+        The user's current weight unit
+    """
+    return resolve_weight_unit(current_user["id"], fresh=True)
+
+
+def resolve_write_weight_unit(user_id: UUID, weight: Optional[Any], weight_unit: WeightUnit) -> WeightUnit:
+    """
+    Return the unit to convert a write's weight with.
+
+    Only a write carrying a weight reads the preference fresh; any other
+    write keeps the request's cached unit, which then only converts the
+    response.
+
+    Args:
+        user_id: User's unique identifier
+        weight: Weight sent in the write (None when absent)
+        weight_unit: The request's cached weight unit
+
+    Returns:
+        The user's weight unit
+    """
+    if weight is None:
+        return weight_unit
+    return resolve_weight_unit(user_id, fresh=True)
@@ -11,31 +11,48 @@ This service layer follows the clean architecture established in Phase 5.2
 and integrates with the authentication system from Phase 5.3.
 """
 
+import json
 import logging
-from datetime import datetime, timezone
-from typing import Optional, List, Dict, Any, TYPE_CHECKING
+from datetime import datetime, timedelta, timezone
+from typing import Optional, List, Dict, Any, Callable, Tuple, TYPE_CHECKING
 from uuid import UUID
-from decimal import Decimal
 
 from fastapi import HTTPException, status
 from postgrest.exceptions import APIError
 
 from core.config import settings
+from core.task_queue import get_task_queue
+from core.write_versions import get_write_version_registry
 from models.workout import (
     CreateWorkoutRequest,
     UpdateWorkoutRequest, 
     WorkoutExerciseRequest,
+    BulkAddExercisesRequest,
+    ReorderExercisesRequest,
+    MoveExerciseRequest,
+    CloneWorkoutRequest,
     CreateSetRequest,
     UpdateSetRequest,
     WorkoutResponse,
     WorkoutWithExercisesResponse,
     WorkoutExerciseResponse,
+    LastPerformanceResponse,
+    LastPerformanceSet,
     SetResponse,
     WorkoutListQuery,
     WorkoutStatsResponse,
+    StaleWorkoutCloseReport,
+    ColdWorkoutArchiveReport,
     ExerciseDetails,
     WorkoutExerciseWithDetails
 )
+from models.auth import WeightUnit
+from models.template import CreateWorkoutFromTemplateRequest
+from services.record_service import RecordService, RECORD_FIELDS
+from services.activity_service import get_activity_calendar_registry
+from services.unit_service import weight_to_grams, grams_to_weight, meters_to_cm, cm_to_meters
+from services.concurrency_service import raise_for_missed_update
+from services.live_session_service import get_live_hub
 
 if TYPE_CHECKING:
     from supabase import Client
@@ -43,6 +60,40 @@ if TYPE_CHECKING:
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Nested PostgREST select returning a workout with its exercises and sets
+WORKOUT_DETAILS_SELECT = "*, workout_exercises(*, exercises(*), sets(*))"
+
+# Partial unique index keeping at most one active workout per user (migration 007)
+ACTIVE_WORKOUT_INDEX = "idx_workouts_one_active_per_user"
+
+# Spacing between workout exercise order indexes so a move rewrites one row
+ORDER_INDEX_GAP = 1024
+
+
+def midpoint_order_index(before: Optional[int], after: Optional[int]) -> Optional[int]:
+    """
+    Pick an order index strictly between two neighbours.
+    
+    Args:
+        before: Order index of the preceding exercise (None at the top)
+        after: Order index of the following exercise (None at the bottom)
+        
+    Returns:
+        Free order index, or None if the neighbours leave no gap and the
+        workout must be rebalanced
+    """
+    if before is None and after is None:
+        return 0
+    if before is None:
+        if after >= ORDER_INDEX_GAP:
+            return after - ORDER_INDEX_GAP
+        return after // 2 if after > 0 else None
+    if after is None:
+        return before + ORDER_INDEX_GAP
+    if after - before > 1:
+        return (before + after) // 2
+    return None
+
 
 class WorkoutService:
     """
@@ -113,12 +164,15 @@ class WorkoutService:
                 )
             
             workout_record = result.data[0]
+            self._record_write(user_id)
+            get_activity_calendar_registry().record_workout(user_id, workout_record)
             logger.info(f"Workout created: {workout_record['id']} for user {user_id}")
             
             # Convert to response model
             return self._convert_to_workout_response(workout_record)
             
         except APIError as e:
+            self._raise_if_active_workout_conflict(e)
             logger.error(f"Database error creating workout: {str(e)}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -134,6 +188,133 @@ class WorkoutService:
                 detail="Workout creation failed"
             )
     
+    def create_workout_from_template(self, user_id: UUID, template_id: UUID, overrides: Optional[CreateWorkoutFromTemplateRequest] = None,
+                                     weight_unit: WeightUnit = WeightUnit.KG) -> WorkoutWithExercisesResponse:
+        """
+        Start a new workout session from a stored template.
+        
+        Uses the create_workout_from_template database function, which inserts
+        the workout, its workout exercises and one planned (not completed) set
+        per target set with set-based inserts in a single transaction.
+        
+        Args:
+            user_id: User's unique identifier
+            template_id: Template's unique identifier
+            overrides: Optional title and start time for the new workout
+            weight_unit: Unit to report set weights in
+            
+        Returns:
+            Created workout with exercises and planned sets
+            
+        Raises:
+            HTTPException: If template not found or workout creation fails
+        """
+        try:
+            overrides = overrides or CreateWorkoutFromTemplateRequest()
+            result = self.supabase.rpc("create_workout_from_template", {
+                "p_user_id": str(user_id),
+                "p_template_id": str(template_id),
+                "p_title": overrides.title,
+                "p_started_at": overrides.started_at.isoformat() if overrides.started_at else None
+            }).execute()
+            
+            if not result.data:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Workout creation failed"
+                )
+            
+            workout_id = result.data[0]["id"]
+            self._record_write(user_id)
+            logger.info(f"Workout created from template {template_id}: {workout_id} for user {user_id}")
+            
+            return self.get_workout_details(user_id, workout_id, weight_unit)
+            
+        except APIError as e:
+            if getattr(e, "code", None) == "P0002":
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Template not found"
+                )
+            self._raise_if_active_workout_conflict(e)
+            logger.error(f"Database error creating workout from template: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Database error during workout creation"
+            )
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error creating workout from template: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Workout creation failed"
+            )
+    
+    def clone_workout(self, user_id: UUID, workout_id: UUID, clone_data: Optional[CloneWorkoutRequest] = None,
+                      weight_unit: WeightUnit = WeightUnit.KG) -> WorkoutWithExercisesResponse:
+        """
+        Repeat a past workout as a new active session.
+        
+        Uses the clone_workout database function, which copies the source
+        workout's exercises and sets with INSERT ... SELECT so no workout data
+        passes through the API. Copied sets start as not completed.
+        
+        Args:
+            user_id: User's unique identifier
+            workout_id: Source workout's unique identifier
+            clone_data: Clone mode and optional title/start time overrides
+            weight_unit: Unit to report set weights in
+            
+        Returns:
+            Created workout with exercises and planned sets
+            
+        Raises:
+            HTTPException: If source workout not found or cloning fails
+        """
+        try:
+            clone_data = clone_data or CloneWorkoutRequest()
+            result = self.supabase.rpc("clone_workout", {
+                "p_user_id": str(user_id),
+                "p_workout_id": str(workout_id),
+                "p_mode": clone_data.mode,
+                "p_title": clone_data.title,
+                "p_started_at": clone_data.started_at.isoformat() if clone_data.started_at else None
+            }).execute()
+            
+            if not result.data:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Workout clone failed"
+                )
+            
+            clone_id = result.data[0]["id"]
+            self._record_write(user_id)
+            logger.info(f"Workout {workout_id} cloned to {clone_id} for user {user_id}")
+            
+            return self.get_workout_details(user_id, clone_id, weight_unit)
+            
+        except APIError as e:
+            if getattr(e, "code", None) == "P0002":
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Workout not found"
+                )
+            self._raise_if_active_workout_conflict(e)
+            logger.error(f"Database error cloning workout: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Database error during workout clone"
+            )
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error cloning workout: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Workout clone failed"
+            )
+    
     def get_user_workouts(self, user_id: UUID, query: WorkoutListQuery) -> List[WorkoutResponse]:
         """
         Get all workouts for user with filtering and pagination.
@@ -149,9 +330,10 @@ class WorkoutService:
             HTTPException: If workout retrieval fails
         """
         try:
-            # Build query with RLS policy enforcement
-            query_builder = self.supabase.table("workouts").select("*")
-            
+            # Service role bypasses RLS; filter by owner explicitly
+            # (served in order by idx_workouts_user_id_created_at)
+            query_builder = self.supabase.table("workouts").select("*").eq("user_id", str(user_id))
+
             # Apply filters
             if query.is_active is not None:
                 query_builder = query_builder.eq("is_active", query.is_active)
@@ -183,13 +365,15 @@ class WorkoutService:
                 detail="Workout retrieval failed"
             )
     
-    def get_workout_details(self, user_id: UUID, workout_id: UUID) -> WorkoutWithExercisesResponse:
+    def get_workout_details(self, user_id: UUID, workout_id: UUID,
+                            weight_unit: WeightUnit = WeightUnit.KG) -> WorkoutWithExercisesResponse:
         """
         Get workout details with exercises and sets.
         
         Args:
             user_id: User's unique identifier
             workout_id: Workout's unique identifier
+            weight_unit: Unit to report set weights in
             
         Returns:
             Complete workout with exercises and sets
@@ -198,77 +382,32 @@ class WorkoutService:
             HTTPException: If workout not found or access denied
         """
         try:
-            # Get workout with RLS policy enforcement
-            workout_result = self.supabase.table("workouts").select("*").eq("id", str(workout_id)).single().execute()
+            result = self._fetch_workout_details(user_id, workout_id)
             
-            if not workout_result.data:
+            if not result or not result.data:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Workout not found"
                 )
             
-            workout_record = workout_result.data
-            
-            # Get workout exercises with exercise details and sets
-            exercises_result = self.supabase.table("workout_exercises").select("""
-                *,
-                exercises(*),
-                sets(*)
-            """).eq("workout_id", str(workout_id)).order("order_index").execute()
-            
-            exercises_data = []
-            if exercises_result.data:
-                for we_record in exercises_result.data:
-                    # Build exercise details
-                    exercise_details = ExerciseDetails(
-                        id=we_record["exercises"]["id"],
-                        name=we_record["exercises"]["name"],
-                        category=we_record["exercises"]["category"],
-                        body_part=we_record["exercises"]["body_part"],
-                        equipment=we_record["exercises"]["equipment"],
-                        description=we_record["exercises"].get("description")
-                    )
-                    
-                    # Build sets list
-                    sets_data = []
-                    if we_record["sets"]:
-                        sets_data = [self._convert_to_set_response(set_record) for set_record in we_record["sets"]]
-                        # Sort sets by order_index
-                        sets_data.sort(key=lambda x: x.order_index)
-                    
-                    # Build workout exercise with details
-                    exercise_with_details = WorkoutExerciseWithDetails(
-                        id=we_record["id"],
-                        workout_id=we_record["workout_id"],
-                        exercise_id=we_record["exercise_id"],
-                        order_index=we_record["order_index"],
-                        notes=we_record.get("notes"),
-                        created_at=we_record["created_at"],
-                        exercise_details=exercise_details,
-                        sets=sets_data
-                    )
-                    
-                    exercises_data.append(exercise_with_details)
+            if result.data.get("archived_at"):
+                # Sets of cold workouts live in the archive; read them from there
+                # without moving them back, so opening a workout never writes
+                self._attach_archived_sets(user_id, result.data)
             
-            logger.debug(f"Retrieved workout details: {workout_id} with {len(exercises_data)} exercises")
+            workout_details = self._convert_to_workout_with_exercises(result.data, weight_unit)
+            logger.debug(f"Retrieved workout details: {workout_id} with {len(workout_details.exercises)} exercises")
             
-            # Build complete workout response
-            return WorkoutWithExercisesResponse(
-                id=workout_record["id"],
-                user_id=workout_record["user_id"],
-                title=workout_record["title"],
-                started_at=workout_record["started_at"],
-                completed_at=workout_record.get("completed_at"),
-                duration=workout_record.get("duration"),
-                is_active=workout_record["is_active"],
-                created_at=workout_record["created_at"],
-                updated_at=workout_record["updated_at"],
-                exercises=exercises_data
-            )
+            return workout_details
             
         except HTTPException:
             raise
         except APIError as e:
+            if getattr(e, "code", None) == "P0002":
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Workout not found"
+                )
             logger.error(f"Database error retrieving workout details: {str(e)}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -280,8 +419,59 @@ class WorkoutService:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Workout detail retrieval failed"
             )
-    
-    def update_workout(self, user_id: UUID, workout_id: UUID, update_data: UpdateWorkoutRequest) -> WorkoutResponse:
+
+    def get_active_workout(self, user_id: UUID,
+                           weight_unit: WeightUnit = WeightUnit.KG) -> Optional[WorkoutWithExercisesResponse]:
+        """
+        Get the user's active workout with exercises and sets.
+
+        Resolves the active workout and its details in one round trip. A
+        partial unique index on workouts(user_id) WHERE is_active keeps at
+        most one active workout per user and makes the lookup a single probe.
+
+        Args:
+            user_id: User's unique identifier
+            weight_unit: Unit to report set weights in
+
+        Returns:
+            The active workout, or None if there is none
+
+        Raises:
+            HTTPException: If retrieval fails
+        """
+        try:
+            result = self.supabase.table("workouts").select(WORKOUT_DETAILS_SELECT).eq(
+                "user_id", str(user_id)
+            ).eq(
+                "is_active", True
+            ).order(
+                "order_index", foreign_table="workout_exercises"
+            ).order(
+                "order_index", foreign_table="workout_exercises.sets"
+            ).limit(1).execute()
+
+            if not result.data:
+                return None
+
+            return self._convert_to_workout_with_exercises(result.data[0], weight_unit)
+
+        except HTTPException:
+            raise
+        except APIError as e:
+            logger.error(f"Database error retrieving active workout: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Database error during active workout retrieval"
+            )
+        except Exception as e:
+            logger.error(f"Unexpected error retrieving active workout: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Active workout retrieval failed"
+            )
+
+    def update_workout(self, user_id: UUID, workout_id: UUID, update_data: UpdateWorkoutRequest,
+                       expected_version: Optional[int] = None) -> WorkoutResponse:
         """
         Update workout session.
         
@@ -289,12 +479,13 @@ class WorkoutService:
             user_id: User's unique identifier
             workout_id: Workout's unique identifier  
             update_data: Workout update data
+            expected_version: Only update if the workout is still at this version
             
         Returns:
             Updated workout response
             
         Raises:
-            HTTPException: If workout not found or update fails
+            HTTPException: If workout not found, the version is stale (409) or update fails
         """
         try:
             # Prepare update data
@@ -317,23 +508,30 @@ class WorkoutService:
                     detail="No valid update fields provided"
                 )
             
-            # Update with RLS policy enforcement
-            result = self.supabase.table("workouts").update(update_dict).eq("id", str(workout_id)).execute()
+            # Compare and update in one statement when a version is expected
+            query = self.supabase.table("workouts").update(update_dict).eq(
+                "id", str(workout_id)
+            ).eq("user_id", str(user_id))
+            if expected_version is not None:
+                query = query.eq("version", expected_version)
+            result = query.execute()
             
             if not result.data or len(result.data) == 0:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Workout not found"
-                )
+                raise_for_missed_update(self.supabase, "workouts", workout_id, user_id, expected_version, "Workout")
             
             updated_record = result.data[0]
+            self._record_write(user_id)
+            get_activity_calendar_registry().record_workout(user_id, updated_record)
             logger.info(f"Workout updated: {workout_id} for user {user_id}")
             
-            return self._convert_to_workout_response(updated_record)
+            workout = self._convert_to_workout_response(updated_record)
+            get_live_hub().publish(user_id, "workout_updated", workout, workout_id=workout_id)
+            return workout
             
         except HTTPException:
             raise
         except APIError as e:
+            self._raise_if_active_workout_conflict(e)
             logger.error(f"Database error updating workout: {str(e)}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -358,8 +556,12 @@ class WorkoutService:
             HTTPException: If workout not found or deletion fails
         """
         try:
-            # Delete with RLS policy enforcement (cascade handled by database)
-            result = self.supabase.table("workouts").delete().eq("id", str(workout_id)).execute()
+            # Delete the user's workout (cascade handled by database)
+            result = self.supabase.table("workouts").delete().eq(
+                "id", str(workout_id)
+            ).eq(
+                "user_id", str(user_id)
+            ).execute()
             
             if not result.data or len(result.data) == 0:
                 raise HTTPException(
@@ -367,7 +569,14 @@ class WorkoutService:
                     detail="Workout not found"
                 )
             
+            self._record_write(user_id)
+            get_activity_calendar_registry().forget_workout(user_id, workout_id)
             logger.info(f"Workout deleted: {workout_id} for user {user_id}")
+            get_live_hub().publish(user_id, "workout_deleted", workout_id=workout_id)
+            self._sync_personal_records(
+                user_id, "workout deletion",
+                lambda records: records.remove_workout(user_id, workout_id)
+            )
             
         except HTTPException:
             raise
@@ -384,7 +593,9 @@ class WorkoutService:
                 detail="Workout deletion failed"
             )
     
-    def add_exercise_to_workout(self, user_id: UUID, workout_id: UUID, exercise_data: WorkoutExerciseRequest) -> WorkoutExerciseResponse:
+    def add_exercise_to_workout(self, user_id: UUID, workout_id: UUID, exercise_data: WorkoutExerciseRequest,
+                                include_last_performance: bool = False,
+                                weight_unit: WeightUnit = WeightUnit.KG) -> WorkoutExerciseResponse:
         """
         Add exercise to workout with order tracking.
         
@@ -392,6 +603,9 @@ class WorkoutService:
             user_id: User's unique identifier
             workout_id: Workout's unique identifier
             exercise_data: Exercise addition data
+            include_last_performance: Attach the user's most recent completed
+                sets for this exercise to the response
+            weight_unit: Unit to report last performance weights in
             
         Returns:
             Created workout-exercise relationship
@@ -400,9 +614,13 @@ class WorkoutService:
             HTTPException: If workout or exercise not found, or addition fails
         """
         try:
-            # Verify workout exists and user has access (RLS will enforce)
-            workout_check = self.supabase.table("workouts").select("id").eq("id", str(workout_id)).single().execute()
-            if not workout_check.data:
+            # Verify the workout exists and belongs to the user (the service role bypasses RLS)
+            workout_check = self.supabase.table("workouts").select("id").eq(
+                "id", str(workout_id)
+            ).eq(
+                "user_id", str(user_id)
+            ).maybe_single().execute()
+            if not workout_check or not workout_check.data:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Workout not found"
@@ -434,16 +652,19 @@ class WorkoutService:
                 )
             
             created_record = result.data[0]
+            self._record_write(user_id)
             logger.info(f"Exercise {exercise_data.exercise_id} added to workout {workout_id}")
             
-            return WorkoutExerciseResponse(
-                id=created_record["id"],
-                workout_id=created_record["workout_id"],
-                exercise_id=created_record["exercise_id"],
-                order_index=created_record["order_index"],
-                notes=created_record.get("notes"),
-                created_at=created_record["created_at"]
+            workout_exercise = self._convert_to_workout_exercise_response(created_record)
+            get_live_hub().publish(
+                user_id, "exercise_added", workout_exercise,
+                workout_id=workout_id, workout_exercise_id=workout_exercise.id
             )
+            if include_last_performance:
+                last_performance = self.get_last_performance(user_id, [exercise_data.exercise_id], weight_unit)
+                workout_exercise.last_performance = last_performance[0] if last_performance else None
+            
+            return workout_exercise
             
         except HTTPException:
             raise
@@ -466,6 +687,290 @@ class WorkoutService:
                 detail="Exercise addition failed"
             )
     
+    def get_last_performance(self, user_id: UUID, exercise_ids: List[UUID],
+                             weight_unit: WeightUnit = WeightUnit.KG) -> List[LastPerformanceResponse]:
+        """
+        Get the user's most recent completed sets for many exercises at once.
+        
+        Reads the exercise_last_performance cache, which triggers on the sets
+        table keep current, so this is one primary-key lookup per exercise
+        instead of a scan of the user's workout history.
+        
+        Args:
+            user_id: User's unique identifier
+            exercise_ids: Exercises to look up
+            weight_unit: Unit to report weights in
+            
+        Returns:
+            Last performance for each exercise the user has completed sets for
+            
+        Raises:
+            HTTPException: If lookup fails
+        """
+        try:
+            if not exercise_ids:
+                return []
+            
+            result = self.supabase.table("exercise_last_performance").select(
+                "exercise_id, workout_id, performed_at, sets"
+            ).eq(
+                "user_id", str(user_id)
+            ).in_(
+                "exercise_id", [str(exercise_id) for exercise_id in exercise_ids]
+            ).execute()
+            
+            return [self._convert_to_last_performance_response(record, weight_unit) for record in result.data or []]
+            
+        except APIError as e:
+            logger.error(f"Database error retrieving last performance: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Database error during last performance retrieval"
+            )
+        except Exception as e:
+            logger.error(f"Unexpected error retrieving last performance: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Last performance retrieval failed"
+            )
+    
+    def add_exercises_to_workout(self, user_id: UUID, workout_id: UUID, bulk_data: BulkAddExercisesRequest) -> List[WorkoutExerciseResponse]:
+        """
+        Add many exercises to a workout in one transaction.
+        
+        Uses the add_workout_exercises database function: ownership is checked
+        and all rows are inserted in a single statement, with exercise existence
+        enforced by the foreign key instead of pre-check queries. Exercises
+        without an explicit order_index are appended using gapped indexes.
+        
+        Args:
+            user_id: User's unique identifier
+            workout_id: Workout's unique identifier
+            bulk_data: Exercises to add
+            
+        Returns:
+            Created workout-exercise relationships in request order
+            
+        Raises:
+            HTTPException: If workout or an exercise is not found, an exercise is
+                already in the workout, or the insert fails
+        """
+        try:
+            items = [
+                {
+                    "exercise_id": str(item.exercise_id),
+                    "order_index": item.order_index,
+                    "notes": item.notes
+                }
+                for item in bulk_data.exercises
+            ]
+            
+            result = self.supabase.rpc("add_workout_exercises", {
+                "p_user_id": str(user_id),
+                "p_workout_id": str(workout_id),
+                "p_items": items,
+                "p_gap": ORDER_INDEX_GAP
+            }).execute()
+            
+            self._record_write(user_id)
+            logger.info(f"Added {len(result.data or [])} exercises to workout {workout_id}")
+            
+            workout_exercises = [self._convert_to_workout_exercise_response(record) for record in result.data or []]
+            for workout_exercise in workout_exercises:
+                get_live_hub().publish(
+                    user_id, "exercise_added", workout_exercise,
+                    workout_id=workout_id, workout_exercise_id=workout_exercise.id
+                )
+            return workout_exercises
+            
+        except APIError as e:
+            self._raise_for_workout_exercise_error(e, "exercise addition")
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error adding exercises to workout: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Exercise addition failed"
+            )
+    
+    def reorder_workout_exercises(self, user_id: UUID, workout_id: UUID, reorder_data: ReorderExercisesRequest) -> List[WorkoutExerciseResponse]:
+        """
+        Rewrite the order of every exercise in a workout with one UPDATE.
+        
+        Args:
+            user_id: User's unique identifier
+            workout_id: Workout's unique identifier
+            reorder_data: All of the workout's exercise IDs in their new order
+            
+        Returns:
+            Workout exercises in their new order
+            
+        Raises:
+            HTTPException: If the workout is not found or the list does not
+                match the workout's exercises
+        """
+        try:
+            records = self._rewrite_exercise_order(user_id, workout_id, reorder_data.exercise_ids)
+            logger.info(f"Reordered {len(records)} exercises in workout {workout_id}")
+            
+            workout_exercises = [self._convert_to_workout_exercise_response(record) for record in records]
+            get_live_hub().publish(user_id, "exercises_reordered", workout_exercises, workout_id=workout_id)
+            return workout_exercises
+            
+        except APIError as e:
+            self._raise_for_workout_exercise_error(e, "exercise reorder")
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error reordering workout exercises: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Exercise reorder failed"
+            )
+    
+    def move_exercise_in_workout(self, user_id: UUID, workout_id: UUID, exercise_id: UUID, move_data: MoveExerciseRequest) -> WorkoutExerciseResponse:
+        """
+        Move one exercise within a workout (drag and drop).
+        
+        The exercise gets an order index between its new neighbours, so only
+        its own row is written. When the neighbours leave no free index the
+        workout is rebalanced with a single reorder statement.
+        
+        Args:
+            user_id: User's unique identifier
+            workout_id: Workout's unique identifier
+            exercise_id: Exercise to move
+            move_data: Exercise to place it after (None for the top)
+            
+        Returns:
+            Moved workout exercise with its new order index
+            
+        Raises:
+            HTTPException: If the workout or either exercise is not found
+        """
+        try:
+            # Current order with ownership enforced on the denormalized owner
+            order_result = self.supabase.table("workout_exercises").select(
+                "id, exercise_id, order_index"
+            ).eq("workout_id", str(workout_id)).eq(
+                "user_id", str(user_id)
+            ).order("order_index").execute()
+            
+            ordered = [row for row in order_result.data or [] if row["exercise_id"] != str(exercise_id)]
+            if len(ordered) == len(order_result.data or []):
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Exercise not found in workout"
+                )
+            
+            if move_data.after_exercise_id is None:
+                position = 0
+            else:
+                anchor_ids = [row["exercise_id"] for row in ordered]
+                if str(move_data.after_exercise_id) not in anchor_ids:
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail="Anchor exercise not found in workout"
+                    )
+                position = anchor_ids.index(str(move_data.after_exercise_id)) + 1
+            
+            before = ordered[position - 1]["order_index"] if position > 0 else None
+            after = ordered[position]["order_index"] if position < len(ordered) else None
+            new_index = midpoint_order_index(before, after)
+            
+            if new_index is not None:
+                result = self.supabase.table("workout_exercises").update({
+                    "order_index": new_index
+                }).match({
+                    "workout_id": str(workout_id),
+                    "exercise_id": str(exercise_id)
+                }).execute()
+                if not result.data:
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail="Exercise not found in workout"
+                    )
+                moved_record = result.data[0]
+            else:
+                # No gap left between neighbours - rebalance the whole workout once
+                new_order = [UUID(row["exercise_id"]) for row in ordered]
+                new_order.insert(position, exercise_id)
+                records = self._rewrite_exercise_order(user_id, workout_id, new_order)
+                moved_record = next(r for r in records if r["exercise_id"] == str(exercise_id))
+            
+            logger.info(f"Moved exercise {exercise_id} in workout {workout_id} to order index {moved_record['order_index']}")
+            
+            workout_exercise = self._convert_to_workout_exercise_response(moved_record)
+            get_live_hub().publish(user_id, "exercise_moved", workout_exercise, workout_id=workout_id)
+            return workout_exercise
+            
+        except APIError as e:
+            self._raise_for_workout_exercise_error(e, "exercise move")
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error moving workout exercise: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Exercise move failed"
+            )
+    
+    def _rewrite_exercise_order(self, user_id: UUID, workout_id: UUID, exercise_ids: List[UUID]) -> List[Dict[str, Any]]:
+        """Assign evenly gapped order indexes to all exercises via one RPC call."""
+        result = self.supabase.rpc("reorder_workout_exercises", {
+            "p_user_id": str(user_id),
+            "p_workout_id": str(workout_id),
+            "p_exercise_ids": [str(exercise_id) for exercise_id in exercise_ids],
+            "p_gap": ORDER_INDEX_GAP
+        }).execute()
+        return sorted(result.data or [], key=lambda record: record["order_index"])
+    
+    def _raise_if_active_workout_conflict(self, e: APIError) -> None:
+        """
+        Map a violation of the one-active-workout-per-user index to 409.
+        
+        Other unique violations are left to the caller's database error
+        handling instead of being reported as an active workout conflict.
+        """
+        if getattr(e, "code", None) != "23505":
+            return
+        if any(ACTIVE_WORKOUT_INDEX in (text or "") for text in (e.message, e.details)):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="An active workout already exists; complete it before starting another"
+            )
+    
+    def _raise_for_workout_exercise_error(self, e: APIError, operation: str) -> None:
+        """Map database errors from workout exercise writes to HTTP errors."""
+        code = getattr(e, "code", None)
+        if code == "P0002":
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=getattr(e, "message", None) or "Workout not found"
+            )
+        if code == "23503":
+            # Foreign key violation - the referenced exercise does not exist
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Exercise not found"
+            )
+        if code == "23505" or "duplicate key" in str(e).lower():
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Exercise already exists in this workout"
+            )
+        if code == "22023":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=getattr(e, "message", None) or "Invalid exercise order"
+            )
+        logger.error(f"Database error during {operation}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error during {operation}"
+        )
+    
     def remove_exercise_from_workout(self, user_id: UUID, workout_id: UUID, exercise_id: UUID) -> None:
         """
         Remove exercise from workout (cascade deletes sets).
@@ -482,7 +987,8 @@ class WorkoutService:
             # Delete workout exercise relationship (cascade deletes sets)
             result = self.supabase.table("workout_exercises").delete().match({
                 "workout_id": str(workout_id),
-                "exercise_id": str(exercise_id)
+                "exercise_id": str(exercise_id),
+                "user_id": str(user_id)
             }).execute()
             
             if not result.data or len(result.data) == 0:
@@ -491,7 +997,16 @@ class WorkoutService:
                     detail="Exercise not found in workout"
                 )
             
+            self._record_write(user_id)
             logger.info(f"Exercise {exercise_id} removed from workout {workout_id}")
+            get_live_hub().publish(
+                user_id, "exercise_removed", {"exercise_id": str(exercise_id)},
+                workout_id=workout_id, workout_exercise_id=result.data[0]["id"]
+            )
+            self._sync_personal_records(
+                user_id, "exercise removal",
+                lambda records: records.remove_workout_exercise(user_id, workout_id, exercise_id)
+            )
             
         except HTTPException:
             raise
@@ -508,7 +1023,8 @@ class WorkoutService:
                 detail="Exercise removal failed"
             )
     
-    def add_set_to_exercise(self, user_id: UUID, workout_id: UUID, exercise_id: UUID, set_data: CreateSetRequest) -> SetResponse:
+    def add_set_to_exercise(self, user_id: UUID, workout_id: UUID, exercise_id: UUID, set_data: CreateSetRequest,
+                            weight_unit: WeightUnit = WeightUnit.KG) -> SetResponse:
         """
         Add set to exercise in workout.
         
@@ -517,6 +1033,7 @@ class WorkoutService:
             workout_id: Workout's unique identifier
             exercise_id: Exercise's unique identifier
             set_data: Set creation data
+            weight_unit: Unit of the set's weight (also used for the response)
             
         Returns:
             Created set response
@@ -525,19 +1042,23 @@ class WorkoutService:
             HTTPException: If workout exercise not found or set creation fails
         """
         try:
-            # Get workout exercise ID for set relationship
-            we_result = self.supabase.table("workout_exercises").select("id").match({
+            # Get the user's workout exercise ID for set relationship
+            we_result = self.supabase.table("workout_exercises").select("id, workouts(archived_at)").match({
                 "workout_id": str(workout_id),
-                "exercise_id": str(exercise_id)
-            }).single().execute()
+                "exercise_id": str(exercise_id),
+                "user_id": str(user_id)
+            }).maybe_single().execute()
             
-            if not we_result.data:
+            if not we_result or not we_result.data:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Exercise not found in workout"
                 )
             
             workout_exercise_id = we_result.data["id"]
+            if (we_result.data.get("workouts") or {}).get("archived_at"):
+                # Keep the workout's history in one store: move its sets back before adding one
+                self._restore_archived_workout(user_id, workout_id)
             
             # Get next order index for sets
             order_result = self.supabase.table("sets").select("order_index").eq("workout_exercise_id", workout_exercise_id).order("order_index", desc=True).limit(1).execute()
@@ -546,26 +1067,7 @@ class WorkoutService:
                 next_order = order_result.data[0]["order_index"] + 1
             
             # Prepare set data for insertion
-            set_insert = {
-                "workout_exercise_id": workout_exercise_id,
-                "order_index": next_order,
-                "completed": set_data.completed,
-                "completed_at": datetime.now(timezone.utc).isoformat()
-            }
-            
-            # Add optional fields
-            if set_data.reps is not None:
-                set_insert["reps"] = set_data.reps
-            if set_data.weight is not None:
-                set_insert["weight"] = float(set_data.weight)
-            if set_data.duration is not None:
-                set_insert["duration"] = set_data.duration
-            if set_data.distance is not None:
-                set_insert["distance"] = float(set_data.distance)
-            if set_data.rest_time is not None:
-                set_insert["rest_time"] = set_data.rest_time
-            if set_data.notes is not None:
-                set_insert["notes"] = set_data.notes
+            set_insert = self.build_set_insert(workout_exercise_id, next_order, set_data, weight_unit)
             
             # Insert set
             result = self.supabase.table("sets").insert(set_insert).execute()
@@ -577,9 +1079,19 @@ class WorkoutService:
                 )
             
             created_record = result.data[0]
+            self._record_write(user_id)
             logger.info(f"Set created for exercise {exercise_id} in workout {workout_id}")
+            self._sync_personal_records(
+                user_id, "set creation",
+                lambda records: records.record_set(user_id, exercise_id, workout_id, created_record)
+            )
             
-            return self._convert_to_set_response(created_record)
+            created_set = self._convert_to_set_response(created_record, weight_unit)
+            get_live_hub().publish(
+                user_id, "set_added", created_set,
+                workout_id=workout_id, workout_exercise_id=workout_exercise_id
+            )
+            return created_set
             
         except HTTPException:
             raise
@@ -596,7 +1108,9 @@ class WorkoutService:
                 detail="Set creation failed"
             )
     
-    def update_set(self, user_id: UUID, set_id: UUID, update_data: UpdateSetRequest) -> SetResponse:
+    def update_set(self, user_id: UUID, set_id: UUID, update_data: UpdateSetRequest,
+                   weight_unit: WeightUnit = WeightUnit.KG,
+                   expected_version: Optional[int] = None) -> SetResponse:
         """
         Update existing set.
         
@@ -604,30 +1118,18 @@ class WorkoutService:
             user_id: User's unique identifier
             set_id: Set's unique identifier
             update_data: Set update data
+            weight_unit: Unit of the updated weight (also used for the response)
+            expected_version: Only update if the set is still at this version
             
         Returns:
             Updated set response
             
         Raises:
-            HTTPException: If set not found or update fails
+            HTTPException: If set not found, the version is stale (409) or update fails
         """
         try:
             # Prepare update data
-            update_dict = {}
-            if update_data.reps is not None:
-                update_dict["reps"] = update_data.reps
-            if update_data.weight is not None:
-                update_dict["weight"] = float(update_data.weight)
-            if update_data.duration is not None:
-                update_dict["duration"] = update_data.duration
-            if update_data.distance is not None:
-                update_dict["distance"] = float(update_data.distance)
-            if update_data.completed is not None:
-                update_dict["completed"] = update_data.completed
-            if update_data.rest_time is not None:
-                update_dict["rest_time"] = update_data.rest_time
-            if update_data.notes is not None:
-                update_dict["notes"] = update_data.notes
+            update_dict = self.build_set_update(update_data, weight_unit)
             
             if not update_dict:
                 raise HTTPException(
@@ -635,19 +1137,36 @@ class WorkoutService:
                     detail="No valid update fields provided"
                 )
             
-            # Update set (RLS enforced through workout_exercise relationship)
-            result = self.supabase.table("sets").update(update_dict).eq("id", str(set_id)).execute()
+            # Update set, comparing the version in the same statement when one is expected
+            query = self.supabase.table("sets").update(update_dict).eq(
+                "id", str(set_id)
+            ).eq("user_id", str(user_id))
+            if expected_version is not None:
+                query = query.eq("version", expected_version)
+            result = query.execute()
+            if not result.data and self._restore_workout_of_archived_set(user_id, set_id):
+                result = query.execute()
             
             if not result.data or len(result.data) == 0:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Set not found"
-                )
+                raise_for_missed_update(self.supabase, "sets", set_id, user_id, expected_version, "Set")
             
             updated_record = result.data[0]
+            self._record_write(user_id)
             logger.info(f"Set updated: {set_id}")
             
-            return self._convert_to_set_response(updated_record)
+            if RECORD_FIELDS.intersection(update_dict):
+                self._sync_personal_records(
+                    user_id, "set update",
+                    lambda records: records.refresh_for_set(
+                        user_id, *self._get_set_context(updated_record["workout_exercise_id"]), updated_record
+                    )
+                )
+            
+            updated_set = self._convert_to_set_response(updated_record, weight_unit)
+            get_live_hub().publish(
+                user_id, "set_updated", updated_set, workout_exercise_id=updated_record["workout_exercise_id"]
+            )
+            return updated_set
             
         except HTTPException:
             raise
@@ -676,8 +1195,15 @@ class WorkoutService:
             HTTPException: If set not found or deletion fails
         """
         try:
-            # Delete set (RLS enforced through workout_exercise relationship)
-            result = self.supabase.table("sets").delete().eq("id", str(set_id)).execute()
+            # Delete the user's set (the service role bypasses RLS)
+            query = self.supabase.table("sets").delete().eq(
+                "id", str(set_id)
+            ).eq(
+                "user_id", str(user_id)
+            )
+            result = query.execute()
+            if not result.data and self._restore_workout_of_archived_set(user_id, set_id):
+                result = query.execute()
             
             if not result.data or len(result.data) == 0:
                 raise HTTPException(
@@ -685,8 +1211,21 @@ class WorkoutService:
                     detail="Set not found"
                 )
             
+            self._record_write(user_id)
             logger.info(f"Set deleted: {set_id}")
             
+            deleted_record = result.data[0]
+            get_live_hub().publish(
+                user_id, "set_deleted", {"id": str(set_id)},
+                workout_exercise_id=deleted_record["workout_exercise_id"]
+            )
+            self._sync_personal_records(
+                user_id, "set deletion",
+                lambda records: records.remove_set(
+                    user_id, self._get_set_context(deleted_record["workout_exercise_id"])[0], set_id
+                )
+            )
+            
         except HTTPException:
             raise
         except APIError as e:
@@ -702,6 +1241,148 @@ class WorkoutService:
                 detail="Set deletion failed"
             )
     
+    def build_set_insert(self, workout_exercise_id: str, order_index: int, set_data: CreateSetRequest,
+                         weight_unit: WeightUnit = WeightUnit.KG) -> Dict[str, Any]:
+        """Build the sets row for a new set, converting weight and distance to storage units."""
+        set_insert = {
+            "workout_exercise_id": workout_exercise_id,
+            "order_index": order_index,
+            "completed": set_data.completed,
+            "completed_at": datetime.now(timezone.utc).isoformat()
+        }
+        
+        # Add optional fields
+        if set_data.reps is not None:
+            set_insert["reps"] = set_data.reps
+        if set_data.weight is not None:
+            set_insert["weight_grams"] = weight_to_grams(set_data.weight, weight_unit)
+        if set_data.duration is not None:
+            set_insert["duration"] = set_data.duration
+        if set_data.distance is not None:
+            set_insert["distance_cm"] = meters_to_cm(set_data.distance)
+        if set_data.rest_time is not None:
+            set_insert["rest_time"] = set_data.rest_time
+        if set_data.notes is not None:
+            set_insert["notes"] = set_data.notes
+        return set_insert
+    
+    def build_set_update(self, update_data: UpdateSetRequest, weight_unit: WeightUnit = WeightUnit.KG) -> Dict[str, Any]:
+        """Build the column changes for a set update, converting weight and distance to storage units."""
+        update_dict = {}
+        if update_data.reps is not None:
+            update_dict["reps"] = update_data.reps
+        if update_data.weight is not None:
+            update_dict["weight_grams"] = weight_to_grams(update_data.weight, weight_unit)
+        if update_data.duration is not None:
+            update_dict["duration"] = update_data.duration
+        if update_data.distance is not None:
+            update_dict["distance_cm"] = meters_to_cm(update_data.distance)
+        if update_data.completed is not None:
+            update_dict["completed"] = update_data.completed
+        if update_data.rest_time is not None:
+            update_dict["rest_time"] = update_data.rest_time
+        if update_data.notes is not None:
+            update_dict["notes"] = update_data.notes
+        return update_dict
+    
+    def load_active_workout_snapshot(self, user_id: UUID, workout_id: UUID) -> Optional[Dict[str, Any]]:
+        """
+        Load the nested record of one of the user's active workouts.
+        
+        Used by the active-session buffer, which serves set writes and reads
+        of the workout from this snapshot until it is flushed and closed.
+        
+        Args:
+            user_id: User's unique identifier
+            workout_id: Workout's unique identifier
+            
+        Returns:
+            The WORKOUT_DETAILS_SELECT record, or None if the workout is not an active workout of the user
+            
+        Raises:
+            HTTPException: If the lookup fails
+        """
+        try:
+            result = self._fetch_workout_details(user_id, workout_id)
+            record = result.data if result else None
+            
+            if not record or not record.get("is_active") or record.get("archived_at"):
+                return None
+            return record
+            
+        except APIError as e:
+            logger.error(f"Database error loading active workout snapshot: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Database error during workout retrieval"
+            )
+        except Exception as e:
+            logger.error(f"Unexpected error loading active workout snapshot: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Workout detail retrieval failed"
+            )
+    
+    def write_buffered_sets(self, user_id: UUID, created: List[Dict[str, Any]], updated: List[Dict[str, Any]]) -> None:
+        """
+        Write set creates and updates acknowledged by the active-session buffer.
+        
+        New sets are written with one insert; their ids and completed_at were
+        assigned when they were buffered, so a replayed create that already
+        landed is skipped. Updates set absolute values and are safe to repeat.
+        
+        Args:
+            user_id: User's unique identifier
+            created: Entries with ``exercise_id``, ``workout_id`` and the full ``row``
+            updated: Entries with ``exercise_id``, ``workout_id``, ``set_id`` and the changed ``fields``
+            
+        Raises:
+            APIError: If the database rejects the batch (the caller keeps it for a retry)
+        """
+        if created:
+            self.supabase.table("sets").upsert(
+                [entry["row"] for entry in created],
+                on_conflict="id,completed_at",
+                ignore_duplicates=True,
+                default_to_null=False
+            ).execute()
+        
+        written = []
+        for entry in updated:
+            result = self.supabase.table("sets").update(entry["fields"]).eq(
+                "id", str(entry["set_id"])
+            ).eq("user_id", str(user_id)).execute()
+            if result.data and RECORD_FIELDS.intersection(entry["fields"]):
+                written.append((entry, result.data[0]))
+        
+        if not created and not updated:
+            return
+        self._record_write(user_id)
+        logger.info(f"Buffered set writes flushed for user {user_id}: {len(created)} created, {len(updated)} updated")
+        
+        for entry in created:
+            self._sync_personal_records(
+                user_id, "buffered set creation",
+                lambda records, entry=entry: records.record_set(
+                    user_id, entry["exercise_id"], entry["workout_id"], entry["row"]
+                )
+            )
+        for entry, row in written:
+            self._sync_personal_records(
+                user_id, "buffered set update",
+                lambda records, entry=entry, row=row: records.refresh_for_set(
+                    user_id, entry["exercise_id"], entry["workout_id"], row
+                )
+            )
+    
+    def hydrate_workout(self, record: Dict[str, Any], weight_unit: WeightUnit = WeightUnit.KG) -> WorkoutWithExercisesResponse:
+        """Convert a nested workout record (e.g. a buffered snapshot) to a response."""
+        return self._convert_to_workout_with_exercises(record, weight_unit)
+    
+    def hydrate_set(self, record: Dict[str, Any], weight_unit: WeightUnit = WeightUnit.KG) -> SetResponse:
+        """Convert a sets row (e.g. a buffered one) to a response."""
+        return self._convert_to_set_response(record, weight_unit)
+    
     def get_workout_stats(self, user_id: UUID) -> WorkoutStatsResponse:
         """
         Get workout statistics for user.
@@ -716,8 +1397,10 @@ class WorkoutService:
             HTTPException: If stats retrieval fails
         """
         try:
-            # Get workout counts
-            all_workouts = self.supabase.table("workouts").select("id, duration, is_active").execute()
+            # Get workout counts (the service role bypasses RLS, so filter by owner)
+            all_workouts = self.supabase.table("workouts").select("id, duration, is_active").eq(
+                "user_id", str(user_id)
+            ).execute()
             
             total_workouts = len(all_workouts.data) if all_workouts.data else 0
             active_workouts = len([w for w in all_workouts.data if w["is_active"]]) if all_workouts.data else 0
@@ -749,6 +1432,280 @@ class WorkoutService:
                 detail="Stats retrieval failed"
             )
     
+    def close_stale_workouts(self, idle_hours: int, batch_size: int, max_batches: int) -> StaleWorkoutCloseReport:
+        """
+        Close active workouts with no activity for ``idle_hours``.
+        
+        Runs the close_stale_workouts database function in bounded batches
+        until a batch comes back short or ``max_batches`` is reached. Each
+        batch is one set-based UPDATE that takes completed_at and duration
+        from the workout's last completed set.
+        
+        Args:
+            idle_hours: Hours since the last completed set (or start) before a workout is closed
+            batch_size: Maximum workouts closed per batch
+            max_batches: Maximum batches per run
+            
+        Returns:
+            Report of what was closed
+            
+        Raises:
+            HTTPException: If a batch fails
+        """
+        try:
+            idle_before = datetime.now(timezone.utc) - timedelta(hours=idle_hours)
+            closed = 0
+            batches = 0
+            users = set()
+            more_pending = False
+            
+            while batches < max_batches:
+                result = self.supabase.rpc("close_stale_workouts", {
+                    "p_idle_before": idle_before.isoformat(),
+                    "p_batch_size": batch_size
+                }).execute()
+                rows = result.data or []
+                batches += 1
+                closed += len(rows)
+                
+                for row in rows:
+                    users.add(row["user_id"])
+                    self._record_write(row["user_id"])
+                    get_activity_calendar_registry().record_workout(row["user_id"], row)
+                
+                more_pending = len(rows) == batch_size
+                if not more_pending:
+                    break
+            
+            report = StaleWorkoutCloseReport(
+                idle_before=idle_before,
+                closed=closed,
+                users=len(users),
+                batches=batches,
+                more_pending=more_pending
+            )
+            if closed:
+                logger.info(f"Closed {closed} stale workouts for {len(users)} users in {batches} batches")
+            
+            return report
+            
+        except HTTPException:
+            raise
+        except APIError as e:
+            logger.error(f"Database error closing stale workouts: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Database error during stale workout close"
+            )
+        except Exception as e:
+            logger.error(f"Unexpected error closing stale workouts: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Stale workout close failed"
+            )
+    
+    def ensure_set_partitions(self, months_ahead: int) -> List[str]:
+        """
+        Create monthly sets partitions through ``months_ahead`` months ahead.
+        
+        Partitions must exist before sets are logged into their month,
+        otherwise rows land in the default partition and have to be moved
+        when the month's partition is created.
+        
+        Args:
+            months_ahead: Months after the current one to cover
+            
+        Returns:
+            Names of the partitions created by this call
+            
+        Raises:
+            HTTPException: If partition maintenance fails
+        """
+        try:
+            result = self.supabase.rpc("ensure_sets_partitions", {
+                "p_months_ahead": months_ahead
+            }).execute()
+            created = [row["partition_name"] for row in result.data or []]
+            if created:
+                logger.info(f"Created sets partitions: {', '.join(created)}")
+            
+            return created
+            
+        except APIError as e:
+            logger.error(f"Database error creating sets partitions: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Database error during sets partition maintenance"
+            )
+        except Exception as e:
+            logger.error(f"Unexpected error creating sets partitions: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Sets partition maintenance failed"
+            )
+    
+    def archive_cold_workouts(self, archive_after_days: int, batch_size: int, max_batches: int) -> ColdWorkoutArchiveReport:
+        """
+        Archive the sets of finished workouts started ``archive_after_days`` ago.
+        
+        Runs the archive_cold_workouts database function in bounded batches
+        until a batch comes back short or ``max_batches`` is reached. Each
+        batch moves the workouts' sets into one compressed archive row per
+        workout and keeps a per-exercise summary row for analytics; opening
+        an archived workout reads its sets from the archive, while cloning it
+        or writing one of its sets restores them.
+        
+        Args:
+            archive_after_days: Age in days (by start time) before a workout is archived
+            batch_size: Maximum workouts archived per batch
+            max_batches: Maximum batches per run
+            
+        Returns:
+            Report of what was archived
+            
+        Raises:
+            HTTPException: If a batch fails
+        """
+        try:
+            started_before = datetime.now(timezone.utc) - timedelta(days=archive_after_days)
+            archived = 0
+            batches = 0
+            users = set()
+            more_pending = False
+            
+            while batches < max_batches:
+                result = self.supabase.rpc("archive_cold_workouts", {
+                    "p_started_before": started_before.isoformat(),
+                    "p_batch_size": batch_size
+                }).execute()
+                rows = result.data or []
+                batches += 1
+                archived += len(rows)
+                
+                for row in rows:
+                    if row["user_id"] not in users:
+                        users.add(row["user_id"])
+                        self._record_write(row["user_id"])
+                
+                more_pending = len(rows) == batch_size
+                if not more_pending:
+                    break
+            
+            report = ColdWorkoutArchiveReport(
+                started_before=started_before,
+                archived=archived,
+                users=len(users),
+                batches=batches,
+                more_pending=more_pending
+            )
+            if archived:
+                logger.info(f"Archived {archived} cold workouts for {len(users)} users in {batches} batches")
+            
+            return report
+            
+        except HTTPException:
+            raise
+        except APIError as e:
+            logger.error(f"Database error archiving cold workouts: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Database error during cold workout archive"
+            )
+        except Exception as e:
+            logger.error(f"Unexpected error archiving cold workouts: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Cold workout archive failed"
+            )
+    
+    def _record_write(self, user_id: UUID) -> None:
+        """Bump the user's write version so cached analytics are recomputed."""
+        get_write_version_registry().bump(user_id)
+    
+    def _sync_personal_records(self, user_id: UUID, operation: str, update: Callable[[RecordService], Any]) -> None:
+        """
+        Queue a personal record update after a successful write.
+        
+        Records are derived data, so the update runs on the background task
+        queue (retried there, and only logged if it keeps failing) instead of
+        delaying or failing the write that already succeeded. Updates for one
+        user run in order.
+        """
+        get_task_queue().enqueue(
+            f"personal records after {operation}",
+            lambda: update(RecordService(self.supabase)),
+            key=f"records:{user_id}"
+        )
+    
+    def _attach_archived_sets(self, user_id: UUID, record: Dict[str, Any]) -> None:
+        """Merge an archived workout's set rows into its nested record (WORKOUT_DETAILS_SELECT), in order."""
+        archive = self.supabase.table("archived_workout_sets").select("sets").eq(
+            "workout_id", str(record["id"])
+        ).eq(
+            "user_id", str(user_id)
+        ).execute()
+        
+        archived_sets: Dict[str, List[Dict[str, Any]]] = {}
+        for row in archive.data or []:
+            for set_record in row["sets"]:
+                archived_sets.setdefault(set_record["workout_exercise_id"], []).append(set_record)
+        
+        for we_record in record.get("workout_exercises") or []:
+            archived = archived_sets.get(we_record["id"])
+            if archived:
+                we_record["sets"] = sorted(
+                    archived + (we_record.get("sets") or []), key=lambda set_record: set_record["order_index"]
+                )
+    
+    def _restore_archived_workout(self, user_id: UUID, workout_id: UUID) -> None:
+        """Move an archived workout's sets back to hot storage before a set write touches it."""
+        self.supabase.rpc("restore_archived_workout", {
+            "p_user_id": str(user_id),
+            "p_workout_id": str(workout_id)
+        }).execute()
+        logger.info(f"Restored archived workout for a set write: {workout_id}")
+    
+    def _restore_workout_of_archived_set(self, user_id: UUID, set_id: UUID) -> bool:
+        """
+        Restore the archived workout holding ``set_id``, if any.
+        
+        Archived sets are still shown by get_workout_details, so a set id
+        that matched no hot row may be in the user's archive. Only runs on
+        that miss path; the lookup is limited to the user's archive rows.
+        
+        Returns:
+            Whether a workout was restored (the write can be retried)
+        """
+        archive = self.supabase.table("archived_workout_sets").select("workout_id").eq(
+            "user_id", str(user_id)
+        ).contains(
+            "sets", json.dumps([{"id": str(set_id)}])
+        ).limit(1).execute()
+        
+        if not archive.data:
+            return False
+        self._restore_archived_workout(user_id, archive.data[0]["workout_id"])
+        return True
+    
+    def _get_set_context(self, workout_exercise_id: str) -> Tuple[str, str]:
+        """Look up the (exercise_id, workout_id) a set belongs to."""
+        result = self.supabase.table("workout_exercises").select(
+            "exercise_id, workout_id"
+        ).eq("id", str(workout_exercise_id)).single().execute()
+        return result.data["exercise_id"], result.data["workout_id"]
+    
+    def _fetch_workout_details(self, user_id: UUID, workout_id: UUID):
+        """Fetch the user's whole workout tree in one round trip, ordered by the database."""
+        return self.supabase.table("workouts").select(WORKOUT_DETAILS_SELECT).eq(
+            "id", str(workout_id)
+        ).eq(
+            "user_id", str(user_id)
+        ).order(
+            "order_index", foreign_table="workout_exercises"
+        ).order(
+            "order_index", foreign_table="workout_exercises.sets"
+        ).maybe_single().execute()
+    
     def _convert_to_workout_response(self, record: Dict[str, Any]) -> WorkoutResponse:
         """Convert database record to WorkoutResponse."""
         return WorkoutResponse(
@@ -760,22 +1717,99 @@ class WorkoutService:
             duration=record.get("duration"),
             is_active=record["is_active"],
             created_at=record["created_at"],
-            updated_at=record["updated_at"]
+            updated_at=record["updated_at"],
+            version=record.get("version", 1)
+        )
+    
+    def _convert_to_workout_exercise_response(self, record: Dict[str, Any]) -> WorkoutExerciseResponse:
+        """Convert database record to WorkoutExerciseResponse."""
+        return WorkoutExerciseResponse(
+            id=record["id"],
+            workout_id=record["workout_id"],
+            exercise_id=record["exercise_id"],
+            order_index=record["order_index"],
+            notes=record.get("notes"),
+            created_at=record["created_at"],
+            version=record.get("version", 1)
+        )
+    
+    def _convert_to_last_performance_response(self, record: Dict[str, Any],
+                                              weight_unit: WeightUnit = WeightUnit.KG) -> LastPerformanceResponse:
+        """Convert exercise_last_performance record to LastPerformanceResponse."""
+        return LastPerformanceResponse(
+            exercise_id=record["exercise_id"],
+            workout_id=record["workout_id"],
+            performed_at=record["performed_at"],
+            sets=[
+                LastPerformanceSet(
+                    reps=set_record.get("reps"),
+                    weight=grams_to_weight(set_record.get("weight_grams"), weight_unit),
+                    duration=set_record.get("duration"),
+                    distance=cm_to_meters(set_record.get("distance_cm")),
+                    rest_time=set_record.get("rest_time")
+                )
+                for set_record in record.get("sets") or []
+            ]
+        )
+    
+    def _convert_to_workout_with_exercises(self, record: Dict[str, Any],
+                                           weight_unit: WeightUnit = WeightUnit.KG) -> WorkoutWithExercisesResponse:
+        """
+        Convert a nested workout record (WORKOUT_DETAILS_SELECT) to a response.
+        
+        Exercises and sets are expected to arrive already ordered by
+        order_index, so hydration is a single pass with no sorting.
+        """
+        exercises_data = []
+        for we_record in record.get("workout_exercises") or []:
+            exercise_record = we_record["exercises"]
+            exercises_data.append(WorkoutExerciseWithDetails(
+                id=we_record["id"],
+                workout_id=we_record["workout_id"],
+                exercise_id=we_record["exercise_id"],
+                order_index=we_record["order_index"],
+                notes=we_record.get("notes"),
+                created_at=we_record["created_at"],
+                version=we_record.get("version", 1),
+                exercise_details=ExerciseDetails(
+                    id=exercise_record["id"],
+                    name=exercise_record["name"],
+                    category=exercise_record["category"],
+                    body_part=exercise_record["body_part"],
+                    equipment=exercise_record["equipment"],
+                    description=exercise_record.get("description")
+                ),
+                sets=[self._convert_to_set_response(set_record, weight_unit) for set_record in we_record.get("sets") or []]
+            ))
+        
+        return WorkoutWithExercisesResponse(
+            id=record["id"],
+            user_id=record["user_id"],
+            title=record["title"],
+            started_at=record["started_at"],
+            completed_at=record.get("completed_at"),
+            duration=record.get("duration"),
+            is_active=record["is_active"],
+            created_at=record["created_at"],
+            updated_at=record["updated_at"],
+            version=record.get("version", 1),
+            exercises=exercises_data
         )
     
-    def _convert_to_set_response(self, record: Dict[str, Any]) -> SetResponse:
-        """Convert database record to SetResponse."""
+    def _convert_to_set_response(self, record: Dict[str, Any], weight_unit: WeightUnit = WeightUnit.KG) -> SetResponse:
+        """Convert database record to SetResponse, reporting weight in the given unit."""
         return SetResponse(
             id=record["id"],
             workout_exercise_id=record["workout_exercise_id"],
             reps=record.get("reps"),
-            weight=Decimal(str(record["weight"])) if record.get("weight") is not None else None,
+            weight=grams_to_weight(record.get("weight_grams"), weight_unit),
             duration=record.get("duration"),
-            distance=Decimal(str(record["distance"])) if record.get("distance") is not None else None,
+            distance=cm_to_meters(record.get("distance_cm")),
             completed=record["completed"],
             rest_time=record.get("rest_time"),
             notes=record.get("notes"),
             order_index=record["order_index"],
             completed_at=record["completed_at"],
-            created_at=record["created_at"]
+            created_at=record["created_at"],
+            version=record.get("version", 1)
         )
\ No newline at end of file
@@ -147,7 +147,7 @@ def test_junction_tables_and_constraints():
     # Verify positive number constraints
     constraints_to_check = [
         r"reps.*CHECK.*reps > 0",
-        r"weight.*CHECK.*weight >= 0", 
+        r"weight_grams.*CHECK.*weight_grams >= 0", 
         r"duration.*CHECK.*duration > 0",
         r"rest_time.*CHECK.*rest_time >= 0"
     ]
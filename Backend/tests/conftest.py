@@ -738,9 +738,9 @@ async def mock_supabase_client():
                         "id": str(uuid.uuid4()),
                         "workout_exercise_id": workout_exercise_id,
                         "reps": data.get("reps"),
-                        "weight": data.get("weight"),
+                        "weight_grams": data.get("weight_grams"),
                         "duration": data.get("duration"),
-                        "distance": data.get("distance"),
+                        "distance_cm": data.get("distance_cm"),
                         "completed": data.get("completed", False),
                         "rest_time": data.get("rest_time"),
                         "notes": data.get("notes"),
@@ -0,0 +1,134 @@
+"""
+Activity Calendar Tests
+
+Testing Focus:
+- Bit operations for streak lengths
+- Idempotent calendar maintenance on complete, reopen and delete
+- Streaks, heatmap and weekly frequency from one calendar build
+- Local calendar days from the user's timezone preference
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+from unittest.mock import MagicMock
+from zoneinfo import ZoneInfo
+
+import pytest
+
+# Test environment setup
+os.environ["TESTING"] = "true"
+
+from models.auth import UserPreferences
+from services.activity_service import (
+    ActivityService,
+    ActivityCalendar,
+    get_activity_calendar_registry,
+    local_day,
+    run_length_ending_at,
+    longest_run
+)
+
+
+def _supabase(timezone_name, workouts):
+    """Supabase mock answering the preferences lookup, then the workouts query."""
+    client = MagicMock()
+    builder = MagicMock()
+    for method in ("select", "eq"):
+        getattr(builder, method).return_value = builder
+    builder.execute.side_effect = [
+        MagicMock(data=[{"preferences": {"timezone": timezone_name}}]),
+        MagicMock(data=workouts)
+    ]
+    client.table.return_value = builder
+    client.builder = builder
+    return client
+
+
+def _workout(started_at):
+    return {"id": str(uuid4()), "started_at": started_at.isoformat()}
+
+
+class TestBitOperations:
+    """Streak lengths from day bitmaps."""
+
+    def test_run_length_ending_at(self):
+        bits = 0b1110111
+        assert run_length_ending_at(bits, 2) == 3
+        assert run_length_ending_at(bits, 6) == 3
+        assert run_length_ending_at(bits, 3) == 0
+
+    def test_longest_run(self):
+        assert longest_run(0b11110110111) == 4
+        assert longest_run(0) == 0
+
+
+class TestActivityCalendar:
+    """Incremental maintenance keeps bits and counts consistent."""
+
+    def test_add_is_idempotent_and_discard_clears_bit(self):
+        calendar = ActivityCalendar("UTC")
+        calendar.add("a", 10)
+        calendar.add("a", 10)
+        calendar.add("b", 10)
+
+        assert calendar.counts == {10: 2}
+        calendar.discard("a")
+        assert calendar.bits == 1 << 10
+        calendar.discard("b")
+        assert calendar.bits == 0 and calendar.counts == {}
+
+    def test_local_day_uses_timezone(self):
+        late_evening = "2026-03-01T02:00:00+00:00"
+
+        assert local_day(late_evening, ZoneInfo("UTC")) - local_day(late_evening, ZoneInfo("America/New_York")) == 1
+
+    def test_timezone_preference_is_validated(self):
+        assert UserPreferences(timezone="Europe/Berlin").timezone == "Europe/Berlin"
+        with pytest.raises(ValueError):
+            UserPreferences(timezone="Mars/Olympus_Mons")
+
+
+class TestActivityService:
+    """One build, then answers from the bitmap."""
+
+    def test_streaks_and_frequency_from_one_build(self):
+        user_id = uuid4()
+        now = datetime.now(timezone.utc)
+        workouts = [_workout(now - timedelta(days=d)) for d in (0, 1, 2, 2, 10, 11, 12, 13)]
+        supabase = _supabase("UTC", workouts)
+        service = ActivityService(supabase)
+
+        streaks = service.get_streaks(user_id)
+        frequency = service.get_weekly_frequency(user_id, weeks=4)
+
+        assert streaks.current_streak == 3
+        assert streaks.longest_streak == 4
+        assert streaks.last_workout_date == now.date()
+        assert sum(frequency.active_days) == 7
+        assert sum(frequency.workouts) == 8
+        assert supabase.builder.execute.call_count == 2
+        supabase.builder.eq.assert_any_call("is_active", False)
+
+    def test_heatmap_counts_per_day(self):
+        workouts = [_workout(datetime(2025, 1, 2, 12, tzinfo=timezone.utc)) for _ in range(2)]
+        workouts.append(_workout(datetime(2025, 12, 31, 12, tzinfo=timezone.utc)))
+
+        heatmap = ActivityService(_supabase("UTC", workouts)).get_heatmap(uuid4(), year=2025)
+
+        assert len(heatmap.counts) == 365
+        assert heatmap.counts[1] == 2 and heatmap.counts[-1] == 1
+        assert heatmap.active_days == 2
+
+    def test_completion_and_deletion_update_loaded_calendar(self):
+        user_id = uuid4()
+        service = ActivityService(_supabase("UTC", []))
+        assert service.get_streaks(user_id).current_streak == 0
+
+        registry = get_activity_calendar_registry()
+        workout = {"id": str(uuid4()), "started_at": datetime.now(timezone.utc).isoformat(), "is_active": False}
+        registry.record_workout(user_id, workout)
+        assert service.get_streaks(user_id).current_streak == 1
+
+        registry.forget_workout(user_id, workout["id"])
+        assert service.get_streaks(user_id).current_streak == 0
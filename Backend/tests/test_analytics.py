@@ -0,0 +1,438 @@
+"""
+Analytics Tests - Exercise Progression and Training Load
+
+Testing Focus:
+- Vectorized per-session aggregation (top set, estimated 1RM, volume, reps)
+- LTTB and bucketed-max downsampling
+- Progression service query shape and columnar response
+- Histories longer than PostgREST's row cap read in ordered pages
+- Rolling training load (ACWR, monotony, strain) over dense per-day arrays
+- Training load cache invalidated by the user's write version
+- Body part volume attribution through the in-memory exercise index
+- Archived workouts contributing their per-exercise summary rows
+- Stored grams reported in the user's weight unit
+"""
+
+import os
+from datetime import date, datetime, timedelta, timezone
+from uuid import uuid4
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+# Test environment setup
+os.environ["TESTING"] = "true"
+
+from models.auth import WeightUnit
+from services.analytics_service import (
+    AnalyticsService,
+    session_metrics,
+    lttb_indices,
+    bucket_max,
+    rolling_mean,
+    ExerciseBodyPartIndex,
+    training_load,
+    PROGRESSION_SELECT,
+    PROGRESSION_SUMMARY_SELECT,
+    LOAD_SELECT
+)
+from core.config import settings
+from core.write_versions import WriteVersionRegistry, VersionedCache, get_write_version_registry
+
+
+def _summaries(sessions):
+    """Build archived summary rows from [(started_at, {column: value, ...}), ...]."""
+    return [
+        dict(summary, workout_id=str(uuid4()), workouts={"started_at": started_at.isoformat()})
+        for started_at, summary in sessions
+    ]
+
+
+def _rows(sessions):
+    """Build fetched set rows from [(started_at, [(weight in kg, reps), ...]), ...]."""
+    rows = []
+    for started_at, sets in sessions:
+        workout_id = str(uuid4())
+        for weight, reps in sets:
+            rows.append({
+                "weight_grams": None if weight is None else weight * 1000,
+                "reps": reps,
+                "workout_exercises": {
+                    "workout_id": workout_id,
+                    "exercise_id": "e",
+                    "workouts": {"started_at": started_at.isoformat()}
+                }
+            })
+    return rows
+
+
+class TestSessionMetrics:
+    """Aggregation over contiguous session runs."""
+
+    def test_metrics_per_session_in_time_order(self):
+        codes = np.array([1, 0, 1, 0])
+        started = np.array([2000, 1000, 2000, 1000])
+        weights = np.array([100.0, 80.0, 90.0, np.nan])
+        reps = np.array([5, 8, 3, 10])
+
+        metrics = session_metrics(codes, started, weights, reps)
+
+        assert metrics["timestamps"].tolist() == [1000, 2000]
+        assert metrics["top_set_weight"].tolist() == [80.0, 100.0]
+        assert metrics["total_volume"].tolist() == [640.0, 770.0]
+        assert metrics["total_reps"].tolist() == [18, 8]
+        assert metrics["estimated_1rm"][1] == pytest.approx(100 * (1 + 5 / 30))
+
+    def test_bodyweight_session_has_no_weight_metrics(self):
+        metrics = session_metrics(np.array([0]), np.array([0]), np.array([np.nan]), np.array([12]))
+
+        assert np.isnan(metrics["top_set_weight"][0])
+        assert np.isnan(metrics["estimated_1rm"][0])
+        assert metrics["total_reps"].tolist() == [12]
+
+
+class TestDownsampling:
+    """Point selection keeps endpoints and extremes."""
+
+    def test_lttb_keeps_endpoints_and_spike(self):
+        x = np.arange(100)
+        y = np.zeros(100)
+        y[42] = 50
+
+        keep = lttb_indices(x, y, 10)
+
+        assert len(keep) == 10
+        assert keep[0] == 0 and keep[-1] == 99
+        assert 42 in keep
+        assert np.all(np.diff(keep) > 0)
+
+    def test_lttb_noop_when_under_threshold(self):
+        assert lttb_indices(np.arange(5), np.arange(5), 10).tolist() == [0, 1, 2, 3, 4]
+
+    def test_bucket_max_keeps_peaks(self):
+        columns = {
+            "timestamps": np.arange(10),
+            "top_set_weight": np.arange(10, dtype=float),
+            "estimated_1rm": np.full(10, np.nan),
+            "total_volume": np.ones(10),
+            "total_reps": np.arange(10)
+        }
+
+        reduced = bucket_max(columns, 2)
+
+        assert reduced["timestamps"].tolist() == [0, 5]
+        assert reduced["top_set_weight"].tolist() == [4.0, 9.0]
+        assert np.isnan(reduced["estimated_1rm"]).all()
+
+
+class TestProgressionService:
+    """One filtered query, columnar output."""
+
+    @pytest.fixture
+    def supabase(self):
+        client = MagicMock()
+        builder = MagicMock()
+        summaries = MagicMock()
+        for query in (builder, summaries):
+            for method in ("select", "eq", "gt", "gte", "order", "range"):
+                getattr(query, method).return_value = query
+        summaries.execute.return_value = MagicMock(data=[])
+        client.table.side_effect = lambda name: summaries if name == "workout_exercise_summaries" else builder
+        client.builder = builder
+        client.summaries = summaries
+        return client
+
+    def test_columnar_progression(self, supabase):
+        start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        supabase.builder.execute.return_value = MagicMock(data=_rows([
+            (start + timedelta(days=7), [(105, 5)]),
+            (start, [(100, 5), (100, 5)])
+        ]))
+        user_id = str(uuid4())
+
+        result = AnalyticsService(supabase).get_exercise_progression(user_id, uuid4())
+
+        supabase.table.assert_any_call("sets")
+        supabase.builder.select.assert_called_once_with(PROGRESSION_SELECT)
+        supabase.builder.eq.assert_any_call("user_id", user_id)
+        assert result.total_sessions == 2
+        assert result.downsampled is False
+        assert result.top_set_weight == [100.0, 105.0]
+        assert result.total_volume == [1000.0, 525.0]
+        assert result.timestamps[0] == int(start.timestamp() * 1000)
+
+    def test_history_is_read_past_the_row_cap(self, supabase):
+        start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        first_page = _rows([(start + timedelta(days=i), [(100, 5)]) for i in range(3)])
+        supabase.builder.execute.side_effect = [
+            MagicMock(data=first_page),
+            MagicMock(data=_rows([(start + timedelta(days=3), [(110, 5)])]))
+        ]
+
+        with patch.object(settings, "query_page_size", 3):
+            result = AnalyticsService(supabase).get_exercise_progression(uuid4(), uuid4())
+
+        assert result.total_sessions == 4
+        assert [call.args for call in supabase.builder.range.call_args_list] == [(0, 2), (3, 5)]
+        supabase.builder.order.assert_any_call("id")
+
+    def test_since_bounds_partition_key(self, supabase):
+        supabase.builder.gte.return_value = supabase.builder
+        supabase.builder.execute.return_value = MagicMock(data=[])
+
+        AnalyticsService(supabase).get_exercise_progression(uuid4(), uuid4(), since=date(2026, 1, 1))
+
+        supabase.builder.gte.assert_any_call("completed_at", "2026-01-01")
+        supabase.builder.gte.assert_any_call("workout_exercises.workouts.started_at", "2026-01-01")
+
+    def test_archived_sessions_merge_in_time_order(self, supabase):
+        start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        supabase.builder.execute.return_value = MagicMock(data=_rows([(start, [(100, 5)])]))
+        supabase.summaries.execute.return_value = MagicMock(data=_summaries([
+            (start - timedelta(days=400), {"top_set_weight_grams": 90000, "estimated_1rm_grams": 105000,
+                                           "total_volume_grams": 1350000, "total_reps": 15}),
+            (start - timedelta(days=500), {"top_set_weight_grams": None, "estimated_1rm_grams": None,
+                                           "total_volume_grams": 0, "total_reps": 30})
+        ]))
+        exercise_id = uuid4()
+
+        result = AnalyticsService(supabase).get_exercise_progression(uuid4(), exercise_id)
+
+        supabase.summaries.select.assert_called_once_with(PROGRESSION_SUMMARY_SELECT)
+        supabase.summaries.eq.assert_any_call("exercise_id", str(exercise_id))
+        assert result.total_sessions == 3
+        assert result.timestamps == sorted(result.timestamps)
+        assert result.top_set_weight == [None, 90.0, 100.0]
+        assert result.total_volume == [0.0, 1350.0, 500.0]
+        assert result.total_reps == [30, 15, 5]
+
+    def test_recent_since_skips_archive(self, supabase):
+        supabase.builder.execute.return_value = MagicMock(data=[])
+        since = datetime.now(timezone.utc).date() - timedelta(days=30)
+
+        AnalyticsService(supabase).get_exercise_progression(uuid4(), uuid4(), since=since)
+
+        supabase.summaries.execute.assert_not_called()
+
+    def test_downsamples_long_history(self, supabase):
+        start = datetime(2021, 1, 1, tzinfo=timezone.utc)
+        supabase.builder.execute.return_value = MagicMock(data=_rows([
+            (start + timedelta(days=3 * i), [(60 + i % 20, 5)]) for i in range(600)
+        ]))
+
+        result = AnalyticsService(supabase).get_exercise_progression(uuid4(), uuid4(), points=50, method="max")
+
+        assert result.total_sessions == 600
+        assert result.downsampled is True
+        assert result.method == "max"
+        assert len(result.timestamps) == len(result.total_reps) == 50
+
+    def test_no_history_is_empty(self, supabase):
+        supabase.builder.execute.return_value = MagicMock(data=[])
+
+        result = AnalyticsService(supabase).get_exercise_progression(uuid4(), uuid4(), points=10)
+
+        assert result.total_sessions == 0
+        assert result.timestamps == []
+
+
+class TestTrainingLoadMath:
+    """Rolling windows over a dense per-day volume array."""
+
+    def test_rolling_mean_aligns_to_window_end(self):
+        assert rolling_mean(np.array([1.0, 2.0, 3.0, 4.0]), 2).tolist() == [1.5, 2.5, 3.5]
+
+    def test_steady_load_has_unit_ratio(self):
+        daily = np.tile([1000.0, 0, 500.0, 0, 1000.0, 0, 0], 8)
+
+        load = training_load(daily, 7)
+
+        assert len(load["acwr"]) == 7
+        np.testing.assert_allclose(load["acwr"], 1.0)
+        np.testing.assert_allclose(load["acute_load"], 2500 / 7)
+        assert np.all(load["monotony"] > 0)
+        np.testing.assert_allclose(load["strain"], 2500 * load["monotony"])
+
+    def test_spike_raises_ratio_and_flat_week_has_no_monotony(self):
+        daily = np.zeros(34)
+        daily[-1] = 7000.0
+
+        load = training_load(daily, 7)
+
+        assert load["acwr"][-1] == pytest.approx(4.0)
+        assert np.isnan(load["acwr"][0])
+        assert np.isnan(load["monotony"][0])
+
+
+class TestVersionedCache:
+    """Entries are valid only at the version they were computed at."""
+
+    def test_write_invalidates_entry(self):
+        registry = WriteVersionRegistry()
+        cache = VersionedCache(registry)
+        cache.set("u", "k", "value", cache.current_version("u"))
+
+        assert cache.get("u", "k") == "value"
+        registry.bump("u")
+        assert cache.get("u", "k") is None
+
+    def test_value_computed_across_a_write_is_never_served(self):
+        registry = WriteVersionRegistry()
+        cache = VersionedCache(registry)
+        version = cache.current_version("u")
+        registry.bump("u")
+        cache.set("u", "k", "stale", version)
+
+        assert cache.get("u", "k") is None
+
+    def test_lru_eviction(self):
+        cache = VersionedCache(WriteVersionRegistry(), max_entries=2)
+        for key in ("a", "b", "c"):
+            cache.set("u", key, key, 0)
+
+        assert cache.get("u", "a") is None
+        assert cache.get("u", "c") == "c"
+
+
+class TestTrainingLoadService:
+    """One windowed query, cached until the next write."""
+
+    @pytest.fixture
+    def supabase(self):
+        client = MagicMock()
+        builder = MagicMock()
+        for method in ("select", "eq", "gt", "gte", "lt", "order", "range"):
+            getattr(builder, method).return_value = builder
+        client.table.return_value = builder
+        client.builder = builder
+        return client
+
+    def test_daily_and_weekly_volume(self, supabase):
+        end = date(2026, 3, 15)  # Sunday
+        supabase.builder.execute.return_value = MagicMock(data=_rows([
+            (datetime(2026, 3, 15, 9, tzinfo=timezone.utc), [(100, 5), (100, 5)]),
+            (datetime(2026, 3, 9, 9, tzinfo=timezone.utc), [(50, 10)]),
+            (datetime(2026, 2, 20, 9, tzinfo=timezone.utc), [(100, 10)])
+        ]))
+
+        result = AnalyticsService(supabase).get_training_load(uuid4(), days=14, end_date=end)
+
+        supabase.builder.select.assert_called_once_with(LOAD_SELECT)
+        supabase.builder.gte.assert_any_call("workout_exercises.workouts.started_at", "2026-02-03")
+        # The sets partition key is bounded too so older partitions are pruned
+        supabase.builder.gte.assert_any_call("completed_at", "2026-02-03")
+        assert result.start_date == date(2026, 3, 2)
+        assert len(result.dates) == len(result.acwr) == 14
+        assert result.daily_volume[-1] == 1000.0
+        assert result.daily_volume[7] == 500.0
+        assert result.week_starts == [date(2026, 3, 2), date(2026, 3, 9)]
+        assert result.weekly_volume == [0.0, 1500.0]
+        assert result.chronic_load[0] == pytest.approx(1000 / 28, abs=0.01)
+
+    def test_archived_window_adds_summary_volume(self, supabase):
+        end = datetime.now(timezone.utc).date() - timedelta(days=400)
+        started_at = datetime.combine(end, datetime.min.time(), tzinfo=timezone.utc) + timedelta(hours=9)
+        supabase.builder.execute.side_effect = [
+            MagicMock(data=_rows([(started_at, [(100, 5)])])),
+            MagicMock(data=_summaries([(started_at, {"total_volume_grams": 1500000})]))
+        ]
+
+        result = AnalyticsService(supabase).get_training_load(uuid4(), days=7, end_date=end)
+
+        supabase.table.assert_any_call("workout_exercise_summaries")
+        assert result.daily_volume[-1] == 2000.0
+
+    def test_volume_in_weight_unit_is_cached_per_unit(self, supabase):
+        end = date(2026, 3, 15)
+        supabase.builder.execute.return_value = MagicMock(data=_rows([
+            (datetime(2026, 3, 15, 9, tzinfo=timezone.utc), [(100, 5)])
+        ]))
+        service = AnalyticsService(supabase)
+        user_id = uuid4()
+
+        kg = service.get_training_load(user_id, days=7, end_date=end, weight_unit=WeightUnit.KG)
+        lbs = service.get_training_load(user_id, days=7, end_date=end, weight_unit=WeightUnit.LBS)
+
+        assert kg.daily_volume[-1] == 500.0
+        assert lbs.daily_volume[-1] == 1102.31
+        assert supabase.builder.execute.call_count == 2
+
+    def test_cached_until_user_writes(self, supabase):
+        supabase.builder.execute.return_value = MagicMock(data=[])
+        service = AnalyticsService(supabase)
+        user_id = uuid4()
+
+        service.get_training_load(user_id, days=7)
+        service.get_training_load(user_id, days=7)
+        assert supabase.builder.execute.call_count == 1
+
+        get_write_version_registry().bump(user_id)
+        service.get_training_load(user_id, days=7)
+        assert supabase.builder.execute.call_count == 2
+
+
+class TestBodyPartVolume:
+    """Volume split across body parts in one vectorized pass."""
+
+    @pytest.fixture
+    def supabase(self):
+        client = MagicMock()
+        builder = MagicMock()
+        for method in ("select", "eq", "gt", "gte", "lt", "order", "range"):
+            getattr(builder, method).return_value = builder
+        client.table.return_value = builder
+        client.builder = builder
+        return client
+
+    def test_index_splits_multi_part_exercises(self):
+        index = ExerciseBodyPartIndex()
+        index.load([
+            {"id": "squat", "body_part": ["quads", "glutes"]},
+            {"id": "curl", "body_part": ["biceps"]}
+        ])
+
+        parts, totals = index.distribute(["squat", "curl", "unknown"], np.array([1000.0, 200.0, 50.0]))
+
+        assert dict(zip(parts, totals.tolist())) == {"quads": 500.0, "glutes": 500.0, "biceps": 200.0}
+        assert index.covers({"squat", "curl"}) and not index.covers({"unknown"})
+
+    def test_service_loads_index_for_unknown_exercises(self, supabase):
+        squat, curl = str(uuid4()), str(uuid4())
+        started_at = datetime(2026, 3, 1, tzinfo=timezone.utc).isoformat()
+        sets = [
+            {"weight_grams": 100000, "reps": 5, "workout_exercises": {"exercise_id": squat, "workouts": {"started_at": started_at}}},
+            {"weight_grams": 20000, "reps": 10, "workout_exercises": {"exercise_id": curl, "workouts": {"started_at": started_at}}}
+        ]
+        library = [{"id": squat, "body_part": ["quads", "glutes"]}, {"id": curl, "body_part": ["biceps"]}]
+        supabase.builder.execute.side_effect = [MagicMock(data=sets), MagicMock(data=library)]
+
+        result = AnalyticsService(supabase).get_body_part_volume(uuid4(), date(2026, 3, 1), date(2026, 3, 31))
+
+        assert result.total_volume == 700.0
+        assert result.total_sets == 2
+        assert [(p.body_part, p.volume, p.sets) for p in result.body_parts] == [
+            ("quads", 250.0, 0.5), ("glutes", 250.0, 0.5), ("biceps", 200.0, 1.0)
+        ]
+        assert result.body_parts[-1].share == pytest.approx(200 / 700, abs=1e-4)
+
+    def test_archived_summaries_count_their_sets(self, supabase):
+        squat = str(uuid4())
+        start = datetime.now(timezone.utc).date() - timedelta(days=500)
+        started_at = datetime.combine(start, datetime.min.time(), tzinfo=timezone.utc).isoformat()
+        sets = [{"weight_grams": 100000, "reps": 5, "workout_exercises": {"exercise_id": squat, "workouts": {"started_at": started_at}}}]
+        summaries = [{"exercise_id": squat, "total_volume_grams": 1500000, "completed_sets": 3, "workouts": {"started_at": started_at}}]
+        library = [{"id": squat, "body_part": ["quads"]}]
+        supabase.builder.execute.side_effect = [MagicMock(data=sets), MagicMock(data=summaries), MagicMock(data=library)]
+
+        result = AnalyticsService(supabase).get_body_part_volume(uuid4(), start, start + timedelta(days=6))
+
+        assert result.total_volume == 2000.0
+        assert result.total_sets == 4
+        assert [(p.body_part, p.volume, p.sets) for p in result.body_parts] == [("quads", 2000.0, 4.0)]
+
+    def test_inverted_range_is_rejected(self, supabase):
+        with pytest.raises(Exception) as exc_info:
+            AnalyticsService(supabase).get_body_part_volume(uuid4(), date(2026, 3, 2), date(2026, 3, 1))
+
+        assert exc_info.value.status_code == 400
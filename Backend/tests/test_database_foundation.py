@@ -403,7 +403,7 @@ class TestDatabaseFoundation:
         assert len(columns) > 0, "sets table does not exist"
         
         # Test required columns
-        required_columns = ['id', 'workout_exercise_id', 'reps', 'weight', 'duration', 'distance', 'completed', 'rest_time', 'notes', 'order_index', 'completed_at', 'created_at']
+        required_columns = ['id', 'workout_exercise_id', 'reps', 'weight_grams', 'duration', 'distance_cm', 'completed', 'rest_time', 'notes', 'order_index', 'completed_at', 'created_at']
         
         for col in required_columns:
             assert col in column_info, f"Missing {col} column in sets table"
@@ -412,9 +412,9 @@ class TestDatabaseFoundation:
         assert column_info['id']['data_type'] == 'uuid', f"Expected UUID for id"
         assert column_info['workout_exercise_id']['data_type'] == 'uuid', f"Expected UUID for workout_exercise_id"
         assert column_info['reps']['data_type'] == 'integer', f"Expected INTEGER for reps"
-        assert column_info['weight']['data_type'] == 'numeric', f"Expected NUMERIC for weight"
+        assert column_info['weight_grams']['data_type'] == 'integer', f"Expected INTEGER for weight_grams"
         assert column_info['duration']['data_type'] == 'integer', f"Expected INTEGER for duration"
-        assert column_info['distance']['data_type'] == 'numeric', f"Expected NUMERIC for distance"
+        assert column_info['distance_cm']['data_type'] == 'integer', f"Expected INTEGER for distance_cm"
         assert column_info['completed']['data_type'] == 'boolean', f"Expected BOOLEAN for completed"
         
         # Check positive number constraints
@@ -423,7 +423,7 @@ class TestDatabaseFoundation:
         FROM information_schema.check_constraints
         WHERE constraint_name LIKE '%sets%'
            OR check_clause LIKE '%reps > 0%'
-           OR check_clause LIKE '%weight >= 0%'
+           OR check_clause LIKE '%weight_grams >= 0%'
            OR check_clause LIKE '%duration > 0%';
         """
         
@@ -432,7 +432,7 @@ class TestDatabaseFoundation:
         
         # Verify positive constraints exist
         has_reps_constraint = any('reps > 0' in clause for clause in constraint_clauses)
-        has_weight_constraint = any('weight >= 0' in clause for clause in constraint_clauses)
+        has_weight_constraint = any('weight_grams >= 0' in clause for clause in constraint_clauses)
         has_duration_constraint = any('duration > 0' in clause for clause in constraint_clauses)
         
         assert has_reps_constraint, "Missing positive constraint for reps"
@@ -0,0 +1,137 @@
+"""
+Workout Event Log Tests
+
+Testing Focus:
+- The relay runs bounded batches until the outbox is drained
+- Consumers get unseen events in order and their offset is committed
+  after the handler returns
+- A failing handler commits nothing, so its batch is delivered again
+- One failing consumer does not hold back the others
+- Retention prunes for the registered consumers in bounded batches
+"""
+
+import os
+from datetime import datetime, timezone
+from uuid import uuid4
+from unittest.mock import MagicMock
+
+import pytest
+
+# Test environment setup
+os.environ["TESTING"] = "true"
+
+from models.event import WorkoutEventType
+from services.event_log_service import WorkoutEventLogService, register_event_consumer, _consumers
+
+
+def _event_record(log_offset: int) -> dict:
+    return {
+        "log_offset": log_offset, "user_id": str(uuid4()), "event_type": "set_logged",
+        "entity_id": str(uuid4()), "workout_id": str(uuid4()), "payload": {"reps": 8},
+        "occurred_at": datetime.now(timezone.utc).isoformat()
+    }
+
+
+@pytest.fixture
+def supabase():
+    """Chainable Supabase client mock - every builder method returns the same builder."""
+    client = MagicMock()
+    builder = MagicMock()
+    for method in ("select", "eq", "gt", "order", "limit"):
+        getattr(builder, method).return_value = builder
+    client.table.return_value = builder
+    client.builder = builder
+    return client
+
+
+@pytest.fixture(autouse=True)
+def clean_consumers():
+    _consumers.clear()
+    yield
+    _consumers.clear()
+
+
+class TestOutboxRelay:
+    """Committed outbox events move into the log in bounded batches."""
+
+    def test_runs_until_a_short_batch(self, supabase):
+        supabase.rpc.return_value.execute.side_effect = [MagicMock(data=2), MagicMock(data=2), MagicMock(data=1)]
+
+        report = WorkoutEventLogService(supabase).relay_outbox(batch_size=2, max_batches=10)
+
+        assert (report.relayed, report.batches, report.more_pending) == (5, 3, False)
+        supabase.rpc.assert_called_with("relay_workout_outbox", {"p_batch_size": 2})
+
+    def test_stops_at_batch_limit(self, supabase):
+        supabase.rpc.return_value.execute.return_value = MagicMock(data=2)
+
+        report = WorkoutEventLogService(supabase).relay_outbox(batch_size=2, max_batches=3)
+
+        assert (report.relayed, report.batches, report.more_pending) == (6, 3, True)
+
+
+class TestConsumers:
+    """At-least-once delivery from the committed offset."""
+
+    def test_handles_from_committed_offset_and_commits(self, supabase):
+        supabase.builder.execute.side_effect = [
+            MagicMock(data=[{"committed_offset": 4}]),
+            MagicMock(data=[_event_record(5), _event_record(6)]),
+            MagicMock(data=[_event_record(7)])
+        ]
+        supabase.rpc.return_value.execute.side_effect = [MagicMock(data=6), MagicMock(data=7)]
+        handler = MagicMock()
+
+        handled = WorkoutEventLogService(supabase).consume("volume", handler, batch_size=2, max_batches=10)
+
+        assert handled == 3
+        supabase.builder.gt.assert_any_call("log_offset", 4)
+        supabase.builder.gt.assert_any_call("log_offset", 6)
+        assert [[e.log_offset for e in call.args[0]] for call in handler.call_args_list] == [[5, 6], [7]]
+        assert handler.call_args_list[0].args[0][0].event_type == WorkoutEventType.SET_LOGGED
+        supabase.rpc.assert_called_with("commit_workout_event_offset", {"p_consumer": "volume", "p_offset": 7})
+
+    def test_failed_handler_commits_nothing(self, supabase):
+        supabase.builder.execute.side_effect = [MagicMock(data=[]), MagicMock(data=[_event_record(1)])]
+
+        with pytest.raises(RuntimeError):
+            WorkoutEventLogService(supabase).consume(
+                "volume", MagicMock(side_effect=RuntimeError("view unavailable")), batch_size=10, max_batches=1
+            )
+
+        supabase.rpc.assert_not_called()
+
+    def test_failing_consumer_does_not_block_others(self, supabase):
+        supabase.builder.execute.side_effect = [
+            MagicMock(data=[]), MagicMock(data=[_event_record(1)]),
+            MagicMock(data=[]), MagicMock(data=[_event_record(1)])
+        ]
+        supabase.rpc.return_value.execute.return_value = MagicMock(data=1)
+        register_event_consumer("broken", MagicMock(side_effect=RuntimeError("view unavailable")))
+        register_event_consumer("healthy", MagicMock())
+
+        handled = WorkoutEventLogService(supabase).run_consumers(batch_size=10, max_batches=1)
+
+        assert handled == {"broken": -1, "healthy": 1}
+
+
+class TestLogRetention:
+    """Events every registered consumer has committed are pruned in bounded batches."""
+
+    def test_prunes_for_registered_consumers(self, supabase):
+        supabase.rpc.return_value.execute.side_effect = [MagicMock(data=2), MagicMock(data=1)]
+        register_event_consumer("volume", MagicMock())
+        register_event_consumer("personal_records", MagicMock())
+
+        report = WorkoutEventLogService(supabase).prune_log(batch_size=2, max_batches=10)
+
+        assert (report.pruned, report.batches, report.more_pending) == (3, 2, False)
+        supabase.rpc.assert_called_with(
+            "prune_workout_event_log", {"p_consumers": ["personal_records", "volume"], "p_batch_size": 2}
+        )
+
+    def test_nothing_pruned_without_consumers(self, supabase):
+        report = WorkoutEventLogService(supabase).prune_log(batch_size=2, max_batches=10)
+
+        assert (report.pruned, report.batches) == (0, 0)
+        supabase.rpc.assert_not_called()
@@ -0,0 +1,174 @@
+"""
+Home Screen Aggregate Tests
+
+Testing Focus:
+- GET /home returns profile, active workout, stats and recent workouts in one payload
+- Upstream service calls run concurrently
+- The active workout is reported in the profile's weight unit without a
+  separate preferences read
+- Active workout and details are resolved in one query
+- Stats only count the requesting user's workouts
+"""
+
+import os
+import threading
+from datetime import datetime, timezone
+from uuid import UUID, uuid4
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+# Test environment setup
+os.environ["TESTING"] = "true"
+
+from models.auth import UserPreferences, WeightUnit
+from models.user import UserProfile
+from models.workout import WorkoutResponse, WorkoutWithExercisesResponse, WorkoutStatsResponse
+from services.workout_service import WorkoutService, WORKOUT_DETAILS_SELECT
+
+
+def _timestamp() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _workout_record(user_id: str, is_active: bool = True) -> dict:
+    return {
+        "id": str(uuid4()),
+        "user_id": user_id,
+        "title": "Push Day",
+        "started_at": _timestamp(),
+        "completed_at": None,
+        "duration": None,
+        "is_active": is_active,
+        "created_at": _timestamp(),
+        "updated_at": _timestamp()
+    }
+
+
+def _profile(user_id: str, weight_unit: WeightUnit = WeightUnit.LBS) -> UserProfile:
+    now = datetime.now(timezone.utc)
+    return UserProfile(
+        id=user_id,
+        email="test@example.com",
+        display_name="Test",
+        preferences=UserPreferences(weightUnit=weight_unit),
+        created_at=now,
+        updated_at=now
+    )
+
+
+class TestHomeEndpoint:
+    """One request, concurrent upstream calls."""
+
+    @pytest.fixture
+    def client(self):
+        from main import app
+        from services.auth_service import get_current_user
+
+        user_id = str(uuid4())
+        app.dependency_overrides[get_current_user] = lambda: {"id": user_id, "email": "test@example.com"}
+        yield TestClient(app), user_id
+        app.dependency_overrides.clear()
+
+    def test_aggregates_all_sections_concurrently(self, client):
+        test_client, user_id = client
+        # Profile, stats and recent workouts each wait for the other two; this only
+        # completes if they overlap (the active workout follows the profile)
+        barrier = threading.Barrier(3, timeout=5)
+
+        def concurrently(value):
+            def call(*args, **kwargs):
+                barrier.wait()
+                return value
+            return call
+
+        active = WorkoutWithExercisesResponse(**_workout_record(user_id), exercises=[])
+        recent = [WorkoutResponse(**_workout_record(user_id, is_active=False))]
+        stats = WorkoutStatsResponse(total_workouts=2, active_workouts=1, completed_workouts=1)
+
+        with patch("routers.home.auth_service") as auth_service, patch("routers.home.workout_service") as workout_service:
+            auth_service.get_user_profile_by_id.side_effect = concurrently(_profile(user_id, WeightUnit.KG))
+            workout_service.get_active_workout.return_value = active
+            workout_service.get_workout_stats.side_effect = concurrently(stats)
+            workout_service.get_user_workouts.side_effect = concurrently(recent)
+
+            response = test_client.get("/home?limit=5")
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["profile"]["email"] == "test@example.com"
+        assert body["active_workout"]["id"] == str(active.id)
+        assert body["stats"]["total_workouts"] == 2
+        assert len(body["recent_workouts"]) == 1
+        assert workout_service.get_user_workouts.call_args[0][1].limit == 5
+        workout_service.get_active_workout.assert_called_once_with(UUID(user_id), WeightUnit.KG)
+
+    def test_missing_profile_is_404(self, client):
+        test_client, _ = client
+
+        with patch("routers.home.auth_service") as auth_service, patch("routers.home.workout_service"):
+            auth_service.get_user_profile_by_id.side_effect = HTTPException(status_code=404, detail="User profile not found")
+            response = test_client.get("/home")
+
+        assert response.status_code == 404
+
+
+class TestActiveWorkoutQuery:
+    """Active workout with details in one round trip."""
+
+    @pytest.fixture
+    def supabase(self):
+        client = MagicMock()
+        builder = MagicMock()
+        for method in ("select", "eq", "order", "limit"):
+            getattr(builder, method).return_value = builder
+        client.table.return_value = builder
+        client.builder = builder
+        return client
+
+    def _service(self, supabase) -> WorkoutService:
+        service = WorkoutService()
+        service.supabase = supabase
+        return service
+
+    def test_active_workout_with_details(self, supabase):
+        user_id = str(uuid4())
+        record = dict(_workout_record(user_id), workout_exercises=[])
+        supabase.builder.execute.return_value = MagicMock(data=[record])
+
+        result = self._service(supabase).get_active_workout(user_id)
+
+        assert str(result.id) == record["id"]
+        supabase.builder.select.assert_called_once_with(WORKOUT_DETAILS_SELECT)
+        supabase.builder.eq.assert_any_call("user_id", user_id)
+        supabase.builder.eq.assert_any_call("is_active", True)
+        assert supabase.table.call_count == 1
+
+    def test_no_active_workout(self, supabase):
+        supabase.builder.execute.return_value = MagicMock(data=[])
+
+        assert self._service(supabase).get_active_workout(uuid4()) is None
+
+
+class TestWorkoutStatsQuery:
+    """Stats in the home payload are scoped to the user."""
+
+    def test_stats_filter_by_user(self):
+        supabase = MagicMock()
+        builder = supabase.table.return_value
+        builder.select.return_value = builder
+        builder.eq.return_value = builder
+        builder.execute.return_value = MagicMock(data=[
+            {"id": str(uuid4()), "duration": 1800, "is_active": False},
+            {"id": str(uuid4()), "duration": None, "is_active": True}
+        ])
+        service = WorkoutService()
+        service.supabase = supabase
+        user_id = uuid4()
+
+        stats = service.get_workout_stats(user_id)
+
+        builder.eq.assert_called_once_with("user_id", str(user_id))
+        assert (stats.total_workouts, stats.completed_workouts, stats.average_duration) == (2, 1, 1800)
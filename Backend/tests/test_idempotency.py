@@ -0,0 +1,263 @@
+"""
+Idempotency Tests - Idempotency-Key Replay for Mutating Workout Endpoints
+
+Testing Focus:
+- In-memory store reservation, TTL expiry and bounded eviction
+- Persistent store retries a vanished or expired reservation a bounded number of times
+- IdempotencyService replay, payload mismatch and in-flight conflicts
+- End-to-end replay through POST /workouts and POST /templates without
+  re-running the service
+- Replayed PUT responses carry the original ETag
+"""
+
+import os
+import time
+from datetime import datetime, timezone
+from uuid import uuid4
+from unittest.mock import patch, MagicMock
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+# Test environment setup
+os.environ["TESTING"] = "true"
+
+from postgrest.exceptions import APIError
+
+from services.idempotency_service import (
+    IdempotencyStore,
+    InMemoryIdempotencyStore,
+    SupabaseIdempotencyStore,
+    IdempotencyService,
+    REPLAY_HEADER,
+    RESERVE_ATTEMPTS
+)
+
+
+class TestInMemoryIdempotencyStore:
+    """Reservation semantics of the default in-memory backend."""
+
+    def test_first_reserve_wins(self):
+        store = InMemoryIdempotencyStore()
+
+        assert store.reserve("k", "fp", 60) is None
+        existing = store.reserve("k", "fp", 60)
+
+        assert existing is not None
+        assert existing["completed"] is False
+
+    def test_expired_entries_can_be_reserved_again(self):
+        store = InMemoryIdempotencyStore()
+        store.reserve("k", "fp", 0)
+        time.sleep(0.01)
+
+        assert store.reserve("k", "fp", 60) is None
+
+    def test_oldest_entries_evicted_when_full(self):
+        store = InMemoryIdempotencyStore(max_entries=2)
+        store.reserve("a", "fp", 60)
+        store.reserve("b", "fp", 60)
+        store.reserve("c", "fp", 60)
+
+        assert store.reserve("a", "fp", 60) is None
+        assert store.reserve("c", "fp", 60) is not None
+
+    def test_release_allows_retry(self):
+        store = InMemoryIdempotencyStore()
+        store.reserve("k", "fp", 60)
+        store.release("k")
+
+        assert store.reserve("k", "fp", 60) is None
+
+    def test_incomplete_backend_fails_on_construction(self):
+        class ReserveOnlyStore(IdempotencyStore):
+            def reserve(self, key, fingerprint, ttl_seconds):
+                return None
+
+        with pytest.raises(TypeError):
+            ReserveOnlyStore()
+
+
+class TestSupabaseIdempotencyStore:
+    """Reservation against the idempotency_keys table."""
+
+    def _client(self):
+        client = MagicMock()
+        builder = client.table.return_value
+        for method in ("insert", "select", "eq", "delete"):
+            getattr(builder, method).return_value = builder
+        return client
+
+    def test_key_released_by_others_gives_up_with_409(self):
+        client = self._client()
+        duplicate = APIError({"message": "duplicate key value violates unique constraint", "code": "23505"})
+        client.table.return_value.execute.side_effect = [duplicate, MagicMock(data=[])] * RESERVE_ATTEMPTS
+
+        with pytest.raises(HTTPException) as exc_info:
+            SupabaseIdempotencyStore(client).reserve("k", "fp", 60)
+        assert exc_info.value.status_code == 409
+        assert client.table.return_value.insert.call_count == RESERVE_ATTEMPTS
+
+    def test_expired_key_is_reserved_again(self):
+        client = self._client()
+        duplicate = APIError({"message": "duplicate key value violates unique constraint", "code": "23505"})
+        expired = {"key": "k", "fingerprint": "old", "completed": True, "expires_at": "2020-01-01T00:00:00Z"}
+        client.table.return_value.execute.side_effect = [duplicate, MagicMock(data=[expired]), MagicMock(), MagicMock()]
+
+        assert SupabaseIdempotencyStore(client).reserve("k", "fp", 60) is None
+        client.table.return_value.delete.assert_called_once()
+
+
+class TestIdempotencyService:
+    """Replay and conflict handling on top of the store."""
+
+    @pytest.fixture
+    def service(self):
+        return IdempotencyService(store=InMemoryIdempotencyStore(), ttl_seconds=60)
+
+    def test_keys_are_scoped_per_user_and_route(self, service):
+        a = service.build_key("user-a", "post", "/workouts", "abc")
+        b = service.build_key("user-b", "POST", "/workouts", "abc")
+        c = service.build_key("user-a", "POST", "/workouts/1/exercises", "abc")
+
+        assert len({a, b, c}) == 3
+
+    def test_completed_response_is_replayed(self, service):
+        fp = service.fingerprint(b'{"title": "Push"}')
+        assert service.begin("k", fp) is None
+
+        service.complete("k", fp, 201, {"id": "w1"})
+        record = service.begin("k", fp)
+
+        assert record["status_code"] == 201
+        assert record["body"] == {"id": "w1"}
+
+    def test_payload_mismatch_is_rejected(self, service):
+        service.begin("k", service.fingerprint(b"one"))
+        service.complete("k", service.fingerprint(b"one"), 200, {})
+
+        with pytest.raises(HTTPException) as exc_info:
+            service.begin("k", service.fingerprint(b"two"))
+        assert exc_info.value.status_code == 422
+
+    def test_in_flight_duplicate_conflicts(self, service):
+        fp = service.fingerprint(b"body")
+        service.begin("k", fp)
+
+        with pytest.raises(HTTPException) as exc_info:
+            service.begin("k", fp)
+        assert exc_info.value.status_code == 409
+
+    def test_abandoned_request_can_be_retried(self, service):
+        fp = service.fingerprint(b"body")
+        service.begin("k", fp)
+        service.abandon("k")
+
+        assert service.begin("k", fp) is None
+
+
+class TestIdempotentWorkoutEndpoints:
+    """Replay through the workouts router."""
+
+    @pytest.fixture
+    def client(self):
+        from main import app
+        from services.auth_service import get_current_user
+        import services.idempotency_service as idempotency_module
+
+        user_id = str(uuid4())
+        app.dependency_overrides[get_current_user] = lambda: {"id": user_id, "email": "test@example.com"}
+        with patch.object(idempotency_module, "_idempotency_service_instance",
+                          IdempotencyService(store=InMemoryIdempotencyStore(), ttl_seconds=60)):
+            yield TestClient(app), user_id
+        app.dependency_overrides.clear()
+
+    def _workout_response(self, user_id):
+        from models.workout import WorkoutResponse
+        now = datetime.now(timezone.utc)
+        return WorkoutResponse(
+            id=uuid4(), user_id=user_id, title="Push Day", started_at=now,
+            is_active=True, created_at=now, updated_at=now
+        )
+
+    def test_retry_replays_without_touching_service(self, client):
+        test_client, user_id = client
+        with patch("routers.workouts.workout_service") as mock_service:
+            mock_service.create_workout.return_value = self._workout_response(user_id)
+            headers = {"Idempotency-Key": "retry-1"}
+
+            first = test_client.post("/workouts", json={"title": "Push Day"}, headers=headers)
+            second = test_client.post("/workouts", json={"title": "Push Day"}, headers=headers)
+
+        assert first.status_code == 201
+        assert second.status_code == 201
+        assert second.json() == first.json()
+        assert second.headers.get(REPLAY_HEADER) == "true"
+        assert mock_service.create_workout.call_count == 1
+
+    def test_replayed_update_keeps_etag(self, client):
+        test_client, user_id = client
+        updated = self._workout_response(user_id).model_copy(update={"version": 4})
+        with patch("routers.workouts.workout_service") as mock_service:
+            mock_service.update_workout.return_value = updated
+            headers = {"Idempotency-Key": "retry-put", "If-Match": '"3"'}
+
+            first = test_client.put(f"/workouts/{updated.id}", json={"title": "Pull Day"}, headers=headers)
+            second = test_client.put(f"/workouts/{updated.id}", json={"title": "Pull Day"}, headers=headers)
+
+        assert first.headers["ETag"] == '"4"'
+        assert second.headers["ETag"] == '"4"'
+        assert second.headers.get(REPLAY_HEADER) == "true"
+        assert mock_service.update_workout.call_count == 1
+
+    def test_failed_request_is_not_stored(self, client):
+        test_client, user_id = client
+        with patch("routers.workouts.workout_service") as mock_service:
+            mock_service.create_workout.side_effect = [
+                HTTPException(status_code=500, detail="Workout creation failed"),
+                self._workout_response(user_id)
+            ]
+            headers = {"Idempotency-Key": "retry-2"}
+
+            first = test_client.post("/workouts", json={"title": "Push Day"}, headers=headers)
+            second = test_client.post("/workouts", json={"title": "Push Day"}, headers=headers)
+
+        assert first.status_code == 500
+        assert second.status_code == 201
+        assert mock_service.create_workout.call_count == 2
+
+    def test_template_retry_replays_without_touching_service(self, client):
+        from main import app
+        from models.auth import WeightUnit
+        from models.template import TemplateResponse
+        from services.unit_service import get_write_weight_unit
+
+        test_client, user_id = client
+        app.dependency_overrides[get_write_weight_unit] = lambda: WeightUnit.KG
+        now = datetime.now(timezone.utc)
+        template = TemplateResponse(
+            id=uuid4(), user_id=user_id, title="Push Day", created_at=now, updated_at=now, exercises=[]
+        )
+        body = {"title": "Push Day", "exercises": [{"exercise_id": str(uuid4()), "target_sets": 3}]}
+        with patch("routers.templates.template_service") as mock_service:
+            mock_service.create_template.return_value = template
+            headers = {"Idempotency-Key": "retry-template"}
+
+            first = test_client.post("/templates", json=body, headers=headers)
+            second = test_client.post("/templates", json=body, headers=headers)
+
+        assert first.status_code == 201
+        assert second.json() == first.json()
+        assert second.headers.get(REPLAY_HEADER) == "true"
+        assert mock_service.create_template.call_count == 1
+
+    def test_requests_without_key_are_not_deduplicated(self, client):
+        test_client, user_id = client
+        with patch("routers.workouts.workout_service") as mock_service:
+            mock_service.create_workout.return_value = self._workout_response(user_id)
+
+            test_client.post("/workouts", json={"title": "Push Day"})
+            test_client.post("/workouts", json={"title": "Push Day"})
+
+        assert mock_service.create_workout.call_count == 2
@@ -0,0 +1,240 @@
+"""
+Live Workout Channel Tests
+
+Testing Focus:
+- The hub fans a user's changes out to every subscription of that user only
+- Subscribers that fall behind get a single resync instead of a backlog
+- The Postgres backend delivers locally while its connection is down,
+  reconnects with backoff and then resyncs subscribers
+- A workout view follows its own exercises and sets and ignores other workouts
+- WorkoutService publishes set changes after they are written
+- WS /workouts/{id}/live sends the snapshot, then the workout's changes
+"""
+
+import asyncio
+import os
+from datetime import datetime, timezone
+from uuid import uuid4
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import HTTPException, WebSocketDisconnect
+from fastapi.testclient import TestClient
+
+# Test environment setup
+os.environ["TESTING"] = "true"
+
+from models.auth import WeightUnit
+from models.workout import CreateSetRequest, UpdateSetRequest, WorkoutWithExercisesResponse
+from services.live_session_service import (
+    LiveHub,
+    LiveHubBackend,
+    LiveWorkoutView,
+    PostgresLiveHubBackend,
+    build_event,
+    get_live_hub
+)
+from services.workout_service import WorkoutService
+
+
+def _set_record(workout_exercise_id: str) -> dict:
+    now = datetime.now(timezone.utc).isoformat()
+    return {
+        "id": str(uuid4()), "workout_exercise_id": workout_exercise_id, "reps": 8, "weight_grams": 80000,
+        "completed": True, "order_index": 0, "completed_at": now, "created_at": now, "version": 1
+    }
+
+
+class TestLiveHub:
+    """In-process fan-out keyed by user."""
+
+    @pytest.mark.asyncio
+    async def test_publish_reaches_each_subscription_of_the_user(self):
+        hub, user_id = LiveHub(), uuid4()
+
+        async with hub.subscribe(user_id) as phone, hub.subscribe(user_id) as watch, \
+                hub.subscribe(uuid4()) as stranger:
+            hub.publish(user_id, "set_updated", {"reps": 9}, workout_exercise_id="we-1")
+            events = await asyncio.gather(phone.get(), watch.get())
+            await asyncio.sleep(0)
+
+            assert [event["data"] for event in events] == [{"reps": 9}, {"reps": 9}]
+            assert stranger._queue.empty()
+        assert hub.subscriber_count() == 0
+
+    @pytest.mark.asyncio
+    async def test_slow_subscriber_gets_resync(self):
+        hub, user_id = LiveHub(queue_size=2), uuid4()
+
+        async with hub.subscribe(user_id) as subscription:
+            for reps in range(3):
+                hub.publish(user_id, "set_updated", {"reps": reps})
+            await asyncio.sleep(0)
+
+            assert (await subscription.get())["type"] == "resync"
+            assert subscription._queue.empty()
+
+
+def _connection(closed: bool = False, notify_error: Exception = None) -> MagicMock:
+    """asyncpg connection stand-in."""
+    connection = MagicMock()
+    connection.is_closed.return_value = closed
+    connection.add_listener = AsyncMock()
+    connection.close = AsyncMock()
+    connection.execute = AsyncMock(side_effect=notify_error)
+    return connection
+
+
+class TestPostgresBackend:
+    """LISTEN/NOTIFY transport survives a lost connection."""
+
+    @pytest.mark.asyncio
+    async def test_closed_connection_delivers_locally_and_reconnects(self):
+        dropped, fresh = _connection(closed=True), _connection()
+        backend = PostgresLiveHubBackend("postgresql://live", reconnect_backoff_seconds=0.01)
+        hub, user_id = LiveHub(backend=backend), uuid4()
+
+        with patch("asyncpg.connect", AsyncMock(side_effect=[dropped, OSError("refused"), fresh])) as connect:
+            await hub.start()
+            async with hub.subscribe(user_id) as subscription:
+                hub.publish(user_id, "set_updated", {"reps": 9})
+                assert (await subscription.get())["data"] == {"reps": 9}
+
+                await asyncio.sleep(0.05)
+                assert connect.call_count == 3
+                assert (await subscription.get())["type"] == "resync"
+
+                hub.publish(user_id, "set_updated", {"reps": 10})
+                await asyncio.sleep(0.01)
+                fresh.execute.assert_awaited_once()
+            await hub.stop()
+
+        dropped.terminate.assert_called_once()
+        fresh.close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_failed_notify_delivers_locally(self):
+        connection = _connection(notify_error=OSError("connection reset"))
+        backend = PostgresLiveHubBackend("postgresql://live", reconnect_backoff_seconds=60)
+        hub, user_id = LiveHub(backend=backend), uuid4()
+
+        with patch("asyncpg.connect", AsyncMock(side_effect=[connection, OSError("refused")])):
+            await hub.start()
+            async with hub.subscribe(user_id) as subscription:
+                hub.publish(user_id, "set_updated", {"reps": 9})
+                event = await asyncio.wait_for(subscription.get(), timeout=1)
+            await hub.stop()
+
+        assert event["data"] == {"reps": 9}
+        connection.terminate.assert_called_once()
+
+    def test_incomplete_backend_fails_on_construction(self):
+        class PublishOnlyBackend(LiveHubBackend):
+            def publish(self, user_id, event):
+                return True
+
+        with pytest.raises(TypeError):
+            PublishOnlyBackend()
+
+
+class TestLiveWorkoutView:
+    """Per-connection filtering of the user's changes."""
+
+    def test_follows_added_exercises_and_ignores_other_workouts(self):
+        workout_id = str(uuid4())
+        view = LiveWorkoutView(workout_id, {"we-1"})
+
+        assert view.accepts(build_event("set_updated", workout_exercise_id="we-1"))
+        assert not view.accepts(build_event("set_updated", workout_exercise_id="we-2"))
+        assert view.accepts(build_event("exercise_added", workout_id=workout_id, workout_exercise_id="we-2"))
+        assert view.accepts(build_event("set_updated", workout_exercise_id="we-2"))
+        assert not view.accepts(build_event("workout_updated", workout_id=str(uuid4())))
+        assert view.accepts(build_event("exercise_removed", workout_id=workout_id, workout_exercise_id="we-1"))
+        assert not view.accepts(build_event("set_added", workout_exercise_id="we-1"))
+
+
+class TestServicePublishes:
+    """Set writes are published once they have succeeded."""
+
+    @pytest.fixture
+    def hub(self):
+        hub = MagicMock()
+        with patch("services.workout_service.get_live_hub", return_value=hub):
+            yield hub
+
+    def test_add_set_publishes_set_added(self, hub):
+        workout_id, exercise_id, we_id = uuid4(), uuid4(), str(uuid4())
+        service = WorkoutService()
+        service.supabase = MagicMock()
+        service._sync_personal_records = MagicMock()
+        table = service.supabase.table.return_value
+        table.select.return_value.match.return_value.maybe_single.return_value.execute.return_value = MagicMock(
+            data={"id": we_id}
+        )
+        table.select.return_value.eq.return_value.order.return_value.limit.return_value.execute.return_value = MagicMock(
+            data=[]
+        )
+        table.insert.return_value.execute.return_value = MagicMock(data=[_set_record(we_id)])
+
+        created = service.add_set_to_exercise(uuid4(), workout_id, exercise_id, CreateSetRequest(reps=8, weight=80),
+                                              WeightUnit.KG)
+
+        args, kwargs = hub.publish.call_args
+        assert args[1:] == ("set_added", created)
+        assert kwargs == {"workout_id": workout_id, "workout_exercise_id": we_id}
+
+    def test_failed_update_publishes_nothing(self, hub):
+        service = WorkoutService()
+        service.supabase = MagicMock()
+        service.supabase.table.return_value.update.side_effect = Exception("database unavailable")
+
+        with pytest.raises(Exception):
+            service.update_set(uuid4(), uuid4(), UpdateSetRequest(reps=8))
+
+        hub.publish.assert_not_called()
+
+
+class TestLiveEndpoint:
+    """WS /workouts/{id}/live"""
+
+    def _workout(self, user_id: str, we_id: str) -> WorkoutWithExercisesResponse:
+        now = datetime.now(timezone.utc)
+        return WorkoutWithExercisesResponse(
+            id=uuid4(), user_id=user_id, title="Push", started_at=now, is_active=True,
+            created_at=now, updated_at=now,
+            exercises=[{
+                "id": we_id, "workout_id": uuid4(), "exercise_id": uuid4(), "order_index": 0,
+                "created_at": now, "sets": [],
+                "exercise_details": {"id": uuid4(), "name": "Bench Press", "category": "strength",
+                                     "body_part": ["chest"], "equipment": ["barbell"]}
+            }]
+        )
+
+    def test_snapshot_then_changes_for_the_workout(self):
+        from main import app
+
+        user_id, we_id = str(uuid4()), str(uuid4())
+        workout = self._workout(user_id, we_id)
+        with patch("routers.workouts.get_current_user", return_value={"id": user_id}), \
+                patch("routers.workouts.resolve_weight_unit", return_value=WeightUnit.KG), \
+                patch("routers.workouts.workout_service") as workout_service:
+            workout_service.get_workout_details.return_value = workout
+
+            with TestClient(app).websocket_connect(f"/workouts/{workout.id}/live?token=abc") as websocket:
+                snapshot = websocket.receive_json()
+                get_live_hub().publish(user_id, "set_added", {"reps": 5}, workout_exercise_id=str(uuid4()))
+                get_live_hub().publish(user_id, "set_added", {"reps": 8}, workout_exercise_id=we_id)
+                change = websocket.receive_json()
+
+        assert snapshot["type"] == "snapshot" and snapshot["data"]["id"] == str(workout.id)
+        assert (change["type"], change["data"]) == ("set_added", {"reps": 8})
+
+    def test_unauthenticated_connection_is_rejected(self):
+        from main import app
+
+        with patch("routers.workouts.get_current_user", side_effect=HTTPException(status_code=401)):
+            with pytest.raises(WebSocketDisconnect) as exc_info:
+                with TestClient(app).websocket_connect(f"/workouts/{uuid4()}/live"):
+                    pass
+
+        assert exc_info.value.code == 1008
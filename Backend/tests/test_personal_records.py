@@ -0,0 +1,297 @@
+"""
+Personal Record Tests
+
+Testing Focus:
+- Record candidates computed from a single set (weight, reps, 1RM, volume, cardio)
+- Incremental application through one apply_personal_records RPC
+- Bounded rebuild only when a record-holding set is removed
+  (directly, or with its exercise or workout), including archived sets
+- WorkoutService set writes keep records in sync without failing on record errors
+- Stored integer values are reported in the user's weight unit
+- The event log consumer applies current set rows, never stale payloads
+"""
+
+import os
+from datetime import datetime, timezone
+from uuid import uuid4
+from unittest.mock import MagicMock
+
+import pytest
+
+# Test environment setup
+os.environ["TESTING"] = "true"
+
+from models.auth import WeightUnit
+from models.event import WorkoutEvent
+from models.workout import CreateSetRequest
+from services.record_service import (
+    RecordService,
+    record_candidates,
+    best_candidates,
+    estimated_one_rep_max,
+    weight_qualifier
+)
+from services.workout_service import WorkoutService
+
+
+def _set_record(reps=None, weight_grams=None, duration=None, distance_cm=None, completed=True) -> dict:
+    now = datetime.now(timezone.utc).isoformat()
+    return {
+        "id": str(uuid4()),
+        "workout_exercise_id": str(uuid4()),
+        "reps": reps,
+        "weight_grams": weight_grams,
+        "duration": duration,
+        "distance_cm": distance_cm,
+        "completed": completed,
+        "rest_time": None,
+        "notes": None,
+        "order_index": 0,
+        "completed_at": now,
+        "created_at": now
+    }
+
+
+def _event(event_type: str, entity_id: str, payload: dict) -> WorkoutEvent:
+    return WorkoutEvent(
+        log_offset=1, user_id=uuid4(), event_type=event_type, entity_id=entity_id, workout_id=uuid4(),
+        payload=payload, occurred_at=datetime.now(timezone.utc)
+    )
+
+
+def _by_type(candidates) -> dict:
+    return {(c["record_type"], c["qualifier"]): c["value"] for c in candidates}
+
+
+@pytest.fixture
+def supabase():
+    """Chainable Supabase client mock - every builder method returns the same builder."""
+    client = MagicMock()
+    builder = MagicMock()
+    for method in ("select", "eq", "order", "limit", "match", "single", "maybe_single", "insert", "update", "delete",
+                   "gt", "in_", "range"):
+        getattr(builder, method).return_value = builder
+    client.table.return_value = builder
+    client.rpc.return_value = builder
+    client.builder = builder
+    return client
+
+
+class TestRecordCandidates:
+    """Candidate computation for a single set."""
+
+    def test_strength_set(self):
+        candidates = _by_type(record_candidates(_set_record(reps=5, weight_grams=100000), uuid4()))
+
+        assert candidates[("max_weight", "")] == 100000
+        assert candidates[("max_reps_at_weight", "100000")] == 5
+        assert candidates[("max_volume_set", "")] == 500000
+        assert candidates[("estimated_1rm", "")] == 116667
+
+    def test_high_rep_sets_skip_estimated_1rm(self):
+        candidates = _by_type(record_candidates(_set_record(reps=20, weight_grams=40000), uuid4()))
+
+        assert ("estimated_1rm", "") not in candidates
+        assert candidates[("max_volume_set", "")] == 800000
+
+    def test_bodyweight_and_cardio(self):
+        bodyweight = _by_type(record_candidates(_set_record(reps=15), uuid4()))
+        cardio = _by_type(record_candidates(_set_record(duration=1800, distance_cm=500000), uuid4()))
+
+        assert bodyweight == {("max_reps_at_weight", "0"): 15}
+        assert cardio == {("longest_distance", ""): 500000, ("longest_duration", ""): 1800}
+
+    def test_uncompleted_sets_never_count(self):
+        assert record_candidates(_set_record(reps=5, weight_grams=200000, completed=False), uuid4()) == []
+
+    def test_helpers(self):
+        assert estimated_one_rep_max(100000, 1) == 100000
+        assert estimated_one_rep_max(100000, 5) == 116667
+        assert weight_qualifier(80000) == "80000"
+        assert weight_qualifier(None) == "0"
+
+    def test_best_candidates_keeps_earliest_on_ties(self):
+        early = {"record_type": "max_weight", "qualifier": "", "value": 100.0, "achieved_at": "2026-01-01"}
+        late = dict(early, achieved_at="2026-02-01")
+        lower = dict(early, value=90.0)
+
+        assert best_candidates([late, lower, early]) == [early]
+
+
+class TestRecordService:
+    """Incremental maintenance issues one RPC per write."""
+
+    def test_record_set_applies_candidates_in_one_rpc(self, supabase):
+        supabase.builder.execute.return_value = MagicMock(data=[])
+        user_id, exercise_id = uuid4(), uuid4()
+
+        RecordService(supabase).record_set(user_id, exercise_id, uuid4(), _set_record(reps=5, weight_grams=100000))
+
+        supabase.rpc.assert_called_once()
+        name, params = supabase.rpc.call_args[0]
+        assert name == "apply_personal_records"
+        assert params["p_exercise_id"] == str(exercise_id)
+        assert len(params["p_candidates"]) == 4
+        supabase.table.assert_not_called()
+
+    def test_removing_non_record_set_skips_rebuild(self, supabase):
+        supabase.builder.execute.return_value = MagicMock(data=[])
+
+        RecordService(supabase).remove_set(uuid4(), uuid4(), uuid4())
+
+        supabase.table.assert_called_once_with("personal_records")
+        supabase.rpc.assert_not_called()
+
+    def test_removing_record_set_rebuilds_only_held_keys(self, supabase):
+        workout_id = str(uuid4())
+        history = [
+            dict(_set_record(reps=8, weight_grams=90000), workout_exercises={"workout_id": workout_id}),
+            dict(_set_record(reps=3, weight_grams=95000), workout_exercises={"workout_id": workout_id})
+        ]
+        supabase.builder.execute.side_effect = [
+            MagicMock(data=[{"record_type": "max_weight", "qualifier": ""}]),
+            MagicMock(data=history),
+            MagicMock(data=[]),
+            MagicMock(data=[])
+        ]
+
+        RecordService(supabase).remove_set(uuid4(), uuid4(), uuid4())
+
+        candidates = supabase.rpc.call_args[0][1]["p_candidates"]
+        assert [(c["record_type"], c["value"]) for c in candidates] == [("max_weight", 95000)]
+
+    def test_rebuild_keeps_records_from_archived_workouts(self, supabase):
+        archived_workout_id, we_id = str(uuid4()), str(uuid4())
+        archived_best = dict(_set_record(reps=1, weight_grams=120000), workout_exercise_id=we_id)
+        other_exercise = _set_record(reps=1, weight_grams=150000)
+        hot = [dict(_set_record(reps=3, weight_grams=95000), workout_exercises={"workout_id": str(uuid4())})]
+        supabase.builder.execute.side_effect = [
+            MagicMock(data=[{"record_type": "max_weight", "qualifier": ""}]),
+            MagicMock(data=hot),
+            MagicMock(data=[{"workout_exercise_id": we_id, "workout_id": archived_workout_id}]),
+            MagicMock(data=[{"workout_id": archived_workout_id, "sets": [archived_best, other_exercise]}]),
+            MagicMock(data=[])
+        ]
+
+        RecordService(supabase).remove_set(uuid4(), uuid4(), uuid4())
+
+        supabase.builder.in_.assert_called_once_with("workout_id", [archived_workout_id])
+        candidates = supabase.rpc.call_args[0][1]["p_candidates"]
+        assert [(c["record_type"], c["value"], c["workout_id"]) for c in candidates] == [
+            ("max_weight", 120000, archived_workout_id)
+        ]
+
+    def test_records_are_reported_in_weight_unit(self, supabase):
+        exercise_id = uuid4()
+        stored = {"exercise_id": str(exercise_id), "set_id": str(uuid4()), "workout_id": str(uuid4()),
+                  "achieved_at": datetime.now(timezone.utc).isoformat()}
+        supabase.builder.execute.return_value = MagicMock(data=[
+            dict(stored, record_type="max_weight", qualifier="", value=61235),
+            dict(stored, record_type="max_reps_at_weight", qualifier="61235", value=8),
+            dict(stored, record_type="longest_distance", qualifier="", value=500000)
+        ])
+
+        records = RecordService(supabase).get_exercise_records(uuid4(), exercise_id, weight_unit=WeightUnit.LBS).records
+
+        assert [(r.record_type, r.qualifier, r.value) for r in records] == [
+            ("max_weight", "", 135.0),
+            ("max_reps_at_weight", "135.00", 8),
+            ("longest_distance", "", 5000.0)
+        ]
+
+
+class TestRecordEventConsumer:
+    """Record maintenance replayed from the workout event log."""
+
+    def test_logged_sets_apply_current_rows(self, supabase):
+        current = _set_record(reps=5, weight_grams=100000)
+        workout_id, exercise_id, missing_id = str(uuid4()), str(uuid4()), str(uuid4())
+        supabase.builder.execute.side_effect = [
+            MagicMock(data=[dict(current, user_id=str(uuid4()),
+                                 workout_exercises={"workout_id": workout_id, "exercise_id": exercise_id})]),
+            MagicMock(data=[])
+        ]
+
+        RecordService(supabase).apply_events([
+            _event("set_logged", current["id"], dict(current, weight_grams=20000)),
+            _event("set_logged", missing_id, _set_record(reps=5, weight_grams=200000))
+        ])
+
+        supabase.builder.in_.assert_called_once_with("id", sorted([current["id"], missing_id]))
+        supabase.rpc.assert_called_once()
+        params = supabase.rpc.call_args[0][1]
+        assert params["p_exercise_id"] == exercise_id
+        assert _by_type(params["p_candidates"])[("max_weight", "")] == 100000
+
+    def test_deleted_sets_rebuild_only_existing_exercises(self, supabase):
+        exercise_id, kept_we_id, removed_we_id = str(uuid4()), str(uuid4()), str(uuid4())
+        deleted = dict(_set_record(reps=5), workout_exercise_id=kept_we_id)
+        cascaded = dict(_set_record(reps=5), workout_exercise_id=removed_we_id)
+        supabase.builder.execute.side_effect = [
+            MagicMock(data=[{"id": kept_we_id, "exercise_id": exercise_id}]),
+            MagicMock(data=[])
+        ]
+
+        RecordService(supabase).apply_events([
+            _event("set_logged", deleted["id"], deleted),
+            _event("set_deleted", deleted["id"], deleted),
+            _event("set_deleted", cascaded["id"], cascaded)
+        ])
+
+        assert [c.args[0] for c in supabase.table.call_args_list] == ["workout_exercises", "personal_records"]
+        supabase.builder.eq.assert_any_call("set_id", deleted["id"])
+        supabase.rpc.assert_not_called()
+
+
+class TestWorkoutServiceRecordSync:
+    """Set writes in WorkoutService feed the record engine."""
+
+    def _service(self, supabase) -> WorkoutService:
+        service = WorkoutService()
+        service.supabase = supabase
+        return service
+
+    def test_add_set_applies_records(self, supabase):
+        created = _set_record(reps=5, weight_grams=100000)
+        supabase.builder.execute.side_effect = [
+            MagicMock(data={"id": created["workout_exercise_id"]}),
+            MagicMock(data=[]),
+            MagicMock(data=[created]),
+            MagicMock(data=[])
+        ]
+
+        self._service(supabase).add_set_to_exercise(uuid4(), uuid4(), uuid4(), CreateSetRequest(reps=5, weight=100))
+
+        assert supabase.builder.insert.call_args[0][0]["weight_grams"] == 100000
+        assert supabase.rpc.call_args[0][0] == "apply_personal_records"
+
+    def test_record_failure_does_not_fail_set_write(self, supabase):
+        created = _set_record(reps=5, weight_grams=100000)
+        supabase.builder.execute.side_effect = [
+            MagicMock(data={"id": created["workout_exercise_id"]}),
+            MagicMock(data=[]),
+            MagicMock(data=[created]),
+            RuntimeError("records unavailable")
+        ]
+
+        result = self._service(supabase).add_set_to_exercise(uuid4(), uuid4(), uuid4(), CreateSetRequest(reps=5, weight=100))
+
+        assert str(result.id) == created["id"]
+
+    def test_remove_exercise_rebuilds_records_it_held(self, supabase):
+        user_id, workout_id, exercise_id = uuid4(), uuid4(), uuid4()
+        supabase.builder.execute.side_effect = [
+            MagicMock(data=[{"id": str(uuid4())}]),
+            MagicMock(data=[{"record_type": "max_weight", "qualifier": ""}]),
+            MagicMock(data=[dict(_set_record(reps=3, weight_grams=95000), workout_exercises={"workout_id": str(uuid4())})]),
+            MagicMock(data=[]),
+            MagicMock(data=[])
+        ]
+
+        self._service(supabase).remove_exercise_from_workout(user_id, workout_id, exercise_id)
+
+        supabase.builder.eq.assert_any_call("workout_id", str(workout_id))
+        supabase.builder.eq.assert_any_call("exercise_id", str(exercise_id))
+        name, params = supabase.rpc.call_args[0]
+        assert (name, params["p_exercise_id"]) == ("apply_personal_records", str(exercise_id))
+        assert [(c["record_type"], c["value"]) for c in params["p_candidates"]] == [("max_weight", 95000)]
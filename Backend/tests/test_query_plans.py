@@ -0,0 +1,288 @@
+"""
+Query Plan Regression Tests
+
+Testing Focus:
+- Every hot service query is served by an index lookup, never a sequential
+  scan or a filtered walk over a whole index
+- Queries that page or append in order can read an index in that order
+- Time-bounded set queries prune older monthly partitions
+
+Each query below is the SQL PostgREST issues for the named service method.
+The tests seed a few thousand rows inside the db_connection transaction
+(rolled back afterwards), ANALYZE them and EXPLAIN each query with
+enable_seqscan off: the planner then only picks a full scan when no index
+can answer the query, so the result does not depend on table sizes.
+Ordered queries are planned with enable_sort off in the same way.
+Run against a local database with the schema applied (TEST_DATABASE_URL);
+the module is skipped when that database cannot be reached.
+"""
+
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import AsyncGenerator
+
+import asyncpg
+import pytest
+import pytest_asyncio
+
+from conftest import TEST_DATABASE_URL
+
+pytestmark = pytest.mark.database
+
+SEED_USERS = 50
+SEED_WORKOUTS_PER_USER = 20
+SEED_EXERCISES_PER_WORKOUT = 3
+SEED_SETS_PER_EXERCISE = 4
+
+SEED_SQL = """
+INSERT INTO exercises (name, category, body_part, equipment)
+SELECT 'Plan Exercise ' || n, 'strength', ARRAY['plan part ' || n % 10], ARRAY['plan gear ' || n % 5]
+FROM generate_series(1, 60) AS n;
+
+CREATE TEMP TABLE plan_users ON COMMIT DROP AS
+SELECT gen_random_uuid() AS id FROM generate_series(1, {users});
+INSERT INTO auth.users (id) SELECT id FROM plan_users;
+INSERT INTO users (id, email) SELECT id, 'plan-' || id || '@example.com' FROM plan_users;
+
+INSERT INTO workouts (user_id, title, is_active, started_at, created_at)
+SELECT u.id, 'Plan', false, now() - n * interval '1 day', now() - n * interval '1 day'
+FROM plan_users u, generate_series(1, {workouts}) AS n;
+
+INSERT INTO workout_exercises (workout_id, exercise_id, order_index)
+SELECT w.id, e.id, e.position * 1024
+FROM workouts w
+JOIN (
+  SELECT id, ROW_NUMBER() OVER (ORDER BY name) - 1 AS position
+  FROM exercises WHERE name LIKE 'Plan Exercise %'
+) e ON e.position < {exercises}
+WHERE w.title = 'Plan';
+
+INSERT INTO sets (workout_exercise_id, reps, weight_grams, order_index)
+SELECT we.id, 8, (60 + n) * 1000, n
+FROM workout_exercises we
+JOIN workouts w ON w.id = we.workout_id AND w.title = 'Plan',
+generate_series(0, {sets} - 1) AS n;
+
+ANALYZE exercises;
+ANALYZE workouts;
+ANALYZE workout_exercises;
+ANALYZE sets;
+ANALYZE exercise_last_performance;
+"""
+
+INDEX_SCAN_NODES = ("Index Scan", "Index Only Scan", "Bitmap Index Scan")
+
+# (service method, SQL, parameter names, must read in index order)
+SERVICE_QUERIES = [
+    (
+        "ExerciseService.get_exercise_library(body_part)",
+        "SELECT * FROM exercises WHERE body_part @> ARRAY[$1]::text[] ORDER BY name LIMIT 50",
+        ("body_part",),
+        False
+    ),
+    (
+        "ExerciseService.get_exercise_library(equipment)",
+        "SELECT * FROM exercises WHERE equipment @> ARRAY[$1]::text[] ORDER BY name LIMIT 50",
+        ("equipment",),
+        False
+    ),
+    (
+        "WorkoutService.get_user_workouts",
+        "SELECT * FROM workouts WHERE user_id = $1 ORDER BY created_at DESC LIMIT 50 OFFSET 0",
+        ("user_id",),
+        True
+    ),
+    (
+        "WorkoutService.get_user_workouts(is_active)",
+        "SELECT * FROM workouts WHERE user_id = $1 AND is_active = false ORDER BY created_at DESC LIMIT 50 OFFSET 0",
+        ("user_id",),
+        True
+    ),
+    (
+        "WorkoutService.get_active_workout",
+        "SELECT * FROM workouts WHERE user_id = $1 AND is_active = true",
+        ("user_id",),
+        False
+    ),
+    (
+        "WorkoutService.get_workout_details(workout_exercises)",
+        "SELECT * FROM workout_exercises WHERE workout_id = $1 ORDER BY order_index",
+        ("workout_id",),
+        True
+    ),
+    (
+        "WorkoutService.get_workout_details(sets)",
+        "SELECT * FROM sets WHERE workout_exercise_id = $1 ORDER BY order_index",
+        ("workout_exercise_id",),
+        True
+    ),
+    (
+        "WorkoutService.add_set_to_exercise(next order_index)",
+        "SELECT order_index FROM sets WHERE workout_exercise_id = $1 ORDER BY order_index DESC LIMIT 1",
+        ("workout_exercise_id",),
+        True
+    ),
+    (
+        "WorkoutService.get_last_performance",
+        "SELECT exercise_id, workout_id, performed_at, sets FROM exercise_last_performance "
+        "WHERE user_id = $1 AND exercise_id = ANY($2::uuid[])",
+        ("user_id", "exercise_ids"),
+        False
+    ),
+    (
+        "AnalyticsService.get_training_load(sets)",
+        "SELECT weight_grams, reps FROM sets WHERE user_id = $1 AND completed = true "
+        "ORDER BY id LIMIT 1000 OFFSET 0",
+        ("user_id",),
+        False
+    ),
+    (
+        "AnalyticsService.get_exercise_progression(summaries)",
+        "SELECT * FROM workout_exercise_summaries WHERE user_id = $1 AND exercise_id = $2 AND completed_sets > 0 "
+        "ORDER BY workout_exercise_id LIMIT 1000 OFFSET 0",
+        ("user_id", "exercise_id"),
+        False
+    ),
+    (
+        "WorkoutService.archive_cold_workouts(candidates)",
+        "SELECT id FROM workouts WHERE archived_at IS NULL AND NOT is_active AND started_at < $1 "
+        "ORDER BY started_at LIMIT 200",
+        ("started_before",),
+        True
+    ),
+    (
+        "RecordService.get_user_records",
+        "SELECT * FROM personal_records WHERE user_id = $1 ORDER BY exercise_id",
+        ("user_id",),
+        True
+    ),
+    (
+        "WorkoutEventLogService.read_events",
+        "SELECT * FROM workout_event_log WHERE log_offset > $1 ORDER BY log_offset LIMIT 500",
+        ("after_offset",),
+        True
+    ),
+    (
+        "TemplateService.get_user_templates",
+        "SELECT * FROM workout_templates WHERE user_id = $1 ORDER BY updated_at DESC",
+        ("user_id",),
+        False
+    ),
+]
+
+
+def _plan_nodes(node: dict):
+    """Yield a plan node and all of its descendants."""
+    yield node
+    for child in node.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+def _is_full_scan(node: dict) -> bool:
+    """Sequential scans, and index scans that walk the whole index for a filter."""
+    if node["Node Type"] == "Seq Scan":
+        return True
+    return node["Node Type"] in INDEX_SCAN_NODES and "Index Cond" not in node
+
+
+def _scanned(node: dict) -> str:
+    return node.get("Index Name") or node["Relation Name"]
+
+
+@pytest_asyncio.fixture
+async def db_connection() -> AsyncGenerator[asyncpg.Connection, None]:
+    """Rolled-back test transaction as in conftest, skipped without a reachable database."""
+    try:
+        connection = await asyncpg.connect(TEST_DATABASE_URL)
+    except (OSError, asyncpg.PostgresError) as e:
+        pytest.skip(f"Test database unavailable: {e}")
+
+    transaction = connection.transaction()
+    await transaction.start()
+
+    try:
+        yield connection
+    finally:
+        await transaction.rollback()
+        await connection.close()
+
+
+@pytest_asyncio.fixture
+async def seeded(db_connection: asyncpg.Connection) -> dict:
+    """Seed workout history and return sample parameter values."""
+    sql = SEED_SQL.format(
+        users=SEED_USERS,
+        workouts=SEED_WORKOUTS_PER_USER,
+        exercises=SEED_EXERCISES_PER_WORKOUT,
+        sets=SEED_SETS_PER_EXERCISE
+    )
+    await db_connection.execute(sql)
+    await db_connection.execute("SET LOCAL enable_seqscan = off")
+
+    sample = await db_connection.fetchrow(
+        """
+        SELECT w.user_id, w.id AS workout_id, we.id AS workout_exercise_id, we.exercise_id
+        FROM workout_exercises we JOIN workouts w ON w.id = we.workout_id
+        WHERE w.title = 'Plan' LIMIT 1
+        """
+    )
+    return {
+        "user_id": sample["user_id"],
+        "workout_id": sample["workout_id"],
+        "workout_exercise_id": sample["workout_exercise_id"],
+        "exercise_id": sample["exercise_id"],
+        "exercise_ids": [sample["exercise_id"], uuid.uuid4()],
+        "started_before": datetime.now(timezone.utc) - timedelta(days=10),
+        "after_offset": 0,
+        "body_part": "plan part 3",
+        "equipment": "plan gear 2"
+    }
+
+
+class TestServiceQueryPlans:
+    """EXPLAIN every hot service query against seeded data."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "name, sql, params, ordered", SERVICE_QUERIES, ids=[query[0] for query in SERVICE_QUERIES]
+    )
+    async def test_query_uses_index(self, db_connection: asyncpg.Connection, seeded: dict,
+                                    name, sql, params, ordered):
+        if ordered:
+            # Only sort when no index returns rows in the requested order
+            await db_connection.execute("SET LOCAL enable_sort = off")
+        plan = await db_connection.fetchval(
+            f"EXPLAIN (FORMAT JSON) {sql}", *(seeded[param] for param in params)
+        )
+        root = json.loads(plan)[0]["Plan"]
+        nodes = list(_plan_nodes(root))
+
+        full_scans = [_scanned(node) for node in nodes if _is_full_scan(node)]
+        assert not full_scans, f"{name} falls back to a full scan of {full_scans}"
+
+        if ordered:
+            sorts = [node for node in nodes if node["Node Type"] in ("Sort", "Incremental Sort")]
+            assert not sorts, f"{name} sorts instead of reading an index in order"
+
+
+class TestSetsPartitionPruning:
+    """Time-bounded set queries only read the months they cover."""
+
+    @pytest.mark.asyncio
+    async def test_window_skips_older_partitions(self, db_connection: asyncpg.Connection, seeded: dict):
+        old_partition = await db_connection.fetchval(
+            "SELECT create_sets_partition((NOW() - INTERVAL '1 year')::DATE)"
+        )
+        window_start = datetime.now(timezone.utc) - timedelta(days=35)
+
+        plan = await db_connection.fetchval(
+            "EXPLAIN (FORMAT JSON) SELECT weight_grams, reps FROM sets "
+            "WHERE user_id = $1 AND completed = true AND completed_at >= $2",
+            seeded["user_id"], window_start
+        )
+        scanned = {node.get("Relation Name") for node in _plan_nodes(json.loads(plan)[0]["Plan"])}
+
+        assert old_partition is not None
+        assert old_partition not in scanned
+        assert f"sets_{datetime.now(timezone.utc):%Y_%m}" in scanned
@@ -0,0 +1,70 @@
+"""
+Scheduler Tests
+
+Testing Focus:
+- Periodic jobs run in worker threads and record results
+- Failures are recorded without stopping the job
+- Start/stop lifecycle cancels timers cleanly
+"""
+
+import asyncio
+import os
+import threading
+
+import pytest
+
+# Test environment setup
+os.environ["TESTING"] = "true"
+
+from core.scheduler import Scheduler
+
+
+class TestScheduler:
+    """Timer tasks around synchronous jobs."""
+
+    @pytest.mark.asyncio
+    async def test_runs_job_periodically_off_the_event_loop(self):
+        scheduler = Scheduler()
+        loop_thread = threading.get_ident()
+        threads = []
+
+        def job():
+            threads.append(threading.get_ident())
+            return {"closed": len(threads)}
+
+        scheduler.register("job", job, interval_seconds=0.01)
+        await scheduler.start()
+        await asyncio.sleep(0.1)
+        await scheduler.stop()
+
+        status = scheduler.jobs()[0]
+        assert status["runs"] >= 2
+        assert status["last_result"] == {"closed": status["runs"]}
+        assert loop_thread not in threads
+
+    @pytest.mark.asyncio
+    async def test_failure_is_recorded_and_job_keeps_running(self):
+        scheduler = Scheduler()
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError("database unavailable")
+            return "ok"
+
+        scheduler.register("flaky", flaky, interval_seconds=0.01)
+        assert await scheduler.run_now("flaky") is None
+        assert scheduler.jobs()[0]["last_error"] == "database unavailable"
+
+        assert await scheduler.run_now("flaky") == "ok"
+        status = scheduler.jobs()[0]
+        assert status["failures"] == 1 and status["last_error"] is None
+
+    def test_duplicate_registration_is_rejected(self):
+        scheduler = Scheduler()
+        scheduler.register("job", lambda: None, interval_seconds=60)
+
+        assert scheduler.has_job("job")
+        with pytest.raises(ValueError):
+            scheduler.register("job", lambda: None, interval_seconds=60)
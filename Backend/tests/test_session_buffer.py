@@ -0,0 +1,215 @@
+"""
+Active-Session Buffer Tests
+
+Testing Focus:
+- Set writes for the active workout are acknowledged from the journal
+  without a database write, and reads of that workout include them
+- Flushes batch new sets into one insert and keep updates in order
+- Unflushed journal entries are replayed after a restart
+- Failed flushes keep every acknowledged write for a retry
+- Workouts that are not active, and conditional updates, write through
+- The weight unit is read once when a session opens and converts its writes
+"""
+
+import json
+import os
+from datetime import datetime, timezone
+from uuid import uuid4
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+
+# Test environment setup
+os.environ["TESTING"] = "true"
+
+from models.auth import WeightUnit
+from models.workout import CreateSetRequest, UpdateSetRequest
+from services.session_buffer_service import SessionBuffer, SessionJournal
+from services.workout_service import WorkoutService
+
+
+def _active_workout(user_id: str) -> dict:
+    now = datetime.now(timezone.utc).isoformat()
+    workout_id, we_id, exercise_id = str(uuid4()), str(uuid4()), str(uuid4())
+    return {
+        "id": workout_id, "user_id": user_id, "title": "Push", "started_at": now, "completed_at": None,
+        "duration": None, "is_active": True, "archived_at": None, "created_at": now, "updated_at": now, "version": 1,
+        "workout_exercises": [{
+            "id": we_id, "workout_id": workout_id, "exercise_id": exercise_id, "order_index": 0, "notes": None,
+            "created_at": now, "version": 1,
+            "exercises": {"id": exercise_id, "name": "Bench Press", "category": "strength",
+                          "body_part": ["chest"], "equipment": ["barbell"], "description": None},
+            "sets": [{
+                "id": str(uuid4()), "workout_exercise_id": we_id, "reps": 5, "weight_grams": 100000,
+                "completed": True, "order_index": 0, "completed_at": now, "created_at": now, "version": 1
+            }]
+        }]
+    }
+
+
+@pytest.fixture(autouse=True)
+def write_unit():
+    """The unit a session pins when it opens (the preference read is mocked)."""
+    with patch("services.session_buffer_service.resolve_weight_unit", return_value=WeightUnit.KG) as resolve:
+        yield resolve
+
+
+@pytest.fixture
+def journal_path(tmp_path) -> str:
+    return str(tmp_path / "session_journal.jsonl")
+
+
+@pytest.fixture
+def service():
+    """WorkoutService with the database edges mocked (conftest patches __init__)."""
+    service = WorkoutService()
+    service.supabase = MagicMock()
+    service.load_active_workout_snapshot = MagicMock()
+    service.write_buffered_sets = MagicMock()
+    return service
+
+
+def _buffer(journal_path: str) -> SessionBuffer:
+    return SessionBuffer(journal=SessionJournal(journal_path, fsync=False), enabled=True)
+
+
+def _journal_ops(journal_path: str) -> list:
+    with open(journal_path) as journal:
+        return [json.loads(line)["op"] for line in journal]
+
+
+class TestBufferedWrites:
+    """Acknowledged after the journal append, written later in batches."""
+
+    def test_new_set_is_acknowledged_from_journal(self, service, journal_path):
+        user_id = str(uuid4())
+        workout = _active_workout(user_id)
+        exercise_id = workout["workout_exercises"][0]["exercise_id"]
+        service.load_active_workout_snapshot.return_value = workout
+        buffer = _buffer(journal_path)
+
+        created = buffer.add_set_to_exercise(
+            service, user_id, workout["id"], exercise_id, CreateSetRequest(reps=8, weight=80), WeightUnit.KG
+        )
+
+        assert created.order_index == 1 and created.weight == 80.0
+        service.write_buffered_sets.assert_not_called()
+        assert _journal_ops(journal_path) == ["create"]
+
+        details = buffer.get_workout_details(service, user_id, workout["id"], WeightUnit.KG)
+        assert [s.id for s in details.exercises[0].sets][-1] == created.id
+        assert service.load_active_workout_snapshot.call_count == 1
+
+    def test_flush_batches_creates_and_keeps_update_order(self, service, journal_path):
+        user_id = str(uuid4())
+        workout = _active_workout(user_id)
+        exercise_id = workout["workout_exercises"][0]["exercise_id"]
+        existing_id = workout["workout_exercises"][0]["sets"][0]["id"]
+        service.load_active_workout_snapshot.return_value = workout
+        buffer = _buffer(journal_path)
+
+        created = buffer.add_set_to_exercise(service, user_id, workout["id"], exercise_id, CreateSetRequest(reps=8))
+        buffer.update_set(service, user_id, created.id, UpdateSetRequest(reps=9))
+        first = buffer.update_set(service, user_id, existing_id, UpdateSetRequest(reps=6))
+        second = buffer.update_set(service, user_id, existing_id, UpdateSetRequest(notes="Paused"))
+
+        assert (first.version, second.version) == (2, 3)
+        assert buffer.flush_all()["flushed"] == 1
+
+        _, creates, updates = service.write_buffered_sets.call_args.args
+        assert [entry["row"]["reps"] for entry in creates] == [9]
+        assert [entry["fields"] for entry in updates] == [{"reps": 6}, {"notes": "Paused"}]
+        assert os.path.getsize(journal_path) == 0
+
+    def test_unflushed_entries_are_replayed_after_restart(self, service, journal_path):
+        user_id = str(uuid4())
+        workout = _active_workout(user_id)
+        exercise_id = workout["workout_exercises"][0]["exercise_id"]
+        service.load_active_workout_snapshot.return_value = workout
+        crashed = _buffer(journal_path)
+        created = crashed.add_set_to_exercise(service, user_id, workout["id"], exercise_id, CreateSetRequest(reps=8))
+        crashed.update_set(service, user_id, created.id, UpdateSetRequest(reps=10))
+        with open(journal_path, "a") as journal:
+            journal.write('{"op": "create", "seq"')  # torn append, never acknowledged
+
+        assert _buffer(journal_path).replay(service) == 2
+
+        replayed_user, creates, updates = service.write_buffered_sets.call_args.args
+        assert replayed_user == user_id
+        assert [(entry["row"]["id"], entry["row"]["reps"]) for entry in creates] == [(str(created.id), 10)]
+        assert updates == []
+        assert os.path.getsize(journal_path) == 0
+
+    def test_failed_flush_keeps_writes(self, service, journal_path):
+        user_id = str(uuid4())
+        workout = _active_workout(user_id)
+        exercise_id = workout["workout_exercises"][0]["exercise_id"]
+        service.load_active_workout_snapshot.return_value = workout
+        service.write_buffered_sets.side_effect = [Exception("database unavailable"), None]
+        buffer = _buffer(journal_path)
+        buffer.add_set_to_exercise(service, user_id, workout["id"], exercise_id, CreateSetRequest(reps=8))
+
+        with pytest.raises(HTTPException) as exc_info:
+            buffer.close_user(user_id)
+        assert exc_info.value.status_code == 503
+        assert buffer.stats()["pending_creates"] == 1
+
+        buffer.close_user(user_id)
+        assert buffer.stats() == {"sessions": 0, "pending_creates": 0, "pending_updates": 0, "recovered": 0}
+        assert len(service.write_buffered_sets.call_args.args[1]) == 1
+
+
+class TestPinnedWeightUnit:
+    """Buffered writes convert with the unit read when the session opened."""
+
+    def test_unit_is_read_once_per_session(self, service, journal_path, write_unit):
+        user_id = str(uuid4())
+        workout = _active_workout(user_id)
+        exercise_id = workout["workout_exercises"][0]["exercise_id"]
+        service.load_active_workout_snapshot.return_value = workout
+        buffer = _buffer(journal_path)
+
+        created = buffer.add_set_to_exercise(
+            service, user_id, workout["id"], exercise_id, CreateSetRequest(reps=8, weight=100), WeightUnit.LBS
+        )
+        buffer.update_set(service, user_id, created.id, UpdateSetRequest(weight=110), WeightUnit.LBS)
+
+        write_unit.assert_called_once()
+        row = buffer._sessions[user_id].rows[str(created.id)]
+        assert row["weight_grams"] == 110000  # converted as kg, the unit pinned at open
+
+
+class TestWriteThrough:
+    """Anything the buffer cannot answer alone goes to the database."""
+
+    def test_inactive_workout_is_not_buffered(self, service, journal_path):
+        service.load_active_workout_snapshot.return_value = None
+
+        result = _buffer(journal_path).add_set_to_exercise(
+            service, uuid4(), uuid4(), uuid4(), CreateSetRequest(reps=8)
+        )
+
+        assert result is None
+
+    def test_conditional_update_closes_session(self, service, journal_path):
+        user_id = str(uuid4())
+        workout = _active_workout(user_id)
+        set_id = workout["workout_exercises"][0]["sets"][0]["id"]
+        service.load_active_workout_snapshot.return_value = workout
+        buffer = _buffer(journal_path)
+        buffer.add_set_to_exercise(
+            service, user_id, workout["id"], workout["workout_exercises"][0]["exercise_id"], CreateSetRequest(reps=8)
+        )
+
+        result = buffer.update_set(service, user_id, set_id, UpdateSetRequest(reps=6), expected_version=1)
+
+        assert result is None
+        service.write_buffered_sets.assert_called_once()
+        assert buffer.stats()["sessions"] == 0
+
+    def test_disabled_buffer_reads_through(self, service):
+        service.get_active_workout = MagicMock(return_value=None)
+
+        assert SessionBuffer().get_active_workout(service, uuid4()) is None
+        service.get_active_workout.assert_called_once()
@@ -0,0 +1,140 @@
+"""
+Set Write Coalescing Tests
+
+Testing Focus:
+- Updates to one set inside the window become a single write and every
+  caller receives the merged result
+- Conditional (If-Match) updates are never merged: they flush the pending
+  batch and are written on their own, so a stale version still gets 409
+- Errors reach every caller of the batch
+- Explicit flushes (workout completion, shutdown) write pending batches
+"""
+
+import asyncio
+import os
+from datetime import datetime, timezone
+from uuid import uuid4
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import HTTPException
+
+# Test environment setup
+os.environ["TESTING"] = "true"
+
+from models.auth import WeightUnit
+from models.workout import UpdateSetRequest, SetResponse
+from services.set_coalescing_service import SetWriteCoalescer
+
+
+def _service() -> MagicMock:
+    """WorkoutService mock whose update_set echoes the merged fields."""
+    service = MagicMock()
+
+    versions = {}
+
+    def update_set(user_id, set_id, update_data, weight_unit, expected_version=None):
+        version = versions.get(set_id, 1)
+        if expected_version is not None and expected_version != version:
+            raise HTTPException(status_code=409, detail="Set was modified")
+        versions[set_id] = version + 1
+        now = datetime.now(timezone.utc)
+        return SetResponse(
+            id=set_id, workout_exercise_id=uuid4(), completed=True, order_index=0,
+            completed_at=now, created_at=now, version=version + 1,
+            **update_data.model_dump(exclude_none=True)
+        )
+
+    service.update_set.side_effect = update_set
+    return service
+
+
+class TestSetWriteCoalescer:
+    """Burst edits stop multiplying database writes."""
+
+    @pytest.mark.asyncio
+    async def test_burst_is_written_once(self):
+        coalescer = SetWriteCoalescer(window_ms=20)
+        service, user_id, set_id = _service(), uuid4(), uuid4()
+
+        results = await asyncio.gather(
+            coalescer.update_set(service, user_id, set_id, UpdateSetRequest(reps=8)),
+            coalescer.update_set(service, user_id, set_id, UpdateSetRequest(weight=100)),
+            coalescer.update_set(service, user_id, set_id, UpdateSetRequest(reps=10))
+        )
+
+        assert service.update_set.call_count == 1
+        assert service.update_set.call_args.kwargs["update_data"] == UpdateSetRequest(reps=10, weight=100)
+        assert all(result == results[0] for result in results)
+        assert coalescer.stats() == {"submitted": 3, "written": 1, "pending": 0}
+
+    @pytest.mark.asyncio
+    async def test_disabled_window_writes_immediately(self):
+        coalescer = SetWriteCoalescer(window_ms=0)
+        service = _service()
+
+        await coalescer.update_set(service, uuid4(), uuid4(), UpdateSetRequest(reps=5), WeightUnit.LBS)
+
+        assert service.update_set.call_count == 1
+        assert service.update_set.call_args.kwargs["weight_unit"] == WeightUnit.LBS
+
+    @pytest.mark.asyncio
+    async def test_conditional_update_flushes_batch_and_writes_alone(self):
+        coalescer = SetWriteCoalescer(window_ms=60000)
+        service, user_id, set_id = _service(), uuid4(), uuid4()
+
+        pending = asyncio.ensure_future(coalescer.update_set(service, user_id, set_id, UpdateSetRequest(reps=8)))
+        await asyncio.sleep(0)
+        result = await coalescer.update_set(service, user_id, set_id, UpdateSetRequest(reps=9), expected_version=2)
+
+        assert (await pending).reps == 8
+        assert result.reps == 9
+        versions = [call.kwargs.get("expected_version") for call in service.update_set.call_args_list]
+        assert versions == [None, 2]
+
+    @pytest.mark.asyncio
+    async def test_same_version_updates_inside_window_conflict(self):
+        coalescer = SetWriteCoalescer(window_ms=20)
+        service, user_id, set_id = _service(), uuid4(), uuid4()
+
+        results = await asyncio.gather(
+            coalescer.update_set(service, user_id, set_id, UpdateSetRequest(reps=8), expected_version=1),
+            coalescer.update_set(service, user_id, set_id, UpdateSetRequest(reps=9), expected_version=1),
+            return_exceptions=True
+        )
+
+        assert results[0].reps == 8
+        assert isinstance(results[1], HTTPException) and results[1].status_code == 409
+        assert service.update_set.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_error_reaches_every_caller(self):
+        coalescer = SetWriteCoalescer(window_ms=20)
+        service, user_id, set_id = MagicMock(), uuid4(), uuid4()
+        service.update_set.side_effect = HTTPException(status_code=404, detail="Set not found")
+
+        results = await asyncio.gather(
+            coalescer.update_set(service, user_id, set_id, UpdateSetRequest(reps=8)),
+            coalescer.update_set(service, user_id, set_id, UpdateSetRequest(reps=9)),
+            return_exceptions=True
+        )
+
+        assert [result.status_code for result in results] == [404, 404]
+        assert service.update_set.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_flush_user_writes_before_window_closes(self):
+        coalescer = SetWriteCoalescer(window_ms=60000)
+        service, user_id, other_user = _service(), uuid4(), uuid4()
+
+        mine = asyncio.ensure_future(coalescer.update_set(service, user_id, uuid4(), UpdateSetRequest(reps=8)))
+        theirs = asyncio.ensure_future(coalescer.update_set(service, other_user, uuid4(), UpdateSetRequest(reps=8)))
+        await asyncio.sleep(0)
+
+        coalescer.flush_user(user_id)
+        assert (await mine).reps == 8
+        assert not theirs.done()
+
+        coalescer.flush_all()
+        assert (await theirs).reps == 8
+        assert coalescer.stats()["pending"] == 0
@@ -175,7 +175,7 @@ class TestSupabaseConnection:
         set_response = supabase_client.table("sets").insert({
             "workout_exercise_id": workout_exercise_id,
             "reps": 10,
-            "weight": 100.50
+            "weight_grams": 100500
         }).execute()
         
         assert set_response.data is not None
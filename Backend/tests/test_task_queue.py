@@ -0,0 +1,149 @@
+"""
+Background Task Queue Tests
+
+Testing Focus:
+- Enqueue returns immediately and workers run tasks off the event loop
+- Higher priorities run first; tasks sharing a key run in enqueue order
+- Failures are retried with backoff, then given up on
+- A full queue runs tasks off the event loop without breaking key order;
+  a stopped pool runs tasks inline
+- Stopping drains accepted tasks, including retries waiting on backoff
+"""
+
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+# Test environment setup
+os.environ["TESTING"] = "true"
+
+from core.task_queue import TaskQueue, TaskPriority
+
+
+class TestTaskQueue:
+    """Worker pool around synchronous side effects."""
+
+    @pytest.mark.asyncio
+    async def test_runs_tasks_off_the_event_loop(self):
+        queue = TaskQueue(workers=2)
+        loop_thread = threading.get_ident()
+        threads = []
+
+        await queue.start()
+        assert queue.enqueue("task", lambda: threads.append(threading.get_ident())) is True
+        await queue.stop()
+
+        assert threads and loop_thread not in threads
+        stats = queue.stats()
+        assert (stats["enqueued"], stats["completed"], stats["depth"]["normal"]) == (1, 1, 0)
+
+    @pytest.mark.asyncio
+    async def test_priority_then_key_order(self):
+        queue = TaskQueue(workers=1)
+        order = []
+        gate = threading.Event()
+
+        await queue.start()
+        queue.enqueue("blocker", gate.wait)
+        await asyncio.sleep(0.01)
+        queue.enqueue("low", lambda: order.append("low"), priority=TaskPriority.LOW)
+        queue.enqueue("first", lambda: order.append("first"), key="user-1")
+        queue.enqueue("second", lambda: order.append("second"), key="user-1", priority=TaskPriority.HIGH)
+        queue.enqueue("high", lambda: order.append("high"), priority=TaskPriority.HIGH)
+        await asyncio.sleep(0.01)
+        assert queue.stats()["depth"] == {"high": 2, "normal": 2, "low": 1}
+
+        gate.set()
+        await queue.stop()
+
+        # "second" is HIGH but waits for "first", which shares its key
+        assert order == ["high", "first", "second", "low"]
+
+    @pytest.mark.asyncio
+    async def test_retries_with_backoff_then_gives_up(self):
+        queue = TaskQueue(workers=1, max_attempts=3, backoff_seconds=0.01)
+        attempts = []
+
+        def flaky():
+            attempts.append(time.monotonic())
+            if len(attempts) < 3:
+                raise RuntimeError("database unavailable")
+
+        def broken():
+            raise RuntimeError("database unavailable")
+
+        await queue.start()
+        queue.enqueue("flaky", flaky)
+        queue.enqueue("broken", broken, max_attempts=2)
+        await asyncio.sleep(0.2)
+        await queue.stop()
+
+        assert len(attempts) == 3
+        assert attempts[2] - attempts[1] >= attempts[1] - attempts[0] >= 0.01
+        stats = queue.stats()
+        assert (stats["completed"], stats["failed"], stats["retried"]) == (1, 1, 3)
+
+    @pytest.mark.asyncio
+    async def test_full_queue_and_stopped_pool_run_inline(self):
+        queue = TaskQueue(workers=1, max_size=1)
+        ran = []
+        gate = threading.Event()
+
+        assert queue.enqueue("before start", lambda: ran.append("before start")) is False
+        await queue.start()
+        queue.enqueue("blocker", gate.wait)
+        assert queue.enqueue("overflow", lambda: ran.append(threading.get_ident())) is False
+        gate.set()
+        await queue.stop()
+
+        assert ran[0] == "before start"
+        assert ran[1] != threading.get_ident()  # never on the event loop
+        assert queue.stats()["ran_inline"] == 2
+
+    @pytest.mark.asyncio
+    async def test_full_queue_keeps_key_order(self):
+        queue = TaskQueue(workers=1, max_size=2)
+        order = []
+        gate, overflow_gate = threading.Event(), threading.Event()
+
+        await queue.start()
+        queue.enqueue("blocker", gate.wait)
+        queue.enqueue("record set", lambda: order.append("record set"), key="records:user-1")
+        # Full, but the key has queued work: waits behind it instead of running now
+        assert queue.enqueue("remove set", lambda: order.append("remove set"), key="records:user-1") is True
+        # Full and the key is idle: runs outside the pool, still holding its key
+        assert queue.enqueue("other", lambda: (overflow_gate.wait(), order.append("other")), key="records:user-2") is False
+        queue.enqueue("other again", lambda: order.append("other again"), key="records:user-2")
+        await asyncio.sleep(0.01)
+        assert order == []
+
+        overflow_gate.set()
+        gate.set()
+        await queue.stop()
+
+        assert order.index("record set") < order.index("remove set")
+        assert order.index("other") < order.index("other again")
+        assert queue.stats()["depth"] == {"high": 0, "normal": 0, "low": 0}
+
+    @pytest.mark.asyncio
+    async def test_stop_runs_waiting_retries(self):
+        queue = TaskQueue(workers=1, max_attempts=5, backoff_seconds=60)
+        attempts = []
+
+        def flaky():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise RuntimeError("database unavailable")
+
+        await queue.start()
+        queue.enqueue("flaky", flaky)
+        await asyncio.sleep(0.05)
+        assert queue.stats()["retry_waiting"] == 1
+
+        await queue.stop()
+
+        assert len(attempts) == 2
+        assert queue.stats()["completed"] == 1
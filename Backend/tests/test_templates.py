@@ -0,0 +1,211 @@
+"""
+Workout Template Tests
+
+Testing Focus:
+- Template creation as a single transactional RPC
+- Template retrieval scoped to the owner
+- Materializing a template into a workout with one RPC plus one nested read
+- POST /workouts/from-template/{template_id} routing and error mapping
+"""
+
+import os
+from datetime import datetime, timezone
+from uuid import uuid4
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from postgrest.exceptions import APIError
+
+# Test environment setup
+os.environ["TESTING"] = "true"
+
+from models.auth import WeightUnit
+from models.template import CreateTemplateRequest, CreateWorkoutFromTemplateRequest
+from services.template_service import TemplateService, TEMPLATE_DETAILS_SELECT
+from services.workout_service import WorkoutService, ORDER_INDEX_GAP
+
+
+def _timestamp() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _template_record(user_id: str, exercise_ids) -> dict:
+    template_id = str(uuid4())
+    return {
+        "id": template_id,
+        "user_id": user_id,
+        "title": "Push Day",
+        "notes": None,
+        "created_at": _timestamp(),
+        "updated_at": _timestamp(),
+        "workout_template_exercises": [
+            {
+                "id": str(uuid4()),
+                "template_id": template_id,
+                "exercise_id": exercise_id,
+                "order_index": i * ORDER_INDEX_GAP,
+                "target_sets": 3,
+                "target_reps": 8,
+                "target_weight_grams": 61235,
+                "target_duration": None,
+                "target_distance_cm": None,
+                "rest_time": 90,
+                "notes": None,
+                "exercises": {
+                    "id": exercise_id,
+                    "name": f"Exercise {i}",
+                    "category": "strength",
+                    "body_part": ["chest"],
+                    "equipment": ["barbell"],
+                    "description": None
+                }
+            }
+            for i, exercise_id in enumerate(exercise_ids)
+        ]
+    }
+
+
+def _workout_record(user_id: str) -> dict:
+    return {
+        "id": str(uuid4()),
+        "user_id": user_id,
+        "title": "Push Day",
+        "started_at": _timestamp(),
+        "completed_at": None,
+        "duration": None,
+        "is_active": True,
+        "created_at": _timestamp(),
+        "updated_at": _timestamp(),
+        "workout_exercises": []
+    }
+
+
+@pytest.fixture
+def supabase():
+    """Chainable Supabase client mock - every builder method returns the same builder."""
+    client = MagicMock()
+    builder = MagicMock()
+    for method in ("select", "eq", "order", "maybe_single", "delete"):
+        getattr(builder, method).return_value = builder
+    client.table.return_value = builder
+    client.rpc.return_value = builder
+    client.builder = builder
+    return client
+
+
+class TestTemplateService:
+    """Template writes are one transaction; reads are one nested query."""
+
+    def test_create_template_is_single_rpc(self, supabase):
+        user_id = str(uuid4())
+        exercise_ids = [str(uuid4()) for _ in range(2)]
+        record = _template_record(user_id, exercise_ids)
+        supabase.builder.execute.side_effect = [MagicMock(data=[{"id": record["id"]}]), MagicMock(data=record)]
+
+        template = TemplateService(supabase).create_template(user_id, CreateTemplateRequest(
+            title="Push Day",
+            exercises=[{"exercise_id": e, "target_sets": 3, "target_reps": 8, "target_weight": 135} for e in exercise_ids]
+        ), weight_unit=WeightUnit.LBS)
+
+        name, params = supabase.rpc.call_args[0]
+        assert name == "create_workout_template"
+        assert [item["exercise_id"] for item in params["p_exercises"]] == exercise_ids
+        assert params["p_exercises"][0]["target_weight_grams"] == 61235
+        supabase.builder.select.assert_called_once_with(TEMPLATE_DETAILS_SELECT)
+        assert [e.target_sets for e in template.exercises] == [3, 3]
+        assert [e.target_weight for e in template.exercises] == [135.0, 135.0]
+
+    def test_unknown_exercise_is_bad_request(self, supabase):
+        supabase.builder.execute.side_effect = APIError({"code": "23503", "message": "fk violation"})
+
+        with pytest.raises(HTTPException) as exc_info:
+            TemplateService(supabase).create_template(uuid4(), CreateTemplateRequest(
+                title="Push Day", exercises=[{"exercise_id": str(uuid4())}]
+            ))
+        assert exc_info.value.status_code == 400
+
+    def test_get_template_is_scoped_to_owner(self, supabase):
+        user_id = str(uuid4())
+        supabase.builder.execute.return_value = None
+
+        with pytest.raises(HTTPException) as exc_info:
+            TemplateService(supabase).get_template(user_id, uuid4())
+
+        assert exc_info.value.status_code == 404
+        supabase.builder.eq.assert_any_call("user_id", user_id)
+
+    def test_duplicate_exercises_rejected(self):
+        exercise_id = str(uuid4())
+        with pytest.raises(ValueError):
+            CreateTemplateRequest(title="Push", exercises=[{"exercise_id": exercise_id}, {"exercise_id": exercise_id}])
+
+
+class TestWorkoutFromTemplate:
+    """Materialization runs in the database, not one request per row."""
+
+    def _service(self, supabase) -> WorkoutService:
+        service = WorkoutService()
+        service.supabase = supabase
+        return service
+
+    def test_materialize_is_one_rpc_and_one_read(self, supabase):
+        user_id = str(uuid4())
+        workout = _workout_record(user_id)
+        supabase.builder.execute.side_effect = [MagicMock(data=[workout]), MagicMock(data=workout)]
+        template_id = uuid4()
+
+        details = self._service(supabase).create_workout_from_template(
+            user_id, template_id, CreateWorkoutFromTemplateRequest(title="Heavy Push")
+        )
+
+        supabase.rpc.assert_called_once()
+        name, params = supabase.rpc.call_args[0]
+        assert name == "create_workout_from_template"
+        assert params["p_template_id"] == str(template_id)
+        assert params["p_title"] == "Heavy Push"
+        assert supabase.builder.execute.call_count == 2
+        assert str(details.id) == workout["id"]
+
+    def test_missing_template_returns_404(self, supabase):
+        supabase.builder.execute.side_effect = APIError({"code": "P0002", "message": "Template not found"})
+
+        with pytest.raises(HTTPException) as exc_info:
+            self._service(supabase).create_workout_from_template(uuid4(), uuid4())
+        assert exc_info.value.status_code == 404
+
+
+class TestWorkoutFromTemplateEndpoint:
+    """POST /workouts/from-template/{template_id} through the router."""
+
+    @pytest.fixture
+    def client(self):
+        from main import app
+        from services.auth_service import get_current_user
+        from services.unit_service import get_weight_unit
+
+        user_id = str(uuid4())
+        app.dependency_overrides[get_current_user] = lambda: {"id": user_id, "email": "test@example.com"}
+        app.dependency_overrides[get_weight_unit] = lambda: WeightUnit.KG
+        yield TestClient(app), user_id
+        app.dependency_overrides.clear()
+
+    def test_body_is_optional(self, client):
+        from models.workout import WorkoutWithExercisesResponse
+
+        test_client, user_id = client
+        with patch("routers.workouts.workout_service") as mock_service:
+            mock_service.create_workout_from_template.return_value = WorkoutWithExercisesResponse(**_workout_record(user_id), exercises=[])
+            response = test_client.post(f"/workouts/from-template/{uuid4()}")
+
+        assert response.status_code == 201
+        assert mock_service.create_workout_from_template.call_args.kwargs["overrides"] is None
+
+    def test_missing_template(self, client):
+        test_client, _ = client
+        with patch("routers.workouts.workout_service") as mock_service:
+            mock_service.create_workout_from_template.side_effect = HTTPException(status_code=404, detail="Template not found")
+            response = test_client.post(f"/workouts/from-template/{uuid4()}", json={"title": "Legs"})
+
+        assert response.status_code == 404
@@ -0,0 +1,117 @@
+"""
+Unit Conversion Tests
+
+Testing Focus:
+- Weights round-trip through integer grams in kg and lbs
+- Distances round-trip through integer centimetres
+- The weight unit preference is loaded once and cached until invalidated
+- Writes carrying a weight read the preference fresh, so a stale cached
+  unit never converts incoming weights; other writes skip the read
+"""
+
+import os
+from decimal import Decimal
+from uuid import uuid4
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# Test environment setup
+os.environ["TESTING"] = "true"
+
+from models.auth import WeightUnit
+from services.unit_service import (
+    WeightUnitCache,
+    weight_to_grams,
+    grams_to_weight,
+    meters_to_cm,
+    cm_to_meters,
+    resolve_weight_unit,
+    resolve_write_weight_unit,
+    get_write_weight_unit
+)
+
+
+class TestConversions:
+    """Integer storage loses nothing the API can express."""
+
+    @pytest.mark.parametrize("weight", ["0", "2.5", "61.25", "135.5", "999.99"])
+    @pytest.mark.parametrize("unit", [WeightUnit.KG, WeightUnit.LBS])
+    def test_two_decimal_weights_round_trip(self, weight, unit):
+        assert grams_to_weight(weight_to_grams(Decimal(weight), unit), unit) == float(weight)
+
+    def test_grams(self):
+        assert weight_to_grams(Decimal("100"), WeightUnit.KG) == 100000
+        assert weight_to_grams(Decimal("135"), "lbs") == 61235
+        assert grams_to_weight(61240, WeightUnit.KG) == 61.24
+        assert weight_to_grams(None, WeightUnit.KG) is None
+        assert grams_to_weight(None, WeightUnit.LBS) is None
+
+    def test_distance(self):
+        assert meters_to_cm(Decimal("1234.56")) == 123456
+        assert cm_to_meters(123456) == 1234.56
+        assert meters_to_cm(None) is None and cm_to_meters(None) is None
+
+
+class TestWeightUnitResolution:
+    """One preference read per user until the profile changes."""
+
+    @pytest.fixture
+    def cache(self):
+        cache = WeightUnitCache(max_entries=2, ttl_seconds=60)
+        with patch("services.unit_service.get_weight_unit_cache", return_value=cache):
+            yield cache
+
+    def _client(self, preferences):
+        client = MagicMock()
+        builder = client.table.return_value
+        builder.select.return_value = builder
+        builder.eq.return_value = builder
+        builder.execute.return_value = MagicMock(data=[{"preferences": preferences}])
+        return client
+
+    def test_loaded_once_then_cached(self, cache):
+        client = self._client({"weightUnit": "kg"})
+        user_id = uuid4()
+
+        assert resolve_weight_unit(user_id, client) == WeightUnit.KG
+        assert resolve_weight_unit(user_id, client) == WeightUnit.KG
+        assert client.table.call_count == 1
+
+        cache.invalidate(user_id)
+        resolve_weight_unit(user_id, client)
+        assert client.table.call_count == 2
+
+    def test_write_unit_ignores_stale_cache(self, cache):
+        client = self._client({"weightUnit": "kg"})
+        user_id = uuid4()
+        cache.put(user_id, WeightUnit.LBS)  # changed to kg on another worker
+
+        with patch("services.supabase_client.SupabaseService") as service:
+            service.return_value.client = client
+            assert get_write_weight_unit({"id": str(user_id)}) == WeightUnit.KG
+
+        assert client.table.call_count == 1
+        assert cache.get(user_id) == WeightUnit.KG
+
+    def test_write_without_weight_skips_the_read(self, cache):
+        client = self._client({"weightUnit": "kg"})
+        user_id = uuid4()
+
+        with patch("services.supabase_client.SupabaseService") as service:
+            service.return_value.client = client
+            assert resolve_write_weight_unit(user_id, None, WeightUnit.LBS) == WeightUnit.LBS
+            assert client.table.call_count == 0
+            assert resolve_write_weight_unit(user_id, Decimal("80"), WeightUnit.LBS) == WeightUnit.KG
+            assert client.table.call_count == 1
+
+    def test_missing_preference_defaults_to_lbs(self, cache):
+        assert resolve_weight_unit(uuid4(), self._client(None)) == WeightUnit.LBS
+
+    def test_cache_is_bounded(self, cache):
+        users = [uuid4() for _ in range(3)]
+        for user_id in users:
+            cache.put(user_id, WeightUnit.KG)
+
+        assert cache.get(users[0]) is None
+        assert cache.get(users[2]) == WeightUnit.KG
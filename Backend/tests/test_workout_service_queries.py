@@ -0,0 +1,640 @@
+"""
+Workout Service Query Tests
+
+Unit tests for WorkoutService query shapes using a mocked Supabase client:
+- Nested single-query workout detail retrieval and single-pass hydration
+- Archived workouts read from the archive when opened, without writing,
+  and restored before a set write touches them
+- Owner-filtered workout list in index order
+- Bulk exercise addition and gapped-index reordering
+- Server-side workout cloning
+- One active workout per user (409 on a second)
+- Version-conditional workout and set updates (409 on a stale version)
+- Owner-scoped deletes and inserts (404 for another user's rows)
+- Replay-safe batched writes of session-buffered sets
+- Bounded batches when closing stale workouts
+- Monthly sets partitions created ahead of time
+- Bounded batches when archiving cold workouts
+- Batched last-performance lookups from the maintained cache
+"""
+
+import json
+import os
+from datetime import datetime, timezone
+from uuid import UUID, uuid4
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import HTTPException
+from postgrest.exceptions import APIError
+
+# Test environment setup
+os.environ["TESTING"] = "true"
+
+from models.auth import WeightUnit
+from models.workout import BulkAddExercisesRequest, MoveExerciseRequest, CloneWorkoutRequest, WorkoutExerciseRequest, CreateSetRequest, CreateWorkoutRequest, WorkoutListQuery, UpdateWorkoutRequest, UpdateSetRequest
+from services.concurrency_service import parse_if_match
+from services.workout_service import (
+    WorkoutService,
+    WORKOUT_DETAILS_SELECT,
+    ORDER_INDEX_GAP,
+    midpoint_order_index
+)
+
+
+def _timestamp() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _set_record(workout_exercise_id: str, order_index: int, weight_grams=None) -> dict:
+    return {
+        "id": str(uuid4()),
+        "workout_exercise_id": workout_exercise_id,
+        "reps": 8,
+        "weight_grams": weight_grams,
+        "duration": None,
+        "distance_cm": None,
+        "completed": True,
+        "rest_time": None,
+        "notes": None,
+        "order_index": order_index,
+        "completed_at": _timestamp(),
+        "created_at": _timestamp()
+    }
+
+
+def _nested_workout_record(user_id: str) -> dict:
+    workout_id = str(uuid4())
+    exercises = []
+    for order_index, name in enumerate(["Bench Press", "Squat"]):
+        we_id = str(uuid4())
+        exercise_id = str(uuid4())
+        exercises.append({
+            "id": we_id,
+            "workout_id": workout_id,
+            "exercise_id": exercise_id,
+            "order_index": order_index,
+            "notes": None,
+            "created_at": _timestamp(),
+            "exercises": {
+                "id": exercise_id,
+                "name": name,
+                "category": "strength",
+                "body_part": ["chest"],
+                "equipment": ["barbell"],
+                "description": None
+            },
+            "sets": [_set_record(we_id, i, weight_grams=80500) for i in range(3)]
+        })
+    return {
+        "id": workout_id,
+        "user_id": user_id,
+        "title": "Push Day",
+        "started_at": _timestamp(),
+        "completed_at": None,
+        "duration": None,
+        "is_active": True,
+        "created_at": _timestamp(),
+        "updated_at": _timestamp(),
+        "workout_exercises": exercises
+    }
+
+
+def _service(supabase) -> WorkoutService:
+    """Build a WorkoutService bound to the given mock (conftest patches __init__)."""
+    service = WorkoutService()
+    service.supabase = supabase
+    return service
+
+
+@pytest.fixture
+def supabase():
+    """Chainable Supabase client mock - every builder method returns the same builder."""
+    client = MagicMock()
+    builder = MagicMock()
+    for method in ("select", "eq", "order", "limit", "offset", "maybe_single", "single", "match", "in_",
+                   "insert", "update", "upsert", "delete", "gte", "lte", "lt", "contains"):
+        getattr(builder, method).return_value = builder
+    client.table.return_value = builder
+    client.rpc.return_value = builder
+    client.builder = builder
+    return client
+
+
+class TestWorkoutDetailsQuery:
+    """get_workout_details fetches the whole tree in one round trip."""
+
+    def test_single_nested_query(self, supabase):
+        user_id = str(uuid4())
+        record = _nested_workout_record(user_id)
+        supabase.builder.execute.return_value = MagicMock(data=record)
+
+        details = _service(supabase).get_workout_details(user_id, record["id"])
+
+        supabase.table.assert_called_once_with("workouts")
+        supabase.builder.select.assert_called_once_with(WORKOUT_DETAILS_SELECT)
+        supabase.builder.order.assert_any_call("order_index", foreign_table="workout_exercises")
+        supabase.builder.order.assert_any_call("order_index", foreign_table="workout_exercises.sets")
+        assert supabase.builder.execute.call_count == 1
+
+        assert [e.exercise_details.name for e in details.exercises] == ["Bench Press", "Squat"]
+        assert [s.order_index for s in details.exercises[0].sets] == [0, 1, 2]
+
+    def test_set_weights_are_reported_in_weight_unit(self, supabase):
+        user_id = str(uuid4())
+        record = _nested_workout_record(user_id)
+        supabase.builder.execute.return_value = MagicMock(data=record)
+
+        kg = _service(supabase).get_workout_details(user_id, record["id"], WeightUnit.KG)
+        lbs = _service(supabase).get_workout_details(user_id, record["id"], WeightUnit.LBS)
+
+        assert kg.exercises[0].sets[0].weight == 80.5
+        assert lbs.exercises[0].sets[0].weight == 177.47
+
+    def test_missing_workout_returns_404(self, supabase):
+        supabase.builder.execute.return_value = None
+
+        with pytest.raises(HTTPException) as exc_info:
+            _service(supabase).get_workout_details(uuid4(), uuid4())
+        assert exc_info.value.status_code == 404
+
+    def test_archived_workout_is_read_from_the_archive(self, supabase):
+        user_id = str(uuid4())
+        record = dict(_nested_workout_record(user_id), is_active=False)
+        archived = dict(record, archived_at=_timestamp(), workout_exercises=[
+            dict(exercise, sets=[]) for exercise in record["workout_exercises"]
+        ])
+        archived_sets = [
+            set_record for exercise in record["workout_exercises"] for set_record in exercise["sets"]
+        ]
+        supabase.builder.execute.side_effect = [
+            MagicMock(data=archived), MagicMock(data=[{"sets": archived_sets}])
+        ]
+
+        details = _service(supabase).get_workout_details(user_id, record["id"])
+
+        supabase.rpc.assert_not_called()
+        supabase.builder.update.assert_not_called()
+        supabase.table.assert_called_with("archived_workout_sets")
+        supabase.builder.eq.assert_any_call("user_id", user_id)
+        assert [len(e.sets) for e in details.exercises] == [3, 3]
+        assert [s.order_index for s in details.exercises[0].sets] == [0, 1, 2]
+
+    def test_workout_of_another_user_returns_404(self, supabase):
+        user_id = uuid4()
+        supabase.builder.execute.return_value = None  # the owner filter matches no row
+
+        with pytest.raises(HTTPException) as exc_info:
+            _service(supabase).get_workout_details(user_id, uuid4())
+        assert exc_info.value.status_code == 404
+        supabase.builder.eq.assert_any_call("user_id", str(user_id))
+        supabase.table.assert_called_once_with("workouts")
+
+
+class TestWorkoutListQuery:
+    """get_user_workouts matches idx_workouts_user_id_created_at."""
+
+    def test_filters_by_owner_newest_first(self, supabase):
+        user_id = str(uuid4())
+        supabase.builder.execute.return_value = MagicMock(data=[])
+
+        _service(supabase).get_user_workouts(user_id, WorkoutListQuery(limit=10))
+
+        supabase.builder.eq.assert_any_call("user_id", user_id)
+        supabase.builder.order.assert_called_once_with("created_at", desc=True)
+
+
+def _workout_exercise_record(workout_id: str, exercise_id: str, order_index: int) -> dict:
+    return {
+        "id": str(uuid4()),
+        "workout_id": workout_id,
+        "exercise_id": exercise_id,
+        "order_index": order_index,
+        "notes": None,
+        "created_at": _timestamp()
+    }
+
+
+class TestGappedOrdering:
+    """midpoint_order_index picks a free index between neighbours."""
+
+    def test_empty_workout_starts_at_zero(self):
+        assert midpoint_order_index(None, None) == 0
+
+    def test_append_and_prepend_use_full_gap(self):
+        assert midpoint_order_index(2048, None) == 2048 + ORDER_INDEX_GAP
+        assert midpoint_order_index(None, 2048) == 2048 - ORDER_INDEX_GAP
+
+    def test_between_neighbours(self):
+        assert midpoint_order_index(0, 1024) == 512
+        assert midpoint_order_index(None, 10) == 5
+
+    def test_exhausted_gap_requires_rebalance(self):
+        assert midpoint_order_index(5, 6) is None
+        assert midpoint_order_index(None, 0) is None
+
+
+class TestBulkExerciseWrites:
+    """Bulk add and move issue set-based writes."""
+
+    def test_bulk_add_is_single_rpc(self, supabase):
+        workout_id = str(uuid4())
+        exercise_ids = [str(uuid4()) for _ in range(3)]
+        supabase.builder.execute.return_value = MagicMock(data=[
+            _workout_exercise_record(workout_id, exercise_id, i * ORDER_INDEX_GAP)
+            for i, exercise_id in enumerate(exercise_ids)
+        ])
+
+        created = _service(supabase).add_exercises_to_workout(
+            uuid4(), workout_id,
+            BulkAddExercisesRequest(exercises=[{"exercise_id": exercise_id} for exercise_id in exercise_ids])
+        )
+
+        supabase.rpc.assert_called_once()
+        name, params = supabase.rpc.call_args[0]
+        assert name == "add_workout_exercises"
+        assert [item["exercise_id"] for item in params["p_items"]] == exercise_ids
+        supabase.table.assert_not_called()
+        assert [str(we.exercise_id) for we in created] == exercise_ids
+
+    def test_move_rewrites_one_row(self, supabase):
+        workout_id = str(uuid4())
+        a, b, c = (str(uuid4()) for _ in range(3))
+        current = [_workout_exercise_record(workout_id, e, i * ORDER_INDEX_GAP) for i, e in enumerate([a, b, c])]
+        moved = dict(current[2], order_index=ORDER_INDEX_GAP // 2)
+        supabase.builder.execute.side_effect = [MagicMock(data=current), MagicMock(data=[moved])]
+
+        result = _service(supabase).move_exercise_in_workout(
+            uuid4(), workout_id, UUID(c), MoveExerciseRequest(after_exercise_id=a)
+        )
+
+        supabase.builder.update.assert_called_once_with({"order_index": ORDER_INDEX_GAP // 2})
+        supabase.rpc.assert_not_called()
+        assert result.order_index == ORDER_INDEX_GAP // 2
+
+    def test_move_without_gap_rebalances(self, supabase):
+        workout_id = str(uuid4())
+        a, b, c = (str(uuid4()) for _ in range(3))
+        current = [_workout_exercise_record(workout_id, e, i) for i, e in enumerate([a, b, c])]
+        rebalanced = [
+            _workout_exercise_record(workout_id, e, i * ORDER_INDEX_GAP) for i, e in enumerate([a, c, b])
+        ]
+        supabase.builder.execute.side_effect = [MagicMock(data=current), MagicMock(data=rebalanced)]
+
+        result = _service(supabase).move_exercise_in_workout(
+            uuid4(), workout_id, UUID(c), MoveExerciseRequest(after_exercise_id=a)
+        )
+
+        name, params = supabase.rpc.call_args[0]
+        assert name == "reorder_workout_exercises"
+        assert params["p_exercise_ids"] == [a, c, b]
+        assert result.order_index == ORDER_INDEX_GAP
+
+
+class TestCloneWorkout:
+    """Cloning copies rows inside the database with a single RPC."""
+
+    def test_clone_is_single_rpc_then_one_read(self, supabase):
+        user_id = str(uuid4())
+        record = _nested_workout_record(user_id)
+        supabase.builder.execute.side_effect = [MagicMock(data=[{"id": record["id"]}]), MagicMock(data=record)]
+        source_id = uuid4()
+
+        details = _service(supabase).clone_workout(user_id, source_id, CloneWorkoutRequest(mode="with_weights"))
+
+        name, params = supabase.rpc.call_args[0]
+        assert name == "clone_workout"
+        assert params["p_workout_id"] == str(source_id)
+        assert params["p_mode"] == "with_weights"
+        supabase.builder.insert.assert_not_called()
+        assert str(details.id) == record["id"]
+
+    def test_defaults_to_structure_only(self, supabase):
+        record = _nested_workout_record(str(uuid4()))
+        supabase.builder.execute.side_effect = [MagicMock(data=[{"id": record["id"]}]), MagicMock(data=record)]
+
+        _service(supabase).clone_workout(uuid4(), uuid4())
+
+        assert supabase.rpc.call_args[0][1]["p_mode"] == "structure"
+
+    def test_missing_source_returns_404(self, supabase):
+        supabase.builder.execute.side_effect = APIError({"code": "P0002", "message": "Workout not found"})
+
+        with pytest.raises(HTTPException) as exc_info:
+            _service(supabase).clone_workout(uuid4(), uuid4())
+        assert exc_info.value.status_code == 404
+
+
+class TestSingleActiveWorkout:
+    """The partial unique index surfaces as 409 on every way to start a workout."""
+
+    def _unique_violation(self) -> APIError:
+        return APIError({
+            "code": "23505",
+            "message": 'duplicate key value violates unique constraint "idx_workouts_one_active_per_user"'
+        })
+
+    def test_second_active_workout_conflicts(self, supabase):
+        supabase.builder.execute.side_effect = self._unique_violation()
+
+        with pytest.raises(HTTPException) as exc_info:
+            _service(supabase).create_workout(uuid4(), CreateWorkoutRequest(title="Legs"))
+        assert exc_info.value.status_code == 409
+
+    def test_clone_while_active_conflicts(self, supabase):
+        supabase.builder.execute.side_effect = self._unique_violation()
+
+        with pytest.raises(HTTPException) as exc_info:
+            _service(supabase).clone_workout(uuid4(), uuid4())
+        assert exc_info.value.status_code == 409
+
+    def test_other_unique_violation_is_not_an_active_conflict(self, supabase):
+        supabase.builder.execute.side_effect = APIError({
+            "code": "23505",
+            "message": 'duplicate key value violates unique constraint "sets_pkey"'
+        })
+
+        with pytest.raises(HTTPException) as exc_info:
+            _service(supabase).clone_workout(uuid4(), uuid4())
+        assert exc_info.value.status_code == 500
+        assert exc_info.value.detail == "Database error during workout clone"
+
+
+class TestOwnerScopedWrites:
+    """Writes match the caller's rows only; the service role bypasses RLS."""
+
+    def test_deleting_another_users_set_is_404(self, supabase):
+        user_id = str(uuid4())
+        supabase.builder.execute.return_value = MagicMock(data=[])
+
+        with pytest.raises(HTTPException) as exc_info:
+            _service(supabase).delete_set(user_id, uuid4())
+        assert exc_info.value.status_code == 404
+        supabase.builder.eq.assert_any_call("user_id", user_id)
+
+    def test_adding_a_set_to_another_users_workout_is_404(self, supabase):
+        user_id = str(uuid4())
+        supabase.builder.execute.return_value = None  # maybe_single with no row
+
+        with pytest.raises(HTTPException) as exc_info:
+            _service(supabase).add_set_to_exercise(user_id, uuid4(), uuid4(), CreateSetRequest(reps=8))
+        assert exc_info.value.status_code == 404
+        assert supabase.builder.match.call_args[0][0]["user_id"] == user_id
+        supabase.builder.insert.assert_not_called()
+
+    def test_adding_an_exercise_to_another_users_workout_is_404(self, supabase):
+        user_id = str(uuid4())
+        supabase.builder.execute.return_value = None
+
+        with pytest.raises(HTTPException) as exc_info:
+            _service(supabase).add_exercise_to_workout(user_id, uuid4(), WorkoutExerciseRequest(exercise_id=uuid4(), order_index=0))
+        assert exc_info.value.status_code == 404
+        supabase.builder.eq.assert_any_call("user_id", user_id)
+        supabase.builder.insert.assert_not_called()
+
+
+class TestArchivedWorkoutWrites:
+    """Set writes to an archived workout restore it first, so its sets stay in one store."""
+
+    def test_adding_a_set_restores_the_archived_workout(self, supabase):
+        user_id, workout_id = str(uuid4()), str(uuid4())
+        created = _set_record(str(uuid4()), 3)
+        supabase.builder.execute.side_effect = [
+            MagicMock(data={"id": created["workout_exercise_id"], "workouts": {"archived_at": _timestamp()}}),
+            MagicMock(data=[]),  # restore_archived_workout
+            MagicMock(data=[{"order_index": 2}]),
+            MagicMock(data=[created])
+        ]
+
+        _service(supabase).add_set_to_exercise(user_id, workout_id, uuid4(), CreateSetRequest(reps=8))
+
+        assert supabase.rpc.call_args_list[0].args == (
+            "restore_archived_workout", {"p_user_id": user_id, "p_workout_id": workout_id}
+        )
+        assert supabase.builder.insert.call_args[0][0]["order_index"] == 3
+
+    def test_updating_an_archived_set_restores_then_retries(self, supabase):
+        user_id, archived_workout_id = str(uuid4()), str(uuid4())
+        updated = dict(_set_record(str(uuid4()), 0), notes="Paused reps")
+        supabase.builder.execute.side_effect = [
+            MagicMock(data=[]),
+            MagicMock(data=[{"workout_id": archived_workout_id}]),
+            MagicMock(data=[]),  # restore_archived_workout
+            MagicMock(data=[updated])
+        ]
+
+        result = _service(supabase).update_set(user_id, updated["id"], UpdateSetRequest(notes="Paused reps"))
+
+        supabase.rpc.assert_called_once_with(
+            "restore_archived_workout", {"p_user_id": user_id, "p_workout_id": archived_workout_id}
+        )
+        supabase.builder.contains.assert_called_once_with("sets", json.dumps([{"id": updated["id"]}]))
+        assert result.notes == "Paused reps"
+
+    def test_set_in_no_archive_is_404_without_restore(self, supabase):
+        supabase.builder.execute.return_value = MagicMock(data=[])
+
+        with pytest.raises(HTTPException) as exc_info:
+            _service(supabase).delete_set(uuid4(), uuid4())
+        assert exc_info.value.status_code == 404
+        supabase.rpc.assert_not_called()
+
+
+class TestConditionalUpdates:
+    """If-Match versions are compared inside the UPDATE, not read beforehand."""
+
+    def test_set_update_compares_version_in_same_statement(self, supabase):
+        user_id = str(uuid4())
+        updated = dict(_set_record(str(uuid4()), 0), notes="Paused reps", version=4)
+        supabase.builder.execute.return_value = MagicMock(data=[updated])
+
+        result = _service(supabase).update_set(
+            user_id, updated["id"], UpdateSetRequest(notes="Paused reps"), expected_version=3
+        )
+
+        supabase.builder.eq.assert_any_call("user_id", user_id)
+        supabase.builder.eq.assert_any_call("version", 3)
+        supabase.builder.select.assert_not_called()
+        assert supabase.builder.execute.call_count == 1
+        assert result.version == 4
+
+    def test_unconditional_update_does_not_filter_on_version(self, supabase):
+        record = _nested_workout_record(str(uuid4()))
+        workout = {key: value for key, value in record.items() if key != "workout_exercises"}
+        supabase.builder.execute.return_value = MagicMock(data=[dict(workout, title="Push", version=2)])
+
+        result = _service(supabase).update_workout(workout["user_id"], workout["id"], UpdateWorkoutRequest(title="Push"))
+
+        assert ("version",) not in [call.args[:1] for call in supabase.builder.eq.call_args_list]
+        assert result.version == 2
+
+    def test_stale_version_conflicts(self, supabase):
+        supabase.builder.execute.side_effect = [MagicMock(data=[]), MagicMock(data=[{"version": 5}])]
+
+        with pytest.raises(HTTPException) as exc_info:
+            _service(supabase).update_workout(
+                uuid4(), uuid4(), UpdateWorkoutRequest(title="Push"), expected_version=3
+            )
+        assert exc_info.value.status_code == 409
+        assert "version 5" in exc_info.value.detail
+
+    def test_missing_row_is_404_not_conflict(self, supabase):
+        supabase.builder.execute.side_effect = [MagicMock(data=[]), MagicMock(data=[]), MagicMock(data=[])]
+
+        with pytest.raises(HTTPException) as exc_info:
+            _service(supabase).update_set(uuid4(), uuid4(), UpdateSetRequest(notes="x"), expected_version=1)
+        assert exc_info.value.status_code == 404
+
+    @pytest.mark.parametrize("header, version", [
+        (None, None), ("*", None), ('"3"', 3), ('W/"12"', 12), ("7", 7)
+    ])
+    def test_if_match_parsing(self, header, version):
+        assert parse_if_match(header) == version
+
+    @pytest.mark.parametrize("header", ['"abc"', "", '"1", "2"', "-1"])
+    def test_malformed_if_match_is_400(self, header):
+        with pytest.raises(HTTPException) as exc_info:
+            parse_if_match(header)
+        assert exc_info.value.status_code == 400
+
+
+class TestBufferedSetWrites:
+    """Session-buffered sets are written in one insert that tolerates replays."""
+
+    def test_creates_are_one_idempotent_insert(self, supabase):
+        user_id = str(uuid4())
+        rows = [dict(_set_record(str(uuid4()), i), weight_grams=None) for i in range(3)]
+        created = [{"exercise_id": str(uuid4()), "workout_id": str(uuid4()), "row": row} for row in rows]
+        updated = [{"exercise_id": str(uuid4()), "workout_id": str(uuid4()), "set_id": rows[0]["id"], "fields": {"notes": "x"}}]
+        supabase.builder.execute.return_value = MagicMock(data=[])
+
+        _service(supabase).write_buffered_sets(user_id, created, updated)
+
+        supabase.builder.upsert.assert_called_once_with(
+            rows, on_conflict="id,completed_at", ignore_duplicates=True, default_to_null=False
+        )
+        supabase.builder.update.assert_called_once_with({"notes": "x"})
+        supabase.builder.eq.assert_any_call("user_id", user_id)
+
+
+class TestStaleWorkoutCloser:
+    """Stale workouts are closed by set-based RPC batches."""
+
+    def _closed(self, count: int) -> list:
+        user_id = str(uuid4())
+        return [dict(_nested_workout_record(user_id), is_active=False) for _ in range(count)]
+
+    def test_batches_until_short_batch(self, supabase):
+        supabase.builder.execute.side_effect = [MagicMock(data=self._closed(2)), MagicMock(data=self._closed(1))]
+
+        report = _service(supabase).close_stale_workouts(idle_hours=12, batch_size=2, max_batches=10)
+
+        assert supabase.rpc.call_count == 2
+        name, params = supabase.rpc.call_args[0]
+        assert name == "close_stale_workouts"
+        assert params["p_batch_size"] == 2
+        assert (report.closed, report.batches, report.users, report.more_pending) == (3, 2, 2, False)
+
+    def test_stops_at_batch_limit(self, supabase):
+        supabase.builder.execute.return_value = MagicMock(data=self._closed(2))
+
+        report = _service(supabase).close_stale_workouts(idle_hours=12, batch_size=2, max_batches=3)
+
+        assert supabase.rpc.call_count == 3
+        assert report.closed == 6
+        assert report.more_pending is True
+
+
+class TestSetPartitionMaintenance:
+    """Monthly sets partitions are created ahead by one RPC."""
+
+    def test_returns_created_partitions(self, supabase):
+        supabase.builder.execute.return_value = MagicMock(data=[{"partition_name": "sets_2027_01"}])
+
+        created = _service(supabase).ensure_set_partitions(months_ahead=3)
+
+        supabase.rpc.assert_called_once_with("ensure_sets_partitions", {"p_months_ahead": 3})
+        assert created == ["sets_2027_01"]
+
+    def test_database_error_is_500(self, supabase):
+        supabase.builder.execute.side_effect = APIError({"code": "22023", "message": "Invalid months ahead: 99"})
+
+        with pytest.raises(HTTPException) as exc_info:
+            _service(supabase).ensure_set_partitions(months_ahead=99)
+        assert exc_info.value.status_code == 500
+
+
+class TestColdWorkoutArchive:
+    """Cold workouts are archived by set-based RPC batches."""
+
+    def _archived(self, count: int) -> list:
+        user_id = str(uuid4())
+        return [dict(_nested_workout_record(user_id), is_active=False, archived_at=_timestamp()) for _ in range(count)]
+
+    def test_batches_until_short_batch(self, supabase):
+        supabase.builder.execute.side_effect = [MagicMock(data=self._archived(2)), MagicMock(data=[])]
+
+        report = _service(supabase).archive_cold_workouts(archive_after_days=365, batch_size=2, max_batches=10)
+
+        assert supabase.rpc.call_count == 2
+        name, params = supabase.rpc.call_args[0]
+        assert name == "archive_cold_workouts"
+        assert params["p_batch_size"] == 2
+        assert datetime.fromisoformat(params["p_started_before"]) < datetime.now(timezone.utc)
+        assert (report.archived, report.batches, report.users, report.more_pending) == (2, 2, 1, False)
+
+    def test_stops_at_batch_limit(self, supabase):
+        supabase.builder.execute.return_value = MagicMock(data=self._archived(2))
+
+        report = _service(supabase).archive_cold_workouts(archive_after_days=365, batch_size=2, max_batches=3)
+
+        assert supabase.rpc.call_count == 3
+        assert report.archived == 6
+        assert report.more_pending is True
+
+
+def _last_performance_record(exercise_id: str) -> dict:
+    return {
+        "exercise_id": exercise_id,
+        "workout_id": str(uuid4()),
+        "performed_at": _timestamp(),
+        "sets": [{"reps": 8, "weight_grams": 36287, "duration": None, "distance_cm": 120000, "rest_time": 90}] * 3
+    }
+
+
+class TestLastPerformance:
+    """Last performance is a keyed read of the cache, never a history scan."""
+
+    def test_batched_lookup_is_one_query(self, supabase):
+        user_id = str(uuid4())
+        exercise_ids = [str(uuid4()) for _ in range(3)]
+        supabase.builder.execute.return_value = MagicMock(data=[_last_performance_record(e) for e in exercise_ids[:2]])
+
+        results = _service(supabase).get_last_performance(user_id, exercise_ids, WeightUnit.LBS)
+
+        supabase.table.assert_called_once_with("exercise_last_performance")
+        supabase.builder.eq.assert_called_once_with("user_id", user_id)
+        supabase.builder.in_.assert_called_once_with("exercise_id", exercise_ids)
+        assert [str(r.exercise_id) for r in results] == exercise_ids[:2]
+        assert results[0].sets[0].weight == 80.0
+        assert results[0].sets[0].distance == 1200.0
+
+    def test_empty_lookup_skips_query(self, supabase):
+        assert _service(supabase).get_last_performance(uuid4(), []) == []
+        supabase.table.assert_not_called()
+
+    def test_add_exercise_can_inline_last_performance(self, supabase):
+        workout_id, exercise_id = str(uuid4()), str(uuid4())
+        supabase.builder.execute.side_effect = [
+            MagicMock(data={"id": workout_id}),
+            MagicMock(data={"id": exercise_id}),
+            MagicMock(data=[_workout_exercise_record(workout_id, exercise_id, 0)]),
+            MagicMock(data=[_last_performance_record(exercise_id)])
+        ]
+
+        result = _service(supabase).add_exercise_to_workout(
+            uuid4(), workout_id, WorkoutExerciseRequest(exercise_id=exercise_id, order_index=0),
+            include_last_performance=True
+        )
+
+        assert len(result.last_performance.sets) == 3